@@ -1,2 +1,13 @@
+import sys
+
 from ._version import __version__, __version_info__
-from .core.create_jacobian import create_jacobian
+
+if sys.version_info >= (3, 7):
+    # the generator (and NumPy) are imported once used, so that the command
+    # line tools start quickly
+    from .utils import lazy_imports
+    __getattr__ = lazy_imports(__name__, {
+        'create_jacobian': '.core.create_jacobian',
+        'create_source_tree': '.core.create_jacobian'})
+else:
+    from .core.create_jacobian import create_jacobian, create_source_tree
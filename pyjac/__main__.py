@@ -1,12 +1,78 @@
+import os
 import sys
+import json
 
 from . import utils
-from .core.create_jacobian import create_jacobian
 
 
 def main(args=None):
     if args is None:
         args = utils.get_parser()
+        # the modules of each command are imported once it is known, so
+        # that e.g. --help answers quickly
+        if args.plan is not None:
+            from .core import planner
+            # keep the messages of the parser out of the JSON
+            stdout = sys.stdout
+            if args.plan == 'json':
+                sys.stdout = sys.stderr
+            try:
+                plan = planner.plan_generation(
+                    lang=args.lang,
+                    mech_name=args.input,
+                    therm_name=args.thermo,
+                    last_spec=args.last_species,
+                    skip_jac=args.skip_jac,
+                    parse_cache=args.parse_cache,
+                    parse_procs=args.parse_procs,
+                    table_kernels=args.table_kernels
+                    )
+            finally:
+                sys.stdout = stdout
+            if args.plan == 'json':
+                print(json.dumps(plan, indent=2, sort_keys=True))
+            else:
+                print(planner.summary(plan))
+            return 0
+        if args.server is not None:
+            from .server import client as server
+            # the options of the mechanism interpreter are the server's
+            params = dict(
+                lang=args.lang,
+                mech_name=os.path.abspath(args.input),
+                therm_name=(os.path.abspath(args.thermo) if args.thermo
+                            else None),
+                build_path=os.path.abspath(args.build_path),
+                options=dict(optimize_cache=args.cache_optimizer,
+                             initial_state=args.initial_conditions,
+                             num_blocks=args.num_blocks,
+                             num_threads=args.num_threads,
+                             no_shared=args.no_shared,
+                             L1_preferred=args.L1_preferred,
+                             multi_thread=args.multi_thread,
+                             force_optimize=args.force_optimize,
+                             skip_jac=args.skip_jac,
+                             last_spec=args.last_species,
+                             auto_diff=args.auto_diff,
+                             cse=args.cse,
+                             jobs=args.jobs,
+                             profile=args.profile is not None,
+                             trace_memory=args.profile != 'time',
+                             disabled_reactions=args.disable_reactions,
+                             delta=args.delta,
+                             table_kernels=args.table_kernels
+                             )
+                )
+            try:
+                manifest = server.call(args.server, 'generate', params)
+            except (server.ServerError, IOError, OSError) as e:
+                print('Error: {}'.format(e))
+                sys.exit(1)
+            print('{} files in {}, {} added or changed'.format(
+                len(manifest['files']), args.build_path,
+                len(manifest['changed'])))
+            return 0
+        from .core.create_jacobian import create_jacobian
         create_jacobian(
                     lang=args.lang,
                     mech_name=args.input,
@@ -22,7 +88,16 @@ def main(args=None):
                     build_path=args.build_path,
                     skip_jac=args.skip_jac,
                     last_spec=args.last_species,
-                    auto_diff=args.auto_diff
+                    auto_diff=args.auto_diff,
+                    parse_cache=args.parse_cache,
+                    parse_procs=args.parse_procs,
+                    cse=args.cse,
+                    jobs=args.jobs,
+                    profile=args.profile is not None,
+                    trace_memory=args.profile != 'time',
+                    disabled_reactions=args.disable_reactions,
+                    delta=args.delta,
+                    table_kernels=args.table_kernels
                     )
 
 if __name__ == '__main__':
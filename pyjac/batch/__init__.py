@@ -0,0 +1,9 @@
+import sys
+
+if sys.version_info >= (3, 7):
+    # the generator is imported once used, so that --help answers quickly
+    from ..utils import lazy_imports
+    __getattr__ = lazy_imports(__name__, dict.fromkeys(
+        ['read_jobs', 'run_batch', 'summary'], '.batch'))
+else:
+    from .batch import read_jobs, run_batch, summary
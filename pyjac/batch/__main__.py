@@ -0,0 +1,46 @@
+import sys
+from argparse import ArgumentParser
+
+
+def main(args=None):
+    if args is None:
+        parser = ArgumentParser(
+            description='batch: generates the code of a list of mechanisms '
+                        'and variants, interpreting each mechanism once.'
+            )
+        parser.add_argument('jobs',
+                            type=str,
+                            help='The job list, JSON (.json) or YAML.'
+                            )
+        parser.add_argument('-w', '--workers',
+                            type=int,
+                            default=None,
+                            help='The number of jobs run at once (default: '
+                                 'the number of CPUs).'
+                            )
+        parser.add_argument('-npc', '--no_parse_cache',
+                            dest='parse_cache',
+                            action='store_false',
+                            help='If specified, do not reuse interpreted '
+                                 'mechanisms from the parse cache.'
+                            )
+        parser.add_argument('-pp', '--parse_processes',
+                            type=int,
+                            dest='parse_procs',
+                            default=1,
+                            help='The number of processes used to interpret '
+                                 'the reactions of a Chemkin-format '
+                                 'mechanism.'
+                            )
+        args = parser.parse_args()
+
+        # the generator is imported once needed
+        from .batch import read_jobs, run_batch, summary
+        results = run_batch(read_jobs(args.jobs), args.workers,
+                            args.parse_cache, args.parse_procs)
+        print(summary(results))
+        if not all(result['succeeded'] for result in results):
+            return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""Generation of many mechanisms and variants in one invocation.
+
+A job list, in JSON or YAML, gives the variants to generate, e.g.::
+
+    defaults:
+      therm_name: therm.dat
+    jobs:
+      - {lang: c, mech_name: mech.inp, build_path: out/c}
+      - {lang: cuda, mech_name: mech.inp, build_path: out/cuda,
+         no_shared: true}
+      - {lang: c, mech_name: mech.inp, build_path: out/c_ar,
+         last_spec: AR}
+
+Each job has the ``lang``, ``mech_name`` and ``build_path`` of
+`create_jacobian`, optionally a ``therm_name``, and any of its
+`job_options`; ``defaults`` apply to every job that does not override them.
+Relative paths are relative to the job list, and no two jobs may share a
+``build_path``. Each mechanism is interpreted once, and shared by all of its
+jobs, which run in a bounded number of worker processes.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import json
+import pickle
+import multiprocessing
+from timeit import default_timer
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+# Local imports
+from .. import utils
+from ..core import mech_cache
+from ..core.create_jacobian import create_jacobian
+
+job_options = ['optimize_cache', 'initial_state', 'num_blocks',
+               'num_threads', 'no_shared', 'L1_preferred', 'multi_thread',
+               'force_optimize', 'last_spec', 'skip_jac', 'auto_diff', 'cse',
+               'profile', 'trace_memory',
+               'disabled_reactions', 'delta', 'table_kernels'
+               ]
+"""list of str: Options of `create_jacobian` a job may set"""
+
+_path_keys = ['mech_name', 'therm_name', 'build_path']
+"""list of str: The keys of a job that are paths"""
+
+_worker_mechanisms = None
+"""dict: The pickled mechanisms, by filenames, in a worker process of a
+batch (see `run_batch`)"""
+
+
+def read_jobs(filename):
+    """Read a job list.
+
+    Parameters
+    ----------
+    filename : str
+        The job list, JSON if its extension is ``.json`` and YAML otherwise;
+        either a list of jobs, or a mapping with the ``jobs`` and optional
+        ``defaults`` (see the module description)
+
+    Returns
+    -------
+    jobs : list of dict
+        The jobs, with ``defaults`` applied and absolute paths; see
+        `check_job`
+
+    """
+    with open(filename, 'r') as file:
+        if filename.endswith('.json'):
+            data = json.load(file)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                print('Error: YAML must be installed to read job list ' +
+                      filename)
+                sys.exit(1)
+            data = yaml.safe_load(file)
+
+    defaults = {}
+    if isinstance(data, dict):
+        defaults = data.get('defaults') or {}
+        data = data.get('jobs')
+        if not isinstance(defaults, dict):
+            print('Error: the defaults in {} are not a mapping'.format(
+                filename))
+            sys.exit(1)
+    if not isinstance(data, list):
+        print('Error: no list of jobs found in ' + filename)
+        sys.exit(1)
+
+    base = os.path.dirname(os.path.abspath(filename))
+    jobs = []
+    for job in data:
+        # anything but a mapping is reported by check_job
+        if isinstance(job, dict):
+            full = dict(defaults)
+            full.update(job)
+            for key in _path_keys:
+                if full.get(key) is not None:
+                    full[key] = os.path.join(base, full[key])
+            job = full
+        jobs.append(job)
+    return check_jobs(jobs)
+
+
+def check_job(job, num=0):
+    """Check the contents of a job, exiting with an error if invalid.
+
+    Parameters
+    ----------
+    job : dict
+        The ``lang``, ``mech_name`` and ``build_path``, optional
+        ``therm_name``, and any of `job_options` of the job
+    num : int, optional
+        The number of the job in its list, for error messages
+
+    Returns
+    -------
+    job : dict
+        The job, with ``therm_name`` set (``None`` if not given)
+
+    """
+    if not isinstance(job, dict):
+        print('Error: job {} is not a mapping of options'.format(num))
+        sys.exit(1)
+    job = dict(job)
+    job.setdefault('therm_name', None)
+    missing = [key for key in ['lang', 'mech_name', 'build_path']
+               if job.get(key) is None]
+    if missing:
+        print('Error: job {} is missing {}'.format(num, ', '.join(missing)))
+        sys.exit(1)
+    if job['lang'] not in utils.langs:
+        print('Error: job {} has unknown language {}'.format(num,
+                                                              job['lang']))
+        sys.exit(1)
+    unknown = sorted(set(job) - set(_path_keys + job_options + ['lang']))
+    if unknown:
+        print('Error: job {} has unknown options {}'.format(
+            num, ', '.join(unknown)))
+        sys.exit(1)
+    return job
+
+
+def check_jobs(jobs):
+    """Check a list of jobs, exiting with an error if any is invalid, or if
+    two of them share a build directory (as they would overwrite each
+    other's files, e.g. ``optimized.pickle`` of the cache optimizer).
+
+    Parameters
+    ----------
+    jobs : list of dict
+        The jobs (see `check_job`)
+
+    Returns
+    -------
+    jobs : list of dict
+        The checked jobs
+
+    """
+    jobs = [check_job(job, i) for i, job in enumerate(jobs)]
+    build_paths = {}
+    for i, job in enumerate(jobs):
+        path = os.path.normcase(os.path.abspath(job['build_path']))
+        if path in build_paths:
+            print('Error: jobs {} and {} have the same build path {}'.format(
+                build_paths[path], i, job['build_path']))
+            sys.exit(1)
+        build_paths[path] = i
+    return jobs
+
+
+def _load_mechanisms(jobs, parse_cache, parse_procs):
+    """Interpret the mechanism of each job, once per mechanism.
+
+    Returns
+    -------
+    mechanisms : dict
+        The pickled elements, species and reactions, by mechanism and
+        thermo filenames
+
+    """
+    mechanisms = {}
+    for job in jobs:
+        key = (job['mech_name'], job['therm_name'])
+        if key not in mechanisms:
+            mechanisms[key] = pickle.dumps(
+                mech_cache.read_mech_file(key[0], key[1], parse_cache,
+                                          parse_procs),
+                pickle.HIGHEST_PROTOCOL)
+    return mechanisms
+
+
+def _init_worker(mechanisms):
+    """Initialize a worker process of a batch.
+    """
+    global _worker_mechanisms
+    _worker_mechanisms = mechanisms
+
+
+def _run_job(job):
+    """Run a job, in a worker process or not.
+
+    Returns
+    -------
+    result : dict
+        The `job`, whether it ``succeeded``, the ``error`` (``None`` if it
+        succeeded) and the wall ``time`` (s)
+
+    """
+    start = default_timer()
+    key = (job['mech_name'], job['therm_name'])
+    # the species and reactions are modified, so each job gets its own copy
+    mechanism = mech_cache.loads_mechanism(_worker_mechanisms[key])
+
+    options = dict((k, v) for k, v in job.items() if k in job_options)
+    error = None
+    try:
+        create_jacobian(job['lang'], job['mech_name'], job['therm_name'],
+                        build_path=job['build_path'], mechanism=mechanism,
+                        **options)
+    except SystemExit as e:
+        error = 'generation failed (exit code {})'.format(e.code)
+    except Exception as e:
+        error = '{}: {}'.format(type(e).__name__, e)
+    sys.stdout.flush()
+    return {'job': job,
+            'succeeded': error is None,
+            'error': error,
+            'time': default_timer() - start
+            }
+
+
+def _worker(mechanisms, tasks, results):
+    """Run the jobs of a queue, until ``None``, in a worker process of a
+    batch.
+    """
+    _init_worker(mechanisms)
+    for num, job in iter(tasks.get, None):
+        results.put((num, _run_job(job)))
+
+
+def run_batch(jobs, workers=None, parse_cache=True, parse_procs=None):
+    """Generate the code of each job.
+
+    Parameters
+    ----------
+    jobs : list of dict
+        The jobs (see `read_jobs` and `check_job`)
+    workers : int, optional
+        The number of jobs run at once, in worker processes; if ``None``,
+        the number of CPUs (at most the number of jobs), and if one, the
+        jobs run one after the other in this process. The workers are not
+        daemonic, so that jobs may start processes of their own (e.g. the
+        cache optimizer).
+    parse_cache : bool, optional
+        If ``True``, reuse interpreted mechanisms from the parse cache
+    parse_procs : int, optional
+        If greater than one, the number of processes used to interpret the
+        reactions of a Chemkin-format mechanism
+
+    Returns
+    -------
+    results : list of dict
+        The result of each job, in order: the ``job``, whether it
+        ``succeeded``, the ``error`` (``None`` if it succeeded) and its wall
+        ``time`` (s). A failed job does not stop the others.
+
+    """
+    jobs = check_jobs(jobs)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(jobs)))
+
+    mechanisms = _load_mechanisms(jobs, parse_cache, parse_procs)
+    if workers == 1:
+        _init_worker(mechanisms)
+        try:
+            return [_run_job(job) for job in jobs]
+        finally:
+            _init_worker(None)
+
+    # one job at a time per worker, as jobs are long
+    tasks = multiprocessing.Queue()
+    for item in enumerate(jobs):
+        tasks.put(item)
+    for _ in range(workers):
+        tasks.put(None)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker,
+                                         args=(mechanisms, tasks, results))
+                 for _ in range(workers)]
+    done = {}
+    try:
+        for process in processes:
+            process.start()
+        while len(done) < len(jobs):
+            try:
+                num, result = results.get(timeout=1)
+                done[num] = result
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    # jobs whose worker died without answering
+    return [done.get(num, {'job': job,
+                           'succeeded': False,
+                           'error': 'worker process exited',
+                           'time': 0.0
+                           }) for num, job in enumerate(jobs)]
+
+
+def summary(results):
+    """Return a table of the results of a batch.
+
+    Parameters
+    ----------
+    results : list of dict
+        The results (see `run_batch`)
+
+    Returns
+    -------
+    summary : str
+        The table
+
+    """
+    lines = ['{:<6}{:<8}{:>10}  {}'.format('job', 'lang', 'time (s)',
+                                           'build path')]
+    for i, result in enumerate(results):
+        job = result['job']
+        lines.append('{:<6}{:<8}{:>10.2f}  {}'.format(i, job['lang'],
+                                                      result['time'],
+                                                      job['build_path']))
+        if not result['succeeded']:
+            lines.append('      failed: ' + result['error'])
+    failed = sum(not result['succeeded'] for result in results)
+    lines.append('{} jobs, {} failed'.format(len(results), failed))
+    return '\n'.join(lines)
@@ -0,0 +1,13 @@
+import sys
+
+if sys.version_info >= (3, 7):
+    # the generator is imported once used, so that --help answers quickly
+    from ..utils import lazy_imports
+    __getattr__ = lazy_imports(__name__, dict(
+        dict.fromkeys(['generate_mechanism', 'write_chemkin',
+                       'write_cantera'], '.synthetic'),
+        **dict.fromkeys(['run_benchmark', 'benchmark_mechanism'],
+                        '.benchmark')))
+else:
+    from .synthetic import generate_mechanism, write_chemkin, write_cantera
+    from .benchmark import run_benchmark, benchmark_mechanism
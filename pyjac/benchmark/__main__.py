@@ -0,0 +1,102 @@
+import sys
+
+from . import synthetic
+from .. import utils
+from argparse import ArgumentParser
+
+def main(args=None):
+    if args is None:
+        # command line arguments
+        parser = ArgumentParser(description='benchmark: measures how pyJac '
+                                            'scales on synthetic mechanisms '
+                                            'of increasing size'
+                                )
+        parser.add_argument('-n', '--num_species',
+                            type=int,
+                            nargs='+',
+                            default=[100, 300, 1000],
+                            help='Number of species of each mechanism.'
+                            )
+        parser.add_argument('-rs', '--reactions_per_species',
+                            type=float,
+                            default=5.,
+                            help='Ratio of reactions to species.'
+                            )
+        parser.add_argument('-cn', '--connectivity',
+                            type=int,
+                            default=10,
+                            help='Width of the window of species each '
+                                 'reaction is drawn from.'
+                            )
+        parser.add_argument('-mix', '--reaction_mix',
+                            type=str,
+                            default=None,
+                            help='Comma separated relative fractions of '
+                                 'reaction types, e.g. "elementary=0.8,'
+                                 'troe=0.2". Types: ' +
+                                 ', '.join(synthetic.reaction_types)
+                            )
+        parser.add_argument('-l', '--lang',
+                            type=str,
+                            choices=utils.langs,
+                            default='c',
+                            help='Programming language for output source files.'
+                            )
+        parser.add_argument('-c', '--compile',
+                            dest='compile_lib',
+                            action='store_true',
+                            default=False,
+                            help='Also compile the generated code into a '
+                                 'library (C or CUDA).'
+                            )
+        parser.add_argument('-tk', '--table_kernels',
+                            action='store_true',
+                            default=False,
+                            help='Benchmark table-driven kernels instead of '
+                                 'unrolled code (C only).'
+                            )
+        parser.add_argument('-cmp', '--compare_kernels',
+                            action='store_true',
+                            default=False,
+                            help='Benchmark both the unrolled and the '
+                                 'table-driven kernels of each mechanism '
+                                 '(C only); with --compile, compares their '
+                                 'compile time, library size and run time.'
+                            )
+        parser.add_argument('-ct', '--cantera',
+                            action='store_true',
+                            default=False,
+                            help='Interpret the Cantera-format version of the '
+                                 'mechanisms (requires Cantera).'
+                            )
+        parser.add_argument('-s', '--seed',
+                            type=int,
+                            default=0,
+                            help='Seed of the random number generator.'
+                            )
+        parser.add_argument('-w', '--working_directory',
+                            type=str,
+                            default='benchmark',
+                            help='Directory for the mechanisms, generated '
+                                 'code and results.'
+                            )
+        args = parser.parse_args()
+
+        reaction_mix = None
+        if args.reaction_mix:
+            reaction_mix = {}
+            for item in args.reaction_mix.split(','):
+                kind, fraction = item.split('=')
+                reaction_mix[kind.strip()] = float(fraction)
+
+        # the generator is imported once needed
+        from . import benchmark
+        benchmark.run_benchmark(args.working_directory, args.num_species,
+                                args.reactions_per_species, args.lang,
+                                args.compile_lib, args.cantera, reaction_mix,
+                                args.connectivity, args.seed,
+                                args.table_kernels, args.compare_kernels
+                                )
+
+if __name__ == '__main__':
+    sys.exit(main())
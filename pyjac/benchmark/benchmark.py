@@ -0,0 +1,354 @@
+"""Scaling benchmarks of pyJac on synthetic mechanisms of increasing size.
+
+For each mechanism size, records the time to interpret the mechanism, to
+generate the source code and (optionally) to compile it into a library,
+as well as the peak memory and the number of lines of generated code. For
+compiled C code, the size of the library and the time to evaluate the
+derivatives and Jacobian are also recorded, so that the unrolled and
+table-driven kernels (see `table_kernels`) can be compared.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import json
+import time
+import subprocess
+import multiprocessing
+
+try:
+    import resource
+except ImportError:
+    # e.g., Windows
+    resource = None
+
+# Local imports
+from ..core import mech_interpret as mech
+from ..core.create_jacobian import create_jacobian
+from ..libgen import generate_library
+from . import synthetic
+
+results_file = 'benchmark.json'
+"""str: Name of the file of benchmark results in the working directory"""
+
+timing_driver = """\
+#include <stdio.h>
+#include <time.h>
+#include "header.h"
+#include "dydt.h"
+#include "jacob.h"
+
+int main (void) {
+  double y[NSP];
+  double dy[NSP];
+  static double jac[NSP * NSP];
+  const double pres = 101325.0;
+  y[0] = 1200.0;
+  for (int i = 1; i < NSP; ++i)
+    y[i] = 1.0 / NSP;
+  double check = 0.0;
+  int evals = 0;
+  clock_t start = clock();
+  double elapsed = 0.0;
+  // at least %(min_evals)d evaluations, and %(min_time)g s
+  while (evals < %(min_evals)d || elapsed < %(min_time)g) {
+    dydt(0.0, pres, y, dy);
+    eval_jacob(0.0, pres, y, jac);
+    check += dy[0] + jac[0];
+    ++evals;
+    elapsed = (double)(clock() - start) / CLOCKS_PER_SEC;
+  }
+  printf("%%.9e %%d %%e\\n", elapsed / evals, evals, check);
+  return 0;
+}
+"""
+"""str: C program timing the evaluation of the derivatives and Jacobian at
+1200 K and 1 atm, with equal mass fractions"""
+
+
+def count_lines(path):
+    """Count the lines of all files in a directory tree.
+
+    Parameters
+    ----------
+    path : str
+        The directory to count lines in
+
+    Returns
+    -------
+    int
+        The total number of lines
+
+    """
+    lines = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            with open(os.path.join(dirpath, filename), 'rb') as file:
+                lines += sum(chunk.count(b'\n') for chunk in
+                             iter(lambda: file.read(1 << 20), b''))
+    return lines
+
+
+def peak_memory():
+    """Returns the peak resident memory of this process in MB, if available.
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return maxrss / (1024. ** 2 if sys.platform == 'darwin' else 1024.)
+
+
+def time_kernels(src_path, lib_name, build_path, min_evals=10,
+                 min_time=0.5):
+    """Time the derivatives and Jacobian of a compiled C library.
+
+    Parameters
+    ----------
+    src_path : str
+        Directory of the generated code
+    lib_name : str
+        The library compiled from the generated code
+    build_path : str
+        Directory for the timing program
+    min_evals : int, optional
+        Least number of evaluations timed
+    min_time : float, optional
+        Least time [s] spent evaluating
+
+    Returns
+    -------
+    float
+        The mean time [s] to evaluate the derivatives and the Jacobian once,
+        or ``None`` if the timing program could not be built or run
+
+    """
+    driver = os.path.join(build_path, 'timing.c')
+    with open(driver, 'w') as file:
+        file.write(timing_driver % {'min_evals': min_evals,
+                                    'min_time': min_time})
+    exe = os.path.join(build_path, 'timing')
+    command = ['gcc', '-std=c99', '-O3', '-I' + src_path, driver, lib_name,
+               '-lm']
+    if lib_name.endswith('.so'):
+        command.append('-Wl,-rpath,' + os.path.dirname(lib_name))
+    try:
+        subprocess.check_call(command + ['-o', exe])
+        output = subprocess.check_output([exe])
+    except (OSError, subprocess.CalledProcessError):
+        print('Error: timing of library {} failed'.format(lib_name))
+        return None
+    return float(output.decode('utf-8').split()[0])
+
+
+def benchmark_mechanism(mech_name, lang, build_path, compile_lib=False,
+                        table_kernels=False):
+    """Benchmark pyJac on a single mechanism.
+
+    Peak memory is that of the whole process, so call this in a new
+    process for each mechanism (as `run_benchmark` does).
+
+    Parameters
+    ----------
+    mech_name : str
+        Reaction mechanism filename, Chemkin or Cantera format
+    lang : str
+        Programming language of the generated code
+    build_path : str
+        Directory for the generated code, objects and library
+    compile_lib : bool, optional
+        If ``True``, also compile the generated code into a library, and
+        for C, time it (see `time_kernels`)
+    table_kernels : bool, optional
+        If ``True``, generate table-driven kernels instead of unrolled code
+        (see ``table_kernels`` of `create_jacobian`)
+
+    Returns
+    -------
+    dict
+        ``parse_time``, ``generate_time`` and ``compile_time`` [s] (the last
+        ``None`` if not compiled), ``emitted_lines``, ``library_size`` [B]
+        (``None`` if not compiled), ``run_time`` [s] of an evaluation of the
+        derivatives and Jacobian (``None`` if not compiled C) and
+        ``peak_memory`` [MB] (``None`` if not available)
+
+    """
+    result = {}
+    start = time.time()
+    if mech_name.endswith(('.cti', '.xml')):
+        mech.read_mech_ct(mech_name)
+    else:
+        mech.read_mech(mech_name, None)
+    result['parse_time'] = time.time() - start
+
+    # end to end, including interpretation
+    src_path = os.path.join(build_path, 'src')
+    start = time.time()
+    create_jacobian(lang, mech_name=mech_name, build_path=src_path,
+                    parse_cache=False, table_kernels=table_kernels
+                    )
+    result['generate_time'] = time.time() - start
+    result['emitted_lines'] = count_lines(src_path)
+
+    result['compile_time'] = None
+    result['library_size'] = None
+    result['run_time'] = None
+    if compile_lib:
+        start = time.time()
+        lib_name = generate_library(lang, src_path,
+                                    os.path.join(build_path, 'obj'),
+                                    os.path.join(build_path, 'lib'),
+                                    lang != 'cuda'
+                                    )
+        result['compile_time'] = time.time() - start
+        result['library_size'] = os.path.getsize(lib_name)
+        if lang == 'c':
+            result['run_time'] = time_kernels(src_path, lib_name, build_path)
+
+    result['peak_memory'] = peak_memory()
+    return result
+
+
+def _benchmark_worker(queue, log_name, args):
+    """Run `benchmark_mechanism` with output to a log file, for `run_benchmark`.
+    """
+    with open(log_name, 'w') as log:
+        sys.stdout = log
+        try:
+            queue.put(benchmark_mechanism(*args))
+        except BaseException as e:
+            queue.put(e)
+            raise
+
+
+def run_benchmark(work_dir, num_species, reactions_per_species=5.,
+                  lang='c', compile_lib=False, cantera=False,
+                  reaction_mix=None, connectivity=10, seed=0,
+                  table_kernels=False, compare_kernels=False
+                  ):
+    """Benchmark pyJac on synthetic mechanisms of increasing size.
+
+    Each mechanism is generated in (and benchmarked from) its own
+    subdirectory of ``work_dir``, in a new process. Results are printed
+    and saved to `results_file` in ``work_dir``.
+
+    Parameters
+    ----------
+    work_dir : str
+        Working directory for mechanisms, generated code and results
+    num_species : list of int
+        Number of species of each mechanism
+    reactions_per_species : float, optional
+        Ratio of reactions to species in each mechanism
+    lang : str, optional
+        Programming language of the generated code
+    compile_lib : bool, optional
+        If ``True``, also compile the generated code into a library
+    cantera : bool, optional
+        If ``True``, interpret the Cantera-format version of the mechanisms
+        (requires Cantera); otherwise the Chemkin-format version
+    reaction_mix : dict, optional
+        Relative fraction of each type of reaction, see
+        `synthetic.generate_mechanism`
+    connectivity : int, optional
+        Width of the window of species each reaction is drawn from, see
+        `synthetic.generate_mechanism`
+    seed : int, optional
+        Seed of the random number generator
+    table_kernels : bool, optional
+        If ``True``, benchmark table-driven kernels instead of unrolled code
+    compare_kernels : bool, optional
+        If ``True``, benchmark both the unrolled and the table-driven
+        kernels of each mechanism (in its ``unrolled`` and ``tables``
+        subdirectories)
+
+    Returns
+    -------
+    results : list of dict
+        For each mechanism (and kind of kernels), the size, format and
+        ``kernels`` (``'unrolled'`` or ``'tables'``), and the results of
+        `benchmark_mechanism`
+
+    """
+    work_dir = os.path.abspath(work_dir)
+    if not os.path.isdir(work_dir):
+        os.makedirs(work_dir)
+
+    if compare_kernels:
+        kernels = [False, True]
+    else:
+        kernels = [table_kernels]
+
+    header = ('{:>8} {:>9} {:>9} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10} '
+              '{:>10}'.format('species', 'reactions', 'kernels', 'parse [s]',
+                              'gen. [s]', 'comp. [s]', 'lib. [kB]',
+                              'run [us]', 'mem. [MB]', 'lines'))
+    print(header)
+    print('-' * len(header))
+
+    results = []
+    for n_spec in num_species:
+        n_reac = int(round(n_spec * reactions_per_species))
+        path = os.path.join(work_dir, '{}_{}'.format(n_spec, n_reac))
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        elems, specs, reacs = synthetic.generate_mechanism(
+            n_spec, n_reac, reaction_mix, connectivity, seed)
+        if cantera:
+            mech_name = os.path.join(path, 'mech.cti')
+            synthetic.write_cantera(mech_name, elems, specs, reacs)
+        else:
+            mech_name = os.path.join(path, 'mech.inp')
+            synthetic.write_chemkin(mech_name, elems, specs, reacs)
+
+        for tables in kernels:
+            kind = 'tables' if tables else 'unrolled'
+            build_path = path
+            if compare_kernels:
+                build_path = os.path.join(path, kind)
+                if not os.path.isdir(build_path):
+                    os.makedirs(build_path)
+
+            # a new (non-daemonic, so it can compile in parallel) process
+            # for each mechanism, so that peak memory is measured separately
+            queue = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=_benchmark_worker,
+                args=(queue, os.path.join(build_path, 'benchmark.log'),
+                      (mech_name, lang, build_path, compile_lib, tables))
+                )
+            worker.start()
+            result = queue.get()
+            worker.join()
+            if isinstance(result, BaseException):
+                print('Error: benchmark of {} failed, see {}'.format(
+                      mech_name, os.path.join(build_path, 'benchmark.log')))
+                raise result
+
+            result.update(num_species=n_spec, num_reactions=n_reac,
+                          format='cantera' if cantera else 'chemkin',
+                          lang=lang, kernels=kind
+                          )
+            results.append(result)
+
+            def fmt(value, spec, scale=1.):
+                return '{:>10}'.format('-' if value is None else
+                                       format(value * scale, spec))
+            print('{:>8} {:>9} {:>9} {} {} {} {} {} {} {:>10}'.format(
+                  n_spec, n_reac, kind, fmt(result['parse_time'], '.3f'),
+                  fmt(result['generate_time'], '.3f'),
+                  fmt(result['compile_time'], '.3f'),
+                  fmt(result['library_size'], '.1f', 1e-3),
+                  fmt(result['run_time'], '.2f', 1e6),
+                  fmt(result['peak_memory'], '.1f'),
+                  result['emitted_lines']))
+
+            with open(os.path.join(work_dir, results_file), 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+
+    return results
@@ -0,0 +1,501 @@
+"""Synthetic reaction mechanisms of configurable size, for benchmarking.
+
+Generated mechanisms are element-balanced and free of undeclared duplicate
+reactions, and can be written in both Chemkin and Cantera (CTI) formats.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import random
+
+# Local imports
+from ..core import chem_utilities as chem
+
+reaction_types = ['elementary', 'three_body', 'troe', 'sri', 'plog', 'cheb',
+                  'duplicate'
+                  ]
+"""list(`str`): Types of reactions that can be generated"""
+
+default_mix = dict(elementary=0.6, three_body=0.1, troe=0.1, sri=0.05,
+                   plog=0.05, cheb=0.05, duplicate=0.05
+                   )
+"""dict: Default (relative) fraction of each reaction type"""
+
+plog_pressures = [0.01, 0.1, 1.0, 10.0]
+"""list(`float`): Pressures [atm] of the rate expressions of PLOG reactions"""
+
+cheb_n_temp = 4
+"""int: Number of temperature terms of Chebyshev reactions"""
+
+cheb_n_pres = 3
+"""int: Number of pressure terms of Chebyshev reactions"""
+
+inert_species = [('N2', [['N', 2]]), ('AR', [['AR', 1]])]
+"""list: Names and compositions of the non-reacting species"""
+
+
+class SyntheticReaction(object):
+    """Reaction of a synthetic mechanism.
+
+    Rate parameters are in Chemkin default units (moles, cm, s and cal/mol)
+    and pressures are in atm.
+
+    Parameters
+    ----------
+    kind : str
+        One of `reaction_types`; both reactions of a duplicate pair are of
+        kind ``'duplicate'``.
+    reac : list of str
+        Reactant species names, repeated for coefficients above one.
+    prod : list of str
+        Product species names, repeated for coefficients above one.
+    rate : list of float
+        Arrhenius coefficients (A, b, E); for falloff reactions, those of
+        the high-pressure limit.
+
+    Attributes
+    ----------
+    low : list of float
+        Low-pressure-limit Arrhenius coefficients of falloff reactions.
+    falloff : list of float
+        Troe or SRI parameters.
+    efficiencies : list of (str, float)
+        Explicit third-body efficiencies.
+    plog : list of list of float
+        Pressure and Arrhenius coefficients of PLOG reactions.
+    cheb : list of list of float
+        Chebyshev coefficients, ``cheb_n_temp`` rows of ``cheb_n_pres``.
+
+    """
+
+    def __init__(self, kind, reac, prod, rate):
+        self.kind = kind
+        self.reac = reac
+        self.prod = prod
+        self.rate = rate
+        self.low = []
+        self.falloff = []
+        self.efficiencies = []
+        self.plog = []
+        self.cheb = []
+
+    def equation(self, cantera=False):
+        """Returns the reaction equation.
+
+        Parameters
+        ----------
+        cantera : bool, optional
+            If ``True``, use the Cantera (CTI) format rather than Chemkin.
+
+        Returns
+        -------
+        str
+            The reaction equation.
+
+        """
+        plus = ' + ' if cantera else '+'
+        coeff = '{} {}' if cantera else '{}{}'
+
+        def side(names):
+            terms = []
+            for name in sorted(set(names), key=names.index):
+                count = names.count(name)
+                terms.append(coeff.format(count, name) if count > 1 else name)
+            return plus.join(terms)
+
+        reac = side(self.reac)
+        prod = side(self.prod)
+        if self.kind == 'three_body':
+            reac += plus + 'M'
+            prod += plus + 'M'
+        elif self.kind in ['troe', 'sri', 'cheb']:
+            third_body = ' (+ M)' if cantera else '(+M)'
+            reac += third_body
+            prod += third_body
+        arrow = ' <=> ' if cantera else '<=>'
+        return reac + arrow + prod
+
+
+def _nasa_coeffs(size, rng):
+    """Returns NASA polynomial coefficients for a species of a given size.
+    """
+    return [2.5 + size, 1.0e-3 * size, -2.0e-7 * size, 0.0, 0.0,
+            -1.0e4 * size * rng.uniform(0.5, 1.5),
+            3.0 + 2.0 * size * rng.uniform(0.5, 1.5)
+            ]
+
+
+def generate_mechanism(num_species, num_reactions, reaction_mix=None,
+                       connectivity=10, seed=0):
+    """Generate a synthetic reaction mechanism.
+
+    Reacting species ``S0``, ``S1``, ... are made of one to three
+    :math:`\\mathrm{CH_2O}` units, so reactions can exchange, combine and
+    split units while conserving elements. Each reaction draws its species
+    from a window of ``connectivity`` consecutive species, so small values
+    give sparse, banded Jacobians and large values dense ones.
+
+    Parameters
+    ----------
+    num_species : int
+        Number of species, including the non-reacting ``N2`` and ``AR``.
+    num_reactions : int
+        Number of reactions.
+    reaction_mix : dict, optional
+        Relative fraction of each of the `reaction_types`; missing types
+        are not generated. Default `default_mix`.
+    connectivity : int, optional
+        Width of the window of species each reaction is drawn from.
+    seed : int, optional
+        Seed of the random number generator; the same arguments always
+        give the same mechanism.
+
+    Returns
+    -------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `SyntheticReaction`
+        List of reactions in mechanism.
+
+    """
+    if reaction_mix is None:
+        reaction_mix = default_mix
+    unknown = [kind for kind in reaction_mix if kind not in reaction_types]
+    if unknown:
+        raise ValueError('Unknown reaction types: ' + ', '.join(unknown))
+    num_reacting = num_species - len(inert_species)
+    if num_reacting < 3:
+        raise ValueError('At least {} species are required'.format(
+                         3 + len(inert_species)))
+
+    rng = random.Random(seed)
+    elem_wt = chem.get_elem_wt()
+    elems = ['C', 'H', 'O', 'N', 'AR']
+
+    # species; sizes cycle, so that every window has all sizes
+    sizes = [1 + i % 3 for i in range(num_reacting)]
+    specs = []
+    for i, size in enumerate(sizes):
+        spec = chem.SpecInfo('S{}'.format(i))
+        spec.elem = [['C', size], ['H', 2 * size], ['O', size]]
+        spec.hi = _nasa_coeffs(size, rng)
+        spec.lo = spec.hi[:]
+        specs.append(spec)
+    for name, elem in inert_species:
+        spec = chem.SpecInfo(name)
+        spec.elem = elem
+        spec.hi = _nasa_coeffs(0, rng)
+        spec.lo = spec.hi[:]
+        specs.append(spec)
+    for spec in specs:
+        spec.mw = sum(elem_wt[e.lower()] * n for e, n in spec.elem)
+
+    names = [sp.name for sp in specs]
+    connectivity = max(3, min(connectivity, num_reacting))
+    weights = [(kind, reaction_mix[kind]) for kind in reaction_types
+               if reaction_mix.get(kind)]
+    total_weight = sum(w for _, w in weights)
+
+    def choose_kind():
+        x = rng.uniform(0, total_weight)
+        for kind, w in weights:
+            x -= w
+            if x <= 0:
+                return kind
+        return weights[-1][0]
+
+    def arrhenius(low, high):
+        return [10 ** rng.uniform(low, high), rng.choice([0.0, 0.5, 1.0, 2.0]),
+                round(rng.uniform(0, 3.0e4), 2)
+                ]
+
+    def efficiencies(window):
+        partners = rng.sample(window, min(2, len(window)))
+        effs = [(names[isp], rng.choice([0.5, 2.0, 5.0])) for isp in
+                sorted(set(partners))]
+        return effs + [('AR', 0.7)]
+
+    seen = set()
+
+    def new_reaction(kind):
+        """Draw a new, unique reaction of the given kind."""
+        for attempt in range(1000):
+            start = rng.randrange(num_reacting)
+            window = [(start + i) % num_reacting for i in range(connectivity)]
+
+            def pick(size):
+                choices = [isp for isp in window if sizes[isp] == size]
+                return rng.choice(choices) if choices else None
+
+            if kind in ['elementary', 'plog', 'duplicate']:
+                # exchange of units: A + B <=> C + D
+                a, b = rng.choice(window), rng.choice(window)
+                reac = [a, b]
+                prod = [pick(sizes[a]), pick(sizes[b])]
+            else:
+                # dissociation: AB (+M) <=> A + B (+M)
+                ab = rng.choice(window)
+                reac = [ab]
+                prod = [pick(1), pick(sizes[ab] - 1)]
+            if None in prod:
+                # e.g., a window without species of the needed size
+                continue
+            key = tuple(sorted([tuple(sorted(reac)), tuple(sorted(prod))]))
+            if key[0] == key[1] or key in seen:
+                continue
+            seen.add(key)
+            rxn = SyntheticReaction(kind, [names[isp] for isp in reac],
+                                    [names[isp] for isp in prod],
+                                    arrhenius(10, 13)
+                                    )
+            if kind == 'three_body':
+                rxn.rate = arrhenius(14, 17)
+                rxn.efficiencies = efficiencies(window)
+            elif kind in ['troe', 'sri']:
+                rxn.rate = arrhenius(12, 14)
+                rxn.low = arrhenius(15, 18)
+                rxn.efficiencies = efficiencies(window)
+                if kind == 'troe':
+                    rxn.falloff = [round(rng.uniform(0.2, 0.9), 3),
+                                   round(rng.uniform(50, 500), 1),
+                                   round(rng.uniform(500, 5000), 1),
+                                   round(rng.uniform(2000, 8000), 1)
+                                   ]
+                else:
+                    rxn.falloff = [round(rng.uniform(0.5, 2.0), 3),
+                                   round(rng.uniform(100, 1000), 1),
+                                   round(rng.uniform(500, 2000), 1)
+                                   ]
+            elif kind == 'plog':
+                # distinct activation energies at each pressure
+                rxn.plog = [[p] + arrhenius(10, 13)[:2] +
+                            [1000.0 * (i + 1) + round(rng.uniform(0, 500), 2)]
+                            for i, p in enumerate(plog_pressures)
+                            ]
+            elif kind == 'cheb':
+                rxn.cheb = [[round(rng.uniform(-0.5, 0.5), 4)
+                             for j in range(cheb_n_pres)]
+                            for i in range(cheb_n_temp)
+                            ]
+                rxn.cheb[0][0] = round(8.0 + rng.uniform(0, 2), 4)
+            return rxn
+        raise ValueError('Could not generate {} unique reactions; increase '
+                         'the connectivity or number of species'.format(
+                         num_reactions))
+
+    reacs = []
+    while len(reacs) < num_reactions:
+        kind = choose_kind()
+        if kind == 'duplicate':
+            if len(reacs) + 2 > num_reactions:
+                kind = 'elementary'
+            else:
+                rxn = new_reaction(kind)
+                dup = SyntheticReaction(kind, rxn.reac, rxn.prod,
+                                        arrhenius(10, 13))
+                reacs.extend([rxn, dup])
+                continue
+        reacs.append(new_reaction(kind))
+
+    return elems, specs, reacs
+
+
+def _fmt(value):
+    """Returns a number formatted for both Chemkin and Cantera files.
+    """
+    return '{:.6E}'.format(value)
+
+
+def get_thermo_lines(specs):
+    """Returns the Chemkin-format thermo records of species.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species.
+
+    Returns
+    -------
+    list of str
+        The four lines of the record of each species, in order.
+
+    """
+    lines = []
+    for sp in specs:
+        elem = ''.join('{:<2}{:>3}'.format(e, n) for e, n in sp.elem)
+        lines.append('{:<18}{:<6}{:<20}G{:>10.3f}{:>10.3f}{:>8.2f}'.format(
+                     sp.name, 'SYN', elem, sp.Trange[0], sp.Trange[2],
+                     sp.Trange[1]).ljust(79) + '1')
+        coeffs = ['{:>15.8E}'.format(c) for c in list(sp.hi) + list(sp.lo)]
+        lines.append(''.join(coeffs[0:5]).ljust(79) + '2')
+        lines.append(''.join(coeffs[5:10]).ljust(79) + '3')
+        lines.append(''.join(coeffs[10:14]).ljust(79) + '4')
+    return lines
+
+
+def write_chemkin(filename, elems, specs, reacs):
+    """Write a synthetic mechanism, including thermo data, in Chemkin format.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the mechanism file to write.
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `SyntheticReaction`
+        List of reactions in mechanism.
+
+    Returns
+    -------
+    None
+
+    """
+    lines = ['ELEMENTS', ' '.join(elems), 'END', 'SPECIES']
+    names = [sp.name for sp in specs]
+    for i in range(0, len(names), 10):
+        lines.append(' '.join(names[i:i + 10]))
+    lines += ['END', 'THERMO ALL', '   300.000  1000.000  5000.000']
+    lines += get_thermo_lines(specs)
+    lines += ['END', 'REACTIONS']
+
+    for rxn in reacs:
+        rate = rxn.rate if not (rxn.plog or rxn.cheb) else [1.0, 0.0, 0.0]
+        lines.append('{} {}'.format(rxn.equation(),
+                                    ' '.join(_fmt(x) for x in rate)))
+        if rxn.low:
+            lines.append('LOW / {} /'.format(' '.join(_fmt(x)
+                                                      for x in rxn.low)))
+        if rxn.kind == 'troe':
+            lines.append('TROE / {} /'.format(' '.join(_fmt(x)
+                                                       for x in rxn.falloff)))
+        elif rxn.kind == 'sri':
+            lines.append('SRI / {} /'.format(' '.join(_fmt(x)
+                                                      for x in rxn.falloff)))
+        for plog in rxn.plog:
+            lines.append('PLOG / {} /'.format(' '.join(_fmt(x)
+                                                       for x in plog)))
+        if rxn.cheb:
+            lines.append('TCHEB / 300.0 2500.0 / PCHEB / 0.001 100.0 /')
+            coeffs = [_fmt(x) for row in rxn.cheb for x in row]
+            lines.append('CHEB / {} {} /'.format(cheb_n_temp, cheb_n_pres))
+            for i in range(0, len(coeffs), 4):
+                lines.append('CHEB / {} /'.format(' '.join(coeffs[i:i + 4])))
+        if rxn.efficiencies:
+            lines.append(' '.join('{}/{}/'.format(name, eff)
+                                  for name, eff in rxn.efficiencies))
+        if rxn.kind == 'duplicate':
+            lines.append('DUPLICATE')
+    lines.append('END')
+
+    with open(filename, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+
+
+def write_cantera(filename, elems, specs, reacs):
+    """Write a synthetic mechanism in Cantera (CTI) format.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the mechanism file to write.
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `SyntheticReaction`
+        List of reactions in mechanism.
+
+    Returns
+    -------
+    None
+
+    """
+    def elem_name(e):
+        return e.capitalize()
+
+    names = [sp.name for sp in specs]
+    lines = ["units(length='cm', time='s', quantity='mol', "
+             "act_energy='cal/mol')",
+             '',
+             "ideal_gas(name='gas',",
+             "          elements='{}',".format(
+                ' '.join(elem_name(e) for e in elems)),
+             "          species='''{}''',".format(' '.join(names)),
+             "          reactions='all',",
+             "          initial_state=state(temperature=300.0, "
+             "pressure=OneAtm))",
+             ''
+             ]
+
+    for sp in specs:
+        lines += ["species(name='{}',".format(sp.name),
+                  "        atoms='{}',".format(
+                    ' '.join('{}:{}'.format(elem_name(e), n)
+                             for e, n in sp.elem)),
+                  "        thermo=(NASA([{:.2f}, {:.2f}], [{}]),".format(
+                    sp.Trange[0], sp.Trange[1],
+                    ', '.join(_fmt(c) for c in sp.lo)),
+                  "                NASA([{:.2f}, {:.2f}], [{}])))".format(
+                    sp.Trange[1], sp.Trange[2],
+                    ', '.join(_fmt(c) for c in sp.hi)),
+                  ''
+                  ]
+
+    def arrhenius(rate):
+        return '[{}]'.format(', '.join(_fmt(x) for x in rate))
+
+    for rxn in reacs:
+        equation = rxn.equation(cantera=True)
+        if rxn.kind in ['elementary', 'duplicate']:
+            line = 'reaction({!r}, {}'.format(equation, arrhenius(rxn.rate))
+            if rxn.kind == 'duplicate':
+                line += ", options='duplicate'"
+            lines.append(line + ')')
+        elif rxn.kind == 'three_body':
+            lines.append('three_body_reaction({!r}, {},'.format(
+                         equation, arrhenius(rxn.rate)))
+            lines.append("                    efficiencies='{}')".format(
+                         ' '.join('{}:{}'.format(*eff)
+                                  for eff in rxn.efficiencies)))
+        elif rxn.kind in ['troe', 'sri']:
+            if rxn.kind == 'troe':
+                falloff = 'Troe(A={}, T3={}, T1={}, T2={})'
+            else:
+                falloff = 'SRI(A={}, B={}, C={})'
+            lines += ['falloff_reaction({!r},'.format(equation),
+                      '                 kf={},'.format(arrhenius(rxn.rate)),
+                      '                 kf0={},'.format(arrhenius(rxn.low)),
+                      "                 efficiencies='{}',".format(
+                        ' '.join('{}:{}'.format(*eff)
+                                 for eff in rxn.efficiencies)),
+                      '                 falloff={})'.format(
+                        falloff.format(*[_fmt(x) for x in rxn.falloff]))
+                      ]
+        elif rxn.kind == 'plog':
+            lines.append('pdep_arrhenius({!r},'.format(equation))
+            lines.append(',\n'.join(
+                         "               [({}, 'atm'), {}]".format(
+                            _fmt(plog[0]), ', '.join(_fmt(x)
+                                                     for x in plog[1:]))
+                         for plog in rxn.plog) + ')')
+        elif rxn.kind == 'cheb':
+            lines += ['chebyshev_reaction({!r},'.format(equation),
+                      '                   Tmin=300.0, Tmax=2500.0,',
+                      "                   Pmin=(0.001, 'atm'), "
+                      "Pmax=(100.0, 'atm'),",
+                      '                   coeffs=[{}])'.format(
+                        ',\n                           '.join(
+                            '[{}]'.format(', '.join(_fmt(x) for x in row))
+                            for row in rxn.cheb))
+                      ]
+        lines.append('')
+
+    with open(filename, 'w') as file:
+        file.write('\n'.join(lines))
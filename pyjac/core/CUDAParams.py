@@ -22,6 +22,9 @@
 import os
 from math import floor
 
+# Local imports
+from . import file_writer
+
 Jacob_Unroll = 40
 Jacob_Spec_Unroll = 40
 Rates_Unroll = 250
@@ -101,7 +104,7 @@ def write_launch_bounds(builddir, blocks_per_sm=8, num_threads=64,
                         if not no_shared
                         else 0
                         )
-    with open(os.path.join(builddir, 'launch_bounds.cuh'), "w") as file:
+    with file_writer.open_file(os.path.join(builddir, 'launch_bounds.cuh'), "w") as file:
         file.write('#ifndef LAUNCH_BOUNDS_CUH\n'
                    '#define LAUNCH_BOUNDS_CUH\n'
                    '#define TARGET_BLOCK_SIZE ({})\n'.format(num_threads) +
@@ -113,5 +116,5 @@ def write_launch_bounds(builddir, blocks_per_sm=8, num_threads=64,
                     if L1_PREFERRED else '//Large shared memory active\n'
                     ) + '#endif\n'
                    )
-    with open(os.path.join(builddir, 'regcount'), 'w') as file:
+    with file_writer.open_file(os.path.join(builddir, 'regcount'), 'w') as file:
         file.write('{}'.format(get_register_count(blocks_per_sm, num_threads)))
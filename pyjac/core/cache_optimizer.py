@@ -9,6 +9,7 @@
 import multiprocessing
 import pickle
 import os
+import io
 import itertools
 
 import numpy as np
@@ -17,6 +18,8 @@
 
 # Local imports
 from .. import utils
+from . import chem_utilities as chem
+from . import file_writer
 
 #dependencies
 have_bitarray = False
@@ -26,6 +29,9 @@
 except:
     print('bitarray not found, turning off cache-optimization')
 
+optimized_name = 'optimized.pickle'
+"""str: Name of the results of `optimize_cache` in the build directory"""
+
 
 def plot(specs, reacs, consider_thd, fwd_spec_mapping, fwd_rxn_mapping):
     """Convenience plotting function. Marked for removal.
@@ -235,7 +241,8 @@ def optimize_cache(specs, reacs, multi_thread,
     force_optimize : bool
         If true, reoptimize even if past data is available
     build_path : str
-        The path to the build directory
+        The path to the build directory, in the current file system, of
+        the results of a previous optimization (see `write_optimized`)
     last_spec : int
         The index of the species that should be placed last
     consider_thd : bool
@@ -274,19 +281,18 @@ def optimize_cache(specs, reacs, multi_thread,
         print('Checking for old optimization')
         try:
             same_mech = False
-            with open(os.path.join(build_path, 'optimized.pickle'), 'rb') as file:
+            data = file_writer.get_file_system().read(
+                os.path.join(build_path, optimized_name))
+            with io.BytesIO(data) as file:
                 old_specs = pickle.load(file)
                 old_reacs = pickle.load(file)
                 fwd_spec_mapping = pickle.load(file)
                 fwd_rxn_mapping = pickle.load(file)
                 reverse_spec_mapping = pickle.load(file)
                 reverse_rxn_mapping = pickle.load(file)
-            same_mech = (
-                all(any(s == sp for sp in specs) for s in old_specs) and
-                len(specs) == len(old_specs) and
-                all(any(r == rxn for rxn in reacs) for r in old_reacs) and
-                len(reacs) == len(old_reacs)
-                )
+            same_mech = (chem.get_mech_fingerprint(old_specs, old_reacs) ==
+                         chem.get_mech_fingerprint(specs, reacs)
+                         )
             if reverse_spec_mapping[last_spec] != len(specs) - 1:
                 print('Different last species detected, '
                       'old species was {} and new species is {}'.format(
@@ -452,16 +458,32 @@ def copy_mapping(mapping):
     specs = [specs[i] for i in fwd_spec_mapping]
     reacs = [reacs[i] for i in fwd_rxn_mapping]
 
-    # save to avoid reoptimization if possible
-    with open(os.path.join(build_path, 'optimized.pickle'), 'wb') as file:
-        pickle.dump(specs, file)
-        pickle.dump(reacs, file)
-        pickle.dump(fwd_spec_mapping, file)
-        pickle.dump(fwd_rxn_mapping, file)
-        pickle.dump(reverse_spec_mapping, file)
-        pickle.dump(reverse_rxn_mapping, file)
-
     # complete, so now return
     return (specs, reacs, fwd_spec_mapping, fwd_rxn_mapping,
             reverse_spec_mapping, reverse_rxn_mapping
             )
+
+
+def write_optimized(build_path, results):
+    """Save the results of `optimize_cache` with the generated files, to
+    avoid reoptimization if possible.
+
+    The file is written with `file_writer.open_file`, so to the current file
+    system and as part of the active transaction.
+
+    Parameters
+    ----------
+    build_path : str
+        The path to the build directory
+    results : tuple
+        The species, reactions and mappings returned by `optimize_cache`
+
+    Returns
+    -------
+    None
+
+    """
+    with file_writer.open_file(os.path.join(build_path, optimized_name),
+                               'wb') as file:
+        for value in results:
+            file.write(pickle.dumps(value))
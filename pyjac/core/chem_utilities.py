@@ -7,10 +7,13 @@
 
 # Standard libraries
 import math
+import hashlib
+import marshal
 import numpy as np
 
 __all__ = ['RU', 'RUC', 'RU_JOUL', 'PA', 'get_elem_wt',
-           'ReacInfo', 'SpecInfo', 'calc_spec_smh']
+           'ReacInfo', 'SpecInfo', 'calc_spec_smh', 'get_fingerprint',
+           'set_fingerprints', 'get_mech_fingerprint']
 
 # universal gas constants, SI units
 RU = 8314.4621  # J/(kmole * K)
@@ -26,19 +29,28 @@
 
 class CommonEqualityMixin(object):
     """Base class for `ReacInfo` and `SpecInfo` classes for equality comparison
+
+    Also pickles the ``__slots__`` of subclasses as a plain tuple of values.
+    The content ``fingerprint`` (see `set_fingerprints`) is not compared.
     """
+    __slots__ = ()
+
     def __eq__(self, other):
         try:
-            for key, value in self.__dict__.items():
-                if not key in other.__dict__:
+            for key in self.__slots__:
+                if key == 'fingerprint':
+                    continue
+                if not hasattr(other, key):
                     return False
+                value = getattr(self, key)
+                other_value = getattr(other, key)
                 if isinstance(value, np.ndarray):
-                    if not np.array_equal(value, other.__dict__[key]):
+                    if not np.array_equal(value, other_value):
                         return False
                 elif isinstance(value, list):
-                    if not all([any(x == y for y in other.__dict__[key]) for x in value]):
+                    if not all([any(x == y for y in other_value) for x in value]):
                         return False
-                elif value != other.__dict__[key]:
+                elif value != other_value:
                     return False
             return True
         except Exception as e:
@@ -47,6 +59,13 @@ def __eq__(self, other):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __getstate__(self):
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
 
 def get_elem_wt():
     """Returns dict with built-in element names and atomic weights [kg/kmol].
@@ -157,6 +176,14 @@ class ReacInfo(CommonEqualityMixin):
 
     """
 
+    __slots__ = ('reac', 'reac_nu', 'prod', 'prod_nu', 'A', 'b', 'E',
+                 'rev', 'rev_par', 'dup', 'thd_body', 'thd_body_eff',
+                 'pdep', 'pdep_sp', 'low', 'high', 'troe', 'troe_par',
+                 'sri', 'sri_par', 'cheb', 'cheb_n_temp', 'cheb_n_pres',
+                 'cheb_plim', 'cheb_tlim', 'cheb_par', 'plog', 'plog_par',
+                 'fingerprint'
+                 )
+
     def __init__(self, rev, reactants, reac_nu, products, prod_nu, A, b, E):
         self.reac = reactants
         self.reac_nu = reac_nu
@@ -215,6 +242,9 @@ def __init__(self, rev, reactants, reac_nu, products, prod_nu, A, b, E):
         # List of arrays with [pressure [Pa], A, b, E]
         self.plog_par = None
 
+        # content hash, set by the parsers (see `set_fingerprints`)
+        self.fingerprint = None
+
 
 class SpecInfo(CommonEqualityMixin):
     """Species class.
@@ -239,6 +269,8 @@ class SpecInfo(CommonEqualityMixin):
 
     """
 
+    __slots__ = ('name', 'elem', 'mw', 'hi', 'lo', 'Trange', 'fingerprint')
+
     def __init__(self, name):
         self.name = name
 
@@ -253,6 +285,118 @@ def __init__(self, name):
         # temperature [K] range for thermodynamic coefficients
         self.Trange = [300.0, 1000.0, 5000.0]
 
+        # content hash, set by the parsers (see `set_fingerprints`)
+        self.fingerprint = None
+
+
+def get_fingerprint(obj, specs=None):
+    """Returns the content hash of a species or reaction.
+
+    Species are identified by name, so the hash of a reaction does not
+    depend on the order of species in the mechanism, nor on the order
+    of its reactants, products or third-body efficiencies.
+
+    Parameters
+    ----------
+    obj : `SpecInfo` or `ReacInfo`
+        Species or reaction to hash.
+    specs : list of `SpecInfo`, optional
+        List of species, required if the reaction's species are given by
+        index (i.e., after `utils.reassign_species_lists`).
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-1 digest.
+
+    """
+    def name(sp):
+        if specs is not None and not isinstance(sp, str):
+            return specs[sp].name
+        return sp
+
+    items = []
+    for key in obj.__slots__:
+        if key in ['fingerprint', 'reac_nu', 'prod_nu']:
+            # coefficients are included with the species below
+            continue
+        value = getattr(obj, key)
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        elif key in ['reac', 'prod']:
+            # coefficients as floats, so that 1 and 1.0 are the same
+            value = sorted(zip([name(sp) for sp in value],
+                               [float(nu) for nu in getattr(obj, key + '_nu')]
+                               ))
+        elif key in ['thd_body_eff', 'elem']:
+            value = sorted((name(x[0]), x[1]) for x in value)
+        elif key == 'pdep_sp':
+            value = name(value) if value not in ['', None] else ''
+        items.append((key, value))
+
+    try:
+        # binary floats, much faster than formatting them
+        data = marshal.dumps(items, 2)
+    except ValueError:
+        # e.g., NumPy scalars
+        data = repr(items).encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def set_fingerprints(specs, reacs):
+    """Stores the content hash of each species and reaction.
+
+    Called by the mechanism parsers, so that comparing mechanisms does not
+    require comparing every species and reaction with each other.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+
+    Returns
+    -------
+    str
+        The mechanism fingerprint (see `get_mech_fingerprint`).
+
+    """
+    for sp in specs:
+        sp.fingerprint = get_fingerprint(sp)
+    for rxn in reacs:
+        rxn.fingerprint = get_fingerprint(rxn, specs)
+    return get_mech_fingerprint(specs, reacs)
+
+
+def get_mech_fingerprint(specs, reacs):
+    """Returns the content hash of a mechanism.
+
+    Independent of the order of species and reactions, so a reordered (e.g.,
+    cache-optimized) mechanism has the same fingerprint as the original.
+    Uses the stored fingerprints where set.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-1 digest.
+
+    """
+    key = hashlib.sha1()
+    for group in [specs, reacs]:
+        for fingerprint in sorted(obj.fingerprint or get_fingerprint(obj, specs)
+                                  for obj in group):
+            key.update(fingerprint.encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
 
 def calc_spec_smh(T, specs):
     """Calculate standard-state entropies minus enthalpies for all species.
@@ -10,20 +10,33 @@
 import sys
 import math
 import os
+import json
+import hashlib
+import multiprocessing
+
+import numpy as np
 
 # Local imports
 from .. import utils
 from . import chem_utilities as chem
 from . import mech_interpret as mech
+from . import mech_cache
+from .mech_arrays import MechanismIndex
+from .sparsity import SparsityPattern
 from . import rate_subs as rate
+from . import table_kernels as tables
 from . import mech_auxiliary as aux
 from . import CUDAParams
 from . import CParams
 from . import cache_optimizer as cache
 from . import shared_memory as shared
+from . import kernel_ir as ir
+from . import file_writer
+from . import profiler as prof
+from .._version import __version__
 
 
-def calculate_shared_memory(rxn_ind, rxn, specs, reacs, rev_reacs, pdep_reacs):
+def calculate_shared_memory(rxn_ind, rxn, specs, reacs, index):
     """Estimates usage of the various variables for a given reaction
 
     Parameters
@@ -36,10 +49,8 @@ def calculate_shared_memory(rxn_ind, rxn, specs, reacs, rev_reacs, pdep_reacs):
         List of species.
     reacs : list of `ReacInfo`
         Full list of reactions.
-    rev_reacs : list of `ReacInfo`
-        List of reversible reactions.
-    pdep_reacs : list of `ReacInfo`
-        List of pressure-dependent reactions.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism.
 
     Returns
     -------
@@ -63,47 +74,41 @@ def calculate_shared_memory(rxn_ind, rxn, specs, reacs, rev_reacs, pdep_reacs):
     variable_list.append(shared.variable('fwd_rates', rxn_ind))
     if rxn.rev:
         variable_list.append(shared.variable('rev_rates',
-                             rev_reacs.index(rxn_ind))
+                             index.rev_index[rxn_ind])
                              )
     if rxn.pdep or rxn.thd_body:
         variable_list.append(shared.variable('pres_mod',
-                             pdep_reacs.index(rxn_ind))
+                             index.pdep_index[rxn_ind])
                              )
     for sp in set(rxn.reac + rxn.prod + [x[0] for x in rxn.thd_body_eff]):
         variable_list.append(shared.variable('conc', sp))
 
+    # each species is used once for the derivative with respect to each
+    # species, and the others on the same side once for each of them
+    num_s = len(specs)
+    reac_first = {}
+    for i, sp in enumerate(rxn.reac):
+        reac_first.setdefault(sp, i)
     for i, sp in enumerate(rxn.reac):
         nu = rxn.reac_nu[i]
         if nu - 1 > 0:
-            reac_usages[i] += 1
-        for sp2 in range(len(specs)):
-            if nu - 1 > 0:
-                reac_usages[i] += nu - 1
-            if rxn.pdep or rxn.thd_body:
-                pres_mod_usage += 1
-            if sp == sp2:
-                continue
-            ind = next((ind for ind, spec in enumerate(rxn.reac)
-                       if spec==sp2), None
-                       )
-            if ind is not None:
+            reac_usages[i] += 1 + (nu - 1) * num_s
+        if rxn.pdep or rxn.thd_body:
+            pres_mod_usage += num_s
+        for sp2, ind in reac_first.items():
+            if sp2 != sp:
                 reac_usages[ind] += 1
 
+    prod_first = {}
+    for i, sp in enumerate(rxn.prod):
+        prod_first.setdefault(sp, i)
     if rxn.rev:
         for i, sp in enumerate(rxn.prod):
             nu = rxn.prod_nu[i]
-            for sp2 in range(len(specs)):
-                if nu - 1 > 0:
-                    prod_usages[i] += nu - 1
-#already counted in reac
-#                if rxn.pdep or rxn.thd_body:
-#                    pres_mod_usage += 1
-                if sp == sp2:
-                    continue
-                ind = next((ind for ind, spec in enumerate(rxn.prod)
-                           if spec==sp2), None
-                           )
-                if ind is not None:
+            if nu - 1 > 0:
+                prod_usages[i] += (nu - 1) * num_s
+            for sp2, ind in prod_first.items():
+                if sp2 != sp:
                     prod_usages[ind] += 1
 
     usages.append(fwd_usage)
@@ -113,10 +118,10 @@ def calculate_shared_memory(rxn_ind, rxn, specs, reacs, rev_reacs, pdep_reacs):
         usages.append(pres_mod_usage)
     for sp in set(rxn.reac + rxn.prod + [x[0] for x in rxn.thd_body_eff]):
         u = 0
-        if sp in rxn.reac:
-            u += reac_usages[rxn.reac.index(sp)]
-        if sp in rxn.prod:
-            u += prod_usages[rxn.prod.index(sp)]
+        if sp in reac_first:
+            u += reac_usages[reac_first[sp]]
+        if sp in prod_first:
+            u += prod_usages[prod_first[sp]]
         if sp in rxn.thd_body_eff:
             u += 1
         usages.append(u)
@@ -124,7 +129,7 @@ def calculate_shared_memory(rxn_ind, rxn, specs, reacs, rev_reacs, pdep_reacs):
     return variable_list, usages
 
 
-def write_dr_dy(file, lang, rev_reacs, rxn, rxn_ind, pres_rxn_ind, get_array):
+def write_dr_dy(file, lang, index, rxn, rxn_ind, pres_rxn_ind, get_array):
     """Writes evaluation of the (non-pressure dependent part) of the
     reaction rate R that is independent of species
 
@@ -134,8 +139,8 @@ def write_dr_dy(file, lang, rev_reacs, rxn, rxn_ind, pres_rxn_ind, get_array):
         The open file object to write to
     lang : str
         The Programming language
-    rev_reacs : list of `ReacInfo`
-        The list of reverisble reactions
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
     rxn : `ReacInfo`
         The reaction to consider
     rxn_ind : int
@@ -183,7 +188,7 @@ def write_dr_dy(file, lang, rev_reacs, rxn, rxn_ind, pres_rxn_ind, get_array):
         if rxn.rev:
             jline += '(' + get_array(lang, 'fwd_rates', rxn_ind)
             jline += ' - ' + \
-                     get_array(lang, 'rev_rates', rev_reacs.index(rxn_ind))
+                     get_array(lang, 'rev_rates', index.rev_index[rxn_ind])
             jline += ')'
         else:
             jline += get_array(lang, 'fwd_rates', rxn_ind)
@@ -221,7 +226,7 @@ def write_dr_dy(file, lang, rev_reacs, rxn, rxn_ind, pres_rxn_ind, get_array):
             jline += ' - '
         else:
             jline += ' - {} * '.format(float(prod_nu))
-        jline += '' + get_array(lang, 'rev_rates', rev_reacs.index(rxn_ind))
+        jline += '' + get_array(lang, 'rev_rates', index.rev_index[rxn_ind])
 
     if rxn.pdep and (rxn.pdep_sp or rxn.thd_body_eff):
         jline += ' + pres_mod_temp'
@@ -338,10 +343,60 @@ def write_rates(file, lang, rxn):
                    )
 
 
-def write_dr_dy_species(lang, specs, rxn, pres_rxn_ind, j_sp, sp_j,
-                        rxn_ind, rev_reacs, get_array
-                        ):
-    """Returns string for evaluation of the (non-pressure dependent part) of the
+def get_s_terms(lang, rxn, pres_rxn_ind, get_array):
+    """Returns the derivatives of the net rate of progress (without any
+    pressure modification) with respect to each concentration
+
+    Parameters
+    ----------
+    lang : str
+        The Programming language
+    rxn : `ReacInfo`
+        The reaction to consider
+    pres_rxn_ind : int
+        The index of the reaction in the pressure dependent reactions
+    get_array : function
+        The SMM binded get_array function (or utils.get_array) as required
+
+    Returns
+    -------
+    s_terms : dict
+        For each reactant or product species index, the derivative as a
+        `kernel_ir.Expr`.
+
+    """
+    def __get_s_term(isp, reac):
+        sp_list = rxn.reac if reac else rxn.prod
+        nu_list = rxn.reac_nu if reac else rxn.prod_nu
+        nu = nu_list[sp_list.index(isp)]
+        factors = [ir.Sym('kf' if reac else 'kr'), nu]
+        if (nu - 1) > 0:
+            factors.append(ir.power(ir.Sym(get_array(lang, 'conc', isp)),
+                                    nu - 1))
+        # loop through remaining species
+        for i, other in enumerate(sp_list):
+            if other == isp:
+                continue
+            factors.append(ir.power(ir.Sym(get_array(lang, 'conc', other)),
+                                    nu_list[i]))
+        return ir.mul(*factors)
+
+    s_terms = {}
+    for isp in set(rxn.reac + rxn.prod):
+        terms = []
+        if isp in rxn.reac:
+            terms.append(__get_s_term(isp, True))
+        if rxn.rev and isp in rxn.prod:
+            terms.append(ir.neg(__get_s_term(isp, False)))
+        if terms:
+            s_terms[isp] = ir.add(*terms)
+    return s_terms
+
+
+def get_dr_dy_species(lang, specs, rxn, pres_rxn_ind, j_sp, sp_j,
+                      get_array, thd_eff=None, s_terms=None, pres_mod=None
+                      ):
+    """Returns the derivative of the (non-pressure dependent part) of the
     reaction rate R with respect to a species ``j``
 
     Parameters
@@ -358,138 +413,187 @@ def write_dr_dy_species(lang, specs, rxn, pres_rxn_ind, j_sp, sp_j,
         The species index
     sp_j : `SpecInfo`
         The species to consider
-    rxn_ind : int
-        The index of the reaction in the mechanism
-    rev_reacs : list of `ReacInfo`
-        The list of reverisble reactions
     get_array : function
         The SMM binded get_array function (or utils.get_array) as required
+    thd_eff : dict, optional
+        The reaction's third-body efficiencies keyed by species index
+        (see `MechanismArrays.efficiencies`), if already known
+    s_terms : dict, optional
+        The reaction's rate of progress derivatives (see `get_s_terms`),
+        if already known
+    pres_mod : str, optional
+        The reaction's pressure modification array element, if already
+        known
 
     Returns
     -------
-    jline : str
-        Jacobian evaluation line with non-pressure-dependent part of \
-        species derivative added.
+    dr_dyj : `kernel_ir.Expr`
+        Derivative, using the ``j_temp`` and ``pres_mod_temp`` terms of
+        `write_dr_dy`.
+
+    """
+    return _dr_dy_species(lang, specs, rxn, pres_rxn_ind, get_array,
+                          thd_eff, s_terms, pres_mod)(j_sp, sp_j)
+
 
+def _dr_dy_species(lang, specs, rxn, pres_rxn_ind, get_array, thd_eff=None,
+                   s_terms=None, pres_mod=None):
+    """Returns a function of ``(j_sp, sp_j)`` returning `get_dr_dy_species`
+    for a reaction, which does the work common to all species once.
     """
-    jline = 'j_temp'
     last_spec = len(specs) - 1
-    mw_frac = sp_j.mw / specs[last_spec].mw
-    jline += ' * {:.16e}'.format(1. - mw_frac)
-    if (((rxn.pdep and rxn.pdep_sp is None) or
-        (rxn.thd_body)) and rxn.thd_body_eff
-        ):
-        alphaij = next((thd[1] for thd in rxn.thd_body_eff
-                        if thd[0] == j_sp), 1.0)
-        alphai_nspec = next((thd[1] for thd in rxn.thd_body_eff
-                        if thd[0] == last_spec), 1.0)
-        if alphai_nspec != 0:
-            alphaij -= alphai_nspec * mw_frac
-        if alphaij != 0:
-            if alphaij != 1:
-                if alphaij == -1:
-                    jline += ' - pres_mod_temp'
-                else:
-                    jline += ' + {:.16e} * pres_mod_temp'.format(alphaij)
-            else:
-                jline += ' + pres_mod_temp'
-    elif (rxn.pdep_sp == j_sp or rxn.pdep_sp == last_spec):
-        if rxn.pdep_sp == j_sp:
-            jline += ' + pres_mod_temp'
-        else:
-            jline += ' - pres_mod_temp * {:.16e}'.format(sp_j.mw / specs[rxn.pdep_sp].mw)
-
-    s_term = ''
-    if (rxn.pdep or rxn.thd_body) and \
-       ((j_sp in rxn.reac or last_spec in rxn.reac)
-        or (rxn.rev and (j_sp in rxn.prod or last_spec in rxn.prod))
-        ):
-        s_term += ' + ' + get_array(lang, 'pres_mod', pres_rxn_ind)
-        s_term += ' * ('
-
-    def __get_s_term(rxn, j_sp, reac=True):
-        jline = 'kf' if reac else 'kr'
-        if reac:
-            nu = rxn.reac_nu[rxn.reac.index(j_sp)]
+    mw_last = specs[last_spec].mw
+    j_temp = ir.Sym('j_temp')
+    pres_mod_temp = ir.Sym('pres_mod_temp')
+
+    thd = (((rxn.pdep and rxn.pdep_sp is None) or (rxn.thd_body)) and
+           rxn.thd_body_eff)
+    if thd:
+        if thd_eff is None:
+            thd_eff = {}
+            for thd_sp in rxn.thd_body_eff:
+                thd_eff.setdefault(thd_sp[0], thd_sp[1])
+        alphai_nspec = thd_eff.get(last_spec, 1.0)
+    pdep_sp = rxn.pdep_sp
+    if pdep_sp is not None:
+        mw_pdep = specs[pdep_sp].mw
+
+    if s_terms is None:
+        s_terms = get_s_terms(lang, rxn, pres_rxn_ind, get_array)
+    s_last = s_terms.get(last_spec)
+    if not (rxn.pdep or rxn.thd_body):
+        pres_mod = None
+    else:
+        if pres_mod is None:
+            pres_mod = get_array(lang, 'pres_mod', pres_rxn_ind)
+        pres_mod = ir.Sym(pres_mod)
+
+    def __dr_dy_species(j_sp, sp_j):
+        mw_frac = sp_j.mw / mw_last
+        terms = [ir.mul(j_temp, 1. - mw_frac)]
+        if thd:
+            alphaij = thd_eff.get(j_sp, 1.0)
+            if alphai_nspec != 0:
+                alphaij -= alphai_nspec * mw_frac
+            terms.append(ir.mul(alphaij, pres_mod_temp))
+        elif pdep_sp == j_sp:
+            terms.append(pres_mod_temp)
+        elif pdep_sp == last_spec:
+            terms.append(ir.mul(-sp_j.mw / mw_pdep, pres_mod_temp))
+
+        s_j = s_terms.get(j_sp)
+        s_last_j = None if s_last is None else ir.mul(-mw_frac, s_last)
+        if pres_mod is not None:
+            if s_j is not None or s_last_j is not None:
+                s_term = (s_last_j if s_j is None else
+                          s_j if s_last_j is None else ir.add(s_j, s_last_j))
+                terms.append(ir.mul(pres_mod, s_term))
         else:
-            nu = rxn.prod_nu[rxn.prod.index(j_sp)]
-        if nu != 1:
-            jline += ' * {}'.format(float(nu))
+            # the rate of progress terms are added one by one
+            if s_j is not None:
+                terms.extend(s_j.terms if isinstance(s_j, ir.Sum)
+                             else (s_j,))
+            if s_last_j is not None:
+                terms.append(s_last_j)
 
-        if (nu - 1) > 0:
-            if utils.is_integer(nu):
-                # integer, so just use multiplication
-                for i in range(int(nu) - 1):
-                    if jline: jline += ' * '
-                    jline += get_array(lang, 'conc', j_sp)
-            else:
-                if jline: jline += ' * '
-                jline += ('pow(' + get_array(lang, 'conc', j_sp) +
-                          ', {})'.format(nu - 1)
-                          )
+        if len(terms) == 1:
+            return terms[0]
+        return ir.add(*terms)
 
-        the_list = rxn.reac if reac else rxn.prod
-        # loop through remaining reactants
-        for i, isp in enumerate(the_list):
-            if isp == j_sp:
-                continue
+    return __dr_dy_species
 
-            nu = rxn.reac_nu[i] if reac else rxn.prod_nu[i]
-            if utils.is_integer(nu):
-                # integer, so just use multiplication
-                for i in range(int(nu)):
-                    if jline: jline += ' * '
-                    jline += get_array(lang, 'conc', isp)
-            else:
-                if jline: jline += ' * '
-                jline += ('pow(' + get_array(lang, 'conc', isp) +
-                          ', ' + str(nu) + ')'
-                          )
-        return jline
-
-    j_sp_add = False
-    if j_sp in rxn.reac or (rxn.rev and j_sp in rxn.prod):
-        j_sp_add = True
-        add = ''
-        if j_sp in rxn.reac:
-            if not s_term:
-                add += ' + '
-            add += __get_s_term(rxn, j_sp, True)
-        if rxn.rev and j_sp in rxn.prod:
-            if not s_term:
-                add += ' - '
-            elif s_term[-1] == '(':
-                add += '-'
-            add += __get_s_term(rxn, j_sp, False)
-        s_term += add
-
-    if last_spec in rxn.reac or (rxn.rev and last_spec in rxn.prod):
-        pre = '{:.16e}'.format(mw_frac)
-        add = ''
-        if j_sp_add:
-            s_term += ' - '
-        else:
-            if s_term and s_term[-1] == '(':
-                pre = '-' + pre
-            else:
-                pre = ' - ' + pre
-        if last_spec in rxn.reac:
-            add += __get_s_term(rxn, last_spec, True)
-        if rxn.rev and last_spec in rxn.prod:
-            if add:
-                add += ' - '
-            else:
-                add += '-'
-            add += __get_s_term(rxn, last_spec, False)
-        s_term += pre + ' * (' + add + ')'
 
-    if (rxn.pdep or rxn.thd_body) and s_term:
-        s_term += ')'
+def get_species_derivatives(lang, specs, rxn, pres_rxn_ind, k_ops, get_array,
+                            thd_eff=None, s_terms=None, cse=False,
+                            printer=None, block_printer=None, pres_mod=None
+                            ):
+    """Returns the code updating the Jacobian entries of a reaction with
+    respect to each species (but the last)
 
-    return (jline + s_term)
+    Parameters
+    ----------
+    lang : str
+        The Programming language
+    specs : list of `SpecInfo`
+        The species in the mechanism
+    rxn : `ReacInfo`
+        The reaction to consider
+    pres_rxn_ind : int
+        The index of the reaction in the pressure dependent reactions
+    k_ops : list of tuple
+        For each species with a nonzero net rate in the reaction, its index,
+        net stoichiometric coefficient and the operator (``'='`` or
+        ``'+='``) updating its entries
+    get_array : function
+        The SMM binded get_array function (or utils.get_array) as required
+    thd_eff : dict, optional
+        The reaction's third-body efficiencies keyed by species index
+        (see `MechanismArrays.efficiencies`), if already known
+    s_terms : dict, optional
+        The reaction's rate of progress derivatives (see `get_s_terms`),
+        if already known
+    cse : bool, optional
+        If ``True``, evaluate repeated subexpressions once (see
+        `kernel_ir.cse`)
+    printer, block_printer : `kernel_ir.CPrinter`, optional
+        Printers of the statements, and of those in a block declaring
+        common subexpressions; the caller clears them
+    pres_mod : str, optional
+        The reaction's pressure modification array element, if already
+        known
+
+    Returns
+    -------
+    text : str
+        The code
+    flops_removed : int
+        The floating point operations removed by `kernel_ir.cse`
+
+    """
+    num_s = len(specs)
+    line_end = utils.line_end[lang]
+    if printer is None:
+        printer = ir.CPrinter(utils.line_start)
+    dr_dy_species = _dr_dy_species(lang, specs, rxn, pres_rxn_ind, get_array,
+                                   thd_eff, s_terms, pres_mod)
+    k_ops = [(k_sp, specs[k_sp].mw, float(nu), op) for k_sp, nu, op in k_ops]
+
+    lines = []
+    stmts = []
+    for j_sp, sp_j in enumerate(specs[:-1]):
+        dr_dyj = dr_dy_species(j_sp, sp_j)
+        for k_sp, mw_k, nu, op in k_ops:
+            if k_sp + 1 < num_s:
+                # sparse indexes
+                target = get_array(lang, 'jac',
+                                   k_sp + 1 + num_s * (j_sp + 1))
+            else:
+                target = get_array(lang, 'J_nplusjplus', j_sp)
 
+            mw_frac = (mw_k / sp_j.mw) * nu
+            if cse:
+                stmts.append(ir.Assign(target, ir.mul(mw_frac, dr_dyj), op))
+            else:
+                lines.append(printer.scaled_statement(
+                    target, mw_frac, dr_dyj, op, line_end))
+
+    removed = 0
+    if cse:
+        # kf, kr, j_temp etc. are reassigned for each reaction, so
+        # the temporaries are scoped to it
+        stmts, removed = ir.cse(stmts)
+        if removed:
+            if block_printer is None:
+                block_printer = ir.CPrinter(utils.line_start * 2)
+            lines = [utils.line_start + '{\n',
+                     block_printer.statements(stmts, utils.line_end[lang]),
+                     utils.line_start + '}\n']
+        else:
+            lines = [printer.statements(stmts, utils.line_end[lang])]
+    return ''.join(lines), removed
 
-def write_kc(file, lang, specs, rxn):
+
+def write_kc(file, lang, specs, rxn, rxn_nu=None):
     """Write evaluation of the reaction rate equilibrium constant
 
     Parameters
@@ -502,6 +606,9 @@ def write_kc(file, lang, specs, rxn):
         The species in the mechanism
     rxn : `ReacInfo`
         The reaction to consider
+    rxn_nu : dict, optional
+        The reaction's net stoichiometric coefficients keyed by species
+        index (see `MechanismIndex.nu`), if already known
 
     Returns
     -------
@@ -512,7 +619,10 @@ def write_kc(file, lang, specs, rxn):
     coeffs = {}
     for isp in set(rxn.reac + rxn.prod):
         sp = specs[isp]
-        nu = utils.get_nu(isp, rxn)
+        if rxn_nu is None:
+            nu = utils.get_nu(isp, rxn)
+        else:
+            nu = rxn_nu.get(isp, 0)
 
         if nu == 0:
             continue
@@ -1132,7 +1242,7 @@ def write_sri(file, lang):
     file.write(line)
 
 
-def get_pdep_dt(lang, rxn, rev_reacs, rxn_ind, pres_rxn_ind, get_array):
+def get_pdep_dt(lang, rxn, index, rxn_ind, pres_rxn_ind, get_array):
     """Write contribution from temperature derivative of reaction rate for
     a pressure dependent reaction
 
@@ -1142,8 +1252,8 @@ def get_pdep_dt(lang, rxn, rev_reacs, rxn_ind, pres_rxn_ind, get_array):
         The Programming language
     rxn : `ReacInfo`
         The reaction to consider
-    rev_reacs : list of `ReacInfo`
-        The list of reverisble reactions
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
     rxn_ind : int
         The index of the reaction in the reaction list
     pres_rxn_ind : int
@@ -1180,7 +1290,7 @@ def get_pdep_dt(lang, rxn, rev_reacs, rxn_ind, pres_rxn_ind, get_array):
         # forward and reverse reaction rates
         jline += '(' + get_array(lang, 'fwd_rates', rxn_ind)
         jline += ' - ' + \
-                 get_array(lang, 'rev_rates', rev_reacs.index(rxn_ind))
+                 get_array(lang, 'rev_rates', index.rev_index[rxn_ind])
         jline += ')'
     else:
         # forward reaction rate only
@@ -1954,9 +2064,9 @@ def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
         Opened Jacobian file
 
     """
-    with open(os.path.join(path, 'jacob_' + str(number) +
-              utils.header_ext[lang]), 'w'
-              ) as file:
+    with file_writer.open_file(os.path.join(path, 'jacob_' + str(number) +
+                               utils.header_ext[lang]), 'w'
+                               ) as file:
         file.write('#ifndef JACOB_HEAD_{}\n'.format(number) +
                    '#define JACOB_HEAD_{}\n'.format(number) +
                    '\n'
@@ -1980,9 +2090,9 @@ def write_sub_intro(path, lang, number, rate_list, this_rev, this_pdep,
                  '#endif\n'
                  )
         file.write(line.format(utils.restrict[lang]))
-    file = open(os.path.join(path, 'jacob_' + str(number) +
-                utils.file_ext[lang]), 'w'
-                )
+    file = file_writer.open_file(os.path.join(path, 'jacob_' + str(number) +
+                                 utils.file_ext[lang]), 'w'
+                                 )
     file.write('#include <math.h>\n'
                '#include "header{}"\n'.format(utils.header_ext[lang]) +
                '\n'
@@ -2136,9 +2246,9 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
         Jacobian file object
 
     """
-    with open(os.path.join(path, 'jacob_' + str(number) +
-              utils.header_ext[lang]), 'w'
-              ) as file:
+    with file_writer.open_file(os.path.join(path, 'jacob_' + str(number) +
+                               utils.header_ext[lang]), 'w'
+                               ) as file:
         file.write('#ifndef JACOB_HEAD_{}\n'.format(number) +
                    '#define JACOB_HEAD_{}\n'.format(number) +
                    '\n'
@@ -2154,9 +2264,9 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
                    '\n'
                    '#endif\n'
                    )
-    file = open(os.path.join(path, 'jacob_' + str(number) +
-                utils.file_ext[lang]), 'w'
-                )
+    file = file_writer.open_file(os.path.join(path, 'jacob_' + str(number) +
+                                 utils.file_ext[lang]), 'w'
+                                 )
     file.write('#include "header{}"\n'.format(utils.header_ext[lang]) +
                '\n'
                )
@@ -2186,7 +2296,147 @@ def write_dy_intros(path, lang, number, have_jnplus_jplus):
     return file
 
 
-def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
+_worker_specs = None
+"""list of `SpecInfo`: The species, in a worker process of a parallel
+generation (see `create_jacobian`)"""
+
+
+def _init_worker(specs, file_system_type):
+    """Initialize a worker process of a parallel generation, writing to a
+    file system of the same type as its parent.
+    """
+    global _worker_specs
+    _worker_specs = specs
+    file_writer.set_file_system(file_system_type())
+
+
+def _species_derivatives_task(lang, rxn, pres_rxn_ind, k_ops, thd_eff,
+                              s_terms, cse, pres_mod):
+    """`get_species_derivatives` in a worker process of a parallel generation.
+    """
+    return get_species_derivatives(lang, _worker_specs, rxn, pres_rxn_ind,
+                                   k_ops, utils.get_array, thd_eff, s_terms,
+                                   cse, pres_mod=pres_mod)
+
+
+def _writer_task(writer, args, profile=False, trace_memory=True):
+    """Run a writer in a worker process of a parallel generation.
+
+    Returns
+    -------
+    result
+        The result of the writer, or the `SystemExit` raised on an error
+        (so the worker process does not exit)
+    written : list of tuple
+        The files written, for `file_writer.adopt`
+    stages : list of dict
+        If ``profile``, the stage of the writer (see `profiler.Profiler`)
+
+    """
+    profiler = prof.Profiler(profile, trace_memory)
+    try:
+        with file_writer.collect() as written, \
+                profiler.stage(writer.__name__):
+            result = writer(*args)
+    except SystemExit as e:
+        return e, [], []
+    finally:
+        profiler.close()
+    return result, written, profiler.stages
+
+
+def _get_result(task):
+    """The result of a `_writer_task`, exiting on its error.
+    """
+    result, written, stages = task.get()
+    if isinstance(result, SystemExit):
+        raise result
+    return result
+
+
+class _DeferredFile(object):
+    """Holds the text written to a file, and the species derivatives being
+    computed in a process pool, until closed; then writes them in order.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.parts = []
+        self.write = self.parts.append
+
+    def count_lines(self):
+        """See `file_writer.BufferedWriter`"""
+        return self.file.count_lines()
+
+    def defer(self, result):
+        """Write the text of a `_species_derivatives_task` here once done.
+        """
+        self.parts.append(result)
+
+    def close(self):
+        for part in self.parts:
+            self.file.write(part if isinstance(part, str) else part.get()[0])
+        self.parts = []
+        self.file.close()
+
+
+class _CallsFile(object):
+    """Holds the text written for the temperature and pressure terms of a
+    reaction, until flushed to a file with its repeated math function calls
+    evaluated once (see `kernel_ir.cse_calls`).
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.parts = []
+        self.write = self.parts.append
+
+    def flush(self, lang):
+        """Write the text held, declaring any temporaries in a block.
+
+        Returns
+        -------
+        removed : int
+            The number of calls removed
+
+        """
+        text, removed = ir.cse_calls(''.join(self.parts),
+                                     line_end=utils.line_end[lang])
+        if removed:
+            text = ''.join([utils.line_start + '{\n'] +
+                           [utils.line_start + line if line.strip() else line
+                            for line in text.splitlines(True)] +
+                           [utils.line_start + '}\n'])
+        self.file.write(text)
+        self.parts = []
+        return removed
+
+
+class _KeptFile(object):
+    """A Jacobian subfile kept from a previous generation: the text written
+    to it is dropped, and its previous contents written instead when closed.
+    """
+
+    def __init__(self, file, contents):
+        self.file = file
+        self.contents = contents
+
+    def write(self, text):
+        pass
+
+    def count_lines(self):
+        """See `file_writer.BufferedWriter`"""
+        return file_writer.count_lines(self.contents)
+
+    def close(self):
+        self.file.discard()
+        mode = 'wb' if isinstance(self.contents, bytes) else 'w'
+        with file_writer.open_file(self.file.name, mode) as file:
+            file.write(self.contents)
+
+
+def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None, index=None,
+                   cse=False, pool=None, disabled=None, keep=None, chunks=None):
     """Write Jacobian subroutine in desired language.
 
     Parameters
@@ -2203,12 +2453,36 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         List of `bool`; ``False`` if species has (identically) zero rate
     smm : shared_memory_manager, optional
         If not ``None``, use this to manage shared memory optimization
+    index : `MechanismIndex`, optional
+        Lookup tables of the mechanism; built if not supplied
+    cse : bool, optional
+        If ``True``, evaluate the subexpressions repeated in the species
+        derivatives of each reaction once (see `kernel_ir.cse`)
+    pool : multiprocessing.Pool, optional
+        If supplied, the species derivatives of the reactions are printed
+        in this pool, whose workers were initialized by `_init_worker`
+    disabled : set of int, optional
+        Indices of reactions left out, with zero rates. Their entries are
+        accounted for (and zeroed where first assigned), so that the code
+        of the other reactions is that of the whole mechanism.
+    keep : dict, optional
+        The Jacobian subfiles of a previous generation to keep, by number:
+        the ``[start, stop)`` range of their reactions and their contents.
+        A subfile is kept if it covers the same reactions; its code is not
+        printed.
+    chunks : list, optional
+        If supplied, filled with the ``[start, stop)`` range of the
+        reactions of each Jacobian subfile
 
     Returns
     -------
-    None
+    pattern : `SparsityPattern`
+        The entries of the Jacobian that are assigned
 
     """
+    if index is None:
+        index = MechanismIndex(specs, reacs)
+    arrays = index.arrays
 
     if lang == 'cuda':
         do_unroll = len(reacs) > CUDAParams.Jacob_Unroll
@@ -2220,10 +2494,10 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         limit = CParams.Max_Lines
     if do_unroll:
         # make paths for separate jacobian files
-        utils.create_dir(os.path.join(path, 'jacobs'))
+        file_writer.create_dir(os.path.join(path, 'jacobs'))
 
     # first write header file
-    file = open(os.path.join(path, 'jacob' + utils.header_ext[lang]), 'w')
+    file = file_writer.open_file(os.path.join(path, 'jacob' + utils.header_ext[lang]), 'w')
     file.write('#ifndef JACOB_HEAD\n'
                '#define JACOB_HEAD\n'
                '\n'
@@ -2250,19 +2524,20 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     # numbers of species and reactions
     num_s = len(specs)
     num_r = len(reacs)
-    rev_reacs = [i for i, rxn in enumerate(reacs) if rxn.rev]
+    rev_reacs = index.rev_reacs
     num_rev = len(rev_reacs)
 
-    pdep_reacs = []
-    for i, reac in enumerate(reacs):
-        if reac.thd_body or reac.pdep:
-            # add reaction index to list
-            pdep_reacs.append(i)
+    pdep_reacs = index.pdep_reacs
     num_pdep = len(pdep_reacs)
 
+    # reactions with a nonzero net rate for the last species
+    changes_last = arrays.changes_species(num_s - 1)
+
     # create file depending on language
     filename = 'jacob' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
+    if pool is not None:
+        file = _DeferredFile(file)
 
     # header files
     file.write('#include "jacob{}"\n\n'.format(utils.header_ext[lang]))
@@ -2600,8 +2875,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         line += 'rho_inv = 1.0 / rho' + utils.line_end[lang]
         file.write(line)
 
-    if any(len(specs) - 1 in set(reac.reac + reac.prod) and \
-        utils.get_nu(len(specs) - 1, reac) for reac in reacs):
+    if changes_last.any():
         file.write(utils.line_start +
                    'double J_nplusone = 0' +
                    utils.line_end[lang]
@@ -2621,6 +2895,11 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     # variables for equilibrium constant derivatives, if needed
     dBdT_flag = [False for sp in specs]
 
+    # prints the species derivatives, and those within a block that
+    # declares common subexpressions
+    printer = ir.CPrinter(utils.line_start)
+    block_printer = ir.CPrinter(utils.line_start * 2)
+
     # define dB/dT's
     write_db_dt_def(file, lang, specs, reacs, rev_reacs, dBdT_flag, do_unroll)
 
@@ -2637,8 +2916,12 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     while not success:
         if lang == 'cuda' and smm is not None:
             smm.reset()
-        # whether this jacobian index has been modified
-        touched = [False for i in range(len(specs) * len(specs))]
+        flops_removed = 0
+        calls_removed = 0
+        # species derivatives being printed in the pool
+        results = []
+        # the jacobian entries modified so far
+        pattern = SparsityPattern(num_s)
         J_nplusone_touched = False
         J_nplusjplus_touched = [False for i in range(len(specs))]
 
@@ -2695,10 +2978,8 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                         cheb = True
                     if reacs[ind_next].plog:
                         plog = True
-                    reac = reacs[ind_next]
-                    if len(specs) - 1 in set(reac.reac + reac.prod) and \
-                        utils.get_nu(len(specs) - 1, reac):
-                        has_jnplus_one = True
+                has_jnplus_one = bool(
+                    changes_last[rxn_ind:next_fn_index].any())
 
                 dim = None
                 if cheb:
@@ -2711,27 +2992,52 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                                        dim, plog, smm is None,
                                        has_jnplus_one
                                        )
+                if keep and keep.get(jac_count, [None])[0] == [rxn_ind,
+                                                              next_fn_index]:
+                    file = _KeptFile(file, keep[jac_count][1])
+                elif pool is not None:
+                    file = _DeferredFile(file)
 
             if lang == 'cuda' and smm is not None:
                 variable_list, usages = calculate_shared_memory(rxn_ind, rxn,
                                                                 specs, reacs,
-                                                                rev_reacs,
-                                                                pdep_reacs
+                                                                index
                                                                 )
                 smm.load_into_shared(file, variable_list, usages)
 
+            # the code of a reaction left out is dropped, and that of a
+            # kept subfile not printed
+            kept = isinstance(file, _KeptFile)
+            left_out = bool(disabled) and rxn_ind in disabled and not kept
+            if left_out:
+                rxn_file = file
+                file = file_writer.NullWriter()
+                rxn_conc_temp = last_conc_temp
+                rxn_sp = [k_sp for k_sp in set(rxn.reac + rxn.prod)
+                          if k_sp in index.nu[rxn_ind]]
+                first_dt = [k_sp for k_sp in rxn_sp if k_sp + 1 < num_s and
+                            (k_sp + 1, 0) not in pattern]
+                first_row = [k_sp for k_sp in rxn_sp if k_sp + 1 < num_s and
+                             (k_sp + 1, 1) not in pattern]
+                first_jplus = (num_s - 1 in rxn_sp and
+                               not J_nplusjplus_touched[0])
 
             ######################################
             # with respect to temperature
             ######################################
 
+            if cse and lang in ['c', 'cuda'] and not (kept or left_out):
+                # Pr, Fcent etc. are reassigned for each reaction, so the
+                # temporaries of its math function calls are scoped to it
+                file = _CallsFile(file)
+
             write_dt_comment(file, lang, rxn_ind)
 
             # first we need any pres mod terms
             jline = ''
             pres_rxn_ind = None
             if rxn.pdep:
-                pres_rxn_ind = pdep_reacs.index(rxn_ind)
+                pres_rxn_ind = index.pdep_index[rxn_ind]
                 last_conc_temp = write_pr(file, lang, specs, reacs, pdep_reacs,
                                           rxn, get_array, last_conc_temp
                                           )
@@ -2742,11 +3048,11 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 elif rxn.sri:
                     write_sri(file, lang)
 
-                jline = get_pdep_dt(lang, rxn, rev_reacs, rxn_ind, pres_rxn_ind, get_array)
+                jline = get_pdep_dt(lang, rxn, index, rxn_ind, pres_rxn_ind, get_array)
 
             elif rxn.thd_body:
                 # third body reaction
-                pres_rxn_ind = pdep_reacs.index(rxn_ind)
+                pres_rxn_ind = index.pdep_index[rxn_ind]
 
                 jline = (utils.line_start +
                          'j_temp = ((-' +
@@ -2758,7 +3064,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                     # forward and reverse reaction rates
                     jline += '(' + get_array(lang, 'fwd_rates', rxn_ind)
                     jline += ' - ' + \
-                        get_array(lang, 'rev_rates', rev_reacs.index(rxn_ind))
+                        get_array(lang, 'rev_rates', index.rev_index[rxn_ind])
                     jline += ')'
                 else:
                     # forward reaction rate only
@@ -2777,20 +3083,20 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
             doT = True
             if rxn.plog:
                 write_plog_rxn_dt(file, lang, jline, specs, rxn, rxn_ind,
-                                  rev_reacs.index(rxn_ind) if rxn.rev else None,
+                                  index.rev_index.get(rxn_ind),
                                   get_array, do_unroll
                                   )
 
             elif rxn.cheb:
                 write_cheb_rxn_dt(file, lang, jline, rxn, rxn_ind,
-                                  rev_reacs.index(rxn_ind) if rxn.rev else None,
+                                  index.rev_index.get(rxn_ind),
                                   specs, get_array, do_unroll
                                   )
 
             else:
                 dkdt = get_elementary_rxn_dt(
                     lang, specs, rxn, rxn_ind,
-                    rev_reacs.index(rxn_ind) if rxn.rev else None,
+                    index.rev_index.get(rxn_ind),
                     get_array, do_unroll
                     )
                 if dkdt:
@@ -2798,13 +3104,16 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 else:
                     doT = False
 
+            # species with a nonzero net rate in this reaction
+            rxn_nu = index.nu[rxn_ind]
+            k_nus = [(k_sp, rxn_nu[k_sp]) for k_sp in set(rxn.reac + rxn.prod)
+                     if k_sp in rxn_nu]
+
             if doT:
-                for k_sp in set(rxn.reac + rxn.prod):
+                for k_sp, nu in k_nus:
                     sp_k = specs[k_sp]
+                    dt_touched = k_sp + 1 < num_s and (k_sp + 1, 0) in pattern
                     line = utils.line_start
-                    nu = utils.get_nu(k_sp, rxn)
-                    if nu == 0:
-                        continue
                     if lang in ['c', 'cuda']:
                         j_str = ('{}J_nplusone'.format('*' if do_unroll else '')
                                  if k_sp + 1 == num_s
@@ -2813,7 +3122,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                         line += (
                             j_str +
                             ' {}= {}j_temp{} * {:.16e}'.format(
-                                '+' if touched[k_sp + 1] else '',
+                                '+' if dt_touched else '',
                                 '' if nu == 1 else ('-' if nu == -1 else ''),
                                 ' * {}'.format(float(nu))
                                 if nu != 1 and nu != -1 else '',
@@ -2829,7 +3138,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                                  )
                         line += (
                             j_str + ' = ' +
-                            (j_str + ' + ' if touched[k_sp + 1] else '') +
+                            (j_str + ' + ' if dt_touched else '') +
                             ' {}j_temp{} * {:.16e}'.format('' if nu == 1 else
                                 ('-' if nu == -1 else ''),
                                 ' * {}'.format(float(nu))
@@ -2840,7 +3149,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                     if k_sp + 1 == num_s:
                         J_nplusone_touched = True
                     else:
-                        touched[k_sp + 1] = True
+                        pattern.add(k_sp + 1, 0)
 
                 file.write('\n')
 
@@ -2851,92 +3160,84 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
 
             if rxn.rev and not rxn.rev_par:
                 # need to find Kc
-                write_kc(file, lang, specs, rxn)
+                write_kc(file, lang, specs, rxn, rxn_nu)
 
             # need to write the dr/dy parts (independent of any species)
-            write_dr_dy(file, lang, rev_reacs, rxn, rxn_ind,
+            write_dr_dy(file, lang, index, rxn, rxn_ind,
                         pres_rxn_ind, get_array
                         )
 
             # write the forward / backwards rates:
             write_rates(file, lang, rxn)
 
-            # now loop through each species
-            for j_sp, sp_j in enumerate(specs[:-1]):
-                dr_dyj = write_dr_dy_species(lang, specs, rxn, pres_rxn_ind,
-                                                        j_sp, sp_j, rxn_ind,
-                                                        rev_reacs, get_array
-                                                        )
-                for k_sp in set(rxn.reac + rxn.prod):
-                    sp_k = specs[k_sp]
-
-                    nu = utils.get_nu(k_sp, rxn)
-
-                    if nu == 0:
-                        continue
-
-                    jline = utils.line_start
-                    if k_sp + 1 < num_s:
-                        lin_index = k_sp + 1 + (num_s) * (j_sp + 1)
-                        #if not rxn_ind in thelist and lin_index == 30608:
-                        #    thelist.add(rxn_ind)
-                        # sparse indexes
-                        if lang in ['c', 'cuda']:
-                            jline += (
-                                  get_array(lang, 'jac', lin_index) +
-                                  ' {}= '.format('+' if touched[lin_index]
-                                  else '')
-                                  )
-                        elif lang in ['fortran', 'matlab']:
-                            jline += (
-                                  get_array(lang, 'jac', k_sp + 1, twod=j_sp+1) +
-                                  (' = ' +
-                                  get_array(lang, 'jac', k_sp + 1, twod=j_sp+1)
-                                  if touched[k_sp + 1] else '') +
-                                  ' + '
-                                  )
+            if isinstance(file, _CallsFile):
+                calls_removed += file.flush(lang)
+                file = file.file
 
-                        touched[lin_index] = True
-                    else:
-                        if lang in ['c', 'cuda']:
-                            jline += (
-                                get_array(lang, 'J_nplusjplus', j_sp) +
-                                ' {}= '.format('+' if J_nplusjplus_touched[j_sp]
-                                               else ''
-                                               )
-                                )
-                        elif lang in ['fortran', 'matlab']:
-                            jline += (
-                                get_array(lang, 'J_nplusjplus', j_sp) +
-                                (' = ' + get_array(lang, 'J_nplusjplus', j_sp)
-                                if J_nplusjplus_touched[j_sp] else '') + ' + '
-                                )
-
-                        J_nplusjplus_touched[j_sp] = True
-
-                    working_temp = ''
-                    mw_frac = (sp_k.mw / sp_j.mw) * float(nu)
-                    if mw_frac == -1.0:
-                        working_temp += ' -'
-                    elif mw_frac != 1.0:
-                        working_temp += ' {:.16e} * '.format(mw_frac)
-                    else:
-                        working_temp += ' '
-
-                    working_temp += '('
-
-                    working_temp += dr_dyj
-
-                    working_temp += ')'
-
-                    jline += working_temp
-                    jline += utils.line_end[lang]
-
-                    file.write(jline)
-                    jline = ''
+            # now loop through each species
+            thd_eff = arrays.efficiencies(rxn_ind)
+            s_terms = get_s_terms(lang, rxn, pres_rxn_ind, get_array)
+            # each species changed by the reaction updates its entries for
+            # all species at once, so the first reaction to do so assigns
+            k_ops = []
+            for k_sp, nu in k_nus:
+                if k_sp + 1 < num_s:
+                    k_ops.append((k_sp, nu, '+=' if (k_sp + 1, 1) in pattern
+                                  else '='))
+                    pattern.add_row(k_sp + 1, 1)
+                else:
+                    k_ops.append((k_sp, nu, '+=' if J_nplusjplus_touched[0]
+                                  else '='))
+                    J_nplusjplus_touched[:-1] = [True] * (num_s - 1)
+
+            if kept or left_out:
+                pass
+            elif pool is None:
+                text, removed = get_species_derivatives(
+                    lang, specs, rxn, pres_rxn_ind, k_ops, get_array,
+                    thd_eff, s_terms, cse, printer, block_printer)
+                flops_removed += removed
+                file.write(text)
+                printer.clear()
+                block_printer.clear()
+            else:
+                # the worker cannot map arrays to shared memory
+                pres_mod = None
+                if rxn.pdep or rxn.thd_body:
+                    pres_mod = get_array(lang, 'pres_mod', pres_rxn_ind)
+                result = pool.apply_async(
+                    _species_derivatives_task,
+                    (lang, rxn, pres_rxn_ind, k_ops, thd_eff, s_terms, cse,
+                     pres_mod))
+                results.append(result)
+                file.defer(result)
 
             file.write('\n')
 
+            if left_out:
+                # the entries the reaction would assign first
+                file = rxn_file
+                last_conc_temp = rxn_conc_temp
+                targets = []
+                if doT:
+                    targets += [get_array(lang, 'jac', k_sp + 1)
+                                for k_sp in first_dt]
+                    if num_s - 1 in rxn_sp:
+                        targets.append('{}J_nplusone'.format(
+                            '*' if do_unroll else ''))
+                for k_sp in first_row:
+                    targets += [get_array(lang, 'jac',
+                                          k_sp + 1 + num_s * (j_sp + 1))
+                                for j_sp in range(num_s - 1)]
+                if first_jplus:
+                    targets += [get_array(lang, 'J_nplusjplus', j_sp)
+                                for j_sp in range(num_s - 1)]
+                file.write(utils.line_start + utils.comment[lang] +
+                           'rxn {} left out\n'.format(rxn_ind))
+                file.write(''.join(utils.line_start + target + ' = 0.0' +
+                                   utils.line_end[lang] for target in targets))
+                file.write('\n')
+
             if lang == 'cuda' and smm is not None:
                 evictable = [x for x in variable_list if not x.base == 'conc']
                 smm.mark_for_eviction(evictable)
@@ -2945,13 +3246,12 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 # switch back
                 file.write('}\n\n')
                 file.close()
+                written = file
                 file = file_store
                 #test file size for CUDA
                 #to avoid killing nvcc
                 if jac_count == 0:
-                    with open(os.path.join(path, 'jacobs', 'jacob_{}{}'.format(jac_count,
-                                utils.file_ext[lang]))) as readfile:
-                        num_lines = sum(1 for line in readfile)
+                    num_lines = written.count_lines()
                     if num_lines > limit:
                         unroll_len = int(unroll_len / 2)
                         retry = True
@@ -2976,6 +3276,17 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 file.write(line + utils.line_end[lang])
         success = rxn_ind == len(reacs) - 1
 
+    if chunks is not None and do_unroll:
+        chunks[:] = [[start, min(start + unroll_len, num_r)]
+                     for start in range(0, num_r, unroll_len)]
+
+    if cse:
+        flops_removed += sum(result.get()[1] for result in results)
+        print('Common subexpression elimination removed {} floating point '
+              'operations from the species derivatives of the Jacobian, and '
+              '{} math function calls from its temperature and pressure '
+              'terms.'.format(flops_removed, calls_removed))
+
     ###################################
     # Partial derivatives of temperature (energy equation)
     ###################################
@@ -3069,7 +3380,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
         line += get_array(lang, 'jac', 0, twod=0) + ' = 0.0_wp'
     elif lang == 'matlab':
         line += get_array(lang, 'jac', 0, twod=0) + ' = 0.0'
-    touched[0] = True
+    pattern.add(0, 0)
     line += utils.line_end[lang]
     file.write(line)
 
@@ -3099,11 +3410,11 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
     limit = (CParams.Max_Spec_Lines if lang == 'c'
                   else CUDAParams.Max_Spec_Lines)
 
-    touched_copy = touched[:]
+    pattern_copy = pattern.copy()
     J_nplusjplus_touched_copy = J_nplusjplus_touched[:]
     success = False
     while not success:
-        touched = touched_copy[:]
+        pattern = pattern_copy.copy()
         J_nplusjplus = J_nplusjplus_touched_copy[:]
         next_fn_index = 0
         for k_sp, sp_k in enumerate(specs):
@@ -3119,6 +3430,9 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                                        lang, jac_count, have_jnplus_jplus
                                        )
 
+            # the entries of this row modified so far
+            k_touched = (pattern.mask[k_sp + 1].tolist() if k_sp + 1 < num_s
+                         else None)
             for j_sp, sp_j in enumerate(specs):
                 lin_index = k_sp + 1 + (num_s) * (j_sp + 1)
                 #the num_s + 1 row is zero
@@ -3126,7 +3440,7 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 if j_sp + 1 == num_s:
                     continue
 
-                if k_sp + 1 < num_s and touched[lin_index]:
+                if k_sp + 1 < num_s and k_touched[j_sp + 1]:
                     #still in the actual jacobian
                     #and this combo matters
                     line = utils.line_start
@@ -3174,25 +3488,26 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                 ######################################
                 line = utils.line_start
                 my_index = (num_s) * (j_sp + 1)
+                my_touched = (0, j_sp + 1) in pattern
                 if lang in ['c', 'cuda']:
                     line += get_array(lang, 'jac', my_index)
                 elif lang in ['fortran', 'matlab']:
                     line += get_array(lang, 'jac', 0, twod=j_sp + 1)
                 if lang in ['fortran', 'matlab']:
                     line += ' = ' + (get_array(lang, 'jac', 0, twod=j_sp + 1)
-                                     + ' +' if touched[my_index] else ''
+                                     + ' +' if my_touched else ''
                                      ) + ' -('
                 else:
-                    line += ' {}= {}('.format('-' if touched[my_index] else '',
-                                              '' if touched[my_index] else '-'
+                    line += ' {}= {}('.format('-' if my_touched else '',
+                                              '' if my_touched else '-'
                                               )
-                touched[my_index] = True
+                pattern.add(0, j_sp + 1)
 
 
                 jac_part = ''
                 if k_sp + 1 < num_s:
                     #still in the actual jacobian
-                    if touched[lin_index]:
+                    if k_touched[j_sp + 1]:
                         if lang in ['c', 'cuda']:
                             jac_part = ('working_temp * ' +
                                         get_array(lang, 'jac', lin_index) +
@@ -3236,11 +3551,11 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
             if do_unroll and k_sp == next_fn_index - 1:
                 # switch back
                 file.write('}\n\n')
+                file.close()
+                written = file
                 file = file_store
                 #check that file length is under limit
-                with open(os.path.join(path, 'jacobs', 'jacob_{}{}'.format(jac_count,
-                            utils.file_ext[lang]))) as readfile:
-                    num_lines = sum(1 for line in readfile)
+                num_lines = written.count_lines()
                 if num_lines > limit:
                     unroll_len = int(unroll_len / 2)
                     break
@@ -3278,9 +3593,9 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
 
     # create include file
     if do_unroll:
-        with open(os.path.join(path, 'jacobs', 'jac_include' +
-                  utils.header_ext[lang]), 'w'
-                  ) as tempfile:
+        with file_writer.open_file(os.path.join(path, 'jacobs', 'jac_include' +
+                                   utils.header_ext[lang]), 'w'
+                                   ) as tempfile:
             tempfile.write('#ifndef JAC_INCLUDE_H\n'
                            '#define JAC_INCLUDE_H\n')
             for i in range(jac_count):
@@ -3289,16 +3604,16 @@ def write_jacobian(path, lang, specs, reacs, seen_sp, smm=None):
                                )
             tempfile.write('#endif\n\n')
 
-        with open(os.path.join(path, 'jacobs',
-                  'jac_list_{}'.format(lang)), 'w'
-                  ) as tempfile: \
+        with file_writer.open_file(os.path.join(path, 'jacobs',
+                                   'jac_list_{}'.format(lang)), 'w'
+                                   ) as tempfile: \
             tempfile.write(' '.join(['jacob_{}{}'.format(i,
                            utils.file_ext[lang]) for i in range(jac_count)])
                            )
-    return touched
+    return pattern
 
 
-def write_sparse_multiplier(path, lang, touched, nvars):
+def write_sparse_multiplier(path, lang, pattern):
     """Write a subroutine that multiplies the non-zero entries of the
     Jacobian with a column 'j' of another matrix.
 
@@ -3308,10 +3623,8 @@ def write_sparse_multiplier(path, lang, touched, nvars):
         Path to build directory for file.
     lang : {'c', 'cuda', 'fortran', 'matlab'}
         Programming language.
-    inidicies : list
-        A list of indicies where the Jacobian is non-zero
-    nvars : int
-        Number of variables in the Jacobian matrix
+    pattern : `SparsityPattern`
+        The entries where the Jacobian is non-zero
 
     Returns
     -------
@@ -3319,15 +3632,15 @@ def write_sparse_multiplier(path, lang, touched, nvars):
 
     """
 
-    sparse_indicies = [x for x in range(nvars * nvars) if touched[nvars]]
+    nvars = pattern.nvars
 
     # first write header file
-    file = open(os.path.join(path,
-                'sparse_multiplier{}'.format(utils.header_ext[lang])), 'w'
-                )
+    file = file_writer.open_file(os.path.join(path,
+                                 'sparse_multiplier{}'.format(utils.header_ext[lang])), 'w'
+                                 )
     file.write('#ifndef SPARSE_HEAD\n'
                '#define SPARSE_HEAD\n')
-    file.write('\n#define N_A {}'.format(len(sparse_indicies)))
+    file.write('\n#define N_A {}'.format(pattern.nnz))
     file.write(
         '\n'
         '#include "header{}"\n'.format(utils.header_ext[lang]) +
@@ -3345,7 +3658,7 @@ def write_sparse_multiplier(path, lang, touched, nvars):
 
     # create file depending on language
     filename = 'sparse_multiplier' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     file.write('#include "sparse_multiplier'
                '{}"\n\n'.format(utils.header_ext[lang])
@@ -3362,19 +3675,17 @@ def write_sparse_multiplier(path, lang, touched, nvars):
         """optimize for cache reusing"""
         touched = [False for i in range(nvars)]
         for i in range(nvars):
-            # get all indicies that belong to row i
-            i_list = [x for x in sparse_indicies if int(x / nvars) == i]
-            for index in i_list:
+            # the non-zero entries of column i
+            for row in pattern.row_indices(i).tolist():
                 file.write(' ' +
-                           utils.get_array(lang, 'w', index % nvars) +
-                           ' {}= '.format('+' if touched[index % nvars]
-                           else '')
+                           utils.get_array(lang, 'w', row) +
+                           ' {}= '.format('+' if touched[row] else '')
                            )
-                file.write(' ' + utils.get_array(lang, 'A', index) +
+                file.write(' ' + utils.get_array(lang, 'A', row + nvars * i) +
                            ' * ' + utils.get_array(lang, 'Vm', i) +
                            utils.line_end[lang]
                            )
-                touched[index % nvars] = True
+                touched[row] = True
         zero_out = [i for i, t in enumerate(touched) if not t]
         for i in zero_out:
             file.write(' ' +
@@ -3384,8 +3695,8 @@ def write_sparse_multiplier(path, lang, touched, nvars):
         file.write("}\n")
     else:
         for i in range(nvars):
-            # get all indicies that belong to row i
-            i_list = [x for x in sparse_indicies if x % nvars == i]
+            # the non-zero entries of row i
+            i_list = pattern.col_indices(i).tolist()
             if not len(i_list):
                 file.write('  ' +
                            utils.get_array(lang, 'w', i) + ' = 0' +
@@ -3393,22 +3704,175 @@ def write_sparse_multiplier(path, lang, touched, nvars):
                            )
                 continue
             file.write('  ' + utils.get_array(lang, 'w', i) + ' = ')
-            for index in i_list:
-                if i_list.index(index):
+            for n, col in enumerate(i_list):
+                if n:
                     file.write(" + ")
-                file.write(' ' + utils.get_array(lang, 'A', index) + ' * '
-                           + utils.get_array(lang, 'Vm', int(index / nvars)))
+                file.write(' ' + utils.get_array(lang, 'A', i + nvars * col)
+                           + ' * ' + utils.get_array(lang, 'Vm', col))
             file.write(";\n")
         file.write("}\n")
 
     file.close()
 
 
+def get_last_species(specs, last_spec=None):
+    """Find the species to assign to the last index.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    last_spec : str, optional
+        Name of the species requested by the user. If not supplied or not
+        found, N2, Ar or He is used if present, or else the last species.
+
+    Returns
+    -------
+    last_spec : int
+        Index of the last species in ``specs``
+
+    """
+    #check to see if the last_spec is specified
+    if last_spec is not None:
+        #find the index if possible
+        isp = next((i for i, sp in enumerate(specs)
+                   if sp.name.lower() == last_spec.lower().strip()),
+                   None
+                   )
+        if isp is None:
+            print('Warning: User specified last species {} '
+                  'not found in mechanism.'
+                  '  Attempting to find a default species.'.format(last_spec)
+                  )
+            last_spec = None
+        else:
+            last_spec = isp
+    else:
+        print('User specified last species not found or not specified.  '
+              'Attempting to find a default species')
+    if last_spec is None:
+        wt = chem.get_elem_wt()
+        #check for N2, Ar, He, etc.
+        candidates = [('N2', wt['n'] * 2.), ('Ar', wt['ar']),
+                        ('He', wt['he'])]
+        for sp in candidates:
+            match = next((isp for isp, spec in enumerate(specs)
+                          if sp[0].lower() == spec.name.lower() and
+                          sp[1] == spec.mw),
+                            None)
+            if match is not None:
+                last_spec = match
+                break
+        if last_spec is not None:
+            print('Default last species '
+                  '{} found.'.format(specs[last_spec].name)
+                  )
+    if last_spec is None:
+        print('Warning: Neither a user specified or default last species '
+              'could be found. Proceeding using the last species in the '
+              'base mechanism: {}'.format(specs[-1].name))
+        last_spec = len(specs) - 1
+    return last_spec
+
+
+def get_layout(lang, specs, reacs, options):
+    """Return the hash of what the code of each reaction depends on: the
+    species and reactions, in order, and the options of the generation.
+
+    Parameters
+    ----------
+    lang : str
+        Programming language
+    specs : list of `SpecInfo`
+        List of species in the mechanism, in order
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism, in order, including those left
+        out
+    options : dict
+        The options of `create_jacobian` changing the code
+
+    Returns
+    -------
+    layout : str
+        Hexadecimal SHA-1 digest
+
+    """
+    params = CUDAParams if lang == 'cuda' else CParams
+    key = hashlib.sha1(json.dumps(
+        [__version__, lang, sorted(options.items()),
+         [params.Jacob_Unroll, params.Jacob_Spec_Unroll, params.Max_Lines,
+          params.Max_Spec_Lines]], sort_keys=True).encode('utf-8'))
+    for group in [specs, reacs]:
+        for obj in group:
+            key.update((obj.fingerprint or
+                        chem.get_fingerprint(obj, specs)).encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
+
+def get_kept_subfiles(previous, layout, disabled, build_path, lang):
+    """Find the Jacobian subfiles of a previous generation that are
+    unchanged (see ``delta`` of `create_jacobian`).
+
+    Parameters
+    ----------
+    previous : dict
+        The manifest of the previous generation, or ``None``
+    layout : str
+        The layout of the generation (see `get_layout`)
+    disabled : set of int
+        Indices of the reactions left out of the generation
+    build_path : str
+        The build directory
+    lang : str
+        Programming language
+
+    Returns
+    -------
+    keep : dict
+        The ``[start, stop)`` range of the reactions of each subfile to keep
+        and its contents, by number (see `write_jacobian`)
+
+    """
+    keep = {}
+    if previous is None or previous.get('layout') != layout:
+        if previous is not None:
+            print('Generated from another mechanism or with other options '
+                  'before; regenerating all files.')
+        return keep
+
+    changed = disabled.symmetric_difference(
+        previous['mappings']['back_reactions'][i]
+        for i in previous.get('disabled_reactions', []))
+    file_system = file_writer.get_file_system()
+    for number, (start, stop) in enumerate(previous.get('jacobian_chunks',
+                                                        [])):
+        if any(start <= rxn_ind < stop for rxn_ind in changed):
+            continue
+        name = 'jacobs/jacob_{}{}'.format(number, utils.file_ext[lang])
+        entry = previous['files'].get(name)
+        try:
+            data = file_system.read(os.path.join(build_path, name))
+        except (IOError, OSError, KeyError):
+            continue
+        sha1 = hashlib.sha1(data if isinstance(data, bytes)
+                            else data.encode('utf-8')).hexdigest()
+        if entry is not None and entry['sha1'] == sha1:
+            keep[number] = [[start, stop], data]
+    print('Keeping {} of {} Jacobian subfiles.'.format(
+        len(keep), len(previous.get('jacobian_chunks', []))))
+    return keep
+
+
 def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_cache=False,
                     initial_state="", num_blocks=8, num_threads=64,
                     no_shared=False, L1_preferred=True, multi_thread=None,
                     force_optimize=False, build_path='./out/', last_spec=None,
-                    skip_jac=False, auto_diff=False
+                    skip_jac=False, auto_diff=False, parse_cache=True,
+                    parse_procs=None, cse=False, jobs=None,
+                    file_system=None, profile=False, trace_memory=True,
+                    mechanism=None, disabled_reactions=None, delta=False,
+                    table_kernels=False
                     ):
     """Create Jacobian subroutine from mechanism.
 
@@ -3443,7 +3907,11 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
     force_optimize : bool, optional
         If ``True``, redo the cache optimization even if the same mechanism
     build_path : str, optional
-        The output directory for the jacobian files
+        The output directory for the jacobian files. Files whose contents
+        are unchanged are not rewritten. ``manifest.json`` lists the hash
+        of each file and those that were added or changed, and describes
+        the mechanism (counts, species and reaction orderings), the sources
+        and the sparsity pattern of the Jacobian for the tools using them.
     last_spec : str, optional
         If specified, the species to assign to the last index.
         Typically should be N2, Ar, He or another inert bath gas
@@ -3451,6 +3919,48 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
         If ``True``, only the reaction rate subroutines will be generated
     auto_diff : bool, optional
         If ``True``, generate files for use with the Adept autodifferention library.
+    parse_cache : bool, optional
+        If ``True``, reuse the interpreted mechanism from the parse cache
+        when the mechanism and thermo files are unchanged.
+    parse_procs : int, optional
+        If greater than one, the number of processes used to interpret the
+        reactions of a Chemkin-format mechanism.
+    cse : bool, optional
+        If ``True``, evaluate the subexpressions repeated in the Jacobian
+        only once (common subexpression elimination).
+    jobs : int, optional
+        If greater than one, the number of processes generating code. The
+        independent writers, and the species derivatives of the Jacobian,
+        are run in parallel; the output is the same.
+    file_system : `file_writer.DiskTree` or `file_writer.MemoryTree`, optional
+        Where the files are written; on disk if not supplied. See also
+        `create_source_tree`.
+    profile : bool, optional
+        If ``True``, record the wall time, CPU time and peak memory of each
+        stage of the generation, and the lines and bytes of each file, in
+        ``profile.json`` in ``build_path`` (see `profiler.Profiler`)
+    trace_memory : bool, optional
+        If ``False``, the profile does not trace memory, which slows the
+        generation down
+    mechanism : tuple, optional
+        The elements, species and reactions of an already interpreted
+        mechanism, used instead of ``mech_name`` or ``gas`` (which then
+        only name it); its species and reactions are modified
+    disabled_reactions : list of int, optional
+        Indices of reactions of the mechanism to leave out (e.g., while
+        reducing it). They keep their place, with zero rates, so that the
+        code of the other reactions is that of the whole mechanism.
+    delta : bool, optional
+        If ``True``, keep the Jacobian subfiles of the previous generation
+        in ``build_path`` (see its manifest) whose reactions are all left
+        out or all kept as before, if generated from the same mechanism
+        with the same options. Together with ``disabled_reactions``, only
+        the files of the reactions changed are rewritten (and recompiled
+        by `libgen`).
+    table_kernels : bool, optional
+        If ``True``, write the reaction and species rates and the Jacobian
+        as compact loops over constant tables of the mechanism (see
+        `table_kernels`) instead of unrolled code; C only
 
     Returns
     -------
@@ -3461,6 +3971,15 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
         print('Error: autodifferention only supported for C')
         sys.exit(2)
 
+    if lang != 'c' and table_kernels:
+        print('Error: table-driven kernels only supported for C')
+        sys.exit(2)
+
+    if auto_diff and table_kernels:
+        print('Error: table-driven kernels cannot be used with '
+              'autodifferentiation')
+        sys.exit(2)
+
     if auto_diff:
         skip_jac = True
 
@@ -3471,26 +3990,31 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
             print(l)
         sys.exit(2)
 
-    # create output directory if none exists
-    utils.create_dir(build_path)
+    if file_system is None:
+        file_system = file_writer.DiskTree()
 
-    if auto_diff:
-        with open(os.path.join(build_path, 'ad_jacob.h'), 'w') as file:
-            file.write('#ifndef AD_JAC_H\n'
-                       '#define AD_JAC_H\n'
-                       'void eval_jacob (const double t, const double pres, '
-                       'const double* y, double* jac);\n'
-                       '#endif\n'
-                       )
+    profiler = prof.Profiler(profile, trace_memory)
+    profiler.start('total')
 
-    assert mech_name is not None or gas is not None, 'No mechanism specified!'
+    # create output directory if none exists
+    file_system.create_dir(build_path)
+
+    assert (mech_name is not None or gas is not None or
+            mechanism is not None), 'No mechanism specified!'
 
     # Interpret reaction mechanism file, depending on Cantera or
     # Chemkin format.
-    if gas is not None or mech_name.endswith(tuple(['.cti', '.xml'])):
+    profiler.start('parse')
+    if mechanism is not None:
+        elems, specs, reacs = mechanism
+    elif gas is not None:
         elems, specs, reacs = mech.read_mech_ct(mech_name, gas)
     else:
-        elems, specs, reacs = mech.read_mech(mech_name, therm_name)
+        elems, specs, reacs = mech_cache.read_mech_file(mech_name, therm_name,
+                                                        parse_cache,
+                                                        parse_procs
+                                                        )
+    profiler.stop()
 
     if not specs:
         print('No species found in file: {}'.format(mech_name))
@@ -3500,55 +4024,24 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
         print('No reactions found in file: {}'.format(mech_name))
         sys.exit(3)
 
-    #check to see if the last_spec is specified
-    if last_spec is not None:
-        #find the index if possible
-        isp = next((i for i, sp in enumerate(specs)
-                   if sp.name.lower() == last_spec.lower().strip()),
-                   None
-                   )
-        if isp is None:
-            print('Warning: User specified last species {} '
-                  'not found in mechanism.'
-                  '  Attempting to find a default species.'.format(last_spec)
-                  )
-            last_spec = None
-        else:
-            last_spec = isp
-    else:
-        print('User specified last species not found or not specified.  '
-              'Attempting to find a default species')
-    if last_spec is None:
-        wt = chem.get_elem_wt()
-        #check for N2, Ar, He, etc.
-        candidates = [('N2', wt['n'] * 2.), ('Ar', wt['ar']),
-                        ('He', wt['he'])]
-        for sp in candidates:
-            match = next((isp for isp, spec in enumerate(specs)
-                          if sp[0].lower() == spec.name.lower() and
-                          sp[1] == spec.mw),
-                            None)
-            if match is not None:
-                last_spec = match
-                break
-        if last_spec is not None:
-            print('Default last species '
-                  '{} found.'.format(specs[last_spec].name)
-                  )
-    if last_spec is None:
-        print('Warning: Neither a user specified or default last species '
-              'could be found. Proceeding using the last species in the '
-              'base mechanism: {}'.format(specs[-1].name))
-        last_spec = len(specs) - 1
+    profiler.start('last_species')
+    last_spec = get_last_species(specs, last_spec)
+    profiler.stop()
 
     optimize_cache = optimize_cache and cache.have_bitarray
+    profiler.start('cache_optimizer' if optimize_cache else 'species_order')
+    optimized = None
     if optimize_cache:
+        # the previous results are read from the build tree, and saved with
+        # the generated files below
+        with file_writer.use_file_system(file_system):
+            optimized = cache.optimize_cache(specs, reacs, multi_thread,
+                                             force_optimize, build_path,
+                                             last_spec
+                                             )
         specs, reacs, \
         fwd_spec_mapping, fwd_rxn_mapping, \
-        reverse_spec_mapping, reverse_rxn_mapping = \
-                cache.optimize_cache(specs, reacs, multi_thread,
-                                     force_optimize, build_path, last_spec
-                                     )
+        reverse_spec_mapping, reverse_rxn_mapping = optimized
     else:
         fwd_rxn_mapping = list(range(len(reacs)))
         reverse_rxn_mapping = list(range(len(reacs)))
@@ -3561,86 +4054,283 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
         temp = specs[:]
         for i in range(len(specs)):
             specs[i] = temp[fwd_spec_mapping[i]]
+    profiler.stop()
 
-
-    #remove old file which potentially could corrupt library generation
-    if not auto_diff:
-        try:
-            os.remove(os.path.join(build_path, 'jacobs', 'jac_list_{}'.format(lang)))
-        except:
-            pass
-
-        try:
-            os.remove(os.path.join(build_path, 'rates', 'rate_list_{}'.format(lang)))
-        except:
-            pass
-
+    # reactions left out, in the new order
+    disabled = set()
+    if disabled_reactions:
+        if any(not 0 <= i < len(reacs) for i in disabled_reactions):
+            print('Error: reactions to leave out must be between 0 and '
+                  '{}'.format(len(reacs) - 1))
+            sys.exit(1)
+        disabled = set(reverse_rxn_mapping[i] for i in disabled_reactions)
 
     the_len = len(reacs)
 
-    if lang == 'cuda':
-        CUDAParams.write_launch_bounds(build_path, num_blocks, num_threads,
-                                       L1_preferred, no_shared
-                                       )
-    smm = None
-    if lang == 'cuda' and not no_shared:
-        smm = shared.shared_memory_manager(num_blocks, num_threads,
-                                           L1_preferred
+    # the manifest also tells the tools using the files about the
+    # mechanism, so that they need not parse the generated code
+    contents = {'version': __version__,
+                'lang': lang,
+                'counts': {'species': len(specs),
+                           'reactions': len(reacs),
+                           'reversible_reactions': sum(1 for rxn in reacs
+                                                       if rxn.rev),
+                           'pdep_reactions': sum(1 for rxn in reacs
+                                                 if rxn.pdep or rxn.thd_body)
+                           },
+                'species': [spec.name for spec in specs],
+                'last_spec': int(last_spec),
+                'cache_optimized': bool(optimize_cache),
+                'mappings': {'fwd_species': [int(i) for i in
+                                             fwd_spec_mapping],
+                             'back_species': [int(i) for i in
+                                              reverse_spec_mapping],
+                             'fwd_reactions': [int(i) for i in
+                                               fwd_rxn_mapping],
+                             'back_reactions': [int(i) for i in
+                                                reverse_rxn_mapping]
+                             },
+                'disabled_reactions': sorted(int(fwd_rxn_mapping[i])
+                                             for i in disabled),
+                'layout': get_layout(lang, specs, reacs,
+                                     {'no_shared': no_shared,
+                                      'L1_preferred': L1_preferred,
+                                      'num_blocks': num_blocks,
+                                      'num_threads': num_threads,
+                                      'auto_diff': auto_diff,
+                                      'cse': cse,
+                                      'initial_state': initial_state,
+                                      'table_kernels': table_kernels
+                                      }),
+                'kernels': 'tables' if table_kernels else 'unrolled',
+                'jacobian_chunks': [],
+                'sparsity': None
+                }
+
+    # the build tree is only changed once completely written, and files
+    # with unchanged contents are left untouched
+    manifest = os.path.join(build_path, file_writer.manifest_name)
+    with file_writer.use_file_system(file_system), \
+            file_writer.transaction(manifest, contents) as written:
+        if optimized is not None:
+            cache.write_optimized(build_path, optimized)
+
+        keep = {}
+        if delta and not skip_jac and not table_kernels:
+            keep = get_kept_subfiles(file_writer.read_manifest(build_path),
+                                     contents['layout'], disabled,
+                                     build_path, lang)
+
+        if auto_diff:
+            with file_writer.open_file(os.path.join(build_path, 'ad_jacob.h'), 'w') as file:
+                file.write('#ifndef AD_JAC_H\n'
+                           '#define AD_JAC_H\n'
+                           'void eval_jacob (const double t, const double pres, '
+                           'const double* y, double* jac);\n'
+                           '#endif\n'
+                           )
+
+        if lang == 'cuda':
+            CUDAParams.write_launch_bounds(build_path, num_blocks, num_threads,
+                                           L1_preferred, no_shared
                                            )
+        smm = None
+        if lang == 'cuda' and not no_shared:
+            smm = shared.shared_memory_manager(num_blocks, num_threads,
+                                               L1_preferred
+                                               )
 
-    #reassign the reaction's product / reactant / third body list
-    # to integer indexes for speed
-    utils.reassign_species_lists(reacs, specs)
+        #reassign the reaction's product / reactant / third body list
+        # to integer indexes for speed
+        profiler.start('index')
+        utils.reassign_species_lists(reacs, specs)
 
-    ## now begin writing subroutines
+        # lookup tables shared by the writers
+        index = MechanismIndex(specs, reacs)
+        profiler.stop()
 
-    # print reaction rate subroutine
-    rate.write_rxn_rates(build_path, lang, specs, reacs,
-                         fwd_rxn_mapping, smm, auto_diff
-                         )
+        pool = None
+        writer_smm = smm
+        if jobs is not None and jobs > 1:
+            pool = multiprocessing.Pool(jobs, _init_worker,
+                                        (specs, type(file_system))
+                                        )
+            if smm is not None:
+                # the writers are sent to the pool while the Jacobian is
+                # written, so they get a manager of their own
+                writer_smm = shared.shared_memory_manager(num_blocks,
+                                                          num_threads,
+                                                          L1_preferred
+                                                          )
+        tasks = []
+
+        def __write(writer, *args):
+            # run a writer, in the pool if any, and return a function
+            # giving its result
+            if pool is None:
+                with profiler.stage(writer.__name__):
+                    result = writer(*args)
+                return lambda: result
+            task = pool.apply_async(_writer_task, (writer, args, profile,
+                                                   trace_memory))
+            tasks.append(task)
+            return lambda: _get_result(task)
+
+        try:
+            ## now begin writing subroutines
+
+            if table_kernels:
+                # constant tables of the mechanism, and the loops over them
+                __write(tables.write_tables, build_path, specs, reacs, index,
+                        disabled)
+                __write(tables.write_rxn_rates, build_path, index)
+                if index.pdep_reacs:
+                    __write(tables.write_rxn_pressure_mod, build_path)
+                seen_sp = __write(tables.write_spec_rates, build_path, index)
+            else:
+                # print reaction rate subroutine
+                __write(rate.write_rxn_rates, build_path, lang, specs, reacs,
+                        fwd_rxn_mapping, writer_smm, auto_diff, index,
+                        disabled
+                        )
 
-    # if third-body/pressure-dependent reactions,
-    # print modification subroutine
-    if next((r for r in reacs if (r.thd_body or r.pdep)), None):
-        rate.write_rxn_pressure_mod(build_path, lang, specs, reacs,
-                                    fwd_rxn_mapping, smm, auto_diff
-                                    )
+                # if third-body/pressure-dependent reactions,
+                # print modification subroutine
+                if index.pdep_reacs:
+                    __write(rate.write_rxn_pressure_mod, build_path, lang,
+                            specs, reacs, fwd_rxn_mapping, writer_smm,
+                            auto_diff
+                            )
 
-    # write species rates subroutine
-    seen_sp = rate.write_spec_rates(build_path, lang, specs, reacs,
-                                    fwd_spec_mapping, fwd_rxn_mapping,
-                                    smm, auto_diff
-                                    )
+                # write species rates subroutine
+                seen_sp = __write(rate.write_spec_rates, build_path, lang,
+                                  specs, reacs, fwd_spec_mapping,
+                                  fwd_rxn_mapping, writer_smm, auto_diff,
+                                  index
+                                  )
 
-    # write chem_utils subroutines
-    rate.write_chem_utils(build_path, lang, specs, auto_diff)
+            # write chem_utils subroutines
+            __write(rate.write_chem_utils, build_path, lang, specs, auto_diff)
 
-    # write derivative subroutines
-    rate.write_derivs(build_path, lang, specs, reacs, seen_sp, auto_diff)
+            # write derivative subroutines
+            seen_sp = seen_sp()
+            __write(rate.write_derivs, build_path, lang, specs, reacs,
+                    seen_sp, auto_diff
+                    )
 
-    # write mass-mole fraction conversion subroutine
-    rate.write_mass_mole(build_path, lang, specs)
+            # write mass-mole fraction conversion subroutine
+            __write(rate.write_mass_mole, build_path, lang, specs)
 
-    # write header file
-    aux.write_header(build_path, lang)
+            # write header file
+            __write(aux.write_header, build_path, lang)
 
-    # write mechanism initializers and testing methods
-    aux.write_mechanism_initializers(build_path, lang, specs, reacs,
-                                     fwd_spec_mapping, reverse_spec_mapping,
-                                     initial_state, optimize_cache,
-                                     last_spec, auto_diff
-                                     )
+            # write mechanism initializers and testing methods
+            __write(aux.write_mechanism_initializers, build_path, lang, specs,
+                    reacs, fwd_spec_mapping, reverse_spec_mapping,
+                    initial_state, optimize_cache, last_spec, auto_diff
+                    )
 
-    if skip_jac == False:
-        # write Jacobian subroutine
-        touched = write_jacobian(build_path, lang, specs,
-                                         reacs, seen_sp, smm)
+            if skip_jac == False:
+                # write Jacobian subroutine
+                with profiler.stage('write_jacobian'):
+                    if table_kernels:
+                        pattern = tables.write_jacobian(build_path, specs,
+                                                        reacs, index, seen_sp)
+                    else:
+                        pattern = write_jacobian(build_path, lang, specs,
+                                                 reacs, seen_sp, smm, index,
+                                                 cse, pool, disabled, keep,
+                                                 contents['jacobian_chunks']
+                                                 )
+
+                with profiler.stage('write_sparse_multiplier'):
+                    write_sparse_multiplier(build_path, lang, pattern)
+                contents['sparsity'] = pattern.to_dict()
+
+            # wait for the writers, and take over their files
+            while tasks:
+                task = tasks.pop(0)
+                _get_result(task)
+                file_writer.adopt(task.get()[1])
+                profiler.add(task.get()[2])
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+            # the sources to compile, without extension
+            contents['sources'] = [
+                os.path.splitext(os.path.relpath(filename, build_path))[0]
+                .replace(os.sep, '/') for filename in file_writer.pending()
+                if filename.endswith(utils.file_ext[lang])]
+            profiler.start('commit')
+        except BaseException:
+            # so that the files of finished writers are removed as well
+            for task in tasks:
+                if task.ready() and task.successful():
+                    file_writer.adopt(task.get()[1])
+            raise
+        finally:
+            if pool is not None:
+                pool.terminate()
+    profiler.stop()
 
-        write_sparse_multiplier(build_path, lang, touched, len(specs))
+    #remove old file which potentially could corrupt library generation
+    if not auto_diff:
+        for filename in [os.path.join(build_path, 'jacobs',
+                                      'jac_list_{}'.format(lang)),
+                         os.path.join(build_path, 'rates',
+                                      'rate_list_{}'.format(lang))
+                         ]:
+            if filename not in written:
+                file_system.remove(filename)
+    profiler.stop()
+
+    if profile:
+        profiler.count_files(written, file_system, build_path)
+        with file_writer.use_file_system(file_system):
+            profiler.write(os.path.join(build_path, prof.report_name))
+        print(profiler.summary())
+    profiler.close()
 
     return 0
 
 
+def create_source_tree(lang, mech_name=None, therm_name=None, gas=None,
+                       build_path=os.curdir, **kwargs):
+    """Generate the source files in memory instead of on disk.
+
+    Parameters
+    ----------
+    lang : {'c', 'cuda', 'fortran', 'matlab'}
+        Language type.
+    mech_name : str, optional
+        Reaction mechanism filename (e.g. 'mech.dat').
+        This or gas must be specified
+    therm_name : str, optional
+        Thermodynamic database filename (e.g. 'therm.dat')
+        or nothing if info in mechanism file.
+    gas : cantera.Solution, optional
+        The mechanism to generate the Jacobian for.
+        This or ``mech_name`` must be specified
+    build_path : str, optional
+        The directory the files are listed relative to; nothing is written
+        to disk
+    kwargs
+        The other options of `create_jacobian` (except ``file_system``)
+
+    Returns
+    -------
+    tree : `file_writer.MemoryTree`
+        The path of each generated file, relative to the build directory
+        and separated by ``/``, and its contents
+
+    """
+    tree = file_writer.MemoryTree(build_path)
+    create_jacobian(lang, mech_name, therm_name, gas, build_path=build_path,
+                    file_system=tree, **kwargs)
+    return tree
+
+
 if __name__ == "__main__":
     args = utils.get_parser()
 
@@ -3657,5 +4347,14 @@ def create_jacobian(lang, mech_name=None, therm_name=None, gas=None, optimize_ca
                     force_optimize=args.force_optimize,
                     build_path=args.build_path,
                     last_spec=args.last_species,
-                    auto_diff=args.auto_diff
+                    auto_diff=args.auto_diff,
+                    parse_cache=args.parse_cache,
+                    parse_procs=args.parse_procs,
+                    cse=args.cse,
+                    jobs=args.jobs,
+                    profile=args.profile is not None,
+                    trace_memory=args.profile != 'time',
+                    disabled_reactions=args.disable_reactions,
+                    delta=args.delta,
+                    table_kernels=args.table_kernels
                     )
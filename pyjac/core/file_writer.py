@@ -0,0 +1,730 @@
+# -*- coding: utf-8 -*-
+"""Buffered, atomic writing of generated source files.
+
+The code generators write through `open_file` instead of `open`, into the
+file system selected by `use_file_system`: on disk (`DiskTree`, the
+default) or in memory (`MemoryTree`).
+
+On disk, text is held in a large buffer and written in big blocks to a
+temporary file next to the output file, which is renamed into place when
+closed, so an output file is either complete or unchanged. A file whose
+contents are the same as those already on disk is not replaced, so that it
+keeps its modification time and is not rebuilt. Inside a `transaction` the
+renames are deferred until the whole build tree has been written, and an
+error (or exit) during generation removes the temporary files instead.
+
+The file system and transaction are those of the current thread, so that
+several threads may generate code at once.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+
+# Local imports
+from .. import utils
+
+buffer_size = 1 << 20
+"""int: Bytes buffered in memory before a block is written to disk"""
+
+try:
+    _replace = os.replace
+except AttributeError:
+    # Python 2; on Windows, not atomic over an existing file
+    _replace = os.rename
+
+manifest_name = 'manifest.json'
+"""str: Name of the manifest of the files written in a build directory"""
+
+
+class _State(threading.local):
+    """The state of the files written by the current thread.
+    """
+    transaction = None
+    """dict: Output filename to file of the active `transaction`"""
+    file_system = None
+    """The file system written to (`DiskTree` if ``None``)"""
+
+_state = _State()
+
+
+def file_hash(filename):
+    """Return the SHA-1 hash of the contents of a file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+
+    Returns
+    -------
+    digest : str
+        Hexadecimal digest of the contents
+
+    """
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(buffer_size), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def write_atomic(filename, data):
+    """Write a file on disk at once, e.g., an entry of a cache shared by
+    several processes: to a new temporary file next to it, renamed into
+    place, so that concurrent readers never see a partial file.
+
+    Unlike `open_file`, the file is written to disk in any file system and
+    outside of any `transaction`.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+    data : bytes
+        The contents
+
+    Raises
+    ------
+    IOError or OSError
+        If the file could not be written, e.g., in a read-only directory;
+        the temporary file is removed and the file left unchanged
+
+    """
+    temp_name = '{}.{}.{}.tmp'.format(filename, os.getpid(),
+                                     threading.current_thread().ident)
+    # a new file, rather than whatever (e.g., a link) is already there
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    handle = os.open(temp_name, flags, 0o666)
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(data)
+        _replace(temp_name, filename)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def count_lines(data):
+    """Return the number of lines of text, as iterating over a file does.
+
+    Parameters
+    ----------
+    data : str or bytes
+        The text
+
+    Returns
+    -------
+    lines : int
+        The number of lines
+
+    """
+    newline = b'\n' if isinstance(data, bytes) else '\n'
+    lines = data.count(newline)
+    if data and not data.endswith(newline):
+        lines += 1
+    return lines
+
+
+def _in_transaction(file):
+    """Whether the (closed) file is committed at the end of a `transaction`.
+    """
+    return (_state.transaction is not None and
+            _state.transaction.get(file.name) is file)
+
+
+class BufferedWriter(object):
+    """Writes a file through a large buffer to a temporary file, which is
+    renamed into place by `close`.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the output file
+    mode : str, optional
+        Write mode, ``'w'`` or ``'wb'``
+    buffer_size : int, optional
+        Size of the buffer in bytes
+
+    Attributes
+    ----------
+    name : str
+        Name of the output file
+    path : str
+        Name of the file holding what has been written so far; the
+        temporary file until renamed into place (``None`` if discarded)
+    status : str
+        Once committed, ``'added'``, ``'changed'`` or ``'unchanged'``
+        (the output file was left as is); otherwise ``None``
+    sha1 : str
+        Once committed, the SHA-1 hash of the contents
+
+    """
+
+    def __init__(self, filename, mode='w', buffer_size=buffer_size):
+        self.name = filename
+        self.temp_name = '{}.{}.tmp'.format(filename, os.getpid())
+        self.path = self.temp_name
+        self.status = None
+        self.sha1 = None
+        self._file = open(self.temp_name, mode, buffer_size)
+        # write straight to the file object, which does the buffering
+        self.write = self._file.write
+        self.writelines = self._file.writelines
+
+    @classmethod
+    def from_temp(cls, filename, temp_name):
+        """A closed writer of a completely written temporary file, e.g., by
+        another process (see `adopt`).
+        """
+        file = cls.__new__(cls)
+        file.name = filename
+        file.temp_name = temp_name
+        file.path = temp_name
+        file.status = None
+        file.sha1 = None
+        file._file = None
+        return file
+
+    @property
+    def closed(self):
+        """bool: ``True`` once closed or discarded"""
+        return self._file is None or self._file.closed
+
+    def close(self):
+        """Flush the buffer and rename the file into place, unless in a
+        `transaction`, which renames it when complete.
+        """
+        if self.closed:
+            return
+        self._file.close()
+        if not _in_transaction(self):
+            self.commit()
+
+    def commit(self):
+        """Rename the (closed) temporary file to the output file, unless the
+        output file already has the same contents, in which case it is left
+        untouched.
+        """
+        if self.path != self.temp_name:
+            return
+        self.sha1 = file_hash(self.temp_name)
+        if not os.path.isfile(self.name):
+            self.status = 'added'
+        elif (os.path.getsize(self.name) == os.path.getsize(self.temp_name)
+              and file_hash(self.name) == self.sha1):
+            self.status = 'unchanged'
+        else:
+            self.status = 'changed'
+
+        if self.status == 'unchanged':
+            os.remove(self.temp_name)
+        else:
+            _replace(self.temp_name, self.name)
+        self.path = self.name
+
+    def discard(self):
+        """Close and remove the temporary file, leaving the output file
+        unchanged.
+        """
+        if self._file is not None:
+            self._file.close()
+        if self.path == self.temp_name:
+            os.remove(self.temp_name)
+            self.path = None
+
+    def handoff(self):
+        """The name of the (closed) temporary file, to be taken over by
+        another process with `adopt`; ``None`` if committed or discarded.
+        """
+        return self.temp_name if self.path == self.temp_name else None
+
+    def count_lines(self):
+        """Return the number of lines written (once closed).
+        """
+        with open(self.path) as file:
+            return sum(1 for line in file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class MemoryWriter(object):
+    """Collects the text written to a file of a `MemoryTree`, which is
+    stored in the tree by `close`.
+
+    Parameters
+    ----------
+    tree : `MemoryTree`
+        The tree the file belongs to
+    filename : str
+        Name of the output file
+    mode : str, optional
+        Write mode, ``'w'`` or ``'wb'``
+
+    Attributes
+    ----------
+    name : str
+        Name of the output file
+    contents : str
+        Once closed, the text written; ``None`` once committed or discarded
+    status : str
+        Once committed, ``'added'``, ``'changed'`` or ``'unchanged'``;
+        otherwise ``None``
+    sha1 : str
+        Once committed, the SHA-1 hash of the contents
+
+    """
+
+    def __init__(self, tree, filename, mode='w'):
+        self.tree = tree
+        self.name = filename
+        self.contents = None
+        self.status = None
+        self.sha1 = None
+        self._empty = b'' if 'b' in mode else ''
+        self._parts = []
+        self.write = self._parts.append
+        self.writelines = self._parts.extend
+
+    @property
+    def closed(self):
+        """bool: ``True`` once closed or discarded"""
+        return self._parts is None
+
+    def close(self):
+        """Join the text written and store it in the tree, unless in a
+        `transaction`, which stores it when complete.
+        """
+        if self.closed:
+            return
+        self.contents = self._empty.join(self._parts)
+        self._parts = None
+        if not _in_transaction(self):
+            self.commit()
+
+    def commit(self):
+        """Store the (closed) file in the tree.
+        """
+        if self.contents is None:
+            return
+        data = self.contents
+        self.sha1 = hashlib.sha1(data if isinstance(data, bytes) else
+                                 data.encode('utf-8')).hexdigest()
+        key = self.tree.key(self.name)
+        if key not in self.tree:
+            self.status = 'added'
+        elif self.tree[key] == data:
+            self.status = 'unchanged'
+        else:
+            self.status = 'changed'
+        self.tree[key] = data
+        self.contents = None
+
+    def discard(self):
+        """Drop the text written, leaving the tree unchanged.
+        """
+        self._parts = None
+        self.contents = None
+
+    def handoff(self):
+        """The text of the (closed) file, to be taken over by another
+        process with `adopt`; ``None`` if committed or discarded.
+        """
+        return self.contents
+
+    def count_lines(self):
+        """Return the number of lines written (once closed).
+        """
+        data = self.contents
+        if data is None:
+            data = self.tree[self.tree.key(self.name)]
+        return count_lines(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class NullWriter(object):
+    """A file dropping the text written to it, e.g., the code of a reaction
+    left out of a generation, whose effects on the rest of the code are
+    still tracked.
+    """
+
+    def write(self, text):
+        pass
+
+    def writelines(self, lines):
+        pass
+
+    def close(self):
+        pass
+
+
+class DiskTree(object):
+    """The default file system, writing the generated files to disk with
+    `BufferedWriter`.
+    """
+
+    def open(self, filename, mode='w'):
+        """Return a `BufferedWriter` of the file.
+        """
+        return BufferedWriter(filename, mode)
+
+    def adopt(self, filename, handoff):
+        """Return a closed `BufferedWriter` of the file handed off by
+        another process.
+        """
+        return BufferedWriter.from_temp(filename, handoff)
+
+    def read(self, filename):
+        """Return the contents of a file, as bytes.
+        """
+        with open(filename, 'rb') as file:
+            return file.read()
+
+    def create_dir(self, path):
+        """Create a directory, see `utils.create_dir`.
+        """
+        utils.create_dir(path)
+
+    def remove(self, filename):
+        """Remove a file, if present.
+        """
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
+class MemoryTree(dict):
+    """A file system kept in memory: a mapping of the path of each file,
+    relative to `root` and separated by ``/``, to its contents.
+
+    Parameters
+    ----------
+    root : str, optional
+        The directory the generated files are written to, e.g., the
+        ``build_path`` of `create_jacobian`
+
+    """
+
+    def __init__(self, root=os.curdir):
+        dict.__init__(self)
+        self.root = root
+
+    def key(self, filename):
+        """Return the path of a file in the tree.
+        """
+        return os.path.relpath(filename, self.root).replace(os.sep, '/')
+
+    def open(self, filename, mode='w'):
+        """Return a `MemoryWriter` of the file.
+        """
+        return MemoryWriter(self, filename, mode)
+
+    def adopt(self, filename, handoff):
+        """Return a closed `MemoryWriter` of the file handed off by another
+        process.
+        """
+        file = MemoryWriter(self, filename)
+        file.discard()
+        file.contents = handoff
+        return file
+
+    def read(self, filename):
+        """Return the contents of a file.
+        """
+        return self[self.key(filename)]
+
+    def create_dir(self, path):
+        """Directories need not be created in memory.
+        """
+        pass
+
+    def remove(self, filename):
+        """Remove a file, if present.
+        """
+        self.pop(self.key(filename), None)
+
+
+def get_file_system():
+    """Return the file system of the current thread (see
+    `use_file_system`).
+    """
+    if _state.file_system is None:
+        _state.file_system = DiskTree()
+    return _state.file_system
+
+
+def set_file_system(file_system):
+    """Set the file system the current thread writes to.
+
+    Parameters
+    ----------
+    file_system : `DiskTree` or `MemoryTree`
+        The file system, or any object with the same methods; ``None`` for
+        a `DiskTree`
+
+    Returns
+    -------
+    previous
+        The file system previously used
+
+    """
+    previous = _state.file_system
+    _state.file_system = file_system
+    return previous
+
+
+@contextmanager
+def use_file_system(file_system):
+    """Write to the file system (see `set_file_system`) in the block.
+    """
+    previous = set_file_system(file_system)
+    try:
+        yield get_file_system()
+    finally:
+        set_file_system(previous)
+
+
+def open_file(filename, mode='w'):
+    """Open a generated file for writing, in the current file system.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the output file
+    mode : str, optional
+        Write mode, ``'w'`` or ``'wb'``
+
+    Returns
+    -------
+    file : `BufferedWriter` or `MemoryWriter`
+        The file to write to
+
+    """
+    if _state.transaction is None:
+        return get_file_system().open(filename, mode)
+
+    _discard_previous(filename)
+    file = get_file_system().open(filename, mode)
+    _state.transaction[filename] = file
+    return file
+
+
+def create_dir(path):
+    """Create a directory in the current file system.
+    """
+    get_file_system().create_dir(path)
+
+
+def remove(filename):
+    """Remove a file, if present, from the current file system.
+    """
+    get_file_system().remove(filename)
+
+
+def _discard_previous(filename):
+    """Discard a file written earlier in the active `transaction`, which is
+    being rewritten (e.g., on a retry).
+    """
+    previous = _state.transaction.get(filename)
+    if previous is not None:
+        previous.discard()
+
+
+def adopt(written):
+    """Take over files written by `collect` in another process, committing
+    them now, or at the end of the active `transaction`.
+
+    Parameters
+    ----------
+    written : list of tuple
+        The name of each output file and what it handed off
+
+    """
+    for filename, handoff in written:
+        file = get_file_system().adopt(filename, handoff)
+        if _state.transaction is None:
+            file.commit()
+        else:
+            _discard_previous(filename)
+            _state.transaction[filename] = file
+
+
+def pending():
+    """Return the names of the files written so far in the active
+    `transaction`, to be committed at its end.
+
+    Returns
+    -------
+    filenames : list of str
+        The names of the files, in order; empty outside a transaction
+
+    """
+    if _state.transaction is None:
+        return []
+    return sorted(_state.transaction)
+
+
+def write_manifest(filename, files, contents=None):
+    """Write a JSON manifest of committed files, listing the hash of each and
+    whether it was added, changed or left unchanged.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the manifest; the files are listed relative to its directory
+    files : list of `BufferedWriter` or `MemoryWriter`
+        The committed files
+    contents : dict, optional
+        Further contents of the manifest (e.g., what the generator knows
+        about the files, for the tools using them)
+
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    entries = {}
+    for file in files:
+        if file.status is not None:
+            name = os.path.relpath(os.path.abspath(file.name), directory)
+            entries[name.replace(os.sep, '/')] = {'sha1': file.sha1,
+                                                  'status': file.status
+                                                  }
+    manifest = dict(contents or {})
+    manifest.update({'files': entries,
+                     'changed': sorted(name for name, entry in entries.items()
+                                       if entry['status'] != 'unchanged'
+                                       )
+                     })
+    with get_file_system().open(filename) as file:
+        file.write(json.dumps(manifest, indent=2, sort_keys=True))
+        file.write('\n')
+
+
+def read_manifest(path):
+    """Read the manifest of a build directory, from the current file system.
+
+    Parameters
+    ----------
+    path : str
+        The build directory
+
+    Returns
+    -------
+    manifest : dict
+        The manifest (see `write_manifest`), or ``None`` if the directory
+        has none (e.g., it was generated by an older version)
+
+    """
+    try:
+        data = get_file_system().read(os.path.join(path, manifest_name))
+    except (IOError, OSError, KeyError):
+        return None
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+@contextmanager
+def transaction(manifest=None, contents=None):
+    """Defer committing the files opened by `open_file` until the end of the
+    block, so that a build tree is only changed once it has been completely
+    written.
+
+    If the block raises (or exits), the files written are discarded and
+    the output files are left unchanged. Nested transactions are part of
+    the outermost one.
+
+    Parameters
+    ----------
+    manifest : str, optional
+        If supplied, once committed a manifest of the files (see
+        `write_manifest`) is written to this file
+    contents : dict, optional
+        Further contents of the manifest, which may be filled in within the
+        block
+
+    Yields
+    ------
+    status : dict
+        Filled in at the end of the block with the status of each output
+        file (see `BufferedWriter`); left empty by a nested transaction
+
+    """
+    if _state.transaction is not None:
+        yield {}
+        return
+
+    _state.transaction = {}
+    status = {}
+    try:
+        yield status
+    except BaseException:
+        for file in _state.transaction.values():
+            file.discard()
+        raise
+    else:
+        for file in _state.transaction.values():
+            # files left open are complete as far as the writers go
+            file.close()
+        for file in _state.transaction.values():
+            file.commit()
+            status[file.name] = file.status
+        if manifest is not None:
+            write_manifest(manifest, _state.transaction.values(), contents)
+    finally:
+        _state.transaction = None
+
+
+@contextmanager
+def collect():
+    """Keep the files opened by `open_file` in the block uncommitted, to be
+    taken over with `adopt` (e.g., by the parent of a worker process).
+
+    Yields
+    ------
+    written : list of tuple
+        Filled in at the end of the block with the name of each output
+        file and what it hands off (see `BufferedWriter.handoff`)
+
+    """
+    outer = _state.transaction
+    _state.transaction = {}
+    written = []
+    try:
+        yield written
+    except BaseException:
+        for file in _state.transaction.values():
+            file.discard()
+        raise
+    else:
+        for file in _state.transaction.values():
+            file.close()
+            handoff = file.handoff()
+            if handoff is not None:
+                written.append((file.name, handoff))
+    finally:
+        _state.transaction = outer
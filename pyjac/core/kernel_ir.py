@@ -0,0 +1,914 @@
+# -*- coding: utf-8 -*-
+"""Intermediate representation of generated kernel code.
+
+Writers build expressions and statements from these nodes instead of
+formatting source strings directly. Constant folding (e.g., multiplication
+by one, zero terms) is applied as the nodes are built, and `CPrinter`
+prints them as C / CUDA source. Nodes compare and hash by structure, so
+identical subexpressions can be found.
+
+Folding never changes the order in which the printed code evaluates an
+expression, so the generated arithmetic rounds as the expression was written.
+Merging nested sums and products (``c * (d * x)`` into ``(c * d) * x``)
+saves operations but changes the rounding, and is only done when asked for
+with ``reassociate=True``.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+import numbers
+import re
+
+max_constants = 1 << 16
+"""int: Printed constants `CPrinter` keeps across reactions"""
+
+
+class Expr(object):
+    """Base class of expression nodes.
+
+    Supports the arithmetic operators, which build (and fold) new nodes.
+    """
+    __slots__ = ('_hash',)
+
+    def _key(self):
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        return (self is other or
+                (type(self) is type(other) and self._key() == other._key()))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash((type(self).__name__,) + self._key())
+            return self._hash
+
+    def __add__(self, other):
+        return add(self, other)
+
+    def __radd__(self, other):
+        return add(other, self)
+
+    def __sub__(self, other):
+        return add(self, neg(other))
+
+    def __rsub__(self, other):
+        return add(other, neg(self))
+
+    def __mul__(self, other):
+        return mul(self, other)
+
+    def __rmul__(self, other):
+        return mul(other, self)
+
+    def __neg__(self):
+        return neg(self)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join(repr(x) for x in self._key()))
+
+
+class Const(Expr):
+    """A numerical constant.
+
+    Parameters
+    ----------
+    value : float
+        The value.
+
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = float(value)
+
+    def _key(self):
+        return (self.value,)
+
+
+class Sym(Expr):
+    """A variable or array element, printed verbatim.
+
+    Parameters
+    ----------
+    name : str
+        The source text, e.g. ``'kf'`` or the result of `utils.get_array`.
+
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def _key(self):
+        return (self.name,)
+
+
+class Sum(Expr):
+    """A sum of two or more terms, evaluated in order.
+
+    Build with `add`, which folds constants and nested sums.
+    """
+    __slots__ = ('terms',)
+
+    def __init__(self, terms):
+        self.terms = tuple(terms)
+
+    def _key(self):
+        return self.terms
+
+
+class Product(Expr):
+    """A constant coefficient times one or more factors.
+
+    Build with `mul`, which folds constants and nested products.
+    """
+    __slots__ = ('coeff', 'factors')
+
+    def __init__(self, coeff, factors):
+        self.coeff = float(coeff)
+        self.factors = tuple(factors)
+
+    def _key(self):
+        return (self.coeff,) + self.factors
+
+
+class Pow(Expr):
+    """An expression raised to a constant power.
+
+    Build with `power`. Integer powers are printed as repeated
+    multiplication.
+    """
+    __slots__ = ('base', 'exponent')
+
+    def __init__(self, base, exponent):
+        self.base = base
+        self.exponent = exponent
+
+    def _key(self):
+        return (self.base, self.exponent)
+
+
+class Call(Expr):
+    """A call of a math function, e.g. ``exp`` or ``log``.
+
+    Parameters
+    ----------
+    func : str
+        The function name.
+    args : list of `Expr`
+        The arguments.
+
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = tuple(as_expr(arg) for arg in args)
+
+    def _key(self):
+        return (self.func,) + self.args
+
+
+def as_expr(value):
+    """Converts a number to a `Const`, and returns expressions as is.
+    """
+    if isinstance(value, Expr):
+        return value
+    if isinstance(value, (float, int, numbers.Real)):
+        return Const(value)
+    raise TypeError('Cannot convert {!r} to an expression'.format(value))
+
+
+def add(*terms, **kwargs):
+    """Builds the sum of the given terms.
+
+    Zero terms are dropped, and a sum given as the first term is extended.
+    Otherwise the terms are kept in order, so that the sum is evaluated as
+    written.
+
+    Parameters
+    ----------
+    terms : `Expr` or float
+        The terms.
+    reassociate : bool, optional
+        If ``True``, all nested sums are flattened and the constant terms
+        summed. This can change the rounding of the result.
+
+    Returns
+    -------
+    `Expr`
+        The (folded) sum.
+
+    """
+    reassociate = kwargs.get('reassociate', False)
+    flat = []
+    const = 0.
+    for term in terms:
+        if not isinstance(term, Expr):
+            term = as_expr(term)
+        if isinstance(term, Sum) and (reassociate or not flat):
+            parts = term.terms
+        else:
+            parts = (term,)
+        for part in parts:
+            if isinstance(part, Const):
+                if reassociate:
+                    const += part.value
+                elif part.value != 0.:
+                    flat.append(part)
+            else:
+                flat.append(part)
+    if const != 0.:
+        flat.append(Const(const))
+    if not flat:
+        return Const(0.)
+    if len(flat) == 1:
+        return flat[0]
+    return Sum(flat)
+
+
+def mul(*factors, **kwargs):
+    """Builds the product of the given factors.
+
+    Leading constants are multiplied into the coefficient; a zero
+    coefficient gives zero and a unit one is dropped. A product given as
+    the first factor (or negated) is extended. Other products are kept as
+    (parenthesized) factors, so that the product is evaluated as written.
+
+    Parameters
+    ----------
+    factors : `Expr` or float
+        The factors.
+    reassociate : bool, optional
+        If ``True``, all nested products are flattened and all constants
+        multiplied into a single coefficient. This saves multiplications,
+        but can change the rounding of the result.
+
+    Returns
+    -------
+    `Expr`
+        The (folded) product.
+
+    """
+    reassociate = kwargs.get('reassociate', False)
+    flat = []
+    coeff = 1.
+    product = None
+    for factor in factors:
+        if isinstance(factor, Const):
+            factor = factor.value
+        elif not isinstance(factor, (Expr, float)):
+            factor = as_expr(factor).value
+        if isinstance(factor, float):
+            # (c * x) * d is not c * d * x, but x * d is d * x
+            if reassociate or not flat or (len(flat) == 1 and coeff == 1.):
+                coeff *= factor
+            else:
+                flat.append(Const(factor))
+        elif isinstance(factor, Product) and (
+                reassociate or (not flat and abs(coeff) == 1.)):
+            coeff *= factor.coeff
+            flat.extend(factor.factors)
+            product = factor
+        else:
+            flat.append(factor)
+    if coeff == 0. or not flat:
+        return Const(coeff)
+    if coeff == 1. and len(flat) == 1:
+        return flat[0]
+    if product is not None and len(flat) == len(product.factors):
+        # a scaled product shares the factors of the original, so that
+        # they are printed once
+        return Product(coeff, product.factors)
+    return Product(coeff, flat)
+
+
+def neg(value):
+    """Builds the negation of an expression.
+    """
+    return mul(-1., value)
+
+
+def power(base, exponent):
+    """Builds an expression raised to a constant power.
+
+    Returns
+    -------
+    `Expr`
+        One for a zero exponent, the base for a unit exponent, else a `Pow`.
+
+    """
+    base = as_expr(base)
+    exponent = float(exponent)
+    if exponent == 0.:
+        return Const(1.)
+    if exponent == 1.:
+        return base
+    if isinstance(base, Const):
+        return Const(base.value ** exponent)
+    return Pow(base, exponent)
+
+
+class Assign(object):
+    """A statement assigning (or adding) an expression to a variable.
+
+    Parameters
+    ----------
+    target : `Sym`
+        The variable or array element assigned to.
+    value : `Expr`
+        The assigned expression.
+    op : {'=', '+=', '-='}, optional
+        The assignment operator.
+    decl : str, optional
+        If given, the type the target is declared with, e.g. ``'double'``.
+
+    """
+    __slots__ = ('target', 'value', 'op', 'decl')
+
+    def __init__(self, target, value, op='=', decl=None):
+        self.target = Sym(target) if isinstance(target, str) else target
+        self.value = as_expr(value)
+        self.op = op
+        self.decl = decl
+
+    def __repr__(self):
+        return 'Assign({!r}, {!r}, {!r})'.format(self.target, self.value,
+                                                 self.op)
+
+
+def count_flops(expr, _memo=None):
+    """Counts the floating point operations needed to evaluate an expression.
+
+    Each addition, subtraction, multiplication (including by a coefficient
+    other than one or minus one) and math function call (including
+    non-integer powers) counts as one operation. Integer powers count the
+    multiplications they are printed as.
+
+    Parameters
+    ----------
+    expr : `Expr`
+        The expression.
+
+    Returns
+    -------
+    int
+        The number of operations.
+
+    """
+    if isinstance(expr, (Sym, Const)):
+        return 0
+    memo = {} if _memo is None else _memo
+    cached = memo.get(id(expr))
+    if cached is not None:
+        return cached[1]
+
+    if isinstance(expr, Sum):
+        flops = len(expr.terms) - 1
+        for term in expr.terms:
+            flops += count_flops(term, memo)
+    elif isinstance(expr, Product):
+        flops = len(expr.factors) - 1 + (abs(expr.coeff) != 1.)
+        for factor in expr.factors:
+            flops += count_flops(factor, memo)
+    elif isinstance(expr, Pow):
+        base = count_flops(expr.base, memo)
+        if expr.exponent.is_integer() and expr.exponent > 0:
+            exponent = int(expr.exponent)
+            flops = exponent * base + exponent - 1
+        else:
+            flops = base + 1
+    elif isinstance(expr, Call):
+        flops = 1
+        for arg in expr.args:
+            flops += count_flops(arg, memo)
+    else:
+        raise TypeError('Cannot count the operations of {!r}'.format(expr))
+
+    memo[id(expr)] = (expr, flops)
+    return flops
+
+
+def _statement_flops(stmts, memo=None):
+    """Counts the floating point operations of a list of statements.
+    """
+    memo = {} if memo is None else memo
+    return sum(count_flops(stmt.value, memo) + (stmt.op != '=')
+               for stmt in stmts)
+
+
+def _children(expr):
+    """Returns the operands of an expression.
+    """
+    if isinstance(expr, Sum):
+        return expr.terms
+    elif isinstance(expr, Product):
+        return expr.factors
+    elif isinstance(expr, Pow):
+        return (expr.base,)
+    elif isinstance(expr, Call):
+        return expr.args
+    return ()
+
+
+def _rebuild(expr, children, reassociate=False):
+    """Builds an expression like the given one, with new operands.
+    """
+    if isinstance(expr, Sum):
+        return add(*children, reassociate=reassociate)
+    elif isinstance(expr, Product):
+        return mul(expr.coeff, *children, reassociate=reassociate)
+    elif isinstance(expr, Pow):
+        return power(children[0], expr.exponent)
+    return Call(expr.func, children)
+
+
+def _symbols(expr):
+    """Returns the set of symbols an expression reads.
+    """
+    if isinstance(expr, Sym):
+        return set([expr])
+    symbols = set()
+    for child in _children(expr):
+        symbols |= _symbols(child)
+    return symbols
+
+
+def cse(stmts, prefix='cse_', decl='double', reassociate=False):
+    """Common subexpression elimination.
+
+    Sums, products, powers and function calls that are evaluated in more
+    than one place are assigned once to temporaries ``prefix0``,
+    ``prefix1``, ..., evaluated before all of the statements.
+
+    Parameters
+    ----------
+    stmts : list of `Assign`
+        The statements. They must not assign any variable read by a
+        repeated subexpression.
+    prefix : str, optional
+        The prefix of the names of the temporaries.
+    decl : str, optional
+        The type the temporaries are declared with.
+    reassociate : bool, optional
+        If ``True``, the factors of products that differ only in their
+        coefficient are also hoisted, i.e., ``c * x * y`` is evaluated as
+        ``c * (x * y)``. This can change the rounding of the result.
+
+    Returns
+    -------
+    stmts : list of `Assign`
+        The assignments of the temporaries, followed by the statements
+        using them.
+    removed : int
+        The number of floating point operations removed (see
+        `count_flops`).
+
+    """
+    # count the occurrences of each subexpression; those of a repeated one
+    # are only counted once, as they will be evaluated once if hoisted
+    counts = {}
+
+    def __count(expr):
+        if isinstance(expr, (Sym, Const)):
+            return
+        if isinstance(expr, Product) and reassociate:
+            key = ('*',) + expr.factors if len(expr.factors) > 1 else None
+        elif (isinstance(expr, Product) and len(expr.factors) == 1 and
+                abs(expr.coeff) == 1.):
+            # a negation is free
+            key = None
+        else:
+            key = expr
+        if key is not None:
+            num = counts.get(key, 0)
+            counts[key] = num + 1
+            if num:
+                return
+        for child in _children(expr):
+            __count(child)
+
+    for stmt in stmts:
+        __count(stmt.value)
+    if all(num == 1 for num in counts.values()):
+        return list(stmts), 0
+
+    names = {}
+    temps = []
+    memo = {}
+
+    def __hoist(key, build):
+        sym = names.get(key)
+        if sym is None:
+            # temporaries it depends on are assigned first
+            value = build()
+            sym = Sym(prefix + str(len(temps)))
+            names[key] = sym
+            temps.append(Assign(sym, value, decl=decl))
+        return sym
+
+    def __rewrite(expr):
+        if isinstance(expr, (Sym, Const)):
+            return expr
+        cached = memo.get(id(expr))
+        if cached is not None:
+            return cached[1]
+
+        children = _children(expr)
+        new_children = [__rewrite(child) for child in children]
+        # unchanged parts are kept as is
+        if any(new is not old for new, old in zip(new_children, children)):
+            def build():
+                return _rebuild(expr, new_children, reassociate)
+        else:
+            def build():
+                return expr
+        if isinstance(expr, Product) and reassociate:
+            key = ('*',) + children if len(children) > 1 else None
+            if key is not None and counts[key] > 1:
+                new = mul(expr.coeff, __hoist(key, lambda: mul(
+                    *new_children, reassociate=True)), reassociate=True)
+            else:
+                new = build()
+        else:
+            new = (__hoist(expr, build) if counts.get(expr, 0) > 1 else
+                   build())
+
+        memo[id(expr)] = (expr, new)
+        return new
+
+    new_stmts = []
+    for stmt in stmts:
+        value = __rewrite(stmt.value)
+        new_stmts.append(stmt if value is stmt.value else
+                         Assign(stmt.target, value, stmt.op, stmt.decl))
+
+    targets = set(stmt.target for stmt in stmts)
+    for temp in temps:
+        if not targets.isdisjoint(_symbols(temp.value)):
+            raise ValueError('Cannot hoist {!r} above the statements '
+                             'assigning it'.format(temp.value))
+
+    # the operations of the parts kept as is are only counted once
+    flops = {}
+    new_stmts = temps + new_stmts
+    return new_stmts, (_statement_flops(stmts, flops) -
+                       _statement_flops(new_stmts, flops))
+
+
+_name_re = re.compile(r'(?<![\w.])[A-Za-z_]\w*')
+_target_re = re.compile(r'\s*(?:double\s+)?\*?([A-Za-z_]\w*)\s*(?:\[[^\]]*\])?'
+                        r'\s*[-+*/]?=(?!=)')
+
+
+def _find_calls(line, call_re):
+    """Returns the text of each (complete) call in a line, including nested
+    calls.
+    """
+    calls = []
+    for match in call_re.finditer(line):
+        depth = 0
+        for end in range(match.end() - 1, len(line)):
+            if line[end] == '(':
+                depth += 1
+            elif line[end] == ')':
+                depth -= 1
+                if not depth:
+                    calls.append(line[match.start():end + 1])
+                    break
+    return calls
+
+
+def cse_calls(text, funcs=('exp', 'log', 'log10', 'pow'), prefix='cse_f',
+              decl='double', line_end=';\n'):
+    """Common subexpression elimination of the math function calls of
+    source text, for the code that is not built with this module.
+
+    A call that is evaluated more than once with the same arguments, with
+    none of the variables it reads assigned in between, is assigned once to
+    a temporary ``prefix0``, ``prefix1``, ..., declared just before the
+    first statement evaluating it. Only the statements outside of braces
+    are changed.
+
+    Parameters
+    ----------
+    text : str
+        The source, with one statement per line.
+    funcs : tuple of str, optional
+        The functions whose calls are considered.
+    prefix : str, optional
+        The prefix of the names of the temporaries.
+    decl : str, optional
+        The type the temporaries are declared with.
+    line_end : str, optional
+        The statement terminator.
+
+    Returns
+    -------
+    text : str
+        The source, using the temporaries.
+    removed : int
+        The number of calls removed.
+
+    """
+    call_re = re.compile(r'(?<![\w.])(?:' + '|'.join(funcs) + r')\(')
+    lines = text.split('\n')
+    removed = 0
+    temps = 0
+    while True:
+        # group the evaluations of each call between assignments of the
+        # variables it reads
+        live = {}
+        groups = []
+        depth = 0
+        for i, line in enumerate(lines):
+            if not depth and not line.lstrip().startswith('//'):
+                for call in _find_calls(line, call_re):
+                    group = live.get(call)
+                    if group is None:
+                        group = live[call] = (call, [])
+                        groups.append(group)
+                    group[1].append(i)
+            depth += line.count('{') - line.count('}')
+            target = _target_re.match(line)
+            if target is not None:
+                for call in [call for call in live if target.group(1) in
+                             _name_re.findall(call)]:
+                    del live[call]
+
+        repeated = [group for group in groups if len(group[1]) > 1]
+        if not repeated:
+            break
+        # nested calls first, so that the calls they are in still match
+        call, uses = min(repeated, key=lambda group: len(group[0]))
+        name = prefix + str(temps)
+        temps += 1
+        removed += len(uses) - 1
+        call_use = re.compile(r'(?<![\w.])' + re.escape(call))
+        for i in set(uses):
+            lines[i] = call_use.sub(name, lines[i])
+        first = lines[uses[0]]
+        indent = first[:len(first) - len(first.lstrip())]
+        lines.insert(uses[0], indent + decl + ' ' + name + ' = ' + call +
+                     line_end.rstrip('\n'))
+
+    text = '\n'.join(lines)
+    if temps > 1:
+        # number the temporaries in the order they are declared
+        names = {}
+        for name in re.findall(re.escape(decl + ' ' + prefix) + r'\d+\b',
+                               text):
+            names[name[len(decl) + 1:]] = prefix + str(len(names))
+        text = re.sub(r'\b' + re.escape(prefix) + r'\d+\b',
+                      lambda match: names.get(match.group(0),
+                                                match.group(0)), text)
+    return text, removed
+
+
+class CPrinter(object):
+    """Prints expressions and statements as C / CUDA source.
+
+    The text of each printed subexpression node is cached, so nodes shared
+    by several statements are formatted only once; call `clear` to bound
+    the cache. The text of recent constants is kept across `clear`.
+
+    Parameters
+    ----------
+    indent : str, optional
+        The indentation of statements.
+    reassociate : bool, optional
+        If ``True``, `scaled_statement` multiplies the coefficient into that
+        of a product, rather than multiplying the product by it.
+
+    """
+
+    def __init__(self, indent='  ', reassociate=False):
+        self.indent = indent
+        self.reassociate = reassociate
+        self._cache = {}
+        self._factors = {}
+        self._consts = {}
+
+    def clear(self):
+        """Empties the cache of printed subexpressions.
+        """
+        self._cache.clear()
+        self._factors.clear()
+
+    def const(self, value):
+        """Prints a constant, with enough digits to be exact.
+        """
+        # the same (mass ratio) coefficients recur in every reaction
+        text = self._consts.get(value)
+        if text is None:
+            text = '{:.16e}'.format(value)
+            if value:
+                # 0.0 == -0.0
+                if len(self._consts) >= max_constants:
+                    self._consts.clear()
+                self._consts[value] = text
+        return text
+
+    def doprint(self, expr):
+        """Prints an expression.
+
+        Parameters
+        ----------
+        expr : `Expr`
+            The expression.
+
+        Returns
+        -------
+        str
+            The source text.
+
+        """
+        if isinstance(expr, Sym):
+            return expr.name
+        elif isinstance(expr, Const):
+            return self.const(expr.value)
+
+        # keyed by identity: structural hashing costs more than printing
+        cached = self._cache.get(id(expr))
+        if cached is not None:
+            return cached[1]
+
+        if isinstance(expr, Sum):
+            parts = [self.doprint(expr.terms[0])]
+            for term in expr.terms[1:]:
+                if isinstance(term, Product) and term.coeff < 0:
+                    parts.append(' - ' + self._product(-term.coeff,
+                                                       term.factors))
+                elif isinstance(term, Const) and term.value < 0:
+                    parts.append(' - ' + self.const(-term.value))
+                else:
+                    parts.append(' + ' + self.doprint(term))
+            text = ''.join(parts)
+        elif isinstance(expr, Product):
+            text = self._product(expr.coeff, expr.factors)
+        elif isinstance(expr, Pow):
+            if expr.exponent.is_integer() and expr.exponent > 0:
+                text = ' * '.join([self._factor(expr.base)] *
+                                  int(expr.exponent))
+            else:
+                text = 'pow({}, {})'.format(self.doprint(expr.base),
+                                            self.const(expr.exponent))
+        elif isinstance(expr, Call):
+            text = '{}({})'.format(expr.func, ', '.join(
+                self.doprint(arg) for arg in expr.args))
+        else:
+            raise TypeError('Cannot print {!r}'.format(expr))
+
+        # the node is kept alive so that its id is not reused
+        self._cache[id(expr)] = (expr, text)
+        return text
+
+    def _product(self, coeff, factors):
+        """Prints a coefficient times the given factors.
+        """
+        # the factors may be shared by scaled products (see `mul`)
+        cached = self._cache.get(id(factors))
+        if cached is not None:
+            text = cached[1]
+        else:
+            text = ' * '.join([factor.name if type(factor) is Sym else
+                               self._factor(factor) for factor in factors])
+            self._cache[id(factors)] = (factors, text)
+        if coeff == -1.:
+            return '-' + text
+        elif coeff != 1.:
+            return self.const(coeff) + ' * ' + text
+        return text
+
+    def _factor(self, expr):
+        """Prints an expression as a factor of a product.
+        """
+        text = self.doprint(expr)
+        if isinstance(expr, (Sum, Product)):
+            return '(' + text + ')'
+        return text
+
+    def statement(self, stmt, line_end=';\n'):
+        """Prints a statement.
+
+        An added negated expression is printed as a subtraction, and
+        vice versa.
+
+        Parameters
+        ----------
+        stmt : `Assign`
+            The statement.
+        line_end : str, optional
+            The statement terminator.
+
+        Returns
+        -------
+        str
+            The source line.
+
+        """
+        decl = stmt.decl + ' ' if stmt.decl else ''
+        return self.scaled_statement(decl + self.doprint(stmt.target), 1.,
+                                     stmt.value, stmt.op, line_end)
+
+    def scaled_statement(self, target, coeff, value, op='=',
+                         line_end=';\n'):
+        """Prints a statement assigning (or adding) a multiple of an
+        expression.
+
+        Equivalent to printing ``Assign(target, mul(coeff, value), op)``,
+        without building the product, for many statements that differ only
+        in the target and coefficient.
+
+        Parameters
+        ----------
+        target : str
+            The variable or array element assigned to.
+        coeff : float
+            The coefficient.
+        value : `Expr`
+            The expression.
+        op : {'=', '+=', '-='}, optional
+            The assignment operator.
+        line_end : str, optional
+            The statement terminator.
+
+        Returns
+        -------
+        str
+            The source line.
+
+        """
+        # the factors of a value assigned with many coefficients are
+        # printed once
+        cached = self._factors.get(id(value))
+        if cached is None:
+            cached = self._scaled(value)
+            self._factors[id(value)] = cached
+        scale, factors, single, nested = cached[1:]
+
+        if nested is not None and coeff != 1. and coeff != -1.:
+            # c * (s * x * y) is not (c * s) * x * y
+            scale = 1.
+            factors = single = nested
+        coeff *= scale
+        if op != '=' and coeff < 0:
+            # an added negated expression is printed as a subtraction
+            op = '-=' if op == '+=' else '+='
+            coeff = -coeff
+        if coeff == 0. or factors is None:
+            text = self.const(coeff)
+        elif coeff == 1.:
+            text = factors if single is None else single
+        elif coeff == -1.:
+            text = '-' + factors
+        else:
+            text = self.const(coeff) + ' * ' + factors
+        return self.indent + target + ' ' + op + ' ' + text + line_end
+
+    def _scaled(self, value):
+        """Prints the parts of an expression used by `scaled_statement`.
+
+        Returns
+        -------
+        tuple
+            The expression (kept alive, so that its id is not reused), its
+            coefficient, the text of its factors, the text of its only
+            factor (if any), and the text to multiply by if the coefficient
+            may not be multiplied into its own.
+
+        """
+        scale = 1.
+        factors = single = nested = None
+        if isinstance(value, Product):
+            scale = value.coeff
+            factors = self._product(1., value.factors)
+            if len(value.factors) == 1:
+                single = self.doprint(value.factors[0])
+            if not self.reassociate and (abs(scale) != 1. or single is None):
+                nested = '(' + self.doprint(value) + ')'
+        elif isinstance(value, Const):
+            scale = value.value
+        else:
+            factors = self._factor(value)
+            single = self.doprint(value)
+        return value, scale, factors, single, nested
+
+    def statements(self, stmts, line_end=';\n'):
+        """Prints a list of statements.
+
+        Returns
+        -------
+        str
+            The source lines.
+
+        """
+        return ''.join(self.statement(stmt, line_end) for stmt in stmts)
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""Struct-of-arrays representation of a mechanism.
+
+Complements the per-object `ReacInfo` / `SpecInfo` lists with NumPy arrays
+built once, so that code generators can look up or select reactions and
+species without walking every object. `MechanismIndex` adds the lookup
+tables shared by the code generators.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+import bisect
+
+import numpy as np
+
+
+def _csr(rows):
+    """Build compressed sparse row arrays from (column, value) rows.
+
+    Parameters
+    ----------
+    rows : list of list of (int, float)
+        Column indices and values of each row, in order.
+
+    Returns
+    -------
+    indptr : numpy.ndarray
+        Row start offsets, of length ``len(rows) + 1``.
+    indices : numpy.ndarray
+        Column index of each stored value.
+    data : numpy.ndarray
+        Stored values.
+
+    """
+    indptr = np.zeros(len(rows) + 1, dtype=np.intp)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    indices = np.fromiter((col for row in rows for col, _ in row),
+                          dtype=np.intp, count=indptr[-1])
+    data = np.fromiter((val for row in rows for _, val in row),
+                       dtype=np.float64, count=indptr[-1])
+    return indptr, indices, data
+
+
+class MechanismArrays(object):
+    """NumPy arrays describing the species and reactions of a mechanism.
+
+    Built from the parsed species and reactions, whose species may be
+    referred to either by name or by index (i.e., before or after
+    `utils.reassign_species_lists`). Sparse per-reaction data is stored in
+    compressed sparse row (CSR) form: the entries of reaction ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]`` and ``data[indptr[i]:indptr[i + 1]]``.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+
+    Attributes
+    ----------
+    num_spec : int
+        Number of species.
+    num_reac : int
+        Number of reactions.
+    species_index : dict
+        Index of each species, keyed by name.
+    mw : numpy.ndarray
+        Species molecular weights, shape (num_spec,).
+    Trange : numpy.ndarray
+        Species thermo temperature ranges (low, middle, high),
+        shape (num_spec, 3).
+    thermo : numpy.ndarray
+        NASA coefficients, low- then high-temperature range,
+        shape (num_spec, 2, 7).
+    A, b, E : numpy.ndarray
+        Forward Arrhenius coefficients, shape (num_reac,).
+    rev, dup, thd_body, pdep, troe, sri, cheb, plog : numpy.ndarray
+        Reaction type flags, shape (num_reac,).
+    pdep_sp : numpy.ndarray
+        Index of the specific falloff third-body species, or -1.
+    low, high : numpy.ndarray
+        Low- and high-pressure limit Arrhenius coefficients,
+        shape (num_reac, 3); NaN if not given.
+    troe_par : numpy.ndarray
+        Troe parameters, shape (num_reac, 4); NaN if not given.
+    sri_par : numpy.ndarray
+        SRI parameters, shape (num_reac, 5); NaN if not given.
+    reac_indptr, reac_indices, reac_nu : numpy.ndarray
+        Reactant stoichiometric coefficients (CSR).
+    prod_indptr, prod_indices, prod_nu : numpy.ndarray
+        Product stoichiometric coefficients (CSR).
+    nu_indptr, nu_indices, nu : numpy.ndarray
+        Nonzero net (product - reactant) coefficients (CSR).
+    eff_indptr, eff_indices, eff : numpy.ndarray
+        Explicit third-body efficiencies (CSR); the default is 1.
+
+    """
+
+    def __init__(self, specs, reacs):
+        self.num_spec = len(specs)
+        self.num_reac = len(reacs)
+        self.species_index = {sp.name: i for i, sp in enumerate(specs)}
+
+        # species data
+        self.mw = np.array([sp.mw for sp in specs], dtype=np.float64)
+        self.Trange = np.array([sp.Trange for sp in specs],
+                               dtype=np.float64).reshape(-1, 3)
+        self.thermo = np.zeros((self.num_spec, 2, 7))
+        for i, sp in enumerate(specs):
+            self.thermo[i, 0] = sp.lo
+            self.thermo[i, 1] = sp.hi
+
+        # reaction data
+        def flag(name):
+            return np.array([bool(getattr(rxn, name)) for rxn in reacs],
+                            dtype=bool)
+
+        self.A = np.array([rxn.A for rxn in reacs], dtype=np.float64)
+        self.b = np.array([rxn.b for rxn in reacs], dtype=np.float64)
+        self.E = np.array([rxn.E for rxn in reacs], dtype=np.float64)
+        self.rev = flag('rev')
+        self.dup = flag('dup')
+        self.thd_body = flag('thd_body')
+        self.pdep = flag('pdep')
+        self.troe = flag('troe')
+        self.sri = flag('sri')
+        self.cheb = flag('cheb')
+        self.plog = flag('plog')
+        self.pdep_sp = np.array([self._index(rxn.pdep_sp)
+                                 if rxn.pdep_sp not in ('', None) else -1
+                                 for rxn in reacs], dtype=np.intp)
+
+        self.low = self._table(reacs, 'low', 3)
+        self.high = self._table(reacs, 'high', 3)
+        self.troe_par = self._table(reacs, 'troe_par', 4)
+        self.sri_par = self._table(reacs, 'sri_par', 5)
+
+        # stoichiometry
+        reac_rows = []
+        prod_rows = []
+        nu_rows = []
+        eff_rows = []
+        for rxn in reacs:
+            reac_row = [(self._index(sp), nu)
+                        for sp, nu in zip(rxn.reac, rxn.reac_nu)]
+            prod_row = [(self._index(sp), nu)
+                        for sp, nu in zip(rxn.prod, rxn.prod_nu)]
+            net = {}
+            for isp, nu in prod_row:
+                net[isp] = nu
+            for isp, nu in reac_row:
+                net[isp] = net.get(isp, 0) - nu
+            reac_rows.append(reac_row)
+            prod_rows.append(prod_row)
+            nu_rows.append(sorted((isp, nu) for isp, nu in net.items()
+                                  if nu != 0))
+
+            # the first efficiency given for a species is the one used
+            seen = set()
+            eff_row = []
+            for thd in rxn.thd_body_eff:
+                isp = self._index(thd[0])
+                if isp not in seen:
+                    seen.add(isp)
+                    eff_row.append((isp, thd[1]))
+            eff_rows.append(eff_row)
+
+        self.reac_indptr, self.reac_indices, self.reac_nu = _csr(reac_rows)
+        self.prod_indptr, self.prod_indices, self.prod_nu = _csr(prod_rows)
+        self.nu_indptr, self.nu_indices, self.nu = _csr(nu_rows)
+        self.eff_indptr, self.eff_indices, self.eff = _csr(eff_rows)
+
+    def _index(self, sp):
+        """Get the index of a species given by name or index.
+        """
+        if isinstance(sp, str):
+            return self.species_index[sp]
+        return int(sp)
+
+    def _table(self, reacs, name, width):
+        """Get a (num_reac, width) table of a list attribute, padded by NaN.
+        """
+        table = np.full((len(reacs), width), np.nan)
+        for i, rxn in enumerate(reacs):
+            par = getattr(rxn, name)
+            if par:
+                table[i, :len(par)] = par
+        return table
+
+    @property
+    def nbytes(self):
+        """int: Total size of the arrays, in bytes."""
+        return sum(value.nbytes for value in vars(self).values()
+                   if isinstance(value, np.ndarray))
+
+    def net_nu(self, rxn_ind):
+        """Get the nonzero net stoichiometric coefficients of a reaction.
+
+        Parameters
+        ----------
+        rxn_ind : int
+            Reaction index.
+
+        Returns
+        -------
+        dict
+            Net (product - reactant) coefficient, keyed by species index.
+
+        """
+        start, end = self.nu_indptr[rxn_ind], self.nu_indptr[rxn_ind + 1]
+        return dict(zip(self.nu_indices[start:end].tolist(),
+                        self.nu[start:end].tolist()))
+
+    def efficiencies(self, rxn_ind):
+        """Get the explicit third-body efficiencies of a reaction.
+
+        Parameters
+        ----------
+        rxn_ind : int
+            Reaction index.
+
+        Returns
+        -------
+        dict
+            Third-body efficiency, keyed by species index.
+
+        """
+        start, end = self.eff_indptr[rxn_ind], self.eff_indptr[rxn_ind + 1]
+        return dict(zip(self.eff_indices[start:end].tolist(),
+                        self.eff[start:end].tolist()))
+
+    def changes_species(self, isp):
+        """Find the reactions with a nonzero net coefficient for a species.
+
+        Parameters
+        ----------
+        isp : int
+            Species index.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask over the reactions.
+
+        """
+        rows = np.repeat(np.arange(self.num_reac), np.diff(self.nu_indptr))
+        mask = np.zeros(self.num_reac, dtype=bool)
+        mask[rows[self.nu_indices == isp]] = True
+        return mask
+
+
+class MechanismIndex(object):
+    """Lookup tables of a mechanism, shared by the code generators.
+
+    Built once the species of the reactions have been reassigned to indices
+    (see `utils.reassign_species_lists`), so that writers look up reaction
+    positions and stoichiometric coefficients in constant time, instead of
+    searching lists for each reaction or species.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+    arrays : `MechanismArrays`, optional
+        Arrays of the mechanism, if already built.
+
+    Attributes
+    ----------
+    arrays : `MechanismArrays`
+        Arrays of the mechanism.
+    rev_reacs : list of int
+        Indices of the reversible reactions.
+    rev_index : dict
+        Position of each reversible reaction in `rev_reacs` (i.e., in the
+        reverse rates), keyed by reaction index.
+    pdep_reacs : list of int
+        Indices of the third-body and pressure-dependent reactions.
+    pdep_index : dict
+        Position of each of those reactions in `pdep_reacs` (i.e., in the
+        pressure modifications), keyed by reaction index.
+    nu : list of dict
+        Nonzero net (product - reactant) coefficients of each reaction,
+        keyed by species index.
+    reac_nu, prod_nu : list of dict
+        Reactant and product coefficients of each reaction, keyed by
+        species index.
+    spec_reacs : list of list of int
+        Indices of the reactions with a nonzero net coefficient for each
+        species, in increasing order.
+
+    """
+
+    def __init__(self, specs, reacs, arrays=None):
+        if arrays is None:
+            arrays = MechanismArrays(specs, reacs)
+        self.arrays = arrays
+
+        self.rev_reacs = np.flatnonzero(arrays.rev).tolist()
+        self.rev_index = {rxn_ind: i for i, rxn_ind in
+                          enumerate(self.rev_reacs)}
+        self.pdep_reacs = np.flatnonzero(arrays.thd_body |
+                                         arrays.pdep).tolist()
+        self.pdep_index = {rxn_ind: i for i, rxn_ind in
+                           enumerate(self.pdep_reacs)}
+
+        self.nu = [arrays.net_nu(i) for i in range(arrays.num_reac)]
+
+        # the first coefficient given for a species is the one used
+        self.reac_nu = []
+        self.prod_nu = []
+        for rxn in reacs:
+            reac_nu = {}
+            for sp, nu in zip(rxn.reac, rxn.reac_nu):
+                reac_nu.setdefault(sp, nu)
+            prod_nu = {}
+            for sp, nu in zip(rxn.prod, rxn.prod_nu):
+                prod_nu.setdefault(sp, nu)
+            self.reac_nu.append(reac_nu)
+            self.prod_nu.append(prod_nu)
+
+        # reaction of each nonzero net coefficient, grouped by species
+        rows = np.repeat(np.arange(arrays.num_reac),
+                         np.diff(arrays.nu_indptr))
+        order = np.argsort(arrays.nu_indices, kind='mergesort')
+        bounds = np.searchsorted(arrays.nu_indices[order],
+                                 np.arange(arrays.num_spec + 1))
+        self.spec_reacs = [rows[order[bounds[i]:bounds[i + 1]]].tolist()
+                           for i in range(arrays.num_spec)]
+
+    def num_following(self, isp, rxn_ind):
+        """Count the reactions right after a reaction that change a species.
+
+        Parameters
+        ----------
+        isp : int
+            Species index.
+        rxn_ind : int
+            Reaction index.
+
+        Returns
+        -------
+        int
+            Number of consecutive reactions after ``rxn_ind`` with a
+            nonzero net coefficient for the species.
+
+        """
+        spec_reacs = self.spec_reacs[isp]
+        pos = bisect.bisect_right(spec_reacs, rxn_ind)
+        count = 0
+        while (pos + count < len(spec_reacs) and
+               spec_reacs[pos + count] == rxn_ind + 1 + count):
+            count += 1
+        return count
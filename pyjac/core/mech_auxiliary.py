@@ -13,6 +13,7 @@
 # Local imports
 from .. import utils
 from . import chem_utilities as chem
+from . import file_writer
 
 def write_mechanism_initializers(path, lang, specs, reacs,
                                  fwd_spec_mapping, back_spec_mapping,
@@ -54,7 +55,7 @@ def write_mechanism_initializers(path, lang, specs, reacs,
         raise NotImplementedError
 
     if auto_diff:
-        with open(os.path.join(path, 'ad_jac.c'), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'ad_jac.c'), 'w') as file:
             #need to write the auto_diff jacobian
             file.write("""
 #include <vector>
@@ -106,9 +107,9 @@ def write_mechanism_initializers(path, lang, specs, reacs,
 
     # the mechanism header defines a number of useful preprocessor defines, as
     # well as defining method stubs for setting initial conditions
-    with open(os.path.join(path, 'mechanism{}'.format(utils.header_ext[lang])),
-              'w'
-              ) as file:
+    with file_writer.open_file(os.path.join(path, 'mechanism{}'.format(utils.header_ext[lang])),
+                               'w'
+                               ) as file:
 
         file.write('#ifndef MECHANISM_{}\n'.format(utils.header_ext[lang][1:]) +
                    '#define MECHANISM_{}\n\n'.format(utils.header_ext[lang][1:])
@@ -176,7 +177,7 @@ def write_mechanism_initializers(path, lang, specs, reacs,
         file.write('#endif\n\n')
 
     # now the mechanism file
-    with open(os.path.join(path, 'mechanism' + utils.file_ext[lang]), 'w') as file:
+    with file_writer.open_file(os.path.join(path, 'mechanism' + utils.file_ext[lang]), 'w') as file:
         file.write(
             '#include "mass_mole{}"\n'.format(utils.header_ext[lang]) +
             '#include <stdio.h>\n'
@@ -312,7 +313,7 @@ def write_mechanism_initializers(path, lang, specs, reacs,
 
     if lang == 'cuda':
         mem_template = 'double* {};'
-        with open(os.path.join(path, 'gpu_memory.cuh'), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'gpu_memory.cuh'), 'w') as file:
             file.write('#ifndef GPU_MEMORY_CUH\n'
                        '#define GPU_MEMORY_CUH\n'
                        '\n'
@@ -329,7 +330,7 @@ def write_mechanism_initializers(path, lang, specs, reacs,
                        '#endif\n'
                        )
 
-        with open(os.path.join(path, 'gpu_memory.cu'), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'gpu_memory.cu'), 'w') as file:
             init_template = 'initialize_pointer(&((*d_mem)->{}), {} * padded)'
             free_template = 'cudaErrorCheck(cudaFree({}))'
             err_check = '  cudaErrorCheck( {} );\n'
@@ -406,7 +407,7 @@ def write_mechanism_initializers(path, lang, specs, reacs,
             file.write('}\n')
 
     if lang == 'cuda':
-        with open(os.path.join(path, 'gpu_macros.cuh'), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'gpu_macros.cuh'), 'w') as file:
             file.write(
     '#ifndef GPU_MACROS_CUH\n'
     '#define GPU_MACROS_CUH\n'
@@ -455,7 +456,7 @@ def write_header(path, lang):
     if lang in ['matlab', 'fortran']:
         raise NotImplementedError
 
-    with open(os.path.join(path, 'header' + utils.header_ext[lang]), 'w') as file:
+    with file_writer.open_file(os.path.join(path, 'header' + utils.header_ext[lang]), 'w') as file:
         file.write('#ifndef HEAD\n'
                    '#define HEAD\n'
                    '#include <stdlib.h>\n'
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Content-addressed cache of interpreted mechanisms.
+
+Parsed elements, species and reactions are stored under a key made from
+the contents of the mechanism (and thermo) files and the parser version,
+so regenerating code for the same mechanism skips the interpreter.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import gc
+import hashlib
+import pickle
+
+# Local imports
+from .._version import __version__
+from . import mech_interpret as mech
+from . import file_writer
+
+parser_version = 5
+"""int: Version of the interpreted mechanism format; bump to invalidate"""
+
+cache_dir_env = 'PYJAC_CACHE_DIR'
+"""str: Environment variable overriding the parse cache directory"""
+
+ct_extensions = ('.cti', '.xml')
+"""tuple(`str`): Extensions of Cantera-format mechanism files"""
+
+
+def get_cache_dir():
+    """Get the directory of the parse cache.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    str
+        ``$PYJAC_CACHE_DIR`` if set, otherwise ``pyjac`` under
+        ``$XDG_CACHE_HOME`` (default ``~/.cache``).
+
+    """
+    if os.environ.get(cache_dir_env):
+        return os.environ[cache_dir_env]
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache')
+                          )
+    return os.path.join(base, 'pyjac')
+
+
+def get_cache_key(mech_name, therm_name=None):
+    """Get the content hash identifying a parsed mechanism.
+
+    Parameters
+    ----------
+    mech_name : str
+        Reaction mechanism filename (e.g. 'mech.dat').
+    therm_name : str, optional
+        Thermodynamic database filename (e.g. 'therm.dat').
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest.
+
+    """
+    key = hashlib.sha256()
+    tag = 'pyjac {} parser {}'.format(__version__, parser_version)
+    if mech_name.endswith(ct_extensions):
+        tag += ' cantera {}'.format(mech.ct.__version__)
+    key.update(tag.encode('utf-8'))
+
+    for filename in [mech_name, therm_name]:
+        # separate files so that content can't shift between them
+        key.update(b'\0')
+        if not filename:
+            continue
+        with open(filename, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                key.update(chunk)
+
+    return key.hexdigest()
+
+
+def loads_mechanism(data):
+    """Unpickle an interpreted mechanism.
+
+    The cyclic garbage collector only slows down unpickling the many
+    objects of a mechanism, so it is paused meanwhile.
+
+    Parameters
+    ----------
+    data : bytes
+        The pickled mechanism.
+
+    Returns
+    -------
+    mechanism
+        The unpickled mechanism, e.g. its elements, species and reactions.
+
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def read_mech_file(mech_name, therm_name=None, use_cache=True,
+                   num_procs=None):
+    """Interpret a mechanism file, reusing a previous result if cached.
+
+    Parameters
+    ----------
+    mech_name : str
+        Reaction mechanism filename, Chemkin or Cantera format
+        (e.g. 'mech.dat' or 'mech.cti').
+    therm_name : str, optional
+        Thermodynamic database filename (e.g. 'therm.dat')
+        or nothing if info in mechanism file.
+    use_cache : bool, optional
+        If ``False``, always interpret the file and leave the cache as is.
+    num_procs : int, optional
+        Number of processes used to interpret the reactions of a
+        Chemkin-format file (see `mech_interpret.read_mech`).
+
+    Returns
+    -------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in mechanism.
+
+    """
+    is_ct = mech_name.endswith(ct_extensions)
+
+    def parse():
+        if is_ct:
+            return mech.read_mech_ct(mech_name)
+        return mech.read_mech(mech_name, therm_name, num_procs)
+
+    if not use_cache or (is_ct and not mech.have_cantera()):
+        return parse()
+
+    cache_file = os.path.join(get_cache_dir(),
+                              get_cache_key(mech_name, therm_name) + '.pickle'
+                              )
+    try:
+        with open(cache_file, 'rb') as file:
+            return loads_mechanism(file.read())
+    except Exception:
+        # missing or unreadable entry, parse below
+        pass
+
+    result = parse()
+
+    try:
+        if not os.path.isdir(os.path.dirname(cache_file)):
+            os.makedirs(os.path.dirname(cache_file))
+        file_writer.write_atomic(cache_file, pickle.dumps(
+            result, pickle.HIGHEST_PROTOCOL))
+    except (IOError, OSError):
+        # e.g., read-only cache directory; caching is best effort
+        pass
+
+    return result
@@ -6,9 +6,15 @@
 from __future__ import division
 
 # Standard libraries
+import os
+import gc
 import sys
 import math
 import re
+import mmap
+import json
+import hashlib
+import multiprocessing
 from copy import deepcopy
 import logging
 
@@ -17,19 +23,36 @@
 # Local imports
 from .. import utils
 from . import chem_utilities as chem
+from . import file_writer
 
-# Related module
-CANTERA_FLAG = False
-try:
-    import cantera as ct
-    version = ct.__version__.split('.')
-    if int(version[0]) < 2 or int(version[1]) < 3:
-        print('Parsing of Cantera mechanisms requires at least version 2.3.0 in order to access species thermo properties...')
-        print('Detected version is only {}'.format(ct.__version__))
-        sys.exit(1)
-    CANTERA_FLAG = True
-except ImportError:
-    CANTERA_FLAG = False
+# Related module, imported when first needed (see `have_cantera`), as
+# importing it takes longer than interpreting most Chemkin mechanisms
+ct = None
+"""module: Cantera, once imported by `have_cantera`"""
+
+
+def have_cantera():
+    """Import Cantera, if not already, and check its version.
+
+    Returns
+    -------
+    bool
+        ``True`` if Cantera is installed
+
+    """
+    global ct
+    if ct is None:
+        try:
+            import cantera
+        except ImportError:
+            return False
+        version = cantera.__version__.split('.')
+        if int(version[0]) < 2 or int(version[1]) < 3:
+            print('Parsing of Cantera mechanisms requires at least version 2.3.0 in order to access species thermo properties...')
+            print('Detected version is only {}'.format(cantera.__version__))
+            sys.exit(1)
+        ct = cantera
+    return True
 
 pre_units = ['moles', 'molecules']
 """list(`str`): Supported units list for pre-exponential factor"""
@@ -49,30 +72,695 @@
                         })
 """dict: Activation energy conversion factor"""
 
-# get local element atomic weight dict
-elem_wt = chem.get_elem_wt()
+thermo_index_ext = '.pyjac-idx'
+"""str: Extension of thermo database indices persisted next to the database"""
 
+thermo_index_min_size = 1 << 20
+"""int: Minimum size (bytes) of a thermo database for its index to be saved"""
 
-def read_mech(mech_filename, therm_filename):
-    """Read and interpret mechanism file for elements, species, and reactions.
+_thermo_index_version = 2
+
+
+_section_re = re.compile(r'(elem|spec|reac|ther|end)', re.IGNORECASE)
+"""Compiled pattern matching a keyword that opens or closes a section"""
+
+_thermo_section_re = re.compile(br'^[ \t]*ther', re.IGNORECASE | re.MULTILINE)
+"""Compiled pattern matching a line that opens a THERMO section"""
+
+_coeff_re = re.compile(r'(\d[^a-zA-Z]*)(.*)')
+"""Compiled pattern splitting a stoichiometric coefficient from a species"""
+
+
+def _mech_lines(file):
+    """Generate the meaningful lines of a Chemkin-format file.
+
+    Blank and commented lines are skipped, and leading/trailing whitespace
+    and end-of-line comments are removed.
 
     Parameters
     ----------
-    mech_filename : str
-        Reaction mechanism filename (e.g. 'mech.dat')
-    therm_filename : str, optional
-        Thermodynamic database filename (e.g., 'therm.dat')
+    file : file
+        Open Chemkin-format file.
+
+    Yields
+    ------
+    line : str
+        Next line with content.
+
+    """
+    for line in file:
+        # don't convert to lowercase, since thermo
+        # needs to match (for Chemkin)
+        line = line.strip()
+
+        # skip blank or commented lines
+        if not line or line[0] == '!':
+            continue
+
+        # remove any comments from end of line
+        ind = line.find('!')
+        if ind > 0:
+            line = line[0:ind]
+
+        yield line
+
+
+def _read_units(line):
+    """Get Arrhenius coefficient units from the REACTIONS line.
+
+    Parameters
+    ----------
+    line : str
+        REACTIONS line of the mechanism file.
 
     Returns
     -------
-    elems : list of str
-        List of elements in mechanism.
-    specs : list of `SpecInfo`
-        List of species in mechanism.
+    units_A : str
+        Units of the pre-exponential factor.
+    units_E : str
+        Units of the activation energy.
+
+    """
+    # default units from Chemkin
+    units_E = 'cal/mole'
+    units_A = 'moles'
+
+    # get Arrhenius coefficient units (if specified)
+    for unit in line.split()[1:]:
+        if unit.lower() in pre_units:
+            units_A = unit.lower()
+        elif unit.lower() in act_energy_units:
+            units_E = unit.lower()
+        else:
+            print('Error: unsupported units on REACTION line.')
+            print('For pre-exponential factor, choose from: ' +
+                  ', '.join(pre_units)
+                  )
+            print('For activation energy, choose from: ' +
+                  ', '.join(act_energy_units)
+                  )
+            print('Otherwise leave blank for moles and cal/mole.')
+            sys.exit(1)
+
+    if units_A == 'molecules':
+        raise NotImplementedError('Molecules units not '
+                                  'supported, sorry.'
+                                  )
+    return units_A, units_E
+
+
+def _read_reaction_side(side_str):
+    """Interpret the reactant or product side of a reaction equation.
+
+    Parameters
+    ----------
+    side_str : str
+        Reactant or product side of the reaction equation.
+
+    Returns
+    -------
+    spec : list of str
+        Species names on this side.
+    nu : list of int/float
+        Stoichiometric coefficients of the species.
+    thd : bool
+        True if a '+M' third body appears on this side.
+    pdep_sp : str or None
+        Contents of a '(+M)' or '(+species)' falloff term, or ``None``.
+
+    """
+    thd = False
+    pdep_sp = None
+
+    # look for pressure-dependence species
+    sub_str = side_str
+    while '(' in sub_str:
+        ind1 = sub_str.find('(')
+        ind2 = sub_str.find(')')
+
+        # Need to check if '+' is first character inside
+        # parentheses and not embedded within parentheses
+        # (e.g., '(+)'). If not, part of species name.
+        in_paren = sub_str[ind1 + 1: ind2].strip()
+        if in_paren == '+':
+            # '+' embedded within parentheses
+            sub_str = sub_str[ind2 + 1:]
+        elif in_paren.startswith('+'):
+            # either 'm' or a specific species
+            pdep_sp = in_paren.replace('+', ' ').strip()
+
+            # now remove from string
+            ind = len(side_str) - len(sub_str)
+            side_str = side_str[0: ind1 + ind] + side_str[ind2 + ind + 1:]
+            break
+        else:
+            # Part of species name, remove from substring
+            # and look at rest of the side.
+            sub_str = sub_str[ind2 + 1:]
+
+    sp_list = side_str.split('+')
+
+    # Check for empty list elements, meaning there were
+    # multiple '+' in a row, which indicates species'
+    # name ended in '+'.
+    while '' in sp_list:
+        ind = sp_list.index('')
+        sp_list[ind - 1] = sp_list[ind - 1] + '+'
+        del sp_list[ind]
+
+    # check for any species with '(+)' that was split apart
+    ind = 0
+    while ind < len(sp_list) - 1:
+        if sp_list[ind].endswith('(') and sp_list[ind + 1].startswith(')'):
+            sp_list[ind] = sp_list[ind] + '+' + sp_list.pop(ind + 1)
+        ind += 1
+
+    spec = []
+    nu = []
+    for sp in sp_list:
+        sp = sp.strip()
+
+        # look for coefficient
+        match = _coeff_re.match(sp)
+        if match:
+            coeff, sp = match.groups()
+            coeff = float(coeff) if '.' in coeff else int(coeff)
+            sp = sp.strip()
+        else:
+            # no coefficient given
+            coeff = 1
+
+        # check for third body
+        if sp.lower() == 'm':
+            thd = True
+            continue
+
+        # check if species already on this side
+        if sp not in spec:
+            spec.append(sp)
+            nu.append(coeff)
+        else:
+            nu[spec.index(sp)] += coeff
+
+    return spec, nu, thd, pdep_sp
+
+
+def _read_reaction(line, units_A, units_E):
+    """Interpret a reaction equation line.
+
+    Parameters
+    ----------
+    line : str
+        Reaction line, with the equation followed by Arrhenius coefficients.
+    units_A : str
+        Units of the pre-exponential factor.
+    units_E : str
+        Units of the activation energy.
+
+    Returns
+    -------
+    reac : `ReacInfo`
+        The new reaction.
+
+    """
+    # get Arrhenius coefficients
+    line, reac_A, reac_b, reac_E = line.rsplit(None, 3)
+    reac_A = float(reac_A)
+    reac_b = float(reac_b)
+    reac_E = float(reac_E)
+
+    if '<=>' in line:
+        reac_rev = True
+        reac_str, prod_str = line.split('<=>', 1)
+    elif '=>' in line:
+        reac_rev = False
+        reac_str, prod_str = line.split('=>', 1)
+    else:
+        reac_rev = True
+        reac_str, prod_str = line.split('=', 1)
+
+    reac_spec, reac_nu, reac_thd, reac_pdep = _read_reaction_side(
+        reac_str.strip())
+    prod_spec, prod_nu, prod_thd, prod_pdep = _read_reaction_side(
+        prod_str.strip())
+
+    # products override reactants for the pressure-dependence species
+    pdep_sp = prod_pdep if prod_pdep is not None else reac_pdep
+    pdep = pdep_sp is not None
+
+    # Don't want to confuse third-body and pressure-dependent
+    # reactions... they are different!
+    thd = (reac_thd or prod_thd) and not pdep
+    if not pdep or pdep_sp.lower() == 'm':
+        pdep_sp = ''
+
+    # Convert given activation energy units to internal units
+    reac_E *= act_energy_fact[units_E]
+
+    # Convert given pre-exponential units to internal units
+    if units_A == 'moles':
+        reac_ord = sum(reac_nu)
+        if thd:
+            reac_A /= 1000. ** reac_ord
+        else:
+            # Elementary reaction, or low- (chemically activated bimolecular
+            # reaction) or high-pressure (fall-off reaction) limit parameters
+            reac_A /= 1000. ** (reac_ord - 1.)
+
+    reac = chem.ReacInfo(reac_rev, reac_spec, reac_nu,
+                         prod_spec, prod_nu, reac_A, reac_b, reac_E
+                         )
+    reac.thd_body = thd
+    reac.pdep = pdep
+    reac.pdep_sp = pdep_sp
+
+    return reac
+
+
+def _read_arrhenius_aux(line):
+    """Read the three Arrhenius parameters of an auxiliary reaction line.
+
+    Parameters
+    ----------
+    line : str
+        Auxiliary line, e.g. 'LOW / 1.0E12 0.0 1000.0 /'.
+
+    Returns
+    -------
+    list of float
+        The [A, b, E] parameters, as given.
+
+    """
+    line_split = line.replace('/', ' ').replace(',', ' ').split()
+    return [float(par) for par in line_split[1:4]]
+
+
+def _read_reaction_aux(line, reacs, units_A, units_E, rxn_offset=0):
+    """Interpret an auxiliary information line of the last reaction.
+
+    Parameters
+    ----------
+    line : str
+        Auxiliary reaction information line.
     reacs : list of `ReacInfo`
-        List of reactions in mechanism.
-    units : str
-        Units of reactions' Arrhenius coefficients
+        List of reactions read so far; the last one is modified.
+    units_A : str
+        Units of the pre-exponential factor.
+    units_E : str
+        Units of the activation energy.
+    rxn_offset : int, optional
+        Number of reactions in the mechanism before ``reacs[0]``, used
+        in messages.
+
+    Returns
+    -------
+    None
+
+    """
+    reac = reacs[-1]
+    aux = line[0:3].lower()
+    if aux == 'dup':
+        reac.dup = True
+
+    elif aux == 'rev':
+        par = _read_arrhenius_aux(line)
+
+        # Convert reverse activation energy units
+        par[2] *= act_energy_fact[units_E]
+
+        # Convert reverse pre-exponential factor
+        if units_A == 'moles':
+            reac_ord = sum(reac.prod_nu)
+            if reac.thd_body:
+                par[0] /= 1000. ** reac_ord
+            else:
+                par[0] /= 1000. ** (reac_ord - 1.)
+
+        # Ensure nonzero reverse coefficients
+        if par[0] != 0.0:
+            reac.rev_par.extend(par)
+        else:
+            reac.rev = False
+
+    elif aux == 'low':
+        par = _read_arrhenius_aux(line)
+
+        # Convert low-pressure activation energy units
+        par[2] *= act_energy_fact[units_E]
+
+        # Convert low-pressure pre-exponential factor
+        if units_A == 'moles':
+            par[0] /= 1000. ** sum(reac.reac_nu)
+
+        reac.low.extend(par)
+
+    elif aux == 'hig':
+        par = _read_arrhenius_aux(line)
+
+        # Convert high-pressure activation energy units
+        par[2] *= act_energy_fact[units_E]
+
+        # Convert high-pressure pre-exponential factor
+        if units_A == 'moles':
+            par[0] /= 1000. ** (sum(reac.reac_nu) - 2.)
+
+        reac.high.extend(par)
+
+    elif aux == 'tro':
+        line_split = line.replace('/', ' ').replace(',', ' ').split()
+        reac.troe = True
+        par = [float(x) for x in line_split[1:4]]
+
+        do_warn = False
+        if par[1] == 0:
+            do_warn = True
+            par[1] = 1e-30
+        if par[2] == 0:
+            do_warn = True
+            par[2] = 1e-30
+        if do_warn:
+            logging.warning('Troe parameters in reaction {} modified to '
+                            'avoid division by zero!.'.format(
+                                rxn_offset + len(reacs)))
+
+        # optional fourth parameter
+        if len(line_split) > 4:
+            par.append(float(line_split[4]))
+
+        reac.troe_par.extend(par)
+
+    elif aux == 'sri':
+        line_split = line.replace('/', ' ').replace(',', ' ').split()
+        reac.sri = True
+        reac.sri_par.extend(float(x) for x in line_split[1:4])
+
+        # optional fourth and fifth parameters
+        if len(line_split) > 4:
+            reac.sri_par.extend(float(x) for x in line_split[4:6])
+
+    elif aux == 'che':
+        line_split = line.replace('/', ' ').split()
+        if reac.cheb:
+            reac.cheb_par.extend(float(par) for par in line_split[1:])
+        else:
+            # first CHEB line
+            reac.cheb = True
+            # Don't want Cheb reactions lumped in with
+            # standard falloff.
+            reac.pdep = False
+            reac.cheb_n_temp = int(line_split[1])
+            reac.cheb_n_pres = int(line_split[2])
+            reac.cheb_par = [float(par) for par in line_split[3:]]
+
+    elif aux == 'pch':
+        line_split = line.replace('/', ' ').split()
+        # Convert pressure from atm to Pa
+        reac.cheb_plim = [float(line_split[1]) * chem.PA,
+                          float(line_split[2]) * chem.PA
+                          ]
+
+        # Look for temperature limits on same line:
+        if len(line_split) > 5 and line_split[3].lower() == 'tcheb':
+            reac.cheb_tlim = [float(line_split[4]), float(line_split[5])]
+
+    elif aux == 'tch':
+        line_split = line.replace('/', ' ').split()
+        reac.cheb_tlim = [float(line_split[1]), float(line_split[2])]
+
+        # Look for pressure limits on same line:
+        if len(line_split) > 5 and line_split[3].lower() == 'pcheb':
+            reac.cheb_plim = [float(line_split[4]) * chem.PA,
+                              float(line_split[5]) * chem.PA
+                              ]
+
+    elif aux == 'plo':
+        line_split = line.replace('/', ' ').split()
+        if not reac.plog:
+            reac.plog = True
+            # Don't want Plog reactions lumped in with
+            # standard falloff.
+            reac.pdep = False
+            reac.plog_par = []
+        pars = [float(n) for n in line_split[1:5]]
+
+        # Convert pressure from atm to Pa
+        pars[0] *= 101325.0
+
+        # Convert given activation energy units to internal units
+        pars[3] *= act_energy_fact[units_E]
+
+        # Convert given pre-exponential units to internal units
+        if units_A == 'moles':
+            reac_ord = sum(reac.reac_nu)
+            # Looks like elementary reaction
+            pars[1] /= 1000. ** (reac_ord - 1.)
+
+        reac.plog_par.append(pars)
+
+    else:
+        # enhanced third body efficiencies
+        line_split = line.replace('/', ' ').split()
+        for i in range(0, len(line_split), 2):
+            reac.thd_body_eff.append([line_split[i],
+                                      float(line_split[i + 1])
+                                      ])
+
+
+def _read_reaction_block(block):
+    """Interpret a block of reaction lines.
+
+    Parameters
+    ----------
+    block : tuple
+        Units of the pre-exponential factor and activation energy, the
+        number of reactions before the block, and the lines of the block.
+        The lines start with a reaction line, and each reaction's auxiliary
+        lines are in the same block.
+
+    Returns
+    -------
+    reacs : list of `ReacInfo`
+        Reactions in the block, in order.
+
+    """
+    units_A, units_E, rxn_offset, lines = block
+    reacs = []
+    for line in lines:
+        if '=' in line:
+            reacs.append(_read_reaction(line, units_A, units_E))
+        else:
+            _read_reaction_aux(line, reacs, units_A, units_E, rxn_offset)
+    return reacs
+
+
+def _read_reactions_parallel(segments, num_procs):
+    """Interpret the REACTIONS sections of a mechanism in a process pool.
+
+    Parameters
+    ----------
+    segments : list of tuple
+        Units of the pre-exponential factor and activation energy, and
+        the lines of each REACTIONS section.
+    num_procs : int
+        Number of processes to use.
+
+    Returns
+    -------
+    reacs : list of `ReacInfo`
+        Reactions of all sections, in order.
+
+    """
+    # a few blocks per process, to balance the load
+    total = sum(len(lines) for _, _, lines in segments)
+    block_size = max(1, total // (4 * num_procs))
+
+    blocks = []
+    rxn_offset = 0
+    for units_A, units_E, lines in segments:
+        start = 0
+        num_rxn = 0
+        for i, line in enumerate(lines):
+            # only split at reaction lines, to keep auxiliary info together
+            if '=' in line:
+                if i - start >= block_size:
+                    blocks.append((units_A, units_E, rxn_offset,
+                                   lines[start:i]))
+                    rxn_offset += num_rxn
+                    start = i
+                    num_rxn = 0
+                num_rxn += 1
+        if start < len(lines):
+            blocks.append((units_A, units_E, rxn_offset, lines[start:]))
+            rxn_offset += num_rxn
+
+    # the cyclic garbage collector only slows down creating (and here,
+    # unpickling) many small objects, so pause it in the pool and parent
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    pool = None
+    try:
+        pool = multiprocessing.Pool(num_procs, initializer=gc.disable)
+        results = pool.map(_read_reaction_block, blocks)
+        pool.close()
+        pool.join()
+    finally:
+        # e.g. a reaction failing to parse, or an interrupt, must not leave
+        # the workers running
+        if pool is not None:
+            pool.terminate()
+        if gc_enabled:
+            gc.enable()
+
+    return [reac for block_reacs in results for reac in block_reacs]
+
+
+def _count_thermo_sections(filename):
+    """Count the THERMO sections of a Chemkin-format file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+
+    Returns
+    -------
+    int
+        Number of lines opening a THERMO section.
+
+    """
+    with open(filename, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return 0
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return len(_thermo_section_re.findall(data))
+        finally:
+            data.close()
+
+
+def _finish_reaction(reac, idx, units_A, spec_names):
+    """Process the auxiliary info of a reaction once all of it is read.
+
+    Parameters
+    ----------
+    reac : `ReacInfo`
+        The reaction.
+    idx : int
+        Index of the reaction in the file, for error messages.
+    units_A : str
+        Units of the pre-exponential factor of its REACTIONS section.
+    spec_names : set of str
+        Names of the species in the mechanism.
+
+    Returns
+    -------
+    reacs : list of `ReacInfo`
+        The reaction, followed by its reverse if it has explicit reverse
+        parameters.
+
+    """
+    if reac.cheb:
+        # check for correct number
+        n = reac.cheb_n_temp
+        m = reac.cheb_n_pres
+        if len(reac.cheb_par) != n * m:
+            print('Error: incorrect number of CHEB coefficients in '
+                  'reaction ' + repr(idx)
+                  )
+            sys.exit(1)
+        else:
+            # Convert units of first Chebyshev parameter
+            order = sum(reac.reac_nu)
+            if units_A == 'moles':
+                reac.cheb_par[0] += math.log10(0.001 ** (order - 1.))
+
+            reac.cheb_par = np.reshape(reac.cheb_par, (n, m))
+
+    # check that all species in reactions correspond to a known species
+    for spec in set(reac.reac + reac.prod):
+        if spec not in spec_names:
+            logger = logging.getLogger(__name__)
+            logger.error('Reaction {} contains unknown species {}'.format(
+                idx, spec))
+            sys.exit(-1)
+
+    if not reac.rev_par:
+        return [reac]
+
+    # Split reversible reactions with explicit reverse parameters into
+    # two irreversible reactions to match Cantera's behavior
+    new_reac = deepcopy(reac)
+
+    reac.rev = False
+    reac.rev_par = []
+
+    new_reac.A = new_reac.rev_par[0]
+    new_reac.b = new_reac.rev_par[1]
+    new_reac.E = new_reac.rev_par[2]
+    new_reac.rev = False
+    new_reac.rev_par = []
+    new_reac.prod = reac.reac[:]
+    new_reac.prod_nu = reac.reac_nu[:]
+    new_reac.reac = reac.prod[:]
+    new_reac.reac_nu = reac.prod_nu[:]
+
+    return [reac, new_reac]
+
+
+def _complete_thermo(elems, specs, therm_filename, elem_wt):
+    """Read the thermo data missing from the mechanism file, if any.
+
+    Exits with an error if data is still missing afterwards.
+    """
+    # Read seperate thermo file if present and needed
+    if any(not sp.mw for sp in specs):
+        if therm_filename:
+            read_thermo(therm_filename, elems, specs, elem_wt)
+        else:
+            print('Error: no thermo file specified, but species missing \n'
+                  'data. Either specify file, or ensure complete data in\n'
+                  'mechanism file with THERMO option.'
+                  )
+            sys.exit(1)
+
+    # Check for missing thermo data again
+    missing_mw = [sp.name for sp in specs if not sp.mw]
+    if missing_mw:
+        print('Error: missing thermo data for ' + ', '.join(missing_mw))
+        sys.exit(1)
+
+
+def iter_mech(mech_filename, therm_filename=None, num_procs=None):
+    """Interpret a mechanism file, yielding its contents as they are read.
+
+    All elements and species are yielded first, each species with its
+    thermo data, followed by the reactions one at a time, each as soon as
+    its auxiliary lines have been read. This lets a consumer process (and
+    discard) each reaction before the rest of the file is interpreted.
+
+    Reactions can only be streamed once the thermo data of all species is
+    known when the REACTIONS section starts, i.e., given in a THERMO
+    section before it or in ``therm_filename``. Otherwise (e.g., a THERMO
+    section after the REACTIONS section), or if the reactions are
+    interpreted in parallel, they are yielded after the whole file is read.
+
+    Parameters
+    ----------
+    mech_filename : str
+        Reaction mechanism filename (e.g. 'mech.dat')
+    therm_filename : str, optional
+        Thermodynamic database filename (e.g., 'therm.dat')
+    num_procs : int, optional
+        If greater than one, the REACTIONS section is split at reaction
+        lines and interpreted by this many processes.
+
+    Yields
+    ------
+    kind : str
+        One of ``'element'``, ``'species'`` or ``'reaction'``.
+    item : str, `SpecInfo` or `ReacInfo`
+        The element name, species or reaction, in the same order as
+        returned by `read_mech`.
 
     Notes
     -----
@@ -81,98 +769,90 @@ def read_mech(mech_filename, therm_filename):
     """
 
     elems = []
-    reacs = []
     specs = []
+    spec_names = set()
     key = ''
 
-    with open(mech_filename, 'r') as file:
-        # start line reading loop
-        while True:
-            line = file.readline()
-
-            # end of file
-            if not line: break
+    # atomic weights, updated by those declared in the ELEMENTS section
+    elem_wt = chem.get_elem_wt()
 
-            # skip blank or commented lines
-            if re.search('^\s*$', line) or re.search('^\s*!', line): continue
+    # default units from Chemkin
+    units_E = 'cal/mole'
+    units_A = 'moles'
 
-            # don't convert to lowercase, since thermo
-            # needs to match (for Chemkin)
+    # lines of each REACTIONS section, if interpreted in parallel
+    parallel = num_procs is not None and num_procs > 1
+    segments = []
 
-            # Remove trailing and leading whitespace, tabs, newline
-            line = line.strip()
+    # the reaction being read (at most one), the number read before it,
+    # and reactions held back until the species are complete
+    current = []
+    num_reacs = 0
+    held = []
+    streaming = False
+    started = False
+    thermo_sections = 0
 
-            # remove any comments from end of line
-            ind = line.find('!')
-            if ind > 0: line = line[0:ind]
+    with open(mech_filename, 'r') as file:
+        for line in _mech_lines(file):
+            # a new reaction or section completes the current reaction
+            if current and ('=' in line or _section_re.match(line)):
+                reac = current.pop()
+                for reac in _finish_reaction(reac, num_reacs, units_A,
+                                             spec_names):
+                    if streaming:
+                        reac.fingerprint = chem.get_fingerprint(reac)
+                        yield 'reaction', reac
+                    else:
+                        held.append(reac)
+                num_reacs += 1
 
             # now determine key
-            if line[0:4].lower() == 'elem':
-                key = 'elem'
-
-                # check for any entries on this line
-                line_split = line.split()
-                if len(line_split) > 1:
-                    ind = line.index(line_split[1])
-                    line = line[ind:]
-                else:
+            match = _section_re.match(line)
+            if match:
+                section = match.group(1).lower()
+                if section == 'ther':
+                    # thermo data is in mechanism file
+                    read_thermo(mech_filename, elems, specs, elem_wt)
+                    thermo_sections += 1
+                    continue
+                elif section == 'end':
+                    key = ''
+                    continue
+                elif section == 'reac':
+                    key = 'reac'
+                    units_A, units_E = _read_units(line)
+                    if parallel:
+                        segments.append((units_A, units_E, []))
+                    elif not started:
+                        started = True
+                        # a THERMO section still to come takes precedence
+                        # over the thermo file, so wait for it
+                        if (all(sp.mw for sp in specs) or therm_filename and
+                                _count_thermo_sections(mech_filename) ==
+                                thermo_sections):
+                            _complete_thermo(elems, specs, therm_filename,
+                                             elem_wt)
+                            for e in elems:
+                                yield 'element', e
+                            for sp in specs:
+                                sp.fingerprint = chem.get_fingerprint(sp)
+                                yield 'species', sp
+                            streaming = True
                     continue
 
-            elif line[0:4].lower() == 'spec':
-                key = 'spec'
-
+                key = section
                 # check for any entries on this line
-                line_split = line.split()
+                line_split = line.split(None, 1)
                 if len(line_split) > 1:
-                    ind = line.index(line_split[1])
-                    line = line[ind:]
+                    line = line_split[1]
                 else:
                     continue
 
-            elif line[0:4].lower() == 'reac':
-                key = 'reac'
-
-                # default units from Chemkin
-                units_E = 'cal/mole'
-                units_A = 'moles'
-
-                # get Arrhenius coefficient units (if specified)
-                for unit in line.split()[1:]:
-                    if unit.lower() in pre_units:
-                        units_A = unit.lower()
-                    elif unit.lower() in act_energy_units:
-                        units_E = unit.lower()
-                    else:
-                        print('Error: unsupported units on REACTION line.')
-                        print('For pre-exponential factor, choose from: ' +
-                              pre_units
-                              )
-                        print('For activation energy, choose from: ' +
-                              act_energy_units
-                              )
-                        print('Otherwise leave blank for moles and cal/mole.')
-                        sys.exit(1)
-
-                if units_A == 'molecules':
-                    raise NotImplementedError('Molecules units not '
-                                              'supported, sorry.'
-                                              )
-                continue
-            elif line[0:4].lower() == 'ther':
-                # thermo data is in mechanism file
-                read_thermo(mech_filename, elems, specs)
-                continue
-            elif line[0:3].lower() == 'end':
-                key = ''
-                continue
-
             if key == 'elem':
                 # if any atomic weight declarations, replace / with spaces
-                line = line.replace('/', ' ')
-
-                line_split = line.split()
                 e_last = ''
-                for e in line_split:
+                for e in line.replace('/', ' ').split():
                     if e.isalpha():
                         if e[0:3] == 'end': continue
                         if e not in elems:
@@ -184,706 +864,445 @@ def read_mech(mech_filename, therm_filename):
                         elem_wt[e_last.lower()] = float(e)
 
             elif key == 'spec':
-                line_split = line.split()
-                for s in line_split:
+                for s in line.split():
                     if s[0:3] == 'end': continue
-                    if not next((sp for sp in specs if sp.name == s), None):
+                    if s not in spec_names:
+                        spec_names.add(s)
                         specs.append(chem.SpecInfo(s))
 
             elif key == 'reac':
+                if parallel:
+                    segments[-1][2].append(line)
                 # determine if reaction or auxiliary info line
+                elif '=' in line:
+                    current.append(_read_reaction(line, units_A, units_E))
+                else:
+                    _read_reaction_aux(line, current, units_A, units_E,
+                                       num_reacs)
 
-                if '=' in line:
-                    # new reaction
-
-                    cheb_flag = False
-
-                    # get Arrhenius coefficients
-                    line_split = line.split()
-                    n = len(line_split)
-                    reac_A = float(line_split[n - 3])
-                    reac_b = float(line_split[n - 2])
-                    reac_E = float(line_split[n - 1])
-
-                    ind = line.index(line_split[n - 3])
-                    line = line[0:ind].strip()
-
-                    if '<=>' in line:
-                        ind = line.index('<=>')
-                        reac_rev = True
-                        reac_str = line[0:ind].strip()
-                        prod_str = line[ind + 3:].strip()
-                    elif '=>' in line:
-                        ind = line.index('=>')
-                        reac_rev = False
-                        reac_str = line[0:ind].strip()
-                        prod_str = line[ind + 2:].strip()
-                    else:
-                        ind = line.index('=')
-                        reac_rev = True
-                        reac_str = line[0:ind].strip()
-                        prod_str = line[ind + 1:].strip()
-
-                    thd = False
-                    pdep = False
-                    pdep_sp = ''
-
-                    reac_spec = []
-                    reac_nu = []
-                    prod_spec = []
-                    prod_nu = []
-
-                    # reactants
-
-                    # look for third-body species
-                    sub_str = reac_str
-                    while '(' in sub_str:
-                        ind1 = sub_str.find('(')
-                        ind2 = sub_str.find(')')
-
-                        # Need to check if '+' is first character inside
-                        # parentheses and not embedded within parentheses
-                        # (e.g., '(+)').
-                        # If not, part of species name.
-                        inParen = sub_str[ind1 + 1: ind2].strip()
-                        if inParen is '+':
-                            # '+' embedded within parentheses
-                            sub_str = sub_str[ind2 + 1:]
-                        elif inParen[0] is '+':
-                            pdep = True
-
-                            # either 'm' or a specific species
-                            pdep_sp = sub_str[ind1 + 1: ind2].replace('+', ' ')
-                            pdep_sp = pdep_sp.strip()
-
-                            if pdep_sp.lower() == 'm':
-                                thd = True
-                                pdep_sp = ''
-
-                            # now remove from string
-                            ind = reac_str.find(sub_str)
-                            reac_str = (reac_str[0: ind1 + ind] +
-                                        reac_str[ind2 + ind + 1:]
-                                        )
-                            break
-                        else:
-                            # Part of species name, remove from substring
-                            # and look at rest of reactant line.
-                            sub_str = sub_str[ind2 + 1:]
-
-                    reac_list = reac_str.split('+')
-
-                    # Check for empty list elements, meaning there were
-                    # multiple '+' in a row, which indicates species'
-                    # name ended in '+'.
-                    while '' in reac_list:
-                        ind = reac_list.index('')
-                        reac_list[ind - 1] = reac_list[ind - 1] + '+'
-                        del reac_list[ind]
-
-                    # check for any species with '(+)' that was split apart
-                    for sp in reac_list:
-                        ind = reac_list.index(sp)
-
-                        # ensure not last entry
-                        if (ind < len(reac_list) - 1):
-                            spNext = reac_list[ind + 1]
-                            if sp[len(sp) - 1] is '(' and spNext[0] is ')':
-                                reac_list[ind] = sp + '+' + spNext
-                                del reac_list[ind + 1]
-
-                    for sp in reac_list:
-
-                        sp = sp.strip()
-
-                        # look for coefficient
-                        if sp[0:1].isdigit():
-                            # starts with number (coefficient)
-
-                            # search for first letter
-                            for i in range(len(sp)):
-                                if sp[i: i + 1].isalpha(): break
-
-                            nu = sp[0:i]
-                            if '.' in nu:
-                                # float
-                                nu = float(nu)
-                            else:
-                                # integer
-                                nu = int(nu)
-
-                            sp = sp[i:].strip()
-                        else:
-                            # no coefficient given
-                            nu = 1
-
-                        # check for third body
-                        if sp.lower() == 'm':
-                            thd = True
-                            continue
-
-                        # check if species already in reaction
-                        if sp not in reac_spec:
-                            # new reactant
-                            reac_spec.append(sp)
-                            reac_nu.append(nu)
-                        else:
-                            # existing reactant
-                            i = reac_spec.index(sp)
-                            reac_nu[i] += nu
-
-                    # products
-
-                    # look for third-body species
-                    sub_str = prod_str
-                    while '(' in sub_str:
-                        ind1 = sub_str.find('(')
-                        ind2 = sub_str.find(')')
-
-                        # Need to check if '+' is first character inside
-                        # parentheses and not embedded within parentheses
-                        # (e.g., '(+)'). If not, part of species name.
-                        inParen = sub_str[ind1 + 1: ind2].strip()
-                        if inParen is '+':
-                            # '+' embedded within parentheses
-                            sub_str = sub_str[ind2 + 1:]
-                        elif inParen[0] is '+':
-                            pdep = True
-
-                            # either 'm' or a specific species
-                            pdep_sp = sub_str[ind1 + 1: ind2].replace('+', ' ')
-                            pdep_sp = pdep_sp.strip()
-
-                            if pdep_sp.lower() == 'm':
-                                thd = True
-                                pdep_sp = ''
-
-                            # now remove from string
-                            ind = prod_str.find(sub_str)
-                            prod_str = (prod_str[0: ind1 + ind] +
-                                        prod_str[ind2 + ind + 1:]
-                                        )
-                            break
-                        else:
-                            # Part of species name, remove from substring and
-                            # look at rest of product line.
-                            sub_str = sub_str[ind2 + 1:]
-
-                    prod_list = prod_str.split('+')
-
-                    # Check for empty list elements, meaning there were
-                    # multiple '+' in a row, which indicates species
-                    # name ended in '+'.
-                    while '' in prod_list:
-                        ind = prod_list.index('')
-                        prod_list[ind - 1] = prod_list[ind - 1] + '+'
-                        del prod_list[ind]
-
-                    # check for any species with '(+)' that was split apart
-                    for sp in prod_list:
-                        ind = prod_list.index(sp)
-
-                        # ensure not last entry
-                        if (ind < len(prod_list) - 1):
-                            spNext = prod_list[ind + 1]
-                            if sp[len(sp) - 1] is '(' and spNext[0] is ')':
-                                prod_list[ind] = sp + '+' + spNext
-                                del prod_list[ind + 1]
-
-                    for sp in prod_list:
-
-                        sp = sp.strip()
-
-                        # look for coefficient
-                        if sp[0:1].isdigit():
-                            # starts with number (coefficient)
-
-                            # search for first letter
-                            for i in range(len(sp)):
-                                if sp[i: i + 1].isalpha(): break
-
-                            nu = sp[0:i]
-                            if '.' in nu:
-                                # float
-                                nu = float(nu)
-                            else:
-                                # integer
-                                nu = int(nu)
-
-                            sp = sp[i:].strip()
-                        else:
-                            # no coefficient given
-                            nu = 1
-
-                        # check for third body
-                        if sp in ['m', 'M']:
-                            thd = True
-                            continue
-
-                        # check if species already in reaction
-                        if sp not in prod_spec:
-                            # new product
-                            prod_spec.append(sp)
-                            prod_nu.append(nu)
-                        else:
-                            # existing product
-                            i = prod_spec.index(sp)
-                            prod_nu[i] += nu
-
-                    # Don't want to confuse third-body and pressure-dependent
-                    # reactions... they are different!
-                    if pdep:
-                        thd = False
-
-                    # Convert given activation energy units to internal units
-                    reac_E *= act_energy_fact[units_E]
-
-                    # Convert given pre-exponential units to internal units
-                    if units_A == 'moles':
-                        reac_ord = sum(reac_nu)
-                        if thd:
-                            reac_A /= 1000. ** reac_ord
-                        elif pdep:
-                            # Low- (chemically activated bimolecular reaction) or
-                            # high-pressure (fall-off reaction) limit parameters
-                            reac_A /= 1000. ** (reac_ord - 1.)
-                        else:
-                            # Elementary reaction
-                            reac_A /= 1000. ** (reac_ord - 1.)
-
-                    # add reaction to list
-                    reac = chem.ReacInfo(reac_rev, reac_spec, reac_nu,
-                                         prod_spec, prod_nu, reac_A, reac_b,
-                                         reac_E
-                                         )
-                    reac.thd_body = thd
-                    reac.pdep = pdep
-                    if pdep: reac.pdep_sp = pdep_sp
-
-                    reacs.append(reac)
+    # the last reaction of the file
+    reacs = current
+    if parallel:
+        reacs = _read_reactions_parallel(segments, num_procs)
 
-                else:
-                    # auxiliary reaction info
-
-                    aux = line[0:3].lower()
-                    if aux == 'dup':
-                        reacs[-1].dup = True
-
-                    elif aux == 'rev':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        # Convert reverse activation energy units
-                        par3 *= act_energy_fact[units_E]
-
-                        # Convert reverse pre-exponential factor
-                        if units_A == 'moles':
-                            reac_ord = sum(reacs[-1].prod_nu)
-                            if thd:
-                                par1 /= 1000. ** reac_ord
-                            elif pdep:
-                                # Low- (chemically activated bimolecular reaction) or
-                                # high-pressure (fall-off reaction) limit parameters
-                                par1 /= 1000. ** (reac_ord - 1.)
-                            else:
-                                # Elementary reaction
-                                par1 /= 1000. ** (reac_ord - 1.)
-
-                        # Ensure nonzero reverse coefficients
-                        if par1 != 0.0:
-                            reacs[-1].rev_par.append(par1)
-                            reacs[-1].rev_par.append(par2)
-                            reacs[-1].rev_par.append(par3)
-                        else:
-                            reacs[-1].rev = False
-
-                    elif aux == 'low':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        # Convert low-pressure activation energy units
-                        par3 *= act_energy_fact[units_E]
-
-                        # Convert low-pressure pre-exponential factor
-                        if units_A == 'moles':
-                            par1 /= 1000. ** sum(reacs[-1].reac_nu)
-
-                        reacs[-1].low.append(par1)
-                        reacs[-1].low.append(par2)
-                        reacs[-1].low.append(par3)
-
-                    elif aux == 'hig':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        # Convert high-pressure activation energy units
-                        par3 *= act_energy_fact[units_E]
-
-                        # Convert high-pressure pre-exponential factor
-                        if units_A == 'moles':
-                            par1 /= 1000. ** (sum(reacs[-1].reac_nu) - 2.)
-
-                        reacs[-1].high.append(par1)
-                        reacs[-1].high.append(par2)
-                        reacs[-1].high.append(par3)
-
-                    elif aux == 'tro':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        reacs[-1].troe = True
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-
-                        do_warn = False
-                        if par2 == 0:
-                            do_warn=True
-                            par2 = 1e-30
-                        if par3 == 0:
-                            do_warn=True
-                            par3 = 1e-30
-                        if do_warn:
-                            logging.warn('Troe parameters in reaction {} modified to avoid'
-                                ' division by zero!.'.format(len(reacs)))
-
-                        reacs[-1].troe_par.append(par1)
-                        reacs[-1].troe_par.append(par2)
-                        reacs[-1].troe_par.append(par3)
-
-                        # optional fourth parameter
-                        if len(line_split) > 4:
-                            par4 = float(line_split[4])
-                            reacs[-1].troe_par.append(par4)
-
-                    elif aux == 'sri':
-                        line = line.replace('/', ' ')
-                        line = line.replace(',', ' ')
-                        line_split = line.split()
-                        reacs[-1].sri = True
-                        par1 = float(line_split[1])
-                        par2 = float(line_split[2])
-                        par3 = float(line_split[3])
-                        reacs[-1].sri_par.append(par1)
-                        reacs[-1].sri_par.append(par2)
-                        reacs[-1].sri_par.append(par3)
-
-                        # optional fourth and fifth parameters
-                        if len(line_split) > 4:
-                            par4 = float(line_split[4])
-                            par5 = float(line_split[5])
-                            reacs[-1].sri_par.append(par4)
-                            reacs[-1].sri_par.append(par5)
-                    elif aux == 'che':
-                        reacs[-1].cheb = True
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        if cheb_flag:
-                            for par in line_split[1:]:
-                                reacs[-1].cheb_par.append(float(par))
-                        else:
-                            # first CHEB line
-                            cheb_flag = True
-                            # Don't want Cheb reactions lumped in with
-                            # standard falloff.
-                            reacs[-1].pdep = False
-                            reacs[-1].cheb_n_temp = int(line_split[1])
-                            reacs[-1].cheb_n_pres = int(line_split[2])
-                            reacs[-1].cheb_par = []
-                            for par in line_split[3:]:
-                                reacs[-1].cheb_par.append(float(par))
-                    elif aux == 'pch':
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        # Convert pressure from atm to Pa
-                        reacs[-1].cheb_plim = [float(line_split[1]) * chem.PA,
-                                               float(line_split[2]) * chem.PA
-                                               ]
-
-                        # Look for temperature limits on same line:
-                        if line_split[3].lower() == 'tcheb':
-                            reacs[-1].cheb_tlim = [float(line_split[4]),
-                                                   float(line_split[5])
-                                                   ]
-                    elif aux == 'tch':
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        reacs[-1].cheb_tlim = [float(line_split[1]),
-                                               float(line_split[2])
-                                               ]
-                        # Look for pressure limits on same line:
-                        if line_split[3].lower() == 'pcheb':
-                            reacs[-1].cheb_plim = [float(line_split[4]) * chem.PA,
-                                                   float(line_split[5]) * chem.PA
-                                                   ]
-                    elif aux == 'plo':
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        if not reacs[-1].plog:
-                            reacs[-1].plog = True
-                            # Don't want Plog reactions lumped in with
-                            # standard falloff.
-                            reacs[-1].pdep = False
-                            reacs[-1].plog_par = []
-                        pars = [float(n) for n in line_split[1:5]]
-
-                        # Convert pressure from atm to Pa
-                        pars[0] *= 101325.0
-
-                        # Convert given activation energy units to internal units
-                        pars[3] *= act_energy_fact[units_E]
-
-                        # Convert given pre-exponential units to internal units
-                        if units_A == 'moles':
-                            reac_ord = sum(reacs[-1].reac_nu)
-                            # Looks like elementary reaction
-                            pars[1] /= 1000. ** (reac_ord - 1.)
-
-                        reacs[-1].plog_par.append(pars)
-                    else:
-                        # enhanced third body efficiencies
-                        line = line.replace('/', ' ')
-                        line_split = line.split()
-                        for i in range(0, len(line_split), 2):
-                            pair = [line_split[i], float(line_split[i + 1])]
-                            reacs[-1].thd_body_eff.append(pair)
-
-    # process some reaction auxiliary info
-    for idx, reac in enumerate(reacs):
-        if reac.cheb:
-            # check for correct number
-            n = reac.cheb_n_temp
-            m = reac.cheb_n_pres
-            if len(reac.cheb_par) != n * m:
-                print('Error: incorrect number of CHEB coefficients in '
-                      'reaction ' + repr(idx)
-                      )
-                sys.exit(1)
-            else:
-                # Convert units of first Chebyshev parameter
-                order = sum(reac.reac_nu)
-                if units_A == 'moles':
-                    reac.cheb_par[0] += math.log10(0.001 ** (order - 1.))
+    for reac in reacs:
+        held.extend(_finish_reaction(reac, num_reacs, units_A, spec_names))
+        num_reacs += 1
 
-                reacs[idx].cheb_par = np.reshape(reac.cheb_par, (n, m))
+    if not streaming:
+        _complete_thermo(elems, specs, therm_filename, elem_wt)
+        for e in elems:
+            yield 'element', e
+        for sp in specs:
+            sp.fingerprint = chem.get_fingerprint(sp)
+            yield 'species', sp
 
-    # check that all species in reactions correspond to a known species
-    spec_names = set(spec.name for spec in specs)
-    for idx, reac in enumerate(reacs):
-        in_rxn = set(reac.reac + reac.prod)
-        for spec in in_rxn:
-            if spec not in spec_names:
-                logger = logging.getLogger(__name__)
-                logger.error('Reaction {} contains unknown species {}'.format(
-                    idx, spec))
-                sys.exit(-1)
+    for reac in held:
+        reac.fingerprint = chem.get_fingerprint(reac)
+        yield 'reaction', reac
 
-    # Split reversible reactions with explicit reverse parameters into
-    # two irreversible reactions to match Cantera's behavior
-    for reac in reacs[:]:
-        if reac.rev_par:
-            new_reac = deepcopy(reac)
-
-            idx = reacs.index(reac)
-            reacs[idx].rev = False
-            reacs[idx].rev_par = []
-
-            new_reac.A = new_reac.rev_par[0]
-            new_reac.b = new_reac.rev_par[1]
-            new_reac.E = new_reac.rev_par[2]
-            new_reac.rev = False
-            new_reac.rev_par = []
-            new_reac.prod = reac.reac[:]
-            new_reac.prod_nu = reac.reac_nu[:]
-            new_reac.reac = reac.prod[:]
-            new_reac.reac_nu = reac.prod_nu[:]
-
-            reacs.insert(idx + 1, new_reac)
 
-    # Read seperate thermo file if present and needed
-    if any([not sp.mw for sp in specs]):
-        if therm_filename:
-            read_thermo(therm_filename, elems, specs)
-        else:
-            print('Error: no thermo file specified, but species missing \n'
-                  'data. Either specify file, or ensure complete data in\n'
-                  'mechanism file with THERMO option.'
-                  )
-            sys.exit(1)
+def read_mech(mech_filename, therm_filename, num_procs=None):
+    """Read and interpret mechanism file for elements, species, and reactions.
 
-    # Check for missing thermo data again
-    missing_mw = [sp.name for sp in specs if not sp.mw]
-    if missing_mw:
-        print('Error: missing thermo data for ' + ', '.join(missing_mw))
-        sys.exit(1)
+    The file is read in a single pass: each line is classified by the
+    section it falls in, and species are looked up by name in a hash set.
+    See `iter_mech` to process the reactions as they are read instead.
 
-    return (elems, specs, reacs)
+    Parameters
+    ----------
+    mech_filename : str
+        Reaction mechanism filename (e.g. 'mech.dat')
+    therm_filename : str, optional
+        Thermodynamic database filename (e.g., 'therm.dat')
+    num_procs : int, optional
+        If greater than one, the REACTIONS section is split at reaction
+        lines and interpreted by this many processes.
+
+    Returns
+    -------
+    elems : list of str
+        List of elements in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in mechanism.
 
+    Notes
+    -----
+    Doesn't support element names with digits.
 
-def read_thermo(filename, elems, specs):
-    """Read and interpret thermodynamic database for species data.
+    """
+    contents = {'element': [], 'species': [], 'reaction': []}
+    for kind, item in iter_mech(mech_filename, therm_filename, num_procs):
+        contents[kind].append(item)
 
-    Reads the thermodynamic file and returns the species thermodynamic
-    coefficients as well as the species-specific temperature range
-    values (if given).
+    return (contents['element'], contents['species'], contents['reaction'])
+
+
+def _next_line(data, pos):
+    """Get the line of a memory-mapped file starting at a byte offset.
+
+    Parameters
+    ----------
+    data : mmap.mmap or bytes
+        File contents.
+    pos : int
+        Byte offset of the start of the line.
+
+    Returns
+    -------
+    line : bytes
+        The line, including any line terminator (empty at end of file).
+    pos : int
+        Byte offset of the start of the next line.
+
+    """
+    end = data.find(b'\n', pos)
+    end = len(data) if end < 0 else end + 1
+    return data[pos:end], end
+
+
+def _is_blank_or_comment(line):
+    """Check if a (byte) line of a Chemkin-format file has no content.
+    """
+    line = line.strip()
+    return not line or line[0:1] == b'!'
+
+
+def _build_thermo_index(data):
+    """Index the species records of a thermodynamic database.
+
+    Only the species names are decoded; the first record of each species
+    in the file is the one indexed.
+
+    Parameters
+    ----------
+    data : mmap.mmap or bytes
+        Contents of the thermo database (or mechanism with THERMO section).
+
+    Returns
+    -------
+    T_ranges : list of float or None
+        Common temperature ranges, if given.
+    offsets : dict or None
+        Byte offset of the first line of each species record, keyed by
+        species name. ``None`` if the file has no THERMO section.
+
+    """
+    size = len(data)
+    pos = 0
+
+    # loop through intro lines
+    while True:
+        if pos >= size:
+            return None, None
+        line, pos = _next_line(data, pos)
+
+        # skip blank or commented lines
+        if _is_blank_or_comment(line): continue
+
+        # skip 'thermo' at beginning
+        if b'thermo' in line.lower(): break
+
+    # next line either has common temperature ranges or first species
+    T_ranges = None
+    line, next_pos = _next_line(data, pos)
+    line_split = line.split()
+    if line_split and line_split[0][0:1].isdigit():
+        T_ranges = utils.read_str_num(line.decode('utf-8', 'replace'))
+        pos = next_pos
+
+    # now index species thermo info
+    offsets = {}
+    while pos < size:
+        start = pos
+        # first line of species info
+        line, pos = _next_line(data, pos)
+
+        if line[0:3].lower() == b'end': break
+
+        # skip blank/commented line
+        if _is_blank_or_comment(line): continue
+
+        # species name, columns 0:18
+        spec = line.decode('utf-8', 'replace')[0:18].strip()
+
+        # Apparently, in some cases, notes are in the
+        # columns of shorter species names, so make
+        # sure no spaces.
+        if spec.find(' ') > 0:
+            spec = spec[0: spec.find(' ')]
+
+        # ensure the first record of a species is used
+        offsets.setdefault(spec, start)
+
+        # skip the other three lines of the record
+        for i in range(3):
+            line, pos = _next_line(data, pos)
+
+    return T_ranges, offsets
+
+
+def _is_thermo_database(data):
+    """Check if a file is a thermo database, rather than e.g. a mechanism
+    with a THERMO section: its first line with content opens the section.
+    """
+    pos = 0
+    while pos < len(data):
+        line, pos = _next_line(data, pos)
+        if not _is_blank_or_comment(line):
+            return line.strip()[0:4].lower() == b'ther'
+    return False
+
+
+def _thermo_digest(data):
+    """Get the SHA-1 digest of the contents of a thermo database.
+    """
+    sha1 = hashlib.sha1()
+    for start in range(0, len(data), file_writer.buffer_size):
+        sha1.update(data[start:start + file_writer.buffer_size])
+    return sha1.hexdigest()
+
+
+def _load_thermo_index(index_file, digest, size):
+    """Load the persisted index of a thermodynamic database.
+
+    The index is JSON data, so that reading it cannot run code whoever
+    wrote it, and is only used if it is the index of the database
+    contents with the given digest.
+
+    Parameters
+    ----------
+    index_file : str
+        Name of the index file.
+    digest : str
+        SHA-1 digest of the contents of the database.
+    size : int
+        Size of the database (bytes).
+
+    Returns
+    -------
+    index : tuple or None
+        The common temperature ranges and the offsets of the species
+        records (see `_build_thermo_index`); ``None`` if the index is
+        missing, unreadable, malformed or that of other contents.
+
+    """
+    try:
+        with open(index_file, 'rb') as file:
+            index = json.loads(file.read().decode('utf-8'))
+        if (index['version'] != _thermo_index_version or
+                index['sha1'] != digest):
+            return None
+        T_ranges = index['T_ranges']
+        offsets = index['offsets']
+        if T_ranges is not None and not all(
+                isinstance(T, (int, float)) for T in T_ranges):
+            return None
+        if not all(isinstance(pos, int) and not isinstance(pos, bool) and
+                   0 <= pos < size for pos in offsets.values()):
+            return None
+    except (IOError, OSError, ValueError, KeyError, TypeError,
+            AttributeError):
+        return None
+    return T_ranges, offsets
+
+
+def _get_thermo_index(filename, data):
+    """Load the persisted index of a thermodynamic database, or build it.
+
+    The index of a thermo database of at least `thermo_index_min_size`
+    bytes is stored next to it (see `thermo_index_ext`), with the digest of
+    the contents of the database, and rebuilt whenever the contents change.
+    Mechanisms with a THERMO section are indexed in memory only.
 
     Parameters
     ----------
     filename : str
         Name of thermo database file.
-    elems : list of str
-        List of element names in mechanism.
-    specs : list of `SpecInfo`
-        List of species in mechanism.
+    data : mmap.mmap or bytes
+        Contents of the thermo database.
 
     Returns
     -------
-    None
+    T_ranges : list of float or None
+        Common temperature ranges, if given.
+    offsets : dict or None
+        Byte offset of the first line of each species record, keyed by
+        species name. ``None`` if the file has no THERMO section.
 
     """
+    index_file = filename + thermo_index_ext
+    persist = (len(data) >= thermo_index_min_size and
+               _is_thermo_database(data))
 
-    with open(filename, 'r') as file:
+    if persist:
+        digest = _thermo_digest(data)
+        index = _load_thermo_index(index_file, digest, len(data))
+        if index is not None:
+            return index
 
-        # loop through intro lines
-        while True:
-            line = file.readline()
+    T_ranges, offsets = _build_thermo_index(data)
 
-            # skip blank or commented lines
-            if re.search('^\s*$', line) or re.search('^\s*!', line): continue
+    if persist and offsets is not None:
+        index = {'version': _thermo_index_version,
+                 'sha1': digest,
+                 'T_ranges': T_ranges,
+                 'offsets': offsets
+                 }
+        try:
+            file_writer.write_atomic(index_file, json.dumps(
+                index, sort_keys=True).encode('utf-8'))
+        except (IOError, OSError):
+            # e.g., read-only directory; the in-memory index still works
+            pass
 
-            # skip 'thermo' at beginning
-            if 'thermo' in line.lower(): break
+    return T_ranges, offsets
 
-        # next line either has common temperature ranges or first species
-        last_line = file.tell()
-        line = file.readline()
 
-        line_split = line.split()
-        if line_split[0][0:1].isdigit():
-            T_ranges = utils.read_str_num(line)
-        else:
-            # no common temperature info
-            file.seek(last_line)
-            # default
+def _read_thermo_record(lines, spec, T_ranges, elem_wt):
+    """Interpret the four lines of a species' NASA polynomial record.
 
-        # now start reading species thermo info
-        while True:
-            # first line of species info
-            line = file.readline()
+    Parameters
+    ----------
+    lines : list of str
+        The four lines of the species' thermo record.
+    spec : `SpecInfo`
+        Species to fill in.
+    T_ranges : list of float or None
+        Common temperature ranges of the database, if given.
+    elem_wt : dict
+        Atomic weights of the elements, by lowercase name.
 
-            # don't convert to lowercase, needs to match thermo for Chemkin
+    Returns
+    -------
+    None
 
-            # break if end of file
-            if line is None or line[0:3].lower() == 'end': break
+    """
+    line = lines[0]
+
+    # now get element composition of species, columns 24:44
+    # each piece of data is 5 characters long (2 for element, 3 for #)
+    elem_str = utils.split_str(line[24:44], 5)
+
+    for e_str in elem_str:
+        e = e_str[0:2].strip()
+        # skip if blank
+        if e == '' or e == '0': continue
+        # may need to convert to float first, in case of e.g. "1."
+        e_num = float(e_str[2:].strip())
+        e_num = int(e_num)
+
+        spec.elem.append([e, e_num])
+
+        # calculate molecular weight
+        spec.mw += e_num * elem_wt[e.lower()]
+
+    # temperatures for species
+    T_spec = utils.read_str_num(line[45:74])
+    T_low = T_spec[0]
+    T_high = T_spec[1]
+    if len(T_spec) == 3:
+        T_com = T_spec[2]
+    elif T_ranges:
+        T_com = T_ranges[1]
+    else:
+        # Chemkin default common temperature
+        T_com = 1000.0
+
+    spec.Trange = [T_low, T_com, T_high]
+
+    # second species line
+    coeffs = utils.split_str(lines[1][0:75], 15)
+    spec.hi[0] = float(coeffs[0])
+    spec.hi[1] = float(coeffs[1])
+    spec.hi[2] = float(coeffs[2])
+    spec.hi[3] = float(coeffs[3])
+    spec.hi[4] = float(coeffs[4])
+
+    # third species line
+    coeffs = utils.split_str(lines[2][0:75], 15)
+    spec.hi[5] = float(coeffs[0])
+    spec.hi[6] = float(coeffs[1])
+    spec.lo[0] = float(coeffs[2])
+    spec.lo[1] = float(coeffs[3])
+    spec.lo[2] = float(coeffs[4])
+
+    # fourth species line
+    coeffs = utils.split_str(lines[3][0:75], 15)
+    spec.lo[3] = float(coeffs[0])
+    spec.lo[4] = float(coeffs[1])
+    spec.lo[5] = float(coeffs[2])
+    spec.lo[6] = float(coeffs[3])
+
+
+def read_thermo(filename, elems, specs, elem_wt=None):
+    """Read and interpret thermodynamic database for species data.
 
-            # skip blank/commented line
-            if re.search('^\s*$', line) or re.search('^\s*!', line): continue
+    Reads the thermodynamic file and returns the species thermodynamic
+    coefficients as well as the species-specific temperature range
+    values (if given).
 
-            # species name, columns 0:18
-            spec = line[0:18].strip()
+    The file is memory-mapped, and located through an index of species
+    record offsets, so that only the records of species in the mechanism
+    are decoded. The first record of a species in the file is used, and
+    species that already have data are left untouched.
 
-            # Apparently, in some cases, notes are in the
-            # columns of shorter species names, so make
-            # sure no spaces.
-            if spec.find(' ') > 0:
-                spec = spec[0: spec.find(' ')]
+    Parameters
+    ----------
+    filename : str
+        Name of thermo database file.
+    elems : list of str
+        List of element names in mechanism.
+    specs : list of `SpecInfo`
+        List of species in mechanism.
+    elem_wt : dict, optional
+        Atomic weights of the elements, by lowercase name; those of
+        `chem_utilities.get_elem_wt` if not given.
 
-            # now need to determine if this species is in mechanism
-            if next((sp for sp in specs if sp.name == spec), None):
-                sp_ind = next(i for i in range(len(specs))
-                              if specs[i].name == spec
-                              )
-            else:
-                # not in mechanism, read next three lines and continue
-                line = file.readline()
-                line = file.readline()
-                line = file.readline()
-                continue
+    Returns
+    -------
+    None
 
-            # set species to the one matched
-            spec = specs[sp_ind]
+    """
 
-            # ensure not reading the same species more than once...
-            if spec.mw:
-                # already done! skip next three lines
-                line = file.readline()
-                line = file.readline()
-                line = file.readline()
-                continue
+    if elem_wt is None:
+        elem_wt = chem.get_elem_wt()
 
-            # now get element composition of species, columns 24:44
-            # each piece of data is 5 characters long (2 for element, 3 for #)
-            elem_str = utils.split_str(line[24:44], 5)
-
-            for e_str in elem_str:
-                e = e_str[0:2].strip()
-                # skip if blank
-                if e == '' or e == '0': continue
-                # may need to convert to float first, in case of e.g. "1."
-                e_num = float(e_str[2:].strip())
-                e_num = int(e_num)
-
-                spec.elem.append([e, e_num])
-
-                # calculate molecular weight
-                spec.mw += e_num * elem_wt[e.lower()]
-
-            # temperatures for species
-            T_spec = utils.read_str_num(line[45:74])
-            T_low = T_spec[0]
-            T_high = T_spec[1]
-            if len(T_spec) == 3:
-                T_com = T_spec[2]
-            else:
-                T_com = T_ranges[1]
-
-            spec.Trange = [T_low, T_com, T_high]
-
-            # second species line
-            line = file.readline()
-            coeffs = utils.split_str(line[0:75], 15)
-            spec.hi[0] = float(coeffs[0])
-            spec.hi[1] = float(coeffs[1])
-            spec.hi[2] = float(coeffs[2])
-            spec.hi[3] = float(coeffs[3])
-            spec.hi[4] = float(coeffs[4])
-
-            # third species line
-            line = file.readline()
-            coeffs = utils.split_str(line[0:75], 15)
-            spec.hi[5] = float(coeffs[0])
-            spec.hi[6] = float(coeffs[1])
-            spec.lo[0] = float(coeffs[2])
-            spec.lo[1] = float(coeffs[3])
-            spec.lo[2] = float(coeffs[4])
-
-            # fourth species line
-            line = file.readline()
-            coeffs = utils.split_str(line[0:75], 15)
-            spec.lo[3] = float(coeffs[0])
-            spec.lo[4] = float(coeffs[1])
-            spec.lo[5] = float(coeffs[2])
-            spec.lo[6] = float(coeffs[3])
-
-            # stop reading if all species in mechanism accounted for
-            if not next((sp for sp in specs if sp.mw == 0.0), None): break
+    with open(filename, 'rb') as file:
+        if os.fstat(file.fileno()).st_size:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = b''
+
+        try:
+            T_ranges, offsets = _get_thermo_index(filename, data)
+            if offsets is None:
+                print('Error: no THERMO section found in ' + filename)
+                sys.exit(1)
+
+            for spec in specs:
+                # ensure not reading the same species more than once...
+                if spec.mw: continue
+
+                # now need to determine if this species is in the database
+                pos = offsets.get(spec.name)
+                if pos is None: continue
+
+                lines = []
+                for i in range(4):
+                    line, pos = _next_line(data, pos)
+                    lines.append(line.decode('utf-8', 'replace'))
+                _read_thermo_record(lines, spec, T_ranges, elem_wt)
+        finally:
+            if not isinstance(data, bytes):
+                data.close()
 
     return None
 
 
-def read_mech_ct(filename=None, gas=None):
+def read_mech_ct(filename=None, gas=None, bulk=True):
     """Read and interpret Cantera-format mechanism file.
 
     Parameters
@@ -892,6 +1311,11 @@ def read_mech_ct(filename=None, gas=None):
         Reaction mechanism filename (e.g. 'mech.cti'). Optional.
     gas : `cantera.Solution` object
         Existing Cantera Solution object to be used. Optional.
+    bulk : bool, optional
+        If ``True`` (default), get reactants and products from the
+        stoichiometric coefficient matrices of ``gas`` in one call, listed
+        in the order of species in the mechanism. Otherwise, get them from
+        each `cantera.Reaction`, in the order Cantera reports them.
 
     Returns
     -------
@@ -906,7 +1330,7 @@ def read_mech_ct(filename=None, gas=None):
 
     """
 
-    if not CANTERA_FLAG:
+    if not have_cantera():
         print('Error: Cantera not installed. Cannot interpret '
               'Cantera-format mechanism.')
         sys.exit(1)
@@ -919,30 +1343,29 @@ def read_mech_ct(filename=None, gas=None):
 
     # Elements
     elems = gas.element_names
-    for e, wt in zip(elems, gas.atomic_weights):
-        if e.lower() not in elem_wt:
-            elem_wt[e.lower()] = wt
 
-    # Species
+    # Species; each property access builds a new array or list in Cantera,
+    # so get them once
+    species_names = gas.species_names
+    species_index = {sp: i for i, sp in enumerate(species_names)}
+    molecular_weights = gas.molecular_weights
     specs = []
-    for i, sp in enumerate(gas.species_names):
+    for i, species in enumerate(gas.species()):
+        sp = species_names[i]
         spec = chem.SpecInfo(sp)
 
-        spec.mw = gas.molecular_weights[i]
-
-        # Get Species object
-        species = gas.species(i)
+        spec.mw = molecular_weights[i]
 
         # Species elemental composition
-        for e in species.composition:
-            spec.elem.append([e, species.composition[e]])
+        composition = species.composition
+        for e in composition:
+            spec.elem.append([e, composition[e]])
 
         # Species thermodynamic properties
-        coeffs = species.thermo.coeffs
-        spec.Trange = [species.thermo.min_temp, coeffs[0],
-                       species.thermo.max_temp
-                       ]
-        if isinstance(species.thermo, ct.NasaPoly2):
+        thermo = species.thermo
+        coeffs = thermo.coeffs
+        spec.Trange = [thermo.min_temp, coeffs[0], thermo.max_temp]
+        if isinstance(thermo, ct.NasaPoly2):
             spec.hi = coeffs[1:8]
             spec.lo = coeffs[8:15]
         else:
@@ -957,6 +1380,59 @@ def read_mech_ct(filename=None, gas=None):
     # Cantera internally uses joules/kmol for activation energy
     E_fac = act_energy_fact['joules/kmole']
 
+    def get_sides(coeffs):
+        """Split a (species, reaction) stoichiometric coefficient matrix
+           into the species names and coefficients of each reaction.
+        """
+        rxn_ind, sp_ind = np.nonzero(coeffs.T)
+        nu = coeffs.T[rxn_ind, sp_ind].tolist()
+        bounds = np.searchsorted(rxn_ind, np.arange(coeffs.shape[1] + 1))
+        return [([species_names[k] for k in sp_ind[start:end]],
+                 nu[start:end])
+                for start, end in zip(bounds[:-1], bounds[1:])
+                ]
+
+    if bulk:
+        reac_sides = get_sides(gas.reactant_stoich_coeffs())
+        prod_sides = get_sides(gas.product_stoich_coeffs())
+
+    def new_reac(i, ct_rxn, rate=None):
+        """Create a `ReacInfo` for Cantera reaction ``i``.
+
+        Parameters
+        ----------
+        i : int
+            Index of the reaction in ``gas``
+        ct_rxn : `Reaction` object
+            The Cantera reaction
+        rate : `Arrhenius` object, optional
+            The Arrhenius rate to use; if ``None``, all coefficients are zero
+
+        Returns
+        -------
+        reac: `ReacInfo`
+            The new pyjac reaction
+        """
+        if bulk:
+            reactants, reac_nu = reac_sides[i]
+            products, prod_nu = prod_sides[i]
+        else:
+            ct_reactants = ct_rxn.reactants
+            ct_products = ct_rxn.products
+            reactants = list(ct_reactants.keys())
+            reac_nu = list(ct_reactants.values())
+            products = list(ct_products.keys())
+            prod_nu = list(ct_products.values())
+        if rate is None:
+            A, b, E = 0.0, 0.0, 0.0
+        else:
+            A = rate.pre_exponential_factor
+            b = rate.temperature_exponent
+            E = rate.activation_energy * E_fac
+        return chem.ReacInfo(ct_rxn.reversible, reactants, reac_nu,
+                             products, prod_nu, A, b, E
+                             )
+
     def handle_effiencies(reac, ct_rxn):
         """Convert Cantera `cantera.Reaction`'s third body efficienicies
            to pyJac's internal format, and return updated reaction
@@ -973,59 +1449,49 @@ def handle_effiencies(reac, ct_rxn):
         updated_reac: `ReacInfo`
             The updated pyjac reaction with appropriate third body efficiencies
         """
+        efficiencies = ct_rxn.efficiencies
+        default_efficiency = ct_rxn.default_efficiency
 
         # See if single species acts as third body
-        if rxn.default_efficiency == 0.0 \
-                and len(ct_rxn.efficiencies.keys()) == 1\
-                and list(ct_rxn.efficiencies.values())[0] == 1\
+        if default_efficiency == 0.0 \
+                and len(efficiencies) == 1\
+                and list(efficiencies.values())[0] == 1\
                 and reac.pdep:
-            reac.pdep_sp = list(rxn.efficiencies.keys())[0]
+            reac.pdep_sp = list(efficiencies.keys())[0]
+        elif default_efficiency == 1.0:
+            # only the explicit efficiencies, in species order
+            for sp in sorted(efficiencies, key=species_index.get):
+                reac.thd_body_eff.append([sp, efficiencies[sp]])
         else:
-            for sp in gas.species_names:
-                if sp in ct_rxn.efficiencies:
-                    reac.thd_body_eff.append([sp, ct_rxn.efficiencies[sp]])
-                elif ct_rxn.default_efficiency != 1.0:
-                    reac.thd_body_eff.append([sp, ct_rxn.default_efficiency])
+            for sp in species_names:
+                reac.thd_body_eff.append([sp, efficiencies.get(
+                                         sp, default_efficiency)])
         return reac
 
-    for rxn in gas.reactions():
+    for i, rxn in enumerate(gas.reactions()):
 
         if isinstance(rxn, ct.ThreeBodyReaction):
             # Instantiate internal reaction based on Cantera Reaction data.
-            reac = chem.ReacInfo(rxn.reversible,
-                                 list(rxn.reactants.keys()),
-                                 list(rxn.reactants.values()),
-                                 list(rxn.products.keys()),
-                                 list(rxn.products.values()),
-                                 rxn.rate.pre_exponential_factor,
-                                 rxn.rate.temperature_exponent,
-                                 rxn.rate.activation_energy * E_fac
-                                 )
+            reac = new_reac(i, rxn, rxn.rate)
             reac.thd_body = True
             reac = handle_effiencies(reac, rxn)
 
         elif isinstance(rxn, ct.FalloffReaction) and \
              not isinstance(rxn, ct.ChemicallyActivatedReaction):
-            reac = chem.ReacInfo(rxn.reversible,
-                                 list(rxn.reactants.keys()),
-                                 list(rxn.reactants.values()),
-                                 list(rxn.products.keys()),
-                                 list(rxn.products.values()),
-                                 rxn.high_rate.pre_exponential_factor,
-                                 rxn.high_rate.temperature_exponent,
-                                 rxn.high_rate.activation_energy * E_fac
-                                 )
+            reac = new_reac(i, rxn, rxn.high_rate)
             reac.pdep = True
             reac = handle_effiencies(reac, rxn)
 
-            reac.low = [rxn.low_rate.pre_exponential_factor,
-                        rxn.low_rate.temperature_exponent,
-                        rxn.low_rate.activation_energy * E_fac
+            low_rate = rxn.low_rate
+            reac.low = [low_rate.pre_exponential_factor,
+                        low_rate.temperature_exponent,
+                        low_rate.activation_energy * E_fac
                         ]
 
-            if rxn.falloff.type == 'Troe':
+            falloff = rxn.falloff
+            if falloff.type == 'Troe':
                 reac.troe = True
-                reac.troe_par = rxn.falloff.parameters.tolist()
+                reac.troe_par = falloff.parameters.tolist()
                 do_warn = False
                 if reac.troe_par[1] == 0:
                     reac.troe_par[1] = 1e-30
@@ -1036,31 +1502,25 @@ def handle_effiencies(reac, ct_rxn):
                 if do_warn:
                     logging.warn('Troe parameters in reaction {} modified to avoid'
                                  ' division by zero!.'.format(len(reacs)))
-            elif rxn.falloff.type == 'SRI':
+            elif falloff.type == 'SRI':
                 reac.sri = True
-                reac.sri_par = rxn.falloff.parameters.tolist()
+                reac.sri_par = falloff.parameters.tolist()
 
         elif isinstance(rxn, ct.ChemicallyActivatedReaction):
-            reac = chem.ReacInfo(rxn.reversible,
-                                 list(rxn.reactants.keys()),
-                                 list(rxn.reactants.values()),
-                                 list(rxn.products.keys()),
-                                 list(rxn.products.values()),
-                                 rxn.low_rate.pre_exponential_factor,
-                                 rxn.low_rate.temperature_exponent,
-                                 rxn.low_rate.activation_energy * E_fac
-                                 )
+            reac = new_reac(i, rxn, rxn.low_rate)
             reac.pdep = True
             reac = handle_effiencies(reac, rxn)
 
-            reac.high = [rxn.high_rate.pre_exponential_factor,
-                         rxn.high_rate.temperature_exponent,
-                         rxn.high_rate.activation_energy * E_fac
+            high_rate = rxn.high_rate
+            reac.high = [high_rate.pre_exponential_factor,
+                         high_rate.temperature_exponent,
+                         high_rate.activation_energy * E_fac
                          ]
 
-            if rxn.falloff.type == 'Troe':
+            falloff = rxn.falloff
+            if falloff.type == 'Troe':
                 reac.troe = True
-                reac.troe_par = rxn.falloff.parameters.tolist()
+                reac.troe_par = falloff.parameters.tolist()
                 do_warn = False
                 if reac.troe_par[1] == 0:
                     reac.troe_par[1] = 1e-30
@@ -1071,18 +1531,12 @@ def handle_effiencies(reac, ct_rxn):
                 if do_warn:
                     logging.warn('Troe parameters in reaction {} modified to avoid'
                                     ' division by zero!.'.format(len(reacs)))
-            elif rxn.falloff.type == 'SRI':
+            elif falloff.type == 'SRI':
                 reac.sri = True
-                reac.sri_par = rxn.falloff.parameters.tolist()
+                reac.sri_par = falloff.parameters.tolist()
 
         elif isinstance(rxn, ct.PlogReaction):
-            reac = chem.ReacInfo(rxn.reversible,
-                                 list(rxn.reactants.keys()),
-                                 list(rxn.reactants.values()),
-                                 list(rxn.products.keys()),
-                                 list(rxn.products.values()),
-                                 0.0, 0.0, 0.0
-                                 )
+            reac = new_reac(i, rxn)
             reac.plog = True
             reac.plog_par = []
             for rate in rxn.rates:
@@ -1093,13 +1547,7 @@ def handle_effiencies(reac, ct_rxn):
                 reac.plog_par.append(pars)
 
         elif isinstance(rxn, ct.ChebyshevReaction):
-            reac = chem.ReacInfo(rxn.reversible,
-                                 list(rxn.reactants.keys()),
-                                 list(rxn.reactants.values()),
-                                 list(rxn.products.keys()),
-                                 list(rxn.products.values()),
-                                 0.0, 0.0, 0.0
-                                 )
+            reac = new_reac(i, rxn)
             reac.cheb = True
             reac.cheb_n_temp = rxn.nTemperature
             reac.cheb_n_pres = rxn.nPressure
@@ -1109,20 +1557,13 @@ def handle_effiencies(reac, ct_rxn):
 
         elif isinstance(rxn, ct.ElementaryReaction):
             # Instantiate internal reaction based on Cantera Reaction data.
+            rate = rxn.rate
 
             # Ensure no reactions with zero pre-exponential factor allowed
-            if rxn.rate.pre_exponential_factor == 0.0:
+            if rate.pre_exponential_factor == 0.0:
                 continue
 
-            reac = chem.ReacInfo(rxn.reversible,
-                                 list(rxn.reactants.keys()),
-                                 list(rxn.reactants.values()),
-                                 list(rxn.products.keys()),
-                                 list(rxn.products.values()),
-                                 rxn.rate.pre_exponential_factor,
-                                 rxn.rate.temperature_exponent,
-                                 rxn.rate.activation_energy * E_fac
-                                 )
+            reac = new_reac(i, rxn, rate)
 
         else:
             print('Error: unsupported reaction.')
@@ -1134,4 +1575,6 @@ def handle_effiencies(reac, ct_rxn):
 
         reacs.append(reac)
 
+    chem.set_fingerprints(specs, reacs)
+
     return (elems, specs, reacs)
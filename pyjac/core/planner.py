@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+"""Dry-run planner of code generation.
+
+Predicts, from the parsed mechanism and the unroll limits of `CParams` and
+`CUDAParams` and without writing any code, the rate and Jacobian subfiles
+that `create_jacobian` would write, their approximate number of lines, the
+nonzero entries of the Jacobian, the memory of the Jacobian per state
+stored densely and sparsely, and an estimate of the time to compile the
+generated code. With the table-driven kernels of `table_kernels`, the
+unrolled rate and Jacobian files are replaced by the constant tables of the
+mechanism, whose size is known exactly, and loops of fixed size.
+
+The line and compile time models are calibrated on C code generated for
+synthetic mechanisms of 32 to 602 species and compiled by gcc with the
+options of `libgen` on one core (CUDA code is estimated with the same
+models); they are estimates, for comparing
+mechanisms and options before committing to a long generation and build.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import sys
+import multiprocessing
+
+# Local imports
+from .. import utils
+from . import mech_interpret as mech
+from . import mech_cache
+from .mech_arrays import MechanismIndex
+from .sparsity import SparsityPattern
+from . import CParams
+from . import CUDAParams
+from . import table_kernels as tables
+from .create_jacobian import get_elementary_rxn_dt, get_last_species
+
+line_model = {'rxn_rates': {'reactions': 12.5},
+              'rxn_rates_pres_mod': {'pdep_reactions': 7.5},
+              'spec_rates': {'coefficients': 2.6},
+              'chem_utils': {'species': 28.},
+              'dydt': {'species': 4.5},
+              'mass_mole': {'species': 6.},
+              'jacob': {'species': 6.},
+              'mechanism': {'constant': 61.},
+              'gpu_memory': {'constant': 79.}
+              }
+"""dict: Approximate lines of each source file (other than the Jacobian
+subfiles and sparse multiplier) per species, reaction, third-body or
+pressure-dependent reaction, nonzero net stoichiometric coefficient and
+constant"""
+
+jacobian_reaction_lines = 24.
+"""float: Approximate lines of the Jacobian per reaction, besides one line
+per species for each species changed by the reaction"""
+
+subfile_lines = 8
+"""int: Lines of a Jacobian subfile besides its reactions or species"""
+
+table_kernel_lines = {'rxn_rates': 25,
+                      'rxn_rates_pres_mod': 13,
+                      'spec_rates': 24,
+                      'jacob': 152,
+                      'rxn_tables': 194
+                      }
+"""dict: Lines of the loops over the constant tables of `table_kernels`, and
+of ``rxn_tables.c`` besides its tables"""
+
+compile_model = {'jacobian': (1.66e-3, 1.6e-8),
+                 'jacobian_species': (1.6e-3, 3.4e-7),
+                 'tables': (2e-5, 0.),
+                 'other': (5e-4, 0.)
+                 }
+"""dict: Seconds to compile a file per line and per line squared (the
+optimizer slows down on long functions), for the reaction and species
+subfiles of the Jacobian, the constant tables of the table-driven kernels
+and the other files"""
+
+
+def get_sparsity_pattern(specs, reacs, index):
+    """Get the nonzero entries of the Jacobian, as `write_jacobian` does,
+    without writing it.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism, the last species last.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism, with species indices.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism.
+
+    Returns
+    -------
+    pattern : `SparsityPattern`
+        The nonzero entries of the Jacobian
+
+    """
+    num_s = len(specs)
+    pattern = SparsityPattern(num_s)
+    for rxn_ind, rxn in enumerate(reacs):
+        rows = [k_sp + 1 for k_sp in index.nu[rxn_ind] if k_sp + 1 < num_s]
+        # the temperature derivative is skipped if identically zero
+        if rxn.plog or rxn.cheb or get_elementary_rxn_dt(
+                'c', specs, rxn, rxn_ind, index.rev_index.get(rxn_ind),
+                utils.get_array, False):
+            for row in rows:
+                pattern.add(row, 0)
+        for row in rows:
+            pattern.add_row(row, 1)
+    pattern.add(0, 0)
+    pattern.add_row(0, 1)
+    return pattern
+
+
+def get_table_size(specs, reacs, index):
+    """Get the size of the constant tables of the table-driven kernels, as
+    `table_kernels.write_tables` writes them.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism, the last species last.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism, with species indices.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism.
+
+    Returns
+    -------
+    lines : int
+        Lines of the definitions of the tables
+    size : int
+        Size of the tables (bytes)
+
+    """
+    lines = 0
+    size = 0
+    for ctype, values in tables.get_tables(specs, reacs, index).values():
+        # an empty table holds a zero
+        num = max(len(values), 1)
+        # the declaration, the values, the closing brace and a blank line
+        lines += 3 - (-num // tables.values_per_line[ctype])
+        size += num * (4 if ctype == 'int' else 8)
+    return lines, size
+
+
+def split_files(lines, unroll, limit, first_only=False):
+    """Split items into subfiles as the Jacobian writer does: ``unroll``
+    items per file, halving ``unroll`` while a file exceeds ``limit`` lines.
+
+    Parameters
+    ----------
+    lines : list of float
+        Lines of each item
+    unroll : int
+        Initial number of items per file
+    limit : int
+        Maximum lines per file
+    first_only : bool, optional
+        If ``True``, only the first file is checked against ``limit``
+
+    Returns
+    -------
+    unroll : int
+        The number of items per file
+    files : list of float
+        Lines of each file
+
+    """
+    while True:
+        files = [sum(lines[i:i + unroll]) + subfile_lines
+                 for i in range(0, len(lines), unroll)]
+        checked = files[:1] if first_only else files
+        if unroll <= 1 or all(n <= limit for n in checked):
+            return unroll, files
+        unroll = int(unroll / 2)
+
+
+def compile_time(lines, kind='other'):
+    """Estimate the time to compile a file.
+
+    Parameters
+    ----------
+    lines : float
+        Lines of the file
+    kind : {'jacobian', 'jacobian_species', 'tables', 'other'}, optional
+        The kind of file (see `compile_model`)
+
+    Returns
+    -------
+    time : float
+        Estimated compile time (s)
+
+    """
+    per_line, per_line_squared = compile_model[kind]
+    return per_line * lines + per_line_squared * lines * lines
+
+
+def plan(lang, specs, reacs, index=None, skip_jac=False, processes=None,
+         table_kernels=False):
+    """Plan the generation of code for a mechanism.
+
+    Parameters
+    ----------
+    lang : {'c', 'cuda'}
+        Language type.
+    specs : list of `SpecInfo`
+        List of species in the mechanism, the last species last.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism, with species indices.
+    index : `MechanismIndex`, optional
+        Lookup tables of the mechanism, if already built.
+    skip_jac : bool, optional
+        If ``True``, only the reaction rate subroutines would be generated
+    processes : int, optional
+        The number of processes compiling the files; the number of CPUs
+        (as `libgen`) if not supplied
+    table_kernels : bool, optional
+        If ``True``, the rates and the Jacobian would be table-driven kernels
+        (see `table_kernels`); C only
+
+    Returns
+    -------
+    plan : dict
+        Whether the kernels are ``table_kernels``; the number of ``species``
+        and ``reactions``; the number of
+        ``rate_files`` and ``jacobian_files`` (subfiles), and of
+        ``jacobian_reactions_per_file`` and ``jacobian_species_per_file``;
+        the estimated ``lines`` of each source file and their ``total_lines``;
+        the ``nonzeros`` of the Jacobian and its ``density``; the ``memory``
+        of the Jacobian per state, ``dense`` and ``sparse`` (values and
+        compressed column indices), in bytes; and the estimated
+        ``compile_time``, the CPU time (``cpu``) and, on ``processes``
+        processes, the ``wall`` time (s); and the size of the constant
+        ``tables`` of the table-driven kernels (bytes), or ``None``
+
+    """
+    if index is None:
+        index = MechanismIndex(specs, reacs)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    params = CParams if lang == 'c' else CUDAParams
+    ext = utils.file_ext[lang]
+    num_s = len(specs)
+    num_r = len(reacs)
+
+    counts = {'species': num_s,
+              'reactions': num_r,
+              'pdep_reactions': len(index.pdep_reacs),
+              'coefficients': sum(len(nu) for nu in index.nu),
+              'constant': 1
+              }
+    lines = {}
+    kinds = {}
+    for name, model in line_model.items():
+        if name == 'gpu_memory' and lang != 'cuda':
+            continue
+        if name == 'rxn_rates_pres_mod' and not index.pdep_reacs:
+            continue
+        lines[name + ext] = sum(model[key] * counts[key] for key in model)
+
+    table_size = None
+    if table_kernels:
+        # the unrolled rates are replaced by loops over the tables
+        table_lines, table_size = get_table_size(specs, reacs, index)
+        for name in ['rxn_rates', 'rxn_rates_pres_mod', 'spec_rates']:
+            if name + ext in lines:
+                lines[name + ext] = table_kernel_lines[name]
+        lines['rxn_tables' + ext] = table_kernel_lines['rxn_tables'] + \
+            table_lines
+        kinds['rxn_tables' + ext] = 'tables'
+
+    # reaction rate subfiles
+    rate_files = 0
+    if lang == 'cuda' and num_r > CUDAParams.Rates_Unroll:
+        rate_files = -(-num_r // CUDAParams.Rates_Unroll)
+        per_file = lines['rxn_rates' + ext] / num_r
+        for i in range(rate_files):
+            size = min(CUDAParams.Rates_Unroll,
+                       num_r - i * CUDAParams.Rates_Unroll)
+            lines['rates/rxn_rates_{}{}'.format(i, ext)] = per_file * size
+        lines['rxn_rates' + ext] = subfile_lines + rate_files
+
+    jacobian_files = 0
+    rxn_unroll = None
+    spec_unroll = None
+    pattern = None
+    if not skip_jac and table_kernels:
+        pattern = tables.get_sparsity(num_s, tables.get_seen_species(index))
+        lines['jacob' + ext] = table_kernel_lines['jacob']
+        lines['sparse_multiplier' + ext] = num_s + 4
+    elif not skip_jac:
+        pattern = get_sparsity_pattern(specs, reacs, index)
+        rxn_lines = [jacobian_reaction_lines + (num_s - 1) * len(nu)
+                     for nu in index.nu]
+        changed = [bool(rxns) for rxns in index.spec_reacs]
+        spec_lines = [2 * (num_s - 1) if changed[k_sp] else 0
+                      for k_sp in range(num_s)]
+        if num_r > params.Jacob_Unroll:
+            rxn_unroll, rxn_files = split_files(rxn_lines, params.Jacob_Unroll,
+                                                params.Max_Lines, True)
+            spec_unroll, spec_files = split_files(spec_lines,
+                                                  params.Jacob_Spec_Unroll,
+                                                  params.Max_Spec_Lines)
+            for i, size in enumerate(rxn_files + spec_files):
+                name = 'jacobs/jacob_{}{}'.format(i, ext)
+                lines[name] = size
+                kinds[name] = ('jacobian' if i < len(rxn_files)
+                               else 'jacobian_species')
+            jacobian_files = len(rxn_files) + len(spec_files)
+        else:
+            lines['jacob' + ext] += sum(rxn_lines) + sum(spec_lines)
+            kinds['jacob' + ext] = 'jacobian_species'
+
+        if lang == 'cuda':
+            untouched = num_s - int(pattern.mask.any(axis=1).sum())
+            lines['sparse_multiplier' + ext] = pattern.nnz + untouched + 4
+        else:
+            lines['sparse_multiplier' + ext] = num_s + 4
+    else:
+        del lines['jacob' + ext]
+
+    times = [compile_time(n, kinds.get(name, 'other'))
+             for name, n in lines.items()]
+    nnz = pattern.nnz if pattern is not None else None
+    return {'lang': lang,
+            'table_kernels': table_kernels,
+            'species': num_s,
+            'reactions': num_r,
+            'rate_files': rate_files,
+            'jacobian_files': jacobian_files,
+            'jacobian_reactions_per_file': rxn_unroll,
+            'jacobian_species_per_file': spec_unroll,
+            'lines': {name: int(round(n)) for name, n in lines.items()},
+            'total_lines': int(round(sum(lines.values()))),
+            'nonzeros': nnz,
+            'density': nnz / (num_s * num_s) if nnz is not None else None,
+            'memory': {'dense': 8 * num_s * num_s,
+                       'sparse': (12 * nnz + 4 * (num_s + 1)
+                                  if nnz is not None else None)
+                       },
+            'compile_time': {'cpu': sum(times),
+                             'wall': max(sum(times) / processes, max(times)),
+                             'processes': processes
+                             },
+            'tables': table_size
+            }
+
+
+def plan_generation(lang, mech_name=None, therm_name=None, gas=None,
+                    last_spec=None, skip_jac=False, parse_cache=True,
+                    parse_procs=None, processes=None, table_kernels=False):
+    """Parse a mechanism and plan the generation of its code (see `plan`).
+
+    The species are ordered as `create_jacobian` does without the cache
+    optimizer, which reorders them but does not change the number of
+    nonzero entries of the Jacobian.
+
+    Parameters
+    ----------
+    lang : {'c', 'cuda'}
+        Language type.
+    mech_name : str, optional
+        Reaction mechanism filename (e.g. 'mech.dat').
+        This or gas must be specified
+    therm_name : str, optional
+        Thermodynamic database filename (e.g. 'therm.dat')
+        or nothing if info in mechanism file.
+    gas : cantera.Solution, optional
+        The mechanism to plan for.  This or ``mech_name`` must be specified
+    last_spec : str, optional
+        If specified, the species to assign to the last index.
+    skip_jac : bool, optional
+        If ``True``, only the reaction rate subroutines would be generated
+    parse_cache : bool, optional
+        If ``True``, reuse the interpreted mechanism from the parse cache
+    parse_procs : int, optional
+        If greater than one, the number of processes used to interpret the
+        reactions of a Chemkin-format mechanism.
+    processes : int, optional
+        The number of processes compiling the files
+    table_kernels : bool, optional
+        If ``True``, plan for table-driven kernels (C only)
+
+    Returns
+    -------
+    plan : dict
+        The plan (see `plan`)
+
+    """
+    assert mech_name is not None or gas is not None, 'No mechanism specified!'
+    if lang != 'c' and table_kernels:
+        print('Error: table-driven kernels only supported for C')
+        sys.exit(2)
+    if gas is not None:
+        elems, specs, reacs = mech.read_mech_ct(mech_name, gas)
+    else:
+        elems, specs, reacs = mech_cache.read_mech_file(mech_name, therm_name,
+                                                        parse_cache,
+                                                        parse_procs
+                                                        )
+    last_spec = get_last_species(specs, last_spec)
+    fwd_spec_mapping, _ = utils.get_species_mappings(len(specs), last_spec)
+    specs = [specs[fwd_spec_mapping[i]] for i in range(len(specs))]
+    utils.reassign_species_lists(reacs, specs)
+    return plan(lang, specs, reacs, skip_jac=skip_jac, processes=processes,
+                table_kernels=table_kernels)
+
+
+def summary(plan):
+    """Return a table of a plan.
+
+    Parameters
+    ----------
+    plan : dict
+        The plan (see `plan`)
+
+    Returns
+    -------
+    summary : str
+        The table
+
+    """
+    def row(name, value):
+        return '{:<36}{:>16}'.format(name, value)
+
+    lines = [row('kernels', 'tables' if plan['table_kernels']
+                 else 'unrolled'),
+             row('species', plan['species']),
+             row('reactions', plan['reactions']),
+             row('rate subfiles', plan['rate_files']),
+             row('Jacobian subfiles', plan['jacobian_files']),
+             row('lines', plan['total_lines'])
+             ]
+    if plan['tables'] is not None:
+        lines += [row('constant tables (kB)',
+                      '{:.1f}'.format(plan['tables'] / 1024.))]
+    if plan['nonzeros'] is not None:
+        lines += [row('Jacobian nonzeros', '{} ({:.1%})'.format(
+                      plan['nonzeros'], plan['density'])),
+                  row('dense Jacobian per state (kB)',
+                      '{:.1f}'.format(plan['memory']['dense'] / 1024.)),
+                  row('sparse Jacobian per state (kB)',
+                      '{:.1f}'.format(plan['memory']['sparse'] / 1024.))
+                  ]
+    compile = plan['compile_time']
+    lines += [row('compile CPU time (s)', '{:.0f}'.format(compile['cpu'])),
+              row('compile time, {} processes (s)'.format(
+                  compile['processes']), '{:.0f}'.format(compile['wall']))
+              ]
+    return '\n'.join(lines)
+
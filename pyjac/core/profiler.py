@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Per-stage timing and memory profile of code generation.
+
+`Profiler` records the wall time, CPU time and peak traced memory (with
+`tracemalloc`) of the stages of `create_jacobian`, and the number of lines
+and bytes of each generated file, and writes them to a JSON report.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import json
+import time
+from timeit import default_timer
+from contextlib import contextmanager
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+try:
+    _cpu_time = time.process_time
+except AttributeError:
+    # Python 2
+    _cpu_time = time.clock
+
+# Local imports
+from . import file_writer
+
+report_name = 'profile.json'
+"""str: Name of the profile report in the build directory"""
+
+
+class Profiler(object):
+    """Records the cost of the stages of code generation.
+
+    Stages may be nested; the peak memory of a stage includes that of the
+    stages within it. Memory is traced process-wide, and only the peak
+    since tracing started is known before Python 3.9.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        If ``False``, nothing is recorded
+    trace_memory : bool, optional
+        If ``True``, trace memory allocations (which slows Python down) to
+        record the peak memory of each stage
+
+    Attributes
+    ----------
+    stages : list of dict
+        The ``name``, nesting ``depth``, ``wall_time`` and ``cpu_time`` (s)
+        and ``peak_memory`` (traced bytes, ``None`` if not traced) of each
+        stage, in the order finished
+    files : dict
+        The path of each generated file to its number of ``lines`` and
+        ``bytes``
+
+    """
+
+    def __init__(self, enabled=True, trace_memory=True):
+        self.enabled = enabled
+        self.stages = []
+        self.files = {}
+        self._stack = []
+        self._trace = enabled and trace_memory and tracemalloc is not None
+        self._started_tracing = False
+        if self._trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _peak(self):
+        """Peak traced memory since the last reset"""
+        return tracemalloc.get_traced_memory()[1]
+
+    def start(self, name):
+        """Start a stage, within the stage in progress (if any).
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage
+
+        """
+        if not self.enabled:
+            return
+        if self._trace and hasattr(tracemalloc, 'reset_peak'):
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], self._peak())
+            tracemalloc.reset_peak()
+        self._stack.append([name, default_timer(), _cpu_time(), 0])
+
+    def stop(self):
+        """Finish the stage in progress.
+
+        Returns
+        -------
+        stage : dict
+            The stage recorded (see `stages`)
+
+        """
+        if not self.enabled:
+            return None
+        name, wall_time, cpu_time, peak = self._stack.pop()
+        stage = {'name': name,
+                 'depth': len(self._stack),
+                 'wall_time': default_timer() - wall_time,
+                 'cpu_time': _cpu_time() - cpu_time,
+                 'peak_memory': None
+                 }
+        if self._trace:
+            stage['peak_memory'] = max(peak, self._peak())
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3],
+                                         stage['peak_memory'])
+        self.stages.append(stage)
+        return stage
+
+    @contextmanager
+    def stage(self, name):
+        """Record the block as a stage (see `start`).
+        """
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def add(self, stages):
+        """Add stages recorded by another profiler (e.g., in a worker
+        process), within the stage in progress.
+
+        Parameters
+        ----------
+        stages : list of dict
+            The stages (see `stages`)
+
+        """
+        if not self.enabled:
+            return
+        for stage in stages:
+            stage = dict(stage)
+            stage['depth'] += len(self._stack)
+            self.stages.append(stage)
+
+    def count_files(self, filenames, file_system, path):
+        """Count the lines and bytes of generated files.
+
+        Parameters
+        ----------
+        filenames : list of str
+            Names of the files
+        file_system : `file_writer.DiskTree` or `file_writer.MemoryTree`
+            The file system the files were written to
+        path : str
+            The build directory; the files are listed relative to it
+
+        """
+        if not self.enabled:
+            return
+        for filename in filenames:
+            data = file_system.read(filename)
+            name = os.path.relpath(filename, path).replace(os.sep, '/')
+            self.files[name] = {'lines': file_writer.count_lines(data),
+                                'bytes': len(data if isinstance(data, bytes)
+                                             else data.encode('utf-8'))
+                                }
+
+    def report(self):
+        """Return the stages and files recorded.
+
+        Returns
+        -------
+        report : dict
+            The ``stages`` and ``files`` (see `stages` and `files`), and the
+            ``total`` number of ``lines`` and ``bytes`` of the files, and
+            whether memory was traced (``trace_memory``)
+
+        """
+        return {'stages': self.stages,
+                'files': self.files,
+                'trace_memory': self._trace,
+                'total': {'lines': sum(f['lines'] for f in self.files.values()),
+                          'bytes': sum(f['bytes'] for f in self.files.values())
+                          }
+                }
+
+    def write(self, filename):
+        """Write the `report` as JSON, with `file_writer.open_file`.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the report
+
+        """
+        with file_writer.open_file(filename) as file:
+            file.write(json.dumps(self.report(), indent=2, sort_keys=True))
+            file.write('\n')
+
+    def summary(self):
+        """Return a table of the stages and the size of the files.
+
+        Returns
+        -------
+        summary : str
+            The table
+
+        """
+        lines = ['{:<36}{:>10}{:>10}{:>12}'.format('stage', 'wall (s)',
+                                                   'cpu (s)', 'peak (MB)'
+                                                   )]
+        for stage in self.stages:
+            peak = ('{:.1f}'.format(stage['peak_memory'] / 2.**20)
+                    if stage['peak_memory'] is not None else '-')
+            lines.append('{:<36}{:>10.2f}{:>10.2f}{:>12}'.format(
+                '  ' * stage['depth'] + stage['name'], stage['wall_time'],
+                stage['cpu_time'], peak))
+        total = self.report()['total']
+        lines.append('{} files, {} lines, {} bytes'.format(len(self.files),
+                                                           total['lines'],
+                                                           total['bytes']
+                                                           ))
+        return '\n'.join(lines)
+
+    def close(self):
+        """Stop tracing memory, if started by this profiler.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -22,6 +22,8 @@
 from . import cache_optimizer as cache
 from . import mech_auxiliary as aux
 from . import shared_memory as shared
+from .mech_arrays import MechanismIndex
+from . import file_writer
 
 
 def rxn_rate_const(A, b, E):
@@ -252,7 +254,7 @@ def get_cheb_rate(lang, rxn, write_defns=True):
 
 
 def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
-                    smm=None, auto_diff=False):
+                    smm=None, auto_diff=False, index=None, disabled=None):
     """Write reaction rate subroutine.
 
     Includes conditionals for reversible reactions.
@@ -273,24 +275,30 @@ def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
         If not ``None`` (default), `shared_memory_manager` for CUDA optimizations
     auto_diff : Optional[bool]
         If ``True``, generate files for Adept autodifferention library.
+    index : `MechanismIndex`, optional
+        Lookup tables of the mechanism; built if not given.
+    disabled : set of int, optional
+        Indices of reactions left out, whose rates are zero
 
     Returns
     -------
     None
 
     """
+    if index is None:
+        index = MechanismIndex(specs, reacs)
 
     num_s = len(specs)
     num_r = len(reacs)
-    rev_reacs = [i for i, rxn in enumerate(reacs) if rxn.rev]
+    rev_reacs = index.rev_reacs
     num_rev = len(rev_reacs)
-    pdep_reacs = [i for i, rxn in enumerate(reacs) if rxn.thd_body or rxn.pdep]
+    pdep_reacs = index.pdep_reacs
 
     pre = '__device__ ' if lang == 'cuda' else ''
     file_prefix = 'ad_' if auto_diff else ''
     pres_ref = '&' if auto_diff else ''
-    file = open(os.path.join(path, '{}rates'.format(file_prefix)
-                                + utils.header_ext[lang]), 'w')
+    file = file_writer.open_file(os.path.join(path, '{}rates'.format(file_prefix)
+                                                 + utils.header_ext[lang]), 'w')
     file.write('#ifndef RATES_HEAD\n'
                '#define RATES_HEAD\n'
                '\n'
@@ -323,12 +331,12 @@ def write_rxn_rates(path, lang, specs, reacs, fwd_rxn_mapping,
     file.close()
 
     filename = file_prefix + 'rxn_rates' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     do_unroll = False
     if lang == 'cuda' and len(reacs) > CUDAParams.Rates_Unroll:
         # make paths for separate rate files
-        utils.create_dir(os.path.join(path, 'rates'))
+        file_writer.create_dir(os.path.join(path, 'rates'))
         rate_count = 0
         do_unroll = True
         next_file = 0
@@ -355,8 +363,8 @@ def write_header(lang, rate_count):
         None
 
         """
-        with open(os.path.join(path, 'rates', 'rxn_rates_{}{}'.format(
-                        rate_count, utils.header_ext[lang])), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'rates', 'rxn_rates_{}{}'.format(
+                                         rate_count, utils.header_ext[lang])), 'w') as file:
             line = ('#ifndef RATES_HEAD_{0}\n'
                    '#define RATES_HEAD_{0}\n'
                    '\n'
@@ -563,7 +571,7 @@ def __get_arrays(sp, factor=1.0):
     for i_rxn in range(len(reacs)):
         if do_unroll and i_rxn == next_file:
             file_store = file
-            file = open(os.path.join(path, 'rates', 'rxn_rates_{}{}'.format(
+            file = file_writer.open_file(os.path.join(path, 'rates', 'rxn_rates_{}{}'.format(
                 rate_count, utils.file_ext[lang])), 'w')
             next_file = min(len(reacs), i_rxn + CUDAParams.Rates_Unroll)
             write_sub_intro(file, True, i_rxn + 1, next_file, rate_count)
@@ -587,6 +595,18 @@ def __get_arrays(sp, factor=1.0):
                 usages.append(temp - i_rxn - 1)
             smm.load_into_shared(file, the_vars, usages)
 
+        rxn_file = file
+        if disabled and i_rxn in disabled:
+            # left out, but keeping its place
+            file.write('  ' + get_array(lang, 'fwd_rxn_rates', i_rxn) +
+                       ' = 0.0' + utils.line_end[lang])
+            if rxn.rev:
+                file.write('  ' + get_array(lang, 'rev_rxn_rates',
+                                            index.rev_index[i_rxn]) +
+                           ' = 0.0' + utils.line_end[lang])
+            file.write('\n')
+            file = file_writer.NullWriter()
+
         # if reversible, save forward rate constant for use
         if rxn.rev and not rxn.rev_par and not (rxn.cheb or rxn.plog):
             line = ('  kf = ' + rxn_rate_const(rxn.A, rxn.b, rxn.E) +
@@ -669,13 +689,10 @@ def __get_arrays(sp, factor=1.0):
 
                 coeffs = {}
                 # go through product species
+                rxn_nu = index.nu[i_rxn]
                 for isp, prod_sp in enumerate(rxn.prod):
-                    # check if species also in reactants
-                    if prod_sp in rxn.reac:
-                        isp2 = rxn.reac.index(prod_sp)
-                        nu = rxn.prod_nu[isp] - rxn.reac_nu[isp2]
-                    else:
-                        nu = rxn.prod_nu[isp]
+                    # net coefficient, as species may also be reactants
+                    nu = rxn_nu.get(prod_sp, 0)
 
                     # Skip species with zero overall
                     # stoichiometric coefficient.
@@ -809,12 +826,13 @@ def __get_arrays(sp, factor=1.0):
                 file.write(line)
 
             line = '  ' + get_array(lang, 'rev_rxn_rates',
-                                    rev_reacs.index(i_rxn)
+                                    index.rev_index[i_rxn]
                                     ) + ' = '
 
             # reactants (products from forward reaction)
+            prod_nu = index.prod_nu[i_rxn]
             for isp in rxn.prod:
-                nu = rxn.prod_nu[rxn.prod.index(isp)]
+                nu = prod_nu[isp]
 
                 # check if stoichiometric coefficient is double or integer
                 if utils.is_integer(nu):
@@ -840,6 +858,7 @@ def __get_arrays(sp, factor=1.0):
             file.write(line)
 
             file.write('\n')
+        file = rxn_file
 
         if do_unroll and (i_rxn == next_file - 1 or i_rxn == len(reacs) - 1):
             file.write('}\n\n')
@@ -857,7 +876,7 @@ def __get_arrays(sp, factor=1.0):
         file.write('end\n\n')
 
     if do_unroll:
-        with open(os.path.join(path, 'rates', 'rates_include' + utils.header_ext[lang]), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'rates', 'rates_include' + utils.header_ext[lang]), 'w') as file:
             file.write('#ifndef RATES_INCLUDE_{}\n'.format(lang))
             file.write('#define RATES_INCLUDE_{}\n'.format(lang))
             for i in range(rate_count):
@@ -866,7 +885,7 @@ def __get_arrays(sp, factor=1.0):
             file.write('#endif\n')
         for i in range(rate_count):
             write_header(lang, i)
-        with open(os.path.join(path, 'rates', 'rate_list_{}'.format(lang)), 'w') as file:
+        with file_writer.open_file(os.path.join(path, 'rates', 'rate_list_{}'.format(lang)), 'w') as file:
             file.write(' '.join(['rxn_rates_{}{}'.format(i,
                utils.file_ext[lang]) for i in range(rate_count)])
                )
@@ -911,7 +930,7 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
         file_prefix = 'ad_'
         pres_ref = '&'
     filename = file_prefix + 'rxn_rates_pres_mod' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     # headers
     if lang in ['c', 'cuda']:
@@ -1295,7 +1314,7 @@ def write_rxn_pressure_mod(path, lang, specs, reacs,
 
 
 def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
-                    fwd_rxn_mapping, smm=None, auto_diff=False):
+                    fwd_rxn_mapping, smm=None, auto_diff=False, index=None):
     """Write subroutine to evaluate species rates of production.
 
     Parameters
@@ -1316,12 +1335,16 @@ def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
         If not ```None```, `shared_memory_manager` to use for CUDA optimizations
     auto_diff : bool, optional
         If ```True```, generate files for Adept autodifferention library.
+    index : `MechanismIndex`, optional
+        Lookup tables of the mechanism; built if not given.
 
     Returns
     -------
     seen : list of `bool`, ``True`` if species rate i is not identically zero
 
     """
+    if index is None:
+        index = MechanismIndex(specs, reacs)
 
     double_type = 'double'
     file_prefix =''
@@ -1330,7 +1353,7 @@ def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
         file_prefix = 'ad_'
 
     filename = file_prefix + 'spec_rates' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     if lang in ['c', 'cuda']:
         file.write('#include "header{}"\n'.format(utils.header_ext[lang])
@@ -1345,15 +1368,11 @@ def write_spec_rates(path, lang, specs, reacs, fwd_spec_mapping,
 
     num_s = len(specs)
     num_r = len(reacs)
-    rev_reacs = [i for i, rxn in enumerate(reacs) if rxn.rev]
+    rev_reacs = index.rev_reacs
     num_rev = len(rev_reacs)
 
     # pressure dependent reactions
-    pdep_reacs = []
-    for i_rxn, reac in enumerate(reacs):
-        if reac.thd_body or reac.pdep:
-            # add reaction index to list
-            pdep_reacs.append(i_rxn)
+    pdep_reacs = index.pdep_reacs
 
     line = ''
     if lang == 'cuda': line = '__device__ '
@@ -1427,19 +1446,15 @@ def __on_eviction(sp, shared, shared_ind):
         file.write(utils.line_start + utils.comment[lang] +
                     'rxn {}'.format(print_ind) + '\n')
         rxn = reacs[rind]
+        rxn_nu = index.nu[rind]
         #get allowed species
         my_specs = [x for x in set(rxn.reac + rxn.prod)
-                        if utils.get_nu(x, rxn) != 0.]
+                        if rxn_nu.get(x, 0) != 0.]
         if lang == 'cuda' and smm is not None:
             the_vars = [__get_smm_var(sp) for sp in my_specs]
             # estimate usages
-            usages = []
-            for sp in set(rxn.reac + rxn.prod):
-                temp = rind + 1
-                while (temp < len(reacs) and
-                      utils.get_nu(sp, reacs[temp])) != 0.:
-                    temp += 1
-                usages.append(temp - rind - 1)
+            usages = [index.num_following(sp, rind)
+                      for sp in set(rxn.reac + rxn.prod)]
             first_smem_use = smm.load_into_shared(file, the_vars,
                                                   usages, load=False
                                                   )
@@ -1449,7 +1464,7 @@ def __on_eviction(sp, shared, shared_ind):
             sp = specs[spind]
 
             #find nu
-            nu = utils.get_nu(spind, rxn)
+            nu = rxn_nu.get(spind, 0)
             if nu == 0.0:
                 continue
 
@@ -1497,7 +1512,7 @@ def __on_eviction(sp, shared, shared_ind):
                 rxn_out = (
                     '(' + get_array(lang, 'fwd_rates', rind) +
                     ' - ' + get_array(lang, 'rev_rates',
-                                rev_reacs.index(rind)) + ')'
+                                index.rev_index[rind]) + ')'
                     )
             else:
                 rxn_out = get_array(lang, 'fwd_rates', rind)
@@ -1506,7 +1521,7 @@ def __on_eviction(sp, shared, shared_ind):
 
             # pressure dependence modification
             if rxn.thd_body or rxn.pdep:
-                pind = pdep_reacs.index(rind)
+                pind = index.pdep_index[rind]
                 rxn_out += ' * ' + get_array(lang, 'pres_mod', pind)
 
             # if lang == 'cuda':
@@ -1578,8 +1593,8 @@ def write_chem_utils(path, lang, specs, auto_diff):
     num_s = len(specs)
 
     pre = '__device__ ' if lang == 'cuda' else ''
-    file = open(os.path.join(path, file_prefix + 'chem_utils'
-                             + utils.header_ext[lang]), 'w')
+    file = file_writer.open_file(os.path.join(path, file_prefix + 'chem_utils'
+                                              + utils.header_ext[lang]), 'w')
     file.write('#ifndef CHEM_UTILS_HEAD\n'
                '#define CHEM_UTILS_HEAD\n'
                '\n'
@@ -1608,7 +1623,7 @@ def write_chem_utils(path, lang, specs, auto_diff):
     file.close()
 
     filename = file_prefix + 'chem_utils' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     if lang in ['c', 'cuda']:
         file.write('#include "header{}"\n'.format(utils.header_ext[lang]))
@@ -2127,8 +2142,8 @@ def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False):
     if lang == 'cuda': pre = '__device__ '
 
     # first write header file
-    file = open(os.path.join(path, file_prefix + 'dydt' +
-                            utils.header_ext[lang]), 'w')
+    file = file_writer.open_file(os.path.join(path, file_prefix + 'dydt' +
+                                             utils.header_ext[lang]), 'w')
     file.write('#ifndef DYDT_HEAD\n'
                '#define DYDT_HEAD\n'
                '\n'
@@ -2150,7 +2165,7 @@ def write_derivs(path, lang, specs, reacs, specs_nonzero, auto_diff=False):
     file.close()
 
     filename = file_prefix + 'dydt' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     file.write('#include "header{}"\n'.format(utils.header_ext[lang]))
 
@@ -2511,7 +2526,7 @@ def write_mass_mole(path, lang, specs):
     # Create header file
     if lang in ['c', 'cuda']:
         arr_lang = 'c'
-        file = open(os.path.join(path, 'mass_mole{}'.format(
+        file = file_writer.open_file(os.path.join(path, 'mass_mole{}'.format(
             utils.header_ext[lang])), 'w')
 
         file.write(
@@ -2530,7 +2545,7 @@ def write_mass_mole(path, lang, specs):
 
     # Open file; both C and CUDA programs use C file (only used on host)
     filename = 'mass_mole' + utils.file_ext[lang]
-    file = open(os.path.join(path, filename), 'w')
+    file = file_writer.open_file(os.path.join(path, filename), 'w')
 
     if lang in ['c', 'cuda']:
         file.write('#include "mass_mole{}"\n\n'.format(
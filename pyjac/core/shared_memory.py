@@ -57,6 +57,12 @@ def to_string(self):
         return utils.get_array(self.lang, self.base, self.index)
 
 
+def _unused_since_last_load(var):
+    """Default self-eviction strategy of the `shared_memory_manager` (a
+    module-level function, so managers can be sent to worker processes).
+    """
+    return var.last_use_count >= 2
+
 class shared_memory_manager(object):
     """Manager for GPU shared memory.
     """
@@ -90,7 +96,7 @@ def __init__(self, blocks_per_sm=8, num_threads=64, L1_PREFERRED=True):
         self.shared_indexes = [True for i in range(self.shared_per_thread)]
         self.eviction_marking = [False for i in range(self.shared_per_thread)]
         self.on_eviction = None
-        self.self_eviction_strategy = lambda x: x.last_use_count >= 2
+        self.self_eviction_strategy = _unused_since_last_load
 
     def force_eviction(self):
         """Forces eviction of the manager's internal dictionary.
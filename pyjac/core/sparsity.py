@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Sparsity pattern of the Jacobian matrix.
+
+Records which entries of the Jacobian the generated code assigns, so that
+the Jacobian writer knows whether an entry is assigned or updated, and the
+sparse multiplier only multiplies the nonzero entries.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+
+class SparsityPattern(object):
+    """The nonzero entries of a square matrix, e.g., the Jacobian.
+
+    The entries are stored as a boolean mask, one byte per entry; the
+    nonzero column indices of each row and row indices of each column are
+    found from it without scanning the other rows or columns.
+
+    Parameters
+    ----------
+    nvars : int
+        Number of rows (and columns) of the matrix
+
+    Attributes
+    ----------
+    nvars : int
+        Number of rows (and columns) of the matrix
+    mask : numpy.ndarray
+        ``True`` for the nonzero entries, indexed by row and column
+
+    """
+
+    def __init__(self, nvars):
+        self.nvars = nvars
+        self.mask = np.zeros((nvars, nvars), dtype=bool)
+
+    def __contains__(self, entry):
+        """Whether the entry, a tuple of row and column, is nonzero.
+        """
+        return bool(self.mask[entry])
+
+    def add(self, row, col):
+        """Mark an entry as nonzero.
+
+        Parameters
+        ----------
+        row : int
+            Row of the entry
+        col : int
+            Column of the entry
+
+        """
+        self.mask[row, col] = True
+
+    def add_row(self, row, start=0, stop=None):
+        """Mark the entries of a row in a range of columns as nonzero.
+
+        Parameters
+        ----------
+        row : int
+            Row of the entries
+        start : int, optional
+            First column
+        stop : int, optional
+            End of the columns; the last column if not supplied
+
+        """
+        self.mask[row, start:stop] = True
+
+    def copy(self):
+        """Return a copy of the pattern.
+        """
+        pattern = SparsityPattern.__new__(SparsityPattern)
+        pattern.nvars = self.nvars
+        pattern.mask = self.mask.copy()
+        return pattern
+
+    @property
+    def nnz(self):
+        """int: Number of nonzero entries"""
+        return int(np.count_nonzero(self.mask))
+
+    def row_indices(self, col):
+        """Return the rows of the nonzero entries of a column, in order.
+
+        Parameters
+        ----------
+        col : int
+            The column
+
+        Returns
+        -------
+        rows : numpy.ndarray
+            Row indices
+
+        """
+        return np.flatnonzero(self.mask[:, col])
+
+    def col_indices(self, row):
+        """Return the columns of the nonzero entries of a row, in order.
+
+        Parameters
+        ----------
+        row : int
+            The row
+
+        Returns
+        -------
+        cols : numpy.ndarray
+            Column indices
+
+        """
+        return np.flatnonzero(self.mask[row])
+
+    def flat_indices(self):
+        """Return the indices of the nonzero entries in the flattened,
+        column-major matrix (as the Jacobian is stored), in order.
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            ``row + nvars * col`` of each nonzero entry
+
+        """
+        return np.flatnonzero(self.mask.T)
+
+    def to_dict(self):
+        """Return the pattern as a JSON-compatible dictionary.
+
+        Each column is stored as the runs of consecutive nonzero rows, so
+        that a dense column takes a single run.
+
+        Returns
+        -------
+        pattern : dict
+            The ``nvars``, the number of ``nonzeros``, and the ``columns``:
+            for each column, a list of ``[start, stop]`` ranges of rows
+
+        """
+        columns = []
+        for col in range(self.nvars):
+            edges = np.diff(np.concatenate(([0], self.mask[:, col].astype(
+                np.int8), [0])))
+            starts = np.flatnonzero(edges == 1).tolist()
+            stops = np.flatnonzero(edges == -1).tolist()
+            columns.append([list(run) for run in zip(starts, stops)])
+        return {'nvars': self.nvars,
+                'nonzeros': self.nnz,
+                'columns': columns
+                }
+
+    @classmethod
+    def from_dict(cls, pattern):
+        """Build a pattern from its dictionary (see `to_dict`).
+
+        Parameters
+        ----------
+        pattern : dict
+            The pattern, as returned by `to_dict`
+
+        Returns
+        -------
+        pattern : `SparsityPattern`
+            The pattern
+
+        """
+        new = cls(pattern['nvars'])
+        for col, runs in enumerate(pattern['columns']):
+            for start, stop in runs:
+                new.mask[start:stop, col] = True
+        return new
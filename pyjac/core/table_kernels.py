@@ -0,0 +1,937 @@
+# -*- coding: utf-8 -*-
+"""Table-driven kernels, an alternative to the fully unrolled C code.
+
+The unrolled writers of `rate_subs` and `create_jacobian` emit code for each
+reaction (and each pair of reaction and species for the Jacobian), whose
+size, compile time and instruction footprint grow with the mechanism.
+Instead, these writers emit the mechanism as constant arrays in
+``rxn_tables.c`` (Arrhenius, PLOG and Chebyshev parameters, stoichiometric
+coefficients and third-body efficiencies in compressed sparse row form,
+falloff parameters and NASA coefficients), and compact loops over them:
+
+* ``rxn_rates.c``, ``rxn_rates_pres_mod.c`` and ``spec_rates.c``, with the
+  interfaces of the unrolled code, so that ``dydt.c`` and the other files
+  are unchanged;
+* ``jacob.c``, the analytical Jacobian, accumulating the derivatives of
+  each reaction rate with respect to the concentrations only for the species
+  of the reaction, and then applying the chain rule to the mass fractions
+  and temperature.
+
+Only C is supported. The results agree with the unrolled code to round-off
+(the unrolled code prints some falloff and Chebyshev parameters with fewer
+digits).
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import math
+from collections import OrderedDict
+
+# Local imports
+from . import chem_utilities as chem
+from .sparsity import SparsityPattern
+from . import file_writer
+
+kf_kinds = OrderedDict([('KF_OFF', 0), ('KF_ARRHENIUS', 1), ('KF_PLOG', 2),
+                        ('KF_CHEB', 3)])
+"""OrderedDict: The kinds of forward rate constant of the table
+``tbl_kf_kind``; reactions left out are ``KF_OFF``"""
+
+pm_kinds = OrderedDict([('PM_THD', 0), ('PM_LINDEMANN', 1), ('PM_TROE', 2),
+                        ('PM_SRI', 3)])
+"""OrderedDict: The kinds of pressure modification of the table
+``tbl_pm_kind``"""
+
+values_per_line = {'int': 16, 'double': 4}
+"""dict: The values of a constant table written per line, by C type"""
+
+_restrict = '__restrict__'
+
+
+def _arrhenius(par):
+    """The A, b and E of Arrhenius coefficients"""
+    return float(par[0]), float(par[1]), float(par[2])
+
+
+def get_tables(specs, reacs, index, disabled=None):
+    """Build the constant tables describing a mechanism.
+
+    Parameters
+    ----------
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism, with species by index (see
+        `utils.reassign_species_lists`)
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
+    disabled : set of int, optional
+        Indices of reactions left out, whose rates are zero
+
+    Returns
+    -------
+    tables : OrderedDict
+        The C type (``'int'`` or ``'double'``) and the values of each table,
+        by name. Tables of pairs or rows are flattened; the per-reaction
+        lists (reactants, products, net coefficients, PLOG and Chebyshev
+        parameters, efficiencies) are in compressed sparse row form, e.g.
+        the reactants of reaction ``i`` are ``tbl_reac_sp[tbl_reac_ptr[i]]``
+        to ``tbl_reac_sp[tbl_reac_ptr[i + 1] - 1]``.
+
+    """
+    disabled = disabled or set()
+    tables = OrderedDict()
+
+    def add(name, ctype, values):
+        tables[name] = (ctype, list(values))
+
+    # species: molecular weights and NASA coefficients, rearranged as the
+    # coefficients of the B terms of the equilibrium constants
+    add('tbl_mw', 'double', [sp.mw for sp in specs])
+    add('tbl_mw_inv', 'double', [1.0 / sp.mw for sp in specs])
+    add('tbl_Tmid', 'double', [sp.Trange[1] for sp in specs])
+    for name, attr in [('tbl_b_lo', 'lo'), ('tbl_b_hi', 'hi')]:
+        coeffs = []
+        for sp in specs:
+            a = getattr(sp, attr)
+            coeffs.extend([a[6] - a[0], a[0] - 1.0, a[1] / 2.0, a[2] / 6.0,
+                           a[3] / 12.0, a[4] / 20.0, a[5]])
+        add(name, 'double', coeffs)
+
+    # reactions
+    kind = []
+    aux = []
+    rev_ind = []
+    pm_ind = []
+    plog_ptr = [0]
+    plog = []
+    cheb = []
+    cheb_ptr = [0]
+    reac_ptr = [0]
+    reac = []
+    prod_ptr = [0]
+    prod = []
+    nu_ptr = [0]
+    nu = []
+    for i, rxn in enumerate(reacs):
+        if i in disabled:
+            kind.append(kf_kinds['KF_OFF'])
+        elif rxn.plog:
+            kind.append(kf_kinds['KF_PLOG'])
+        elif rxn.cheb:
+            kind.append(kf_kinds['KF_CHEB'])
+        else:
+            kind.append(kf_kinds['KF_ARRHENIUS'])
+        if rxn.plog:
+            aux.append(len(plog_ptr) - 1)
+            plog.extend(rxn.plog_par)
+            plog_ptr.append(len(plog))
+        elif rxn.cheb:
+            aux.append(len(cheb))
+            cheb.append(rxn)
+            cheb_ptr.append(cheb_ptr[-1] + rxn.cheb_n_temp * rxn.cheb_n_pres)
+        else:
+            aux.append(-1)
+        rev_ind.append(index.rev_index.get(i, -1))
+        pm_ind.append(index.pdep_index.get(i, -1))
+
+        reac.extend(zip(rxn.reac, rxn.reac_nu))
+        reac_ptr.append(len(reac))
+        prod_nu = index.prod_nu[i]
+        prod.extend((isp, prod_nu[isp]) for isp in rxn.prod)
+        prod_ptr.append(len(prod))
+        nu.extend(sorted(index.nu[i].items()))
+        nu_ptr.append(len(nu))
+
+    add('tbl_kf_kind', 'int', kind)
+    add('tbl_kf_aux', 'int', aux)
+    add('tbl_A', 'double', [rxn.A for rxn in reacs])
+    add('tbl_b', 'double', [rxn.b for rxn in reacs])
+    add('tbl_E', 'double', [rxn.E for rxn in reacs])
+    add('tbl_rev_ind', 'int', rev_ind)
+    add('tbl_pm_ind', 'int', pm_ind)
+    for name, ptr, vals in [('reac', reac_ptr, reac), ('prod', prod_ptr, prod),
+                            ('nu', nu_ptr, nu)]:
+        add('tbl_{}_ptr'.format(name), 'int', ptr)
+        add('tbl_{}_sp'.format(name), 'int', [isp for isp, _ in vals])
+        add('tbl_{}_nu'.format(name), 'double', [val for _, val in vals])
+
+    # reversible reactions: explicit reverse Arrhenius coefficients, or the
+    # factor (PA / RU)^sum(nu) of the equilibrium constant
+    rev = [reacs[i] for i in index.rev_reacs]
+    rev_par = [_arrhenius(rxn.rev_par) if rxn.rev_par else (0.0, 0.0, 0.0)
+               for rxn in rev]
+    add('tbl_rev_kind', 'int', [1 if rxn.rev_par else 0 for rxn in rev])
+    add('tbl_rev_A', 'double', [par[0] for par in rev_par])
+    add('tbl_rev_b', 'double', [par[1] for par in rev_par])
+    add('tbl_rev_E', 'double', [par[2] for par in rev_par])
+    add('tbl_kc_fac', 'double',
+        [(chem.PA / chem.RU) ** sum(index.nu[i].values())
+         for i in index.rev_reacs])
+
+    # PLOG reactions
+    add('tbl_plog_ptr', 'int', plog_ptr)
+    add('tbl_plog_P', 'double', [par[0] for par in plog])
+    add('tbl_plog_logP', 'double', [math.log(par[0]) for par in plog])
+    add('tbl_plog_A', 'double', [par[1] for par in plog])
+    add('tbl_plog_b', 'double', [par[2] for par in plog])
+    add('tbl_plog_E', 'double', [par[3] for par in plog])
+
+    # Chebyshev reactions, with coefficients by temperature then pressure
+    add('tbl_cheb_ptr', 'int', cheb_ptr)
+    add('tbl_cheb_nT', 'int', [rxn.cheb_n_temp for rxn in cheb])
+    add('tbl_cheb_nP', 'int', [rxn.cheb_n_pres for rxn in cheb])
+    add('tbl_cheb_Tsum', 'double', [1.0 / rxn.cheb_tlim[0] +
+                                    1.0 / rxn.cheb_tlim[1] for rxn in cheb])
+    add('tbl_cheb_Tsub', 'double', [1.0 / rxn.cheb_tlim[1] -
+                                    1.0 / rxn.cheb_tlim[0] for rxn in cheb])
+    add('tbl_cheb_Psum', 'double', [math.log10(rxn.cheb_plim[0]) +
+                                    math.log10(rxn.cheb_plim[1])
+                                    for rxn in cheb])
+    add('tbl_cheb_Psub', 'double', [math.log10(rxn.cheb_plim[1]) -
+                                    math.log10(rxn.cheb_plim[0])
+                                    for rxn in cheb])
+    add('tbl_cheb_par', 'double', [val for rxn in cheb for row in
+                                   rxn.cheb_par.tolist() for val in row])
+
+    # third-body and pressure-dependent reactions
+    pm_kind = []
+    pm_low = []
+    pm_lim = []
+    pm_sp = []
+    pm_par = []
+    eff_ptr = [0]
+    eff = []
+    for i in index.pdep_reacs:
+        rxn = reacs[i]
+        par = [0.0] * 5
+        if rxn.thd_body:
+            pm_kind.append(pm_kinds['PM_THD'])
+        elif rxn.troe:
+            pm_kind.append(pm_kinds['PM_TROE'])
+            par[:len(rxn.troe_par)] = rxn.troe_par
+        elif rxn.sri:
+            pm_kind.append(pm_kinds['PM_SRI'])
+            par[:3] = rxn.sri_par[:3]
+            # as the unrolled code, the factor d * T^e is only used if
+            # neither is trivial
+            if (len(rxn.sri_par) == 5 and rxn.sri_par[3] != 1.0 and
+                    rxn.sri_par[4] != 0.0):
+                par[3:] = rxn.sri_par[3:]
+            else:
+                par[3:] = [1.0, 0.0]
+        else:
+            pm_kind.append(pm_kinds['PM_LINDEMANN'])
+        pm_par.extend(par)
+        # the limit of the pressure-dependent reaction other than that of
+        # its forward Arrhenius coefficients
+        pm_low.append(0 if rxn.high else 1)
+        if rxn.low:
+            pm_lim.append(_arrhenius(rxn.low))
+        elif rxn.high:
+            pm_lim.append(_arrhenius(rxn.high))
+        else:
+            pm_lim.append(_arrhenius([rxn.A, rxn.b, rxn.E]))
+        pm_sp.append(rxn.pdep_sp if rxn.pdep and
+                     rxn.pdep_sp not in ('', None) else -1)
+        eff.extend((isp, val - 1.0) for isp, val in rxn.thd_body_eff
+                   if val != 1.0)
+        eff_ptr.append(len(eff))
+    add('tbl_pm_kind', 'int', pm_kind)
+    add('tbl_pm_rxn', 'int', index.pdep_reacs)
+    add('tbl_pm_low', 'int', pm_low)
+    add('tbl_pm_A', 'double', [par[0] for par in pm_lim])
+    add('tbl_pm_b', 'double', [par[1] for par in pm_lim])
+    add('tbl_pm_E', 'double', [par[2] for par in pm_lim])
+    add('tbl_pm_sp', 'int', pm_sp)
+    add('tbl_pm_par', 'double', pm_par)
+    add('tbl_eff_ptr', 'int', eff_ptr)
+    add('tbl_eff_sp', 'int', [isp for isp, _ in eff])
+    add('tbl_eff', 'double', [val for _, val in eff])
+
+    return tables
+
+
+def get_seen_species(index):
+    """Return whether each species is changed by any reaction.
+
+    Parameters
+    ----------
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
+
+    Returns
+    -------
+    seen : list of `bool`
+        ``True`` if species rate i is not identically zero (as returned by
+        `rate_subs.write_spec_rates`)
+
+    """
+    return [bool(reacs) for reacs in index.spec_reacs]
+
+
+def get_sparsity(num_s, seen):
+    """Return the nonzero entries of the Jacobian of the table-driven code.
+
+    The temperature row, and the row of each species changed by a reaction,
+    are dense: the derivatives with respect to the mass fractions include
+    those of the density and of the last species.
+
+    Parameters
+    ----------
+    num_s : int
+        Number of species (and of rows of the Jacobian)
+    seen : list of `bool`
+        Whether each species is changed by any reaction
+
+    Returns
+    -------
+    pattern : `SparsityPattern`
+        The nonzero entries of the Jacobian
+
+    """
+    pattern = SparsityPattern(num_s)
+    pattern.add_row(0)
+    for k_sp in range(num_s - 1):
+        if seen[k_sp]:
+            pattern.add_row(k_sp + 1)
+    return pattern
+
+
+def _write_table(file, name, ctype, values):
+    """Write the definition of a constant table.
+
+    C has no empty arrays, so an empty table holds a zero.
+    """
+    values = values or [0]
+    if ctype == 'int':
+        text = [str(int(val)) for val in values]
+    else:
+        text = ['{:.16e}'.format(val) for val in values]
+    per_line = values_per_line[ctype]
+    file.write('const {} {}[{}] = {{\n'.format(ctype, name, len(values)))
+    for start in range(0, len(text), per_line):
+        file.write('  ' + ', '.join(text[start:start + per_line]) + ',\n')
+    file.write('};\n\n')
+
+
+_helpers = """\
+static double conc_pow (const double C, const double nu) {
+  if (nu == 1.0)
+    return C;
+  if (nu == 2.0)
+    return C * C;
+  if (nu == 3.0)
+    return C * C * C;
+  return pow(C, nu);
+}
+
+double tbl_conc_prod (const double * __restrict__ C, const int start, const int end, const int * __restrict__ sp, const double * __restrict__ nu, const int skip) {
+  double prod = 1.0;
+  for (int n = start; n < end; ++n) {
+    if (n != skip)
+      prod *= conc_pow(C[sp[n]], nu[n]);
+    else if (nu[n] != 1.0)
+      prod *= nu[n] * conc_pow(C[sp[n]], nu[n] - 1.0);
+  }
+  return prod;
+}
+
+void tbl_eval_b (const double T, const double logT, double * __restrict__ B, double * __restrict__ dBdT) {
+  for (int k = 0; k < NSP; ++k) {
+    const double * a = T <= tbl_Tmid[k] ? &tbl_b_lo[7 * k] : &tbl_b_hi[7 * k];
+    B[k] = a[0] + a[1] * logT + T * (a[2] + T * (a[3] + T * (a[4] + a[5] * T))) - a[6] / T;
+    if (dBdT)
+      dBdT[k] = (a[1] + a[6] / T) / T + a[2] + T * (2.0 * a[3] + T * (3.0 * a[4] + 4.0 * a[5] * T));
+  }
+}
+
+double tbl_eval_kf (const int i, const double T, const double logT, const double pres, double * __restrict__ dlnkf) {
+  if (tbl_kf_kind[i] == KF_PLOG) {
+    const int first = tbl_plog_ptr[tbl_kf_aux[i]];
+    const int last = tbl_plog_ptr[tbl_kf_aux[i] + 1] - 1;
+    int j = -1;
+    if (pres <= tbl_plog_P[first])
+      j = first;
+    else if (pres > tbl_plog_P[last])
+      j = last;
+    if (j >= 0) {
+      if (dlnkf)
+        *dlnkf = (tbl_plog_b[j] + tbl_plog_E[j] / T) / T;
+      return tbl_plog_A[j] * exp(tbl_plog_b[j] * logT - tbl_plog_E[j] / T);
+    }
+    // interpolate in log(pres) between the enclosing pressures
+    for (j = first; pres > tbl_plog_P[j + 1]; ++j);
+    const double lnk1 = log(tbl_plog_A[j]) + tbl_plog_b[j] * logT - tbl_plog_E[j] / T;
+    const double lnk2 = log(tbl_plog_A[j + 1]) + tbl_plog_b[j + 1] * logT - tbl_plog_E[j + 1] / T;
+    const double w = (log(pres) - tbl_plog_logP[j]) / (tbl_plog_logP[j + 1] - tbl_plog_logP[j]);
+    if (dlnkf) {
+      const double d1 = (tbl_plog_b[j] + tbl_plog_E[j] / T) / T;
+      const double d2 = (tbl_plog_b[j + 1] + tbl_plog_E[j + 1] / T) / T;
+      *dlnkf = d1 + (d2 - d1) * w;
+    }
+    return exp(lnk1 + (lnk2 - lnk1) * w);
+  }
+  if (tbl_kf_kind[i] == KF_CHEB) {
+    const int c = tbl_kf_aux[i];
+    const int nT = tbl_cheb_nT[c];
+    const int nP = tbl_cheb_nP[c];
+    const double * par = &tbl_cheb_par[tbl_cheb_ptr[c]];
+    const double Tred = (2.0 / T - tbl_cheb_Tsum[c]) / tbl_cheb_Tsub[c];
+    const double Pred = (2.0 * log10(pres) - tbl_cheb_Psum[c]) / tbl_cheb_Psub[c];
+    // Chebyshev polynomials of Tred (and their derivatives) by recurrence
+    double Tn = 1.0, Tn_1 = 0.0, dTn = 0.0, dTn_1 = 0.0;
+    double logk = 0.0, dlogk = 0.0;
+    for (int n = 0; n < nT; ++n) {
+      if (n > 0) {
+        const double next = n == 1 ? Tred : 2.0 * Tred * Tn - Tn_1;
+        const double dnext = n == 1 ? 1.0 : 2.0 * Tn + 2.0 * Tred * dTn - dTn_1;
+        Tn_1 = Tn;
+        Tn = next;
+        dTn_1 = dTn;
+        dTn = dnext;
+      }
+      double dot = 0.0, Pl = 1.0, Pl_1 = 0.0;
+      for (int l = 0; l < nP; ++l) {
+        if (l > 0) {
+          const double next = l == 1 ? Pred : 2.0 * Pred * Pl - Pl_1;
+          Pl_1 = Pl;
+          Pl = next;
+        }
+        dot += par[n * nP + l] * Pl;
+      }
+      logk += dot * Tn;
+      dlogk += dot * dTn;
+    }
+    if (dlnkf)
+      *dlnkf = -2.0 * TBL_LN10 * dlogk / (T * T * tbl_cheb_Tsub[c]);
+    return pow(10.0, logk);
+  }
+  if (dlnkf)
+    *dlnkf = (tbl_b[i] + tbl_E[i] / T) / T;
+  return tbl_A[i] * exp(tbl_b[i] * logT - tbl_E[i] / T);
+}
+
+double tbl_eval_kr (const int i, const double T, const double logT, const double kf, const double dlnkf, const double * __restrict__ B, const double * __restrict__ dBdT, double * __restrict__ dlnkr) {
+  const int r = tbl_rev_ind[i];
+  if (tbl_rev_kind[r]) {
+    if (dlnkr)
+      *dlnkr = (tbl_rev_b[r] + tbl_rev_E[r] / T) / T;
+    return tbl_rev_A[r] * exp(tbl_rev_b[r] * logT - tbl_rev_E[r] / T);
+  }
+  // through the equilibrium constant
+  double sum = 0.0, dsum = 0.0;
+  for (int n = tbl_nu_ptr[i]; n < tbl_nu_ptr[i + 1]; ++n) {
+    sum += tbl_nu_nu[n] * B[tbl_nu_sp[n]];
+    if (dlnkr)
+      dsum += tbl_nu_nu[n] * dBdT[tbl_nu_sp[n]];
+  }
+  if (dlnkr)
+    *dlnkr = dlnkf - dsum;
+  return kf / (tbl_kc_fac[r] * exp(sum));
+}
+
+double tbl_eval_pres_mod (const int p, const double T, const double logT, const double m, const double * __restrict__ C, double * __restrict__ dpdT, double * __restrict__ dpdX) {
+  // the third-body concentration, or that of the specific species
+  double X;
+  if (tbl_pm_sp[p] >= 0) {
+    X = C[tbl_pm_sp[p]];
+  } else {
+    X = m;
+    for (int n = tbl_eff_ptr[p]; n < tbl_eff_ptr[p + 1]; ++n)
+      X += tbl_eff[n] * C[tbl_eff_sp[n]];
+  }
+  const int kind = tbl_pm_kind[p];
+  if (kind == PM_THD) {
+    if (dpdT) {
+      *dpdT = 0.0;
+      *dpdX = 1.0;
+    }
+    return X;
+  }
+
+  // reduced pressure
+  const int i = tbl_pm_rxn[p];
+  const double k = tbl_A[i] * exp(tbl_b[i] * logT - tbl_E[i] / T);
+  const double dlnk = (tbl_b[i] + tbl_E[i] / T) / T;
+  const double klim = tbl_pm_A[p] * exp(tbl_pm_b[p] * logT - tbl_pm_E[p] / T);
+  const double dlnklim = (tbl_pm_b[p] + tbl_pm_E[p] / T) / T;
+  const int low = tbl_pm_low[p];
+  const double ratio = low ? klim / k : k / klim;
+  const double dlnratio = low ? dlnklim - dlnk : dlnk - dlnklim;
+  const double Pr = ratio * X;
+
+  // Pr / (1 + Pr) for falloff, 1 / (1 + Pr) for chemically activated
+  const double P = low ? Pr / (1.0 + Pr) : 1.0 / (1.0 + Pr);
+  const double dP = (low ? 1.0 : -1.0) / ((1.0 + Pr) * (1.0 + Pr));
+
+  // broadening factor, and its derivatives at constant T and Pr
+  double F = 1.0, dFdPr = 0.0, dFdT = 0.0;
+  const double * par = &tbl_pm_par[5 * p];
+  if (kind == PM_TROE) {
+    const double e3 = exp(-T / par[1]);
+    const double e1 = exp(-T / par[2]);
+    const double e2 = par[3] != 0.0 ? exp(-par[3] / T) : 0.0;
+    const double Fcent = (1.0 - par[0]) * e3 + par[0] * e1 + e2;
+    const double dFcent = -(1.0 - par[0]) * e3 / par[1] - par[0] * e1 / par[2] + par[3] * e2 / (T * T);
+    const double logFcent = log10(fmax(Fcent, 1.0e-300));
+    const double dlogFcent = Fcent > 1.0e-300 ? dFcent / (Fcent * TBL_LN10) : 0.0;
+    const double x = log10(fmax(Pr, 1.0e-300));
+    const double dx = Pr > 1.0e-300 ? 1.0 / (Pr * TBL_LN10) : 0.0;
+    const double A = x - 0.67 * logFcent - 0.4;
+    const double B = 0.806 - 1.1762 * logFcent - 0.14 * x;
+    const double r = A / B;
+    const double den = 1.0 + r * r;
+    F = pow(10.0, logFcent / den);
+    const double dlogF_dr = -2.0 * logFcent * r / (den * den);
+    const double dlogF_dx = dlogF_dr * (B + 0.14 * A) / (B * B);
+    const double dlogF_dL = 1.0 / den + dlogF_dr * (1.1762 * A - 0.67 * B) / (B * B);
+    dFdPr = F * TBL_LN10 * dlogF_dx * dx;
+    dFdT = F * TBL_LN10 * dlogF_dL * dlogFcent;
+  } else if (kind == PM_SRI) {
+    const double x = log10(fmax(Pr, 1.0e-300));
+    const double dx = Pr > 1.0e-300 ? 1.0 / (Pr * TBL_LN10) : 0.0;
+    const double Xs = 1.0 / (1.0 + x * x);
+    const double eb = exp(-par[1] / T);
+    const double ec = exp(-T / par[2]);
+    const double base = par[0] * eb + ec;
+    F = pow(base, Xs) * par[3] * pow(T, par[4]);
+    dFdPr = F * log(base) * -2.0 * x * Xs * Xs * dx;
+    dFdT = F * (Xs * (par[0] * par[1] * eb / (T * T) - ec / par[2]) / base + par[4] / T);
+  }
+
+  if (dpdT) {
+    const double dpdPr = F * dP + P * dFdPr;
+    *dpdX = dpdPr * ratio;
+    *dpdT = dpdPr * Pr * dlnratio + P * dFdT;
+  }
+  return F * P;
+}
+"""
+"""str: The kernels shared by the rates and the Jacobian"""
+
+_prototypes = """\
+double tbl_conc_prod (const double * __restrict__, const int, const int, const int * __restrict__, const double * __restrict__, const int);
+void tbl_eval_b (const double, const double, double * __restrict__, double * __restrict__);
+double tbl_eval_kf (const int, const double, const double, const double, double * __restrict__);
+double tbl_eval_kr (const int, const double, const double, const double, const double, const double * __restrict__, const double * __restrict__, double * __restrict__);
+double tbl_eval_pres_mod (const int, const double, const double, const double, const double * __restrict__, double * __restrict__, double * __restrict__);
+"""
+"""str: The declarations of `_helpers`"""
+
+
+def write_tables(path, specs, reacs, index, disabled=None):
+    """Write the constant tables of the mechanism, and the kernels shared by
+    the rates and the Jacobian, to ``rxn_tables.h`` and ``rxn_tables.c``.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
+    disabled : set of int, optional
+        Indices of reactions left out, whose rates are zero
+
+    Returns
+    -------
+    None
+
+    """
+    tables = get_tables(specs, reacs, index, disabled)
+
+    with file_writer.open_file(os.path.join(path, 'rxn_tables.h'),
+                               'w') as file:
+        file.write('#ifndef RXN_TABLES_HEAD\n'
+                   '#define RXN_TABLES_HEAD\n'
+                   '\n'
+                   '#include "header.h"\n'
+                   '\n'
+                   '#define TBL_RU {:.8e}\n'.format(chem.RU) +
+                   '#define TBL_LN10 {:.16e}\n'.format(math.log(10.0)) +
+                   '\n'
+                   '// kinds of forward rate constant\n')
+        for name, val in kf_kinds.items():
+            file.write('#define {} {}\n'.format(name, val))
+        file.write('\n// kinds of pressure modification\n')
+        for name, val in pm_kinds.items():
+            file.write('#define {} {}\n'.format(name, val))
+        file.write('\n')
+        for name, (ctype, _) in tables.items():
+            file.write('extern const {} {}[];\n'.format(ctype, name))
+        file.write('\n' + _prototypes + '\n#endif\n')
+
+    with file_writer.open_file(os.path.join(path, 'rxn_tables.c'),
+                               'w') as file:
+        file.write('#include <math.h>\n'
+                   '#include "rxn_tables.h"\n'
+                   '\n')
+        for name, (ctype, values) in tables.items():
+            _write_table(file, name, ctype, values)
+        file.write(_helpers)
+
+
+def write_rxn_rates(path, index):
+    """Write the reaction rate subroutine, and ``rates.h``.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
+
+    Returns
+    -------
+    None
+
+    """
+    with file_writer.open_file(os.path.join(path, 'rates.h'), 'w') as file:
+        file.write('#ifndef RATES_HEAD\n'
+                   '#define RATES_HEAD\n'
+                   '\n'
+                   '#include "header.h"\n'
+                   '\n'
+                   'void eval_rxn_rates (const double, const double, '
+                   'const double * {0}, double * {0}, double * {0});\n'
+                   'void eval_spec_rates (const double * {0}, '
+                   'const double * {0}, const double * {0}, double * {0}, '
+                   'double * {0});\n'.format(_restrict))
+        if index.pdep_reacs:
+            file.write('void get_rxn_pres_mod (const double, const double, '
+                       'const double * {0}, double * {0});\n'.format(
+                           _restrict))
+        file.write('\n'
+                   '#endif\n')
+
+    with file_writer.open_file(os.path.join(path, 'rxn_rates.c'),
+                               'w') as file:
+        file.write(
+            '#include <math.h>\n'
+            '#include "rates.h"\n'
+            '#include "rxn_tables.h"\n'
+            '\n'
+            'void eval_rxn_rates (const double T, const double pres, '
+            'const double * {0} C, double * {0} fwd_rxn_rates, '
+            'double * {0} rev_rxn_rates) {{\n'
+            '  double logT = log(T);\n'
+            '  double B[NSP];\n'
+            '  tbl_eval_b(T, logT, B, NULL);\n'
+            '\n'
+            '  for (int i = 0; i < FWD_RATES; ++i) {{\n'
+            '    const int r = tbl_rev_ind[i];\n'
+            '    if (tbl_kf_kind[i] == KF_OFF) {{\n'
+            '      // left out, but keeping its place\n'
+            '      fwd_rxn_rates[i] = 0.0;\n'
+            '      if (r >= 0)\n'
+            '        rev_rxn_rates[r] = 0.0;\n'
+            '      continue;\n'
+            '    }}\n'
+            '    const double kf = tbl_eval_kf(i, T, logT, pres, NULL);\n'
+            '    fwd_rxn_rates[i] = kf * tbl_conc_prod(C, tbl_reac_ptr[i], '
+            'tbl_reac_ptr[i + 1], tbl_reac_sp, tbl_reac_nu, -1);\n'
+            '    if (r >= 0)\n'
+            '      rev_rxn_rates[r] = tbl_eval_kr(i, T, logT, kf, 0.0, B, '
+            'NULL, NULL) * tbl_conc_prod(C, tbl_prod_ptr[i], '
+            'tbl_prod_ptr[i + 1], tbl_prod_sp, tbl_prod_nu, -1);\n'
+            '  }}\n'
+            '}} // end eval_rxn_rates\n'
+            '\n'.format(_restrict))
+
+
+def write_rxn_pressure_mod(path):
+    """Write the subroutine of the pressure modifications of the third-body
+    and pressure-dependent reaction rates.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+
+    Returns
+    -------
+    None
+
+    """
+    with file_writer.open_file(os.path.join(path, 'rxn_rates_pres_mod.c'),
+                               'w') as file:
+        file.write(
+            '#include <math.h>\n'
+            '#include "header.h"\n'
+            '#include "rates.h"\n'
+            '#include "rxn_tables.h"\n'
+            '\n'
+            'void get_rxn_pres_mod (const double T, const double pres, '
+            'const double * {0} C, double * {0} pres_mod) {{\n'
+            '  double logT = log(T);\n'
+            '  double m = pres / (TBL_RU * T);\n'
+            '\n'
+            '  for (int p = 0; p < PRES_MOD_RATES; ++p)\n'
+            '    pres_mod[p] = tbl_eval_pres_mod(p, T, logT, m, C, NULL, '
+            'NULL);\n'
+            '}} // end get_rxn_pres_mod\n'
+            '\n'.format(_restrict))
+
+
+def write_spec_rates(path, index):
+    """Write the subroutine of the species rates of production.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
+
+    Returns
+    -------
+    seen : list of `bool`
+        ``True`` if species rate i is not identically zero
+
+    """
+    with file_writer.open_file(os.path.join(path, 'spec_rates.c'),
+                               'w') as file:
+        file.write(
+            '#include "header.h"\n'
+            '#include "rates.h"\n'
+            '#include "rxn_tables.h"\n'
+            '\n'
+            'void eval_spec_rates (const double * {0} fwd_rates, '
+            'const double * {0} rev_rates, const double * {0} pres_mod, '
+            'double * {0} sp_rates, double * {0} dy_N) {{\n'
+            '  for (int k = 0; k < NSP - 1; ++k)\n'
+            '    sp_rates[k] = 0.0;\n'
+            '  (*dy_N) = 0.0;\n'
+            '\n'
+            '  for (int i = 0; i < FWD_RATES; ++i) {{\n'
+            '    double q = fwd_rates[i];\n'
+            '    if (tbl_rev_ind[i] >= 0)\n'
+            '      q -= rev_rates[tbl_rev_ind[i]];\n'
+            '    if (tbl_pm_ind[i] >= 0)\n'
+            '      q *= pres_mod[tbl_pm_ind[i]];\n'
+            '    for (int n = tbl_nu_ptr[i]; n < tbl_nu_ptr[i + 1]; ++n) {{\n'
+            '      if (tbl_nu_sp[n] == NSP - 1)\n'
+            '        (*dy_N) += tbl_nu_nu[n] * q;\n'
+            '      else\n'
+            '        sp_rates[tbl_nu_sp[n]] += tbl_nu_nu[n] * q;\n'
+            '    }}\n'
+            '  }}\n'
+            '}} // end eval_spec_rates\n'
+            '\n'.format(_restrict))
+
+    return get_seen_species(index)
+
+
+_jacobian = """\
+void eval_jacob (const double t, const double pres, const double * __restrict__ y, double * __restrict__ jac) {
+
+  double T = y[0];
+  double logT = log(T);
+  double m = pres / (TBL_RU * T);
+
+  // average molecular weight, density and species molar concentrations
+  double mw_avg;
+  double rho;
+  double conc[NSP];
+  double y_N;
+  eval_conc(T, pres, &y[1], &y_N, &mw_avg, &rho, conc);
+  double rho_inv = 1.0 / rho;
+
+  double B[NSP];
+  double dBdT[NSP];
+  tbl_eval_b(T, logT, B, dBdT);
+
+  // per species: molar production rate, its derivative with respect to
+  // temperature at constant mass fractions, the sums over its reactions of
+  // nu * sum(dq/dC * C), and of nu * dq/dC of the last species
+  double omega[NSP] = {0};
+  double domega_dT[NSP] = {0};
+  double alpha[NSP] = {0};
+  double beta[NSP] = {0};
+
+  // the derivatives with respect to the concentrations are accumulated in
+  // the species block of the Jacobian, for the species of each reaction
+  for (int n = 0; n < NSP * NSP; ++n)
+    jac[n] = 0.0;
+
+  int grad_sp[%(max_grad)d];
+  double grad[%(max_grad)d];
+  for (int i = 0; i < FWD_RATES; ++i) {
+    if (tbl_kf_kind[i] == KF_OFF)
+      continue;
+    double dlnkf;
+    const double kf = tbl_eval_kf(i, T, logT, pres, &dlnkf);
+    const double Rf = kf * tbl_conc_prod(conc, tbl_reac_ptr[i], tbl_reac_ptr[i + 1], tbl_reac_sp, tbl_reac_nu, -1);
+    const int r = tbl_rev_ind[i];
+    double kr = 0.0, dlnkr = 0.0, Rr = 0.0;
+    if (r >= 0) {
+      kr = tbl_eval_kr(i, T, logT, kf, dlnkf, B, dBdT, &dlnkr);
+      Rr = kr * tbl_conc_prod(conc, tbl_prod_ptr[i], tbl_prod_ptr[i + 1], tbl_prod_sp, tbl_prod_nu, -1);
+    }
+    const int p = tbl_pm_ind[i];
+    double pm = 1.0, dpm_dT = 0.0, dpm_dX = 0.0;
+    if (p >= 0)
+      pm = tbl_eval_pres_mod(p, T, logT, m, conc, &dpm_dT, &dpm_dX);
+
+    const double net = Rf - Rr;
+    const double q = net * pm;
+    double dq_dT = pm * (Rf * dlnkf - Rr * dlnkr) + net * dpm_dT;
+
+    // derivatives with respect to the concentrations, and to m
+    int ng = 0;
+    for (int n = tbl_reac_ptr[i]; n < tbl_reac_ptr[i + 1]; ++n) {
+      grad_sp[ng] = tbl_reac_sp[n];
+      grad[ng++] = pm * kf * tbl_conc_prod(conc, tbl_reac_ptr[i], tbl_reac_ptr[i + 1], tbl_reac_sp, tbl_reac_nu, n);
+    }
+    if (r >= 0) {
+      for (int n = tbl_prod_ptr[i]; n < tbl_prod_ptr[i + 1]; ++n) {
+        grad_sp[ng] = tbl_prod_sp[n];
+        grad[ng++] = -pm * kr * tbl_conc_prod(conc, tbl_prod_ptr[i], tbl_prod_ptr[i + 1], tbl_prod_sp, tbl_prod_nu, n);
+      }
+    }
+    double dq_dm = 0.0;
+    if (p >= 0) {
+      if (tbl_pm_sp[p] >= 0) {
+        grad_sp[ng] = tbl_pm_sp[p];
+        grad[ng++] = net * dpm_dX;
+      } else {
+        dq_dm = net * dpm_dX;
+        for (int n = tbl_eff_ptr[p]; n < tbl_eff_ptr[p + 1]; ++n) {
+          grad_sp[ng] = tbl_eff_sp[n];
+          grad[ng++] = dq_dm * tbl_eff[n];
+        }
+      }
+    }
+
+    // the concentrations, and m, are proportional to 1 / T
+    double D = 0.0;
+    for (int g = 0; g < ng; ++g)
+      D += grad[g] * conc[grad_sp[g]];
+    dq_dT -= (D + dq_dm * m) / T;
+
+    for (int n = tbl_nu_ptr[i]; n < tbl_nu_ptr[i + 1]; ++n) {
+      const int k = tbl_nu_sp[n];
+      const double nu = tbl_nu_nu[n];
+      omega[k] += nu * q;
+      if (k == NSP - 1)
+        continue;
+      domega_dT[k] += nu * dq_dT;
+      alpha[k] += nu * D;
+      for (int g = 0; g < ng; ++g) {
+        if (grad_sp[g] == NSP - 1)
+          beta[k] += nu * grad[g];
+        else
+          jac[k + 1 + NSP * (grad_sp[g] + 1)] += nu * grad[g];
+      }
+    }
+  }
+
+  // species rows: the chain rule through the concentrations and density
+  for (int k = 0; k < NSP - 1; ++k) {
+    jac[k + 1] = tbl_mw[k] * rho_inv * (domega_dT[k] + omega[k] / T);
+    alpha[k] = (alpha[k] - omega[k]) * mw_avg * rho_inv;
+    beta[k] *= tbl_mw_inv[NSP - 1];
+  }
+  for (int j = 0; j < NSP - 1; ++j) {
+    double * col = &jac[NSP * (j + 1)];
+    const double s = tbl_mw_inv[j] - tbl_mw_inv[NSP - 1];
+    for (int k = 0; k < NSP - 1; ++k)
+      col[k + 1] = tbl_mw[k] * (col[k + 1] * tbl_mw_inv[j] - beta[k] - s * alpha[k]);
+  }
+
+  // temperature row
+  double h[NSP];
+  eval_h(T, h);
+  double cp[NSP];
+  eval_cp(T, cp);
+  double cp_avg = y_N * cp[NSP - 1];
+  double dcp_avg = 0.0;
+  double dT = 0.0;
+  for (int k = 0; k < NSP; ++k) {
+    const double Yk = k < NSP - 1 ? y[k + 1] : y_N;
+    const double * a = T <= tbl_Tmid[k] ? &tbl_b_lo[7 * k] : &tbl_b_hi[7 * k];
+    // from the coefficients of the B terms of the NASA polynomials
+    dcp_avg += Yk * TBL_RU * tbl_mw_inv[k] * (2.0 * a[2] + T * (12.0 * a[3] + T * (36.0 * a[4] + 80.0 * a[5] * T)));
+    if (k < NSP - 1) {
+      cp_avg += Yk * cp[k];
+      dT += omega[k] * tbl_mw[k] * h[k];
+    }
+  }
+  dT *= -rho_inv / cp_avg;
+
+  double sum = dT * dcp_avg;
+  for (int k = 0; k < NSP - 1; ++k)
+    sum += h[k] * jac[k + 1] + omega[k] * tbl_mw[k] * cp[k] * rho_inv;
+  jac[0] = -sum / cp_avg;
+  for (int j = 0; j < NSP - 1; ++j) {
+    double * col = &jac[NSP * (j + 1)];
+    sum = dT * (cp[j] - cp[NSP - 1]);
+    for (int k = 0; k < NSP - 1; ++k)
+      sum += h[k] * col[k + 1];
+    col[0] = -sum / cp_avg;
+  }
+} // end eval_jacob
+
+"""
+"""str: The Jacobian subroutine, formatted with the largest number of
+derivatives of a reaction rate with respect to the concentrations"""
+
+
+def write_jacobian(path, specs, reacs, index, seen):
+    """Write the Jacobian subroutine.
+
+    Parameters
+    ----------
+    path : str
+        Path to build directory for file.
+    specs : list of `SpecInfo`
+        List of species in the mechanism.
+    reacs : list of `ReacInfo`
+        List of reactions in the mechanism.
+    index : `MechanismIndex`
+        Lookup tables of the mechanism
+    seen : list of `bool`
+        Whether each species is changed by any reaction (see
+        `write_spec_rates`)
+
+    Returns
+    -------
+    pattern : `SparsityPattern`
+        The nonzero entries of the Jacobian
+
+    """
+    max_grad = 1
+    for rxn in reacs:
+        num = len(rxn.reac) + (len(rxn.prod) if rxn.rev else 0)
+        if rxn.thd_body or rxn.pdep:
+            num += max(1, len(rxn.thd_body_eff))
+        max_grad = max(max_grad, num)
+
+    with file_writer.open_file(os.path.join(path, 'jacob.h'), 'w') as file:
+        file.write('#ifndef JACOB_HEAD\n'
+                   '#define JACOB_HEAD\n'
+                   '\n'
+                   '#include "header.h"\n'
+                   '#include "chem_utils.h"\n'
+                   '#include "rates.h"\n'
+                   '#include "rxn_tables.h"\n'
+                   'void eval_jacob (const double, const double, '
+                   'const double * {0}, double * {0});\n'
+                   '\n'
+                   '#endif\n'.format(_restrict))
+
+    with file_writer.open_file(os.path.join(path, 'jacob.c'), 'w') as file:
+        file.write('#include <math.h>\n'
+                   '#include "jacob.h"\n'
+                   '\n')
+        file.write(_jacobian % {'max_grad': max_grad})
+
+    return get_sparsity(len(specs), seen)
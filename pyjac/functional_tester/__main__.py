@@ -1,5 +1,4 @@
 from argparse import ArgumentParser
-from . import test
 from .. import utils
 import os
 
@@ -102,6 +101,9 @@
                              ' useful for debugging.'
                         )
     args = parser.parse_args()
+
+    # Cantera and the generator are imported once needed
+    from . import test
     test.test(args.lang, os.path.dirname(os.path.abspath(test.__file__)),
               args.build_dir, args.mech, args.thermo, args.input,
               args.generate_jacob, args.compile_jacob, args.seed,
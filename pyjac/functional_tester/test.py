@@ -7,10 +7,8 @@
 
 # Standard libraries
 import os
-import re
 import sys
 import subprocess
-import pickle
 from argparse import ArgumentParser
 import multiprocessing
 import glob
@@ -28,6 +26,7 @@
 # Local imports
 from .. import utils
 from ..core.create_jacobian import create_jacobian
+from ..core import file_writer
 from . import partially_stirred_reactor as pasr
 from ..pywrap import generate_wrapper
 
@@ -286,112 +285,63 @@ def __copy(self, B):
         A[:] = B
         return A
 
-    def check_numbers(self, build_dir, gas, filename='mechanism.h'):
+    def check_numbers(self, manifest, gas):
         """Ensure numbers of species and forward reaction match.
 
         Parameters
         ----------
-        build_dir : str
-            Path of directory for build objects
+        manifest : dict
+            Manifest of the generated files (see `file_writer.read_manifest`)
         gas : `cantera.Solution`
             Object with kinetic system
-        filename : str
-            Optional; filename of header with mechanism information
 
         Returns
         -------
         None
 
         """
-        with open(os.path.join(build_dir, filename), 'r') as file:
-            n_spec = None
-            n_reac = None
-            for line in file.readlines():
-                if n_spec is None:
-                    match = re.search(r'^#define NSP (\d+)$', line)
-                    if match:
-                        n_spec = int(match.group(1))
-
-                if n_reac is None:
-                    match = re.search(r'^#define FWD_RATES (\d+)$', line)
-                    if match:
-                        n_reac = int(match.group(1))
-
-                if n_spec is not None and n_reac is not None:
-                    break
+        n_spec = manifest['counts']['species']
+        n_reac = manifest['counts']['reactions']
 
         if n_spec != gas.n_species:
             print('Error: species counts do not match between '
-                  'mechanism.h and Cantera.'
+                  'the manifest and Cantera.'
                   )
             raise
         if n_reac != gas.n_reactions:
             print('Error: forward reaction counts do not match between '
-                  'mechanism.h and Cantera.'
+                  'the manifest and Cantera.'
                   )
             raise
 
-    def check_optimized(self, build_dir, gas, filename='mechanism.h'):
+    def check_optimized(self, manifest, gas):
         """Check if pyJac files were cache-optimized (and thus rearranged)
 
         Parameters
         ----------
-        build_dir : str
-            Path of directory for build objects
+        manifest : dict
+            Manifest of the generated files (see `file_writer.read_manifest`)
         gas : `cantera.Solution`
             Object with kinetic system
-        filename : str
-            Optional; filename of header with mechanism information
 
         Returns
         -------
         None
 
         """
-        self.fwd_spec_map = np.array(range(gas.n_species))
-        with open(os.path.join(build_dir, filename), 'r') as file:
-            opt = False
-            last_spec = None
-            for line in file.readlines():
-                if 'Cache Optimized' in line:
-                    opt = True
-                match = re.search(r'^//last_spec (\d+)$', line)
-                if match:
-                    last_spec = int(match.group(1))
-                if opt and last_spec is not None:
-                    break
-
+        last_spec = manifest['last_spec']
         self.last_spec = last_spec
-        self.cache_opt = opt
+        # moving the last species also rearranges the species
+        self.cache_opt = (manifest['cache_optimized'] or
+                          last_spec != gas.n_species - 1)
         self.dydt_mask = np.array([0] + [x + 1 for x in range(gas.n_species)
                                   if x != last_spec]
                                   )
-        if self.cache_opt:
-            with open(os.path.join(build_dir, 'optimized.pickle'), 'rb') as file:
-                dummy = pickle.load(file)
-                dummy = pickle.load(file)
-                self.fwd_spec_map = np.array(pickle.load(file))
-                self.fwd_rxn_map = np.array(pickle.load(file))
-                self.back_spec_map = np.array(pickle.load(file))
-                self.back_rxn_map = np.array(pickle.load(file))
-        elif last_spec != gas.n_species - 1:
-            #still need to treat it as a cache optimized
-            self.cache_opt = True
-
-            (self.fwd_spec_map,
-             self.back_spec_map
-             ) = utils.get_species_mappings(gas.n_species, last_spec)
-
-            self.fwd_spec_map = np.array(self.fwd_spec_map)
-            self.back_spec_map = np.array(self.back_spec_map)
-
-            self.fwd_rxn_map = np.array(range(gas.n_reactions))
-            self.back_rxn_map = np.array(range(gas.n_reactions))
-        else:
-            self.fwd_spec_map = list(range(gas.n_species))
-            self.back_spec_map = list(range(gas.n_species))
-            self.fwd_rxn_map = np.array(range(gas.n_reactions))
-            self.back_rxn_map = np.array(range(gas.n_reactions))
+        mappings = manifest['mappings']
+        self.fwd_spec_map = np.array(mappings['fwd_species'])
+        self.back_spec_map = np.array(mappings['back_species'])
+        self.fwd_rxn_map = np.array(mappings['fwd_reactions'])
+        self.back_rxn_map = np.array(mappings['back_reactions'])
 
         #assign the rest
         n_spec = gas.n_species
@@ -429,11 +379,10 @@ def check_optimized(self, build_dir, gas, filename='mechanism.h'):
                                       [x + 1 for x in self.back_spec_map]
                                       )
 
-    def __init__(self, build_dir, gas, module_name='pyjacob',
-                 filename='mechanism.h'
-                 ):
-        self.check_numbers(build_dir, gas, filename)
-        self.check_optimized(build_dir, gas, filename)
+    def __init__(self, build_dir, gas, module_name='pyjacob'):
+        manifest = file_writer.read_manifest(build_dir)
+        self.check_numbers(manifest, gas)
+        self.check_optimized(manifest, gas)
         self.pyjac = __import__(module_name)
 
     def eval_conc(self, temp, pres, mass_frac, conc):
@@ -894,7 +843,7 @@ class tchem_evaluator(cpyjac_evaluator):
     """Class for TChem-based Jacobian matrix evaluator
     """
     def __init__(self, build_dir, gas, state_data, mechfile, thermofile,
-                 module_name='py_tchem', filename='mechanism.h'
+                 module_name='py_tchem'
                  ):
         self.tchem = __import__(module_name)
 
@@ -1,6 +1,5 @@
 from argparse import ArgumentParser
 
-from .libgen import generate_library
 from .. import utils
 
 if __name__ == '__main__':
@@ -40,6 +39,8 @@
                         )
 
     args = parser.parse_args()
+
+    from .libgen import generate_library
     generate_library(args.lang, args.source_dir, args.obj_dir,
                      args.out_dir, not args.static
                      )
@@ -11,6 +11,7 @@
 import platform
 
 from .. import utils
+from ..core import file_writer
 
 def lib_ext(shared):
     """Returns the appropriate library extension based on the shared flag"""
@@ -98,16 +99,25 @@ def compiler(fstruct):
                includes[fstruct.build_lang]
                ]
     args.extend(include)
+    source = os.path.join(fstruct.source_dir, fstruct.filename +
+                          utils.file_ext[fstruct.build_lang]
+                          )
+    obj = os.path.join(fstruct.obj_dir, os.path.basename(fstruct.filename) + '.o')
     args.extend([
         '-{}c'.format('d' if fstruct.lang == 'cuda' else ''),
-        os.path.join(fstruct.source_dir, fstruct.filename +
-                     utils.file_ext[fstruct.build_lang]
-                     ),
-        '-o', os.path.join(fstruct.obj_dir, os.path.basename(fstruct.filename) + '.o')
+        source,
+        '-o', obj
         ])
     args = [val for val in args if val.strip()]
+    command = ' '.join(args)
+    if up_to_date(obj, source, command, fstruct.headers_mtime):
+        return 0
     try:
-        print(' '.join(args))
+        os.remove(obj + '.cmd')
+    except OSError:
+        pass
+    try:
+        print(command)
         subprocess.check_call(args)
     except OSError:
         print('Error: Compiler {} not found, generation of pyjac library failed.'.format(args[0]))
@@ -117,9 +127,68 @@ def compiler(fstruct):
               utils.file_ext[fstruct.build_lang]
               )
         return -1
+    with open(obj + '.cmd', 'w') as file:
+        file.write(command)
     return 0
 
 
+def up_to_date(obj, source, command, headers_mtime=0):
+    """Whether an object file need not be recompiled: it is newer than its
+    source file and the headers, and was compiled by the same command (which
+    is stored next to it, in a ``.cmd`` file).
+
+    Parameters
+    ----------
+    obj : str
+        The object file
+    source : str
+        The source file
+    command : str
+        The compilation command
+    headers_mtime : float, optional
+        The latest modification time of the headers the source may include
+
+    Returns
+    -------
+    up_to_date : bool
+        ``True`` if the object file may be reused
+
+    """
+    try:
+        with open(obj + '.cmd', 'r') as file:
+            if file.read() != command:
+                return False
+        obj_mtime = os.path.getmtime(obj)
+        return obj_mtime >= max(os.path.getmtime(source), headers_mtime)
+    except (IOError, OSError):
+        return False
+
+
+def get_headers_mtime(i_dirs):
+    """Returns the latest modification time of the (C or CUDA) headers in the
+    include directories (0 if none).
+
+    Parameters
+    ----------
+    i_dirs : list of `str`
+        List of include directories
+
+    Returns
+    -------
+    mtime : float
+        The latest modification time
+
+    """
+    mtime = 0
+    for directory in i_dirs:
+        for name in os.listdir(directory):
+            if name.endswith(tuple(utils.header_ext.values())):
+                mtime = max(mtime,
+                            os.path.getmtime(os.path.join(directory, name))
+                            )
+    return mtime
+
+
 def get_cuda_path():
     """Returns location of CUDA (nvcc) on the system.
 
@@ -251,9 +320,10 @@ def __init__(self, lang, build_lang, filename, i_dirs, args,
         self.obj_dir = obj_dir
         self.shared = shared
         self.auto_diff=False
+        self.headers_mtime = 0
 
 
-def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
+def get_file_list(source_dir, pmod, lang, FD=False, AD=False, manifest=None):
     """
 
     Parameters
@@ -268,6 +338,11 @@ def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
         Optional; if ``True``, include finite difference
     AD : Optional[bool]
         Optional; if ``True``, include autodifferentiation
+    manifest : Optional[dict]
+        Optional; the manifest of ``source_dir``, listing the rate and
+        Jacobian subfiles and whether the kernels are table-driven. If not
+        supplied, the subfiles are read from the ``rate_list`` and
+        ``jac_list`` files.
 
     Returns
     -------
@@ -291,6 +366,9 @@ def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
              ]
     if pmod:
         files += ['rxn_rates_pres_mod']
+    if manifest is not None and manifest.get('kernels') == 'tables':
+        # the constant tables of the table-driven kernels
+        files += ['rxn_tables']
 
     if FD:
         files += ['fd_jacob']
@@ -300,6 +378,14 @@ def get_file_list(source_dir, pmod, lang, FD=False, AD=False):
         flists = [('jacobs', 'jac_list_{}')]
 
     flists += [('rates', 'rate_list_{}')]
+    if manifest is not None:
+        for subdir, _ in flists:
+            vals = [f for f in manifest['sources']
+                    if f.startswith(subdir + '/')]
+            if vals:
+                files += vals
+                i_dirs.append(os.path.join(source_dir, subdir))
+        flists = []
     for flist in flists:
         try:
             with open(os.path.join(source_dir,
@@ -377,19 +463,26 @@ def generate_library(lang, source_dir, obj_dir=None,
 
     pmod = False
     #figure out whether there's pressure mod reactions or not
-    with open(os.path.join(source_dir,
-              'mechanism{}'.format(utils.header_ext[build_lang])), 'r'
-              ) as file:
-        for line in file.readlines():
-            line = line.strip()
-            match = re.search(r'\s*#define PRES_MOD_RATES (\d+)', line)
-            if match is not None:
-                pmod = int(match.group(1)) > 0
-                break
+    manifest = file_writer.read_manifest(source_dir)
+    if manifest is not None and 'counts' in manifest:
+        pmod = manifest['counts']['pdep_reactions'] > 0
+    else:
+        # generated by an older version
+        manifest = None
+        with open(os.path.join(source_dir,
+                  'mechanism{}'.format(utils.header_ext[build_lang])), 'r'
+                  ) as file:
+            for line in file.readlines():
+                line = line.strip()
+                match = re.search(r'\s*#define PRES_MOD_RATES (\d+)', line)
+                if match is not None:
+                    pmod = int(match.group(1)) > 0
+                    break
 
     #get file lists
     i_dirs, files = get_file_list(source_dir, pmod, build_lang,
-                                  FD=finite_difference, AD=auto_diff
+                                  FD=finite_difference, AD=auto_diff,
+                                  manifest=manifest
                                   )
 
     # Compile generated source code
@@ -397,8 +490,11 @@ def generate_library(lang, source_dir, obj_dir=None,
                (['-DFINITE_DIFF'] if finite_difference else []),
                source_dir, obj_dir, shared) for f in files
                ]
+    # sources are only recompiled if they, or the headers, have changed
+    headers_mtime = get_headers_mtime(i_dirs)
     for x in structs:
         x.auto_diff=auto_diff
+        x.headers_mtime = headers_mtime
 
     pool = multiprocessing.Pool()
     results = pool.map(compiler, structs)
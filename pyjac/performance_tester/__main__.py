@@ -1,7 +1,6 @@
 import sys
 import os
 
-from . import performance_tester as pt
 from argparse import ArgumentParser
 
 def main(args=None):
@@ -23,6 +22,9 @@ def main(args=None):
                                  'any old optimization files found'
                             )
         args = parser.parse_args()
+
+        # Cantera and the generator are imported once needed
+        from . import performance_tester as pt
         pt.performance_tester(os.path.dirname(os.path.abspath(pt.__file__)),
                               args.working_directory,
                               args.use_old_opt)
@@ -1,7 +1,6 @@
 """Main module for pywrap module.
 """
 from argparse import ArgumentParser
-from .pywrap_gen import generate_wrapper
 
 from .. import utils
 
@@ -28,4 +27,6 @@
                         help='The folder to place the generated library in')
 
     args = parser.parse_args()
+
+    from .pywrap_gen import generate_wrapper
     generate_wrapper(args.lang, args.source_dir, args.out_dir)
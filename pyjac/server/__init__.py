@@ -0,0 +1,11 @@
+import sys
+
+from .client import ServerError, call, parse_address
+
+if sys.version_info >= (3, 7):
+    # the generator is imported once used, so that clients start quickly
+    from ..utils import lazy_imports
+    __getattr__ = lazy_imports(__name__, dict.fromkeys(
+        ['GeneratorServer', 'make_server', 'serve'], '.server'))
+else:
+    from .server import GeneratorServer, make_server, serve
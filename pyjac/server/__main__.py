@@ -0,0 +1,64 @@
+import sys
+from argparse import ArgumentParser
+
+
+def main(args=None):
+    if args is None:
+        parser = ArgumentParser(
+            description='server: keeps interpreted mechanisms in memory and '
+                        'generates code for them on request (see '
+                        '"python -m pyjac --server").'
+            )
+        parser.add_argument('-a', '--address',
+                            type=str,
+                            required=True,
+                            help='The address to listen on: host:port (e.g., '
+                                 'localhost:8765), or else the path of a Unix '
+                                 'domain socket.'
+                            )
+        parser.add_argument('-ar', '--allow_remote',
+                            action='store_true',
+                            default=False,
+                            help='If specified, allow listening on a host '
+                                 'other than a loopback address. Requests '
+                                 'are not authenticated, and write files '
+                                 'wherever asked to, so only use this on a '
+                                 'trusted network.'
+                            )
+        parser.add_argument('-i', '--input',
+                            type=str,
+                            nargs='*',
+                            default=[],
+                            help='Mechanisms to interpret on startup.'
+                            )
+        parser.add_argument('-t', '--thermo',
+                            type=str,
+                            default=None,
+                            help='Thermodynamic database of the mechanisms '
+                                 'interpreted on startup.'
+                            )
+        parser.add_argument('-npc', '--no_parse_cache',
+                            dest='parse_cache',
+                            action='store_false',
+                            help='If specified, do not reuse interpreted '
+                                 'mechanisms from the parse cache.'
+                            )
+        parser.add_argument('-pp', '--parse_processes',
+                            type=int,
+                            dest='parse_procs',
+                            default=1,
+                            help='The number of processes used to interpret '
+                                 'the reactions of a Chemkin-format '
+                                 'mechanism.'
+                            )
+        args = parser.parse_args()
+
+        # the generator is imported once needed
+        from .server import GeneratorServer, serve
+        generator = GeneratorServer(args.parse_cache, args.parse_procs)
+        for mech_name in args.input:
+            generator.load(mech_name, args.thermo)
+        serve(args.address, generator, args.allow_remote)
+
+if __name__ == '__main__':
+    sys.exit(main())
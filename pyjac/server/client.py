@@ -0,0 +1,108 @@
+"""Client of the code generator server (see `server`).
+
+Only needs the standard library, so that a client starts quickly.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import json
+import socket
+
+PARSE_ERROR = -32700
+"""int: JSON-RPC error code of a request that is not valid JSON"""
+INVALID_REQUEST = -32600
+"""int: JSON-RPC error code of a request that is not a request object"""
+METHOD_NOT_FOUND = -32601
+"""int: JSON-RPC error code of an unknown method"""
+INVALID_PARAMS = -32602
+"""int: JSON-RPC error code of invalid method parameters"""
+GENERATION_ERROR = -32000
+"""int: JSON-RPC error code of a failed interpretation or generation"""
+
+
+class ServerError(Exception):
+    """An error returned by a generator server.
+
+    Parameters
+    ----------
+    code : int
+        The JSON-RPC error code
+    message : str
+        The error message
+
+    """
+    def __init__(self, code, message):
+        super(ServerError, self).__init__(message)
+        self.code = code
+
+
+def parse_address(address):
+    """Get the socket family and address of a server.
+
+    Parameters
+    ----------
+    address : str
+        ``host:port`` for TCP, or else the path of a Unix domain socket
+
+    Returns
+    -------
+    family : int
+        ``socket.AF_INET`` or ``socket.AF_UNIX``
+    address : tuple or str
+        ``(host, port)``, or the path
+
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and host and port.isdigit():
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def call(address, method, params=None, timeout=None):
+    """Send a request to a server and wait for its result.
+
+    Parameters
+    ----------
+    address : str
+        ``host:port``, or the path of a Unix domain socket
+    method : str
+        The method: ``load``, ``unload``, ``mechanisms``, ``generate`` or
+        ``shutdown`` (see `GeneratorServer`)
+    params : dict, optional
+        The parameters of the method
+    timeout : float, optional
+        Seconds to wait for the result; forever if not supplied
+
+    Returns
+    -------
+    result
+        The result of the method
+
+    Raises
+    ------
+    ServerError
+        If the server returned an error
+
+    """
+    family, address = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+        request = {'jsonrpc': '2.0', 'id': 1, 'method': method,
+                   'params': params or {}}
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as file:
+            line = file.readline()
+    finally:
+        sock.close()
+    if not line:
+        raise ServerError(GENERATION_ERROR, 'No response from server')
+    response = json.loads(line.decode('utf-8'))
+    if 'error' in response:
+        raise ServerError(response['error']['code'],
+                          response['error']['message'])
+    return response['result']
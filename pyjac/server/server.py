@@ -0,0 +1,450 @@
+"""Long-lived code generator with a local JSON-RPC interface.
+
+Tools that generate code many times (e.g., mechanism reduction or tuning
+loops) pay the startup of Python, the imports and the interpretation of
+the mechanism on each call of ``python -m pyjac``. A `GeneratorServer`
+instead keeps interpreted mechanisms in memory, and generates code for them
+(or a subset of their reactions) on request.
+
+The server listens on a Unix domain socket, or on ``host:port`` (e.g.,
+``localhost:8765``). As requests are not authenticated, and ``generate``
+writes to any build directory, a TCP server only listens on a loopback
+address unless explicitly allowed otherwise. Each request and response is a single line of JSON, as
+in JSON-RPC 2.0::
+
+    {"jsonrpc": "2.0", "id": 1, "method": "generate",
+     "params": {"lang": "c", "mech_name": "/path/mech.inp",
+                "build_path": "/path/out"}}
+
+and the result of ``generate`` is the manifest of the build directory
+(see `file_writer.read_manifest`). `client.call` sends a request to a
+server.
+"""
+
+# Python 2 compatibility
+from __future__ import division
+from __future__ import print_function
+
+# Standard libraries
+import os
+import sys
+import json
+import stat
+import errno
+import pickle
+import inspect
+import socket
+import threading
+
+try:
+    import socketserver
+except ImportError:
+    # Python 2
+    import SocketServer as socketserver
+
+# Local imports
+from .client import (parse_address, ServerError, INVALID_REQUEST, PARSE_ERROR,
+                     METHOD_NOT_FOUND, INVALID_PARAMS, GENERATION_ERROR)
+from ..core import mech_cache
+from ..core import file_writer
+from ..core.create_jacobian import create_jacobian
+
+generate_options = ['optimize_cache', 'initial_state', 'num_blocks',
+                    'num_threads', 'no_shared', 'L1_preferred',
+                    'multi_thread', 'force_optimize', 'last_spec', 'skip_jac',
+                    'auto_diff', 'cse', 'jobs', 'profile', 'trace_memory',
+                    'disabled_reactions', 'delta', 'table_kernels'
+                    ]
+"""list of str: Options of `create_jacobian` accepted by ``generate``"""
+
+
+
+class GeneratorServer(object):
+    """Keeps interpreted mechanisms in memory and generates code for them.
+
+    Each mechanism is kept pickled, and unpickled for each generation (which
+    modifies the species and reactions), which is much faster than
+    interpreting it again. Generations run one at a time.
+
+    Parameters
+    ----------
+    parse_cache : bool, optional
+        If ``True``, reuse interpreted mechanisms from the parse cache
+    parse_procs : int, optional
+        If greater than one, the number of processes used to interpret the
+        reactions of a Chemkin-format mechanism
+
+    Attributes
+    ----------
+    mechanisms : dict
+        The interpreted mechanisms, by id (see `load`)
+    stopping : bool
+        ``True`` once asked to `shutdown`
+
+    """
+
+    def __init__(self, parse_cache=True, parse_procs=None):
+        self.parse_cache = parse_cache
+        self.parse_procs = parse_procs
+        self.mechanisms = {}
+        self.stopping = False
+        self._lock = threading.Lock()
+        self.methods = {'load': self.load,
+                        'unload': self.unload,
+                        'mechanisms': self.list_mechanisms,
+                        'generate': self.generate,
+                        'shutdown': self.shutdown
+                        }
+
+    def _info(self, mech_id):
+        """The description of a loaded mechanism"""
+        mech = self.mechanisms[mech_id]
+        return {'id': mech_id,
+                'mech_name': mech['mech_name'],
+                'therm_name': mech['therm_name'],
+                'species': mech['species'],
+                'reactions': mech['reactions']
+                }
+
+    def load(self, mech_name, therm_name=None):
+        """Interpret a mechanism and keep it in memory.
+
+        Parameters
+        ----------
+        mech_name : str
+            Reaction mechanism filename, Chemkin or Cantera format
+        therm_name : str, optional
+            Thermodynamic database filename
+
+        Returns
+        -------
+        mechanism : dict
+            The ``id`` of the mechanism (the hash of its files, so loading
+            an unchanged mechanism again reuses it), its ``mech_name`` and
+            ``therm_name``, and its number of ``species`` and ``reactions``
+
+        """
+        mech_id = mech_cache.get_cache_key(mech_name, therm_name)
+        with self._lock:
+            if mech_id not in self.mechanisms:
+                elems, specs, reacs = mech_cache.read_mech_file(
+                    mech_name, therm_name, self.parse_cache, self.parse_procs)
+                self.mechanisms[mech_id] = {
+                    'mech_name': mech_name,
+                    'therm_name': therm_name,
+                    'species': len(specs),
+                    'reactions': len(reacs),
+                    'data': pickle.dumps((elems, specs, reacs),
+                                         pickle.HIGHEST_PROTOCOL)
+                    }
+        return self._info(mech_id)
+
+    def unload(self, id):
+        """Forget a mechanism.
+
+        Parameters
+        ----------
+        id : str
+            The id of the mechanism (see `load`)
+
+        Returns
+        -------
+        unloaded : bool
+            ``True`` if the mechanism was loaded
+
+        """
+        with self._lock:
+            return self.mechanisms.pop(id, None) is not None
+
+    def list_mechanisms(self):
+        """Return the description of each loaded mechanism (see `load`).
+        """
+        with self._lock:
+            return [self._info(mech_id) for mech_id in sorted(self.mechanisms)]
+
+    def generate(self, lang, build_path, mechanism=None, mech_name=None,
+                 therm_name=None, reactions=None, options=None):
+        """Generate the code for a mechanism, as `create_jacobian` does.
+
+        Parameters
+        ----------
+        lang : {'c', 'cuda', 'fortran', 'matlab'}
+            Language type.
+        build_path : str
+            The output directory
+        mechanism : str, optional
+            The id of a loaded mechanism (see `load`)
+        mech_name : str, optional
+            Reaction mechanism filename, loaded if not already; this or
+            ``mechanism`` must be specified
+        therm_name : str, optional
+            Thermodynamic database filename
+        reactions : list of int, optional
+            If supplied, only generate code for these reactions of the
+            mechanism (by index, in order); all species are kept
+        options : dict, optional
+            Further options of `create_jacobian` (see `generate_options`)
+
+        Returns
+        -------
+        manifest : dict
+            The manifest of the build directory
+
+        """
+        options = dict(options or {})
+        unknown = sorted(set(options) - set(generate_options))
+        if unknown:
+            raise ServerError(INVALID_PARAMS,
+                              'Unknown options: ' + ', '.join(unknown))
+        if mechanism is None:
+            if mech_name is None:
+                raise ServerError(INVALID_PARAMS, 'No mechanism specified')
+            mechanism = self.load(mech_name, therm_name)['id']
+
+        with self._lock:
+            if mechanism not in self.mechanisms:
+                raise ServerError(INVALID_PARAMS,
+                                  'Unknown mechanism: {}'.format(mechanism))
+            mech = self.mechanisms[mechanism]
+            elems, specs, reacs = mech_cache.loads_mechanism(mech['data'])
+            if reactions is not None:
+                if any(not 0 <= i < len(reacs) for i in reactions):
+                    raise ServerError(INVALID_PARAMS,
+                                      'Reaction index out of range')
+                reacs = [reacs[i] for i in reactions]
+            try:
+                create_jacobian(lang, mech['mech_name'], mech['therm_name'],
+                                build_path=build_path,
+                                mechanism=(elems, specs, reacs), **options)
+            except SystemExit as e:
+                raise ServerError(GENERATION_ERROR,
+                                  'Generation failed (exit code {})'.format(
+                                      e.code))
+            return file_writer.read_manifest(build_path)
+
+    def shutdown(self):
+        """Stop the server once this request is answered.
+
+        Returns
+        -------
+        stopping : bool
+            ``True``
+
+        """
+        self.stopping = True
+        return True
+
+    def handle(self, line):
+        """Answer a request.
+
+        Parameters
+        ----------
+        line : str
+            The request, a JSON-RPC request object
+
+        Returns
+        -------
+        response : dict
+            The response, or ``None`` for a notification (without ``id``)
+
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, str(e))
+        if not isinstance(request, dict) or 'method' not in request:
+            return _error(None, INVALID_REQUEST, 'Not a request')
+        request_id = request.get('id')
+        method = self.methods.get(request['method'])
+        if method is None:
+            response = _error(request_id, METHOD_NOT_FOUND,
+                              'Unknown method: {}'.format(request['method']))
+        else:
+            params = request.get('params') or {}
+            if isinstance(params, dict):
+                args, kwargs = [], params
+            else:
+                args, kwargs = params, {}
+            try:
+                _check_params(method, args, kwargs)
+                result = method(*args, **kwargs)
+                response = {'jsonrpc': '2.0', 'id': request_id,
+                            'result': result}
+            except ServerError as e:
+                response = _error(request_id, e.code, str(e))
+            except Exception as e:
+                response = _error(request_id, GENERATION_ERROR,
+                                  '{}: {}'.format(type(e).__name__, e))
+        if 'id' not in request:
+            return None
+        return response
+
+
+def _check_params(method, args, kwargs):
+    """Check that a method accepts the parameters of a request, so that only
+    those the method cannot be called with are reported as invalid, and not
+    errors raised by the method itself.
+
+    Raises
+    ------
+    ServerError
+        ``INVALID_PARAMS`` if the parameters do not match the method
+
+    """
+    if not isinstance(args, list):
+        raise ServerError(INVALID_PARAMS, 'Parameters must be an array or '
+                                          'an object')
+    try:
+        if hasattr(inspect, 'signature'):
+            inspect.signature(method).bind(*args, **kwargs)
+        else:
+            # Python 2
+            inspect.getcallargs(method, *args, **kwargs)
+    except TypeError as e:
+        raise ServerError(INVALID_PARAMS, str(e))
+
+
+def _error(request_id, code, message):
+    """A JSON-RPC error response"""
+    return {'jsonrpc': '2.0', 'id': request_id,
+            'error': {'code': code, 'message': message}}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answers the requests of a connection, one per line.
+    """
+    def handle(self):
+        for line in iter(self.rfile.readline, b''):
+            line = line.decode('utf-8').strip()
+            if not line:
+                continue
+            response = self.server.generator.handle(line)
+            if response is not None:
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+                self.wfile.flush()
+            if self.server.generator.stopping:
+                # shutdown waits for serve_forever, so not in this thread
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn,
+                      socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def is_loopback(host):
+    """Return whether a host name resolves to a loopback address.
+
+    Parameters
+    ----------
+    host : str
+        The host name or IPv4 address
+
+    Returns
+    -------
+    bool
+        ``True`` if the host is a loopback address (``127.0.0.0/8``)
+
+    """
+    try:
+        return socket.gethostbyname(host).startswith('127.')
+    except socket.error:
+        return False
+
+
+def _remove_stale_socket(path):
+    """Remove the socket of a server that did not exit cleanly, exiting
+    with an error if the path is not a socket, or a server still listens
+    on it.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except OSError:
+        # nothing there
+        return
+    if not stat.S_ISSOCK(mode):
+        print('Error: {} exists and is not a socket'.format(path))
+        sys.exit(1)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error as e:
+        if e.errno != errno.ECONNREFUSED:
+            print('Error: cannot check socket {}: {}'.format(path, e))
+            sys.exit(1)
+    else:
+        print('Error: a server is already listening on {}'.format(path))
+        sys.exit(1)
+    finally:
+        sock.close()
+    os.remove(path)
+
+
+def make_server(address, generator=None, allow_remote=False):
+    """Create a server answering requests on an address (see `serve`).
+
+    Parameters
+    ----------
+    address : str
+        ``host:port``, or the path of a Unix domain socket
+    generator : `GeneratorServer`, optional
+        The generator answering the requests; a new one if not supplied
+    allow_remote : bool, optional
+        If ``True``, listen on any host; otherwise, only on a loopback
+        address, as requests are not authenticated
+
+    Returns
+    -------
+    server : `socketserver.BaseServer`
+        The server, bound to the address; its ``generator`` answers the
+        requests, once it is started with ``serve_forever``
+
+    """
+    family, address = parse_address(address)
+    if family == socket.AF_UNIX:
+        _remove_stale_socket(address)
+        server = _UnixServer(address, _Handler)
+    else:
+        if not allow_remote and not is_loopback(address[0]):
+            print('Error: {} is not a loopback address; the server only '
+                  'listens on other hosts if allowed to (--allow_remote), '
+                  'as anyone who can reach it can write files'.format(
+                      address[0]))
+            sys.exit(1)
+        server = _TCPServer(address, _Handler)
+    server.generator = generator or GeneratorServer()
+    return server
+
+
+def serve(address, generator=None, allow_remote=False):
+    """Answer requests on an address until asked to ``shutdown``.
+
+    Parameters
+    ----------
+    address : str
+        ``host:port``, or the path of a Unix domain socket
+    generator : `GeneratorServer`, optional
+        The generator answering the requests; a new one if not supplied
+    allow_remote : bool, optional
+        If ``True``, listen on any host (see `make_server`)
+
+    """
+    server = make_server(address, generator, allow_remote)
+    print('pyJac server listening on {}'.format(address))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        family, address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
@@ -0,0 +1,156 @@
+# Python 2 compatibility
+from __future__ import print_function
+from __future__ import division
+
+import os
+import sys
+import json
+import multiprocessing
+
+from .. import utils
+from ..batch import batch
+from ..core import cache_optimizer
+from ..core import create_jacobian
+from ..core import file_writer
+from ..core import mech_cache
+from ..benchmark import synthetic
+
+class TestBatch(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure batch module imported.
+        """
+        assert 'pyjac.batch.batch' in sys.modules
+
+    def test_read_jobs(self, tmpdir):
+        """Ensure defaults apply to the jobs and paths are made absolute.
+        """
+        filename = os.path.join(str(tmpdir), 'jobs.json')
+        with open(filename, 'w') as file:
+            json.dump({'defaults': {'mech_name': 'mech.inp', 'lang': 'c'},
+                       'jobs': [{'build_path': 'c'},
+                                {'build_path': 'cuda', 'lang': 'cuda',
+                                 'no_shared': True}]
+                       }, file)
+        jobs = batch.read_jobs(filename)
+        assert [job['lang'] for job in jobs] == ['c', 'cuda']
+        assert jobs[0]['mech_name'] == os.path.join(str(tmpdir), 'mech.inp')
+        assert jobs[1]['build_path'] == os.path.join(str(tmpdir), 'cuda')
+        assert jobs[1]['no_shared'] and jobs[1]['therm_name'] is None
+
+        for job in [{'lang': 'c', 'mech_name': 'mech.inp'},
+                    {'lang': 'c', 'mech_name': 'mech.inp', 'build_path': 'c',
+                     'jobs': 2}]:
+            try:
+                batch.check_job(job)
+                assert False, job
+            except SystemExit:
+                pass
+
+        # each job must be a mapping, as must the defaults
+        for data in [{'defaults': {'lang': 'c'}, 'jobs': ['c']},
+                     [{'lang': 'c', 'mech_name': 'mech.inp',
+                       'build_path': 'c'}, ['lang', 'c']],
+                     {'defaults': ['c'], 'jobs': [{'build_path': 'c'}]}]:
+            with open(filename, 'w') as file:
+                json.dump(data, file)
+            try:
+                batch.read_jobs(filename)
+                assert False, data
+            except SystemExit:
+                pass
+
+        # two jobs cannot share a build directory
+        with open(filename, 'w') as file:
+            json.dump({'defaults': {'mech_name': 'mech.inp', 'lang': 'c'},
+                       'jobs': [{'build_path': 'c'},
+                                {'build_path': 'c/../c', 'lang': 'cuda'}]
+                       }, file)
+        try:
+            batch.read_jobs(filename)
+            assert False
+        except SystemExit:
+            pass
+
+    def test_run_batch(self, tmpdir, monkeypatch):
+        """Ensure each mechanism is interpreted once, and the jobs give the
+        same code as separate generations.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+
+        num_read = [0]
+        read_mech_file = mech_cache.read_mech_file
+        def counting_read_mech_file(*args, **kwargs):
+            num_read[0] += 1
+            return read_mech_file(*args, **kwargs)
+        monkeypatch.setattr(mech_cache, 'read_mech_file',
+                            counting_read_mech_file)
+
+        variants = [('c', {}), ('cuda', {}), ('cuda', {'no_shared': True}),
+                    ('c', {'last_spec': 'S3', 'skip_jac': True})]
+        jobs = []
+        for i, (lang, options) in enumerate(variants):
+            job = dict(lang=lang, mech_name=mech_name,
+                       build_path=os.path.join(str(tmpdir), str(i)))
+            job.update(options)
+            jobs.append(job)
+        for workers in [1, 2]:
+            results = batch.run_batch(jobs, workers, parse_cache=False)
+            assert all(result['succeeded'] for result in results)
+        assert num_read[0] == 2
+
+        for job, (lang, options) in zip(jobs, variants):
+            tree = create_jacobian.create_source_tree(lang, mech_name,
+                                                      parse_cache=False,
+                                                      **options)
+            for name, text in tree.items():
+                if name != file_writer.manifest_name:
+                    with open(os.path.join(job['build_path'], name)) as file:
+                        assert file.read() == text
+
+        # the build directory cannot be created over a file
+        results = batch.run_batch([dict(jobs[0], build_path=mech_name),
+                                   jobs[1]], 1, parse_cache=False)
+        assert not results[0]['succeeded'] and results[0]['error']
+        assert results[1]['succeeded']
+        assert '1 failed' in batch.summary(results)
+
+    def test_optimize_cache(self, tmpdir, monkeypatch):
+        """Ensure jobs may start processes of their own, as the cache
+        optimizer does, when run in worker processes.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+
+        def pooled_optimize_cache(specs, reacs, multi_thread, force_optimize,
+                                  build_path, last_spec):
+            # the optimizer runs its tries in a pool, and the worker
+            # processes of the batch inherit this function
+            pool = multiprocessing.Pool(2)
+            try:
+                assert pool.map(abs, [-1, -2]) == [1, 2]
+            finally:
+                pool.close()
+                pool.join()
+            fwd_spec, back_spec = utils.get_species_mappings(len(specs),
+                                                             last_spec)
+            rxns = list(range(len(reacs)))
+            return ([specs[i] for i in fwd_spec], reacs, fwd_spec, rxns,
+                    back_spec, rxns)
+        monkeypatch.setattr(cache_optimizer, 'optimize_cache',
+                            pooled_optimize_cache)
+        monkeypatch.setattr(cache_optimizer, 'have_bitarray', True)
+
+        jobs = [dict(lang='c', mech_name=mech_name, optimize_cache=True,
+                     build_path=os.path.join(str(tmpdir), str(i)))
+                for i in range(2)]
+        results = batch.run_batch(jobs, 2, parse_cache=False)
+        assert all(result['succeeded'] for result in results), results
+        for job in jobs:
+            manifest = file_writer.read_manifest(job['build_path'])
+            assert manifest['cache_optimized']
+
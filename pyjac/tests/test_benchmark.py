@@ -0,0 +1,70 @@
+# Python 2 compatibility
+from __future__ import print_function
+from __future__ import division
+
+import os
+import sys
+
+from ..benchmark import benchmark
+from ..benchmark import synthetic
+from ..core import mech_interpret
+
+class TestSynthetic(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure synthetic module imported.
+        """
+        assert 'pyjac.benchmark.synthetic' in sys.modules
+
+    def test_generate_mechanism(self, tmpdir):
+        """Ensure synthetic mechanisms have the requested size and types.
+        """
+        elems, specs, reacs = synthetic.generate_mechanism(40, 150, seed=1)
+        assert len(specs) == 40 and len(reacs) == 150
+        kinds = set(rxn.kind for rxn in reacs)
+        assert kinds == set(synthetic.reaction_types)
+        # same seed, same mechanism
+        again = synthetic.generate_mechanism(40, 150, seed=1)[2]
+        assert [rxn.equation() for rxn in again] == \
+            [rxn.equation() for rxn in reacs]
+
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename, elems, specs, reacs)
+        synthetic.write_cantera(os.path.join(str(tmpdir), 'mech.cti'),
+                                elems, specs, reacs)
+        elems, parsed_specs, parsed_reacs = mech_interpret.read_mech(filename,
+                                                                     None)
+        assert [sp.name for sp in parsed_specs] == [sp.name for sp in specs]
+        assert len(parsed_reacs) == len(reacs)
+        assert sum(rxn.cheb for rxn in parsed_reacs) == \
+            sum(rxn.kind == 'cheb' for rxn in reacs)
+        assert sum(rxn.dup for rxn in parsed_reacs) == \
+            sum(rxn.kind == 'duplicate' for rxn in reacs)
+
+        # only the requested types
+        reacs = synthetic.generate_mechanism(
+            20, 30, reaction_mix=dict(elementary=1, plog=1))[2]
+        assert set(rxn.kind for rxn in reacs) == set(['elementary', 'plog'])
+
+
+class TestBenchmark(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure benchmark module imported.
+        """
+        assert 'pyjac.benchmark.benchmark' in sys.modules
+
+    def test_benchmark_mechanism(self, tmpdir):
+        """Ensure a benchmark of a small mechanism records all quantities.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(10, 20))
+        result = benchmark.benchmark_mechanism(filename, 'c', str(tmpdir))
+        assert result['parse_time'] > 0 and result['generate_time'] > 0
+        assert result['compile_time'] is None
+        assert result['emitted_lines'] == benchmark.count_lines(
+            os.path.join(str(tmpdir), 'src'))
+        assert result['emitted_lines'] > 0
@@ -2,14 +2,33 @@
 from __future__ import print_function
 from __future__ import division
 
+import os
 import sys
+import json
+import pickle
+import multiprocessing
+import subprocess
+
+import numpy as np
 
 from ..core import cache_optimizer
 from ..core import chem_utilities
 from ..core import create_jacobian
+from ..core import file_writer
+from ..core import kernel_ir
+from ..core import mech_arrays
 from ..core import mech_auxiliary
+from ..core import mech_cache
+from ..core import mech_interpret
+from ..core import planner
+from ..core import profiler
 from ..core import rate_subs
 from ..core import shared_memory
+from ..core import sparsity
+from ..core import table_kernels
+from ..libgen import libgen
+from ..benchmark import synthetic
+from .. import utils
 
 class TestCacheOptimizer(object):
     """
@@ -19,6 +38,46 @@ def test_imported(self):
         """
         assert 'pyjac.core.cache_optimizer' in sys.modules
 
+    def test_results_in_tree(self, tmpdir, monkeypatch):
+        """Ensure the results of the optimizer are kept with the generated
+        files, in memory for an in-memory tree.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+        optimize_cache = cache_optimizer.optimize_cache
+
+        def last_species_last(specs, reacs, multi_thread, force_optimize,
+                              build_path, last_spec):
+            # the optimization itself takes minutes
+            fwd_spec, back_spec = utils.get_species_mappings(len(specs),
+                                                             last_spec)
+            rxns = list(range(len(reacs)))
+            return ([specs[i] for i in fwd_spec], reacs, fwd_spec, rxns,
+                    back_spec, rxns)
+        monkeypatch.setattr(cache_optimizer, 'optimize_cache',
+                            last_species_last)
+        monkeypatch.setattr(cache_optimizer, 'have_bitarray', True)
+        monkeypatch.chdir(str(tmpdir))
+
+        tree = create_jacobian.create_source_tree('c', mech_name,
+                                                  parse_cache=False,
+                                                  optimize_cache=True)
+        assert os.listdir(str(tmpdir)) == ['mech.inp']
+        with file_writer.use_file_system(tree):
+            manifest = file_writer.read_manifest(os.curdir)
+        assert manifest['cache_optimized']
+        assert cache_optimizer.optimized_name in manifest['files']
+
+        # the previous results are read from the tree
+        elems, specs, reacs = mech_interpret.read_mech(mech_name, None)
+        last_spec = create_jacobian.get_last_species(specs, None)
+        with file_writer.use_file_system(tree):
+            results = optimize_cache(specs, reacs, 1, False, os.curdir,
+                                     last_spec)
+        assert [sp.name for sp in results[0]] == manifest['species']
+        assert results[2] == manifest['mappings']['fwd_species']
+
 class TestChemUtilities(object):
     """
     """
@@ -27,6 +86,36 @@ def test_imported(self):
         """
         assert 'pyjac.core.chem_utilities' in sys.modules
 
+    def test_fingerprints(self, tmpdir):
+        """Ensure fingerprints identify content, not order or representation.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(20, 60))
+        elems, specs, reacs = mech_interpret.read_mech(filename, None)
+        fingerprint = chem_utilities.get_mech_fingerprint(specs, reacs)
+        assert all(rxn.fingerprint for rxn in reacs)
+
+        # reordering and reassigning species to indices is the same mechanism
+        utils.reassign_species_lists(reacs, specs)
+        assert chem_utilities.get_fingerprint(reacs[0], specs) == \
+            reacs[0].fingerprint
+        reacs[0].reac = reacs[0].reac[::-1]
+        reacs[0].reac_nu = reacs[0].reac_nu[::-1]
+        assert chem_utilities.get_fingerprint(reacs[0], specs) == \
+            reacs[0].fingerprint
+        assert chem_utilities.get_mech_fingerprint(specs[::-1],
+                                                   reacs[::-1]) == fingerprint
+
+        # while any change in content is not
+        reacs[1].A *= 2.0
+        assert chem_utilities.get_fingerprint(reacs[1], specs) != \
+            reacs[1].fingerprint
+        chem_utilities.set_fingerprints(specs, reacs)
+        assert chem_utilities.get_mech_fingerprint(specs, reacs) != fingerprint
+        assert chem_utilities.get_mech_fingerprint(specs, reacs[1:]) != \
+            chem_utilities.get_mech_fingerprint(specs, reacs)
+
 class TestCreateJacobian(object):
     """
     """
@@ -35,6 +124,385 @@ def test_imported(self):
         """
         assert 'pyjac.core.create_jacobian' in sys.modules
 
+    def test_parallel(self, tmpdir):
+        """Ensure parallel generation writes the same files as serial.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        # enough reactions to split the Jacobian into files
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(20, 100))
+
+        def read_tree(path):
+            files = {}
+            for dirpath, dirnames, filenames in os.walk(path):
+                for filename in filenames:
+                    with open(os.path.join(dirpath, filename)) as file:
+                        files[os.path.relpath(os.path.join(dirpath, filename),
+                                              path)] = file.read()
+            return files
+
+        for lang in ['c', 'cuda']:
+            trees = []
+            for jobs in [1, 2]:
+                build_path = os.path.join(str(tmpdir), '{}_{}'.format(lang,
+                                                                       jobs))
+                create_jacobian.create_jacobian(lang, mech_name,
+                                                build_path=build_path,
+                                                parse_cache=False, jobs=jobs
+                                                )
+                trees.append(read_tree(build_path))
+            assert 'jacobs/jacob_1' + utils.file_ext[lang] in trees[0]
+            assert trees[0] == trees[1]
+
+            # the same files, in memory
+            tree = create_jacobian.create_source_tree(lang, mech_name,
+                                                      parse_cache=False,
+                                                      jobs=2
+                                                      )
+            assert isinstance(tree, file_writer.MemoryTree)
+            assert tree == trees[0]
+
+    def test_manifest(self, tmpdir):
+        """Ensure the manifest describes the mechanism and generated files.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(20, 100))
+        tree = create_jacobian.create_source_tree('c', mech_name,
+                                                  parse_cache=False)
+        with file_writer.use_file_system(tree):
+            manifest = file_writer.read_manifest(os.curdir)
+        assert manifest['lang'] == 'c'
+        assert manifest['counts']['species'] == 20
+        num_reac = manifest['counts']['reactions']
+        assert '#define FWD_RATES {}\n'.format(num_reac) in tree['mechanism.h']
+        assert len(manifest['species']) == 20
+        assert sorted(manifest['mappings']['fwd_species']) == list(range(20))
+        assert manifest['mappings']['fwd_reactions'] == list(range(num_reac))
+        assert 'jacobs/jacob_1' in manifest['sources']
+        assert sorted(name + '.c' for name in manifest['sources']) == sorted(
+            name for name in tree if name.endswith('.c'))
+        assert manifest['files']['dydt.c']['sha1'] is not None
+
+        pattern = sparsity.SparsityPattern.from_dict(manifest['sparsity'])
+        assert '#define N_A {}\n'.format(pattern.nnz) in \
+            tree['sparse_multiplier.h']
+        assert pattern.to_dict() == manifest['sparsity']
+
+    def test_disabled_reactions(self, tmpdir):
+        """Ensure reactions left out keep their place, and only the files of
+        the changed reactions are rewritten with ``delta``.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(20, 100))
+        disabled = [0, 1, 2, 3, 5, 8]
+        for lang in ['c', 'cuda']:
+            full = create_jacobian.create_source_tree(lang, mech_name,
+                                                      parse_cache=False)
+            assert create_jacobian.create_source_tree(
+                lang, mech_name, parse_cache=False,
+                disabled_reactions=[]) == full
+            reduced = create_jacobian.create_source_tree(
+                lang, mech_name, parse_cache=False,
+                disabled_reactions=disabled)
+            assert sorted(reduced) == sorted(full)
+            assert utils.get_array(lang, 'fwd_rxn_rates', 0) + ' = 0.0;' in \
+                reduced['rxn_rates' + utils.file_ext[lang]]
+            with file_writer.use_file_system(reduced):
+                manifest = file_writer.read_manifest(os.curdir)
+            assert manifest['disabled_reactions'] == disabled
+            assert manifest['jacobian_chunks'][0][0] == 0
+
+            build_path = os.path.join(str(tmpdir), lang)
+            for reactions, tree in [(None, full), (disabled, reduced),
+                                    (None, full)]:
+                create_jacobian.create_jacobian(
+                    lang, mech_name, build_path=build_path,
+                    parse_cache=False, jobs=2, disabled_reactions=reactions,
+                    delta=True)
+                manifest = file_writer.read_manifest(build_path)
+                for name in tree:
+                    if name != file_writer.manifest_name:
+                        with open(os.path.join(build_path, name)) as file:
+                            assert file.read() == tree[name]
+            # only the reaction rates, and the Jacobian subfile of the
+            # reactions, changed
+            assert sorted(manifest['changed']) == [
+                'jacobs/jacob_0' + utils.file_ext[lang],
+                'rxn_rates' + utils.file_ext[lang]]
+
+class TestFileWriter(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure file_writer module imported.
+        """
+        assert 'pyjac.core.file_writer' in sys.modules
+
+    def test_atomic_writes(self, tmpdir):
+        """Ensure output files are only replaced once completely written.
+        """
+        filename = os.path.join(str(tmpdir), 'out.c')
+        with file_writer.open_file(filename) as file:
+            file.write('old\n')
+            assert not os.path.exists(filename)
+        with open(filename) as file:
+            assert file.read() == 'old\n'
+
+        # an error leaves the previous file
+        try:
+            with file_writer.open_file(filename) as file:
+                file.write('partial')
+                raise ValueError
+        except ValueError:
+            pass
+        with open(filename) as file:
+            assert file.read() == 'old\n'
+        assert os.listdir(str(tmpdir)) == ['out.c']
+
+        # in a transaction, all files are replaced at the end ...
+        other = os.path.join(str(tmpdir), 'out.h')
+        with file_writer.transaction():
+            with file_writer.open_file(filename) as file:
+                file.write('new\n')
+            file = file_writer.open_file(other)
+            file.write('header\n')
+            assert not os.path.exists(other)
+            with open(filename) as readfile:
+                assert readfile.read() == 'old\n'
+        with open(filename) as file:
+            assert file.read() == 'new\n'
+        with open(other) as file:
+            assert file.read() == 'header\n'
+
+        # ... or none of them
+        try:
+            with file_writer.transaction():
+                for name in (filename, other):
+                    with file_writer.open_file(name) as file:
+                        file.write('partial')
+                sys.exit(1)
+        except SystemExit:
+            pass
+        with open(filename) as file:
+            assert file.read() == 'new\n'
+        assert sorted(os.listdir(str(tmpdir))) == ['out.c', 'out.h']
+
+        # files written by another process are taken over
+        with file_writer.collect() as written:
+            with file_writer.open_file(other) as file:
+                file.write('other\n')
+        assert written == [(other, file.temp_name)]
+        with file_writer.transaction():
+            file_writer.adopt(written)
+            with open(other) as readfile:
+                assert readfile.read() == 'header\n'
+        with open(other) as file:
+            assert file.read() == 'other\n'
+        assert sorted(os.listdir(str(tmpdir))) == ['out.c', 'out.h']
+
+        # files outside of the generated trees are written at once, to disk
+        cache = os.path.join(str(tmpdir), 'cache.pickle')
+        with file_writer.use_file_system(file_writer.MemoryTree()):
+            with file_writer.transaction():
+                file_writer.write_atomic(cache, b'data')
+                assert sorted(os.listdir(str(tmpdir))) == [
+                    'cache.pickle', 'out.c', 'out.h']
+        with open(cache, 'rb') as file:
+            assert file.read() == b'data'
+        try:
+            file_writer.write_atomic(os.path.join(str(tmpdir), 'missing',
+                                                  'cache.pickle'), b'data')
+            assert False
+        except (IOError, OSError):
+            pass
+        assert sorted(os.listdir(str(tmpdir))) == ['cache.pickle', 'out.c',
+                                                   'out.h']
+
+    def test_unchanged_files(self, tmpdir):
+        """Ensure files with unchanged contents are left untouched, and
+        listed as such in the manifest.
+        """
+        filename = os.path.join(str(tmpdir), 'out.c')
+        other = os.path.join(str(tmpdir), 'out.h')
+        manifest = os.path.join(str(tmpdir), file_writer.manifest_name)
+        with file_writer.open_file(filename) as file:
+            file.write('old\n')
+        os.utime(filename, (0, 0))
+
+        with file_writer.transaction(manifest) as written:
+            for name, text in [(filename, 'old\n'), (other, 'header\n')]:
+                with file_writer.open_file(name) as file:
+                    file.write(text)
+        assert written == {filename: 'unchanged', other: 'added'}
+        assert os.path.getmtime(filename) == 0
+        with open(manifest) as file:
+            contents = json.load(file)
+        assert contents['changed'] == ['out.h']
+        assert contents['files']['out.c']['status'] == 'unchanged'
+        assert (contents['files']['out.h']['sha1'] ==
+                file_writer.file_hash(other))
+
+        with file_writer.open_file(filename) as file:
+            file.write('new\n')
+        assert file.status == 'changed'
+        assert os.path.getmtime(filename) != 0
+        assert sorted(os.listdir(str(tmpdir))) == [file_writer.manifest_name,
+                                                   'out.c', 'out.h'
+                                                   ]
+
+    def test_memory_tree(self, tmpdir):
+        """Ensure files are written to a memory tree instead of disk.
+        """
+        tree = file_writer.MemoryTree(str(tmpdir))
+        with file_writer.use_file_system(tree):
+            with file_writer.transaction() as written:
+                with file_writer.open_file(os.path.join(str(tmpdir), 'out.c')
+                                           ) as file:
+                    file.write('int x;\n')
+                file_writer.create_dir(os.path.join(str(tmpdir), 'rates'))
+                with file_writer.open_file(os.path.join(str(tmpdir), 'rates',
+                                                        'rates.h')) as file:
+                    file.writelines(['#ifndef RATES\n', '#endif'])
+                    file.close()
+                    assert file.count_lines() == 2
+                    assert not tree
+        assert isinstance(file_writer.get_file_system(), file_writer.DiskTree)
+        assert tree == {'out.c': 'int x;\n',
+                        'rates/rates.h': '#ifndef RATES\n#endif'
+                        }
+        assert sorted(written.values()) == ['added', 'added']
+        assert os.listdir(str(tmpdir)) == []
+
+class TestKernelIR(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure kernel_ir module imported.
+        """
+        assert 'pyjac.core.kernel_ir' in sys.modules
+
+    def test_fold_and_print(self):
+        """Ensure constants are folded and expressions printed as C.
+        """
+        ir = kernel_ir
+        kf, kr = ir.Sym('kf'), ir.Sym('kr')
+        conc = [ir.Sym('conc[{}]'.format(i)) for i in range(3)]
+        printer = ir.CPrinter()
+
+        assert ir.mul(1.0, kf) is kf
+        assert ir.mul(0.0, kf) == ir.Const(0.)
+        assert ir.add(kf, 0.0, ir.mul(0.0, kr)) is kf
+        assert ir.power(conc[0], 1) is conc[0]
+        # products are evaluated as written, unless reassociated
+        scaled = ir.mul(2.0, ir.mul(0.5, kf, conc[1]))
+        assert scaled == ir.Product(2.0, [ir.mul(0.5, kf, conc[1])])
+        assert printer.doprint(scaled) == '{} * ({} * kf * conc[1])'.format(
+            printer.const(2.0), printer.const(0.5))
+        assert ir.mul(2.0, ir.mul(0.5, kf, conc[1]), reassociate=True) == \
+            ir.mul(kf, conc[1])
+        assert ir.mul(kf, conc[1], 2.0) == \
+            ir.Product(1.0, [kf, conc[1], ir.Const(2.0)])
+        assert ir.add(kf, kr + 1.0) == ir.Sum([kf, kr + 1.0])
+        assert ir.add(kf, kr + 1.0, 1.0, reassociate=True) == \
+            ir.Sum([kf, kr, ir.Const(2.0)])
+        # equal structure hashes the same
+        assert len({ir.mul(kf, conc[0]), ir.mul(kf, conc[0])}) == 1
+
+        expr = ir.mul(conc[2], kf * ir.power(conc[0], 2) -
+                      2.0 * kr * ir.power(conc[1], 0.5))
+        assert printer.doprint(expr) == \
+            'conc[2] * (kf * conc[0] * conc[0] - {} * kr * ' \
+            'pow(conc[1], {}))'.format(printer.const(2.0), printer.const(0.5))
+        assert printer.statement(ir.Assign('jac[1]', -expr, '+=')) == \
+            '  jac[1] -= ' + printer.doprint(expr) + ';\n'
+        assert printer.statement(ir.Assign('jac[1]', -kf)) == \
+            '  jac[1] = -kf;\n'
+        # the same as building the product
+        for coeff in [-2.0, -1.0, 0.5, 1.0]:
+            for value in [expr, -expr, kf, 2.0 * (kf + kr), ir.Const(2.0)]:
+                assert printer.scaled_statement('jac[1]', coeff, value,
+                                                '+=') == \
+                    printer.statement(ir.Assign('jac[1]',
+                                                ir.mul(coeff, value), '+='))
+        printer = ir.CPrinter(reassociate=True)
+        assert printer.scaled_statement('jac[1]', 2.0, scaled) == \
+            '  jac[1] = {} * ({} * kf * conc[1]);\n'.format(
+                printer.const(4.0), printer.const(0.5))
+        assert printer.scaled_statement('jac[1]', 0.5, 2.0 * kf) == \
+            '  jac[1] = kf;\n'
+
+    def test_cse(self):
+        """Ensure repeated subexpressions are hoisted and counted.
+        """
+        ir = kernel_ir
+        kf, kr, j_temp = ir.Sym('kf'), ir.Sym('kr'), ir.Sym('j_temp')
+        conc = [ir.Sym('conc[{}]'.format(i)) for i in range(3)]
+        rate = ir.mul(ir.Sym('pres_mod[0]'),
+                      kf * conc[0] * conc[1] - kr * conc[2])
+
+        assert ir.count_flops(rate) == 5
+        assert ir.count_flops(ir.power(conc[0] + conc[1], 2)) == 3
+        assert ir.count_flops(ir.Call('exp', [2.0 * kf])) == 2
+
+        stmts = []
+        for j in range(1, 3):
+            dr_dyj = ir.add(ir.mul(0.5 * j, j_temp), ir.mul(-0.25 * j, rate))
+            for k in range(2):
+                stmts.append(ir.Assign('jac[{}]'.format(2 * j + k),
+                                       ir.mul(k + 1.5, dr_dyj), '+='))
+        new_stmts, removed = ir.cse(stmts)
+
+        printer = ir.CPrinter()
+        assert printer.statements(new_stmts[:3]) == (
+            '  double cse_0 = pres_mod[0] * (kf * conc[0] * conc[1] - '
+            'kr * conc[2]);\n'
+            '  double cse_1 = {0} * j_temp - {1} * cse_0;\n'
+            '  double cse_2 = j_temp - {0} * cse_0;\n'.format(
+                printer.const(0.5), printer.const(0.25)))
+        assert printer.statements(new_stmts[3:5]) == (
+            '  jac[2] += {0} * cse_1;\n'
+            '  jac[3] += {1} * cse_1;\n'.format(
+                printer.const(1.5), printer.const(2.5)))
+        # 38 operations before, 5 + 3 + 2 + 4 * 2 after
+        assert ir._statement_flops(stmts) == 38
+        assert removed == 20
+        # nothing repeated
+        assert ir.cse(stmts[:1]) == (stmts[:1], 0)
+
+        # the temporaries are evaluated before the statements
+        try:
+            ir.cse([ir.Assign('kf', kf * kr + kf * kr)])
+            assert False
+        except ValueError:
+            pass
+
+    def test_cse_calls(self):
+        """Ensure repeated math function calls are hoisted per scope.
+        """
+        text = ('  Fcent = 0.5 * exp(T / -100.0) + 0.5 * exp(T / -100.0);\n'
+                '  A = log10(fmax(Pr, 1.0e-300)) - 0.67 * '
+                'log10(fmax(Fcent, 1.0e-300));\n'
+                '  B = 0.806 - 0.14 * log10(fmax(Pr, 1.0e-300));\n'
+                '  Pr = 2.0 * Pr;\n'
+                '  X = log10(fmax(Pr, 1.0e-300));\n'
+                '  if (X > 0.0) {\n'
+                '    X = log10(fmax(Pr, 1.0e-300));\n'
+                '  }\n')
+        new_text, removed = kernel_ir.cse_calls(text)
+        assert removed == 2
+        # the calls after Pr is reassigned, and inside braces, are kept
+        assert new_text == (
+            '  double cse_f0 = exp(T / -100.0);\n'
+            '  Fcent = 0.5 * cse_f0 + 0.5 * cse_f0;\n'
+            '  double cse_f1 = log10(fmax(Pr, 1.0e-300));\n'
+            '  A = cse_f1 - 0.67 * log10(fmax(Fcent, 1.0e-300));\n'
+            '  B = 0.806 - 0.14 * cse_f1;\n' + text[text.index('  Pr ='):])
+        # nothing repeated
+        assert kernel_ir.cse_calls(text[text.index('  Pr ='):]) == \
+            (text[text.index('  Pr ='):], 0)
+
 class TestMechAuxiliary(object):
     """
     """
@@ -43,6 +511,460 @@ def test_imported(self):
         """
         assert 'pyjac.core.mech_auxiliary' in sys.modules
 
+class TestMechArrays(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure mech_arrays module imported.
+        """
+        assert 'pyjac.core.mech_arrays' in sys.modules
+
+    def test_mechanism_arrays(self, tmpdir):
+        """Ensure arrays match the parsed species and reactions.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(20, 60))
+        elems, specs, reacs = mech_interpret.read_mech(filename, None)
+        by_name = mech_arrays.MechanismArrays(specs, reacs)
+        utils.reassign_species_lists(reacs, specs)
+        arrays = mech_arrays.MechanismArrays(specs, reacs)
+
+        assert np.array_equal(by_name.nu_indices, arrays.nu_indices)
+        assert np.array_equal(by_name.eff, arrays.eff)
+        assert arrays.mw.shape == (20,)
+        assert arrays.thermo.shape == (20, 2, 7)
+        assert np.array_equal(arrays.rev, [rxn.rev for rxn in reacs])
+        assert any(rxn.low for rxn in reacs) and not all(rxn.low
+                                                         for rxn in reacs)
+        for rxn_ind, rxn in enumerate(reacs):
+            if rxn.low:
+                assert arrays.low[rxn_ind, 0] == rxn.low[0]
+            else:
+                assert np.isnan(arrays.low[rxn_ind, 0])
+            # the falloff reactions are (+M)
+            if rxn.pdep:
+                assert arrays.pdep_sp[rxn_ind] == -1
+
+        for rxn_ind, rxn in enumerate(reacs):
+            nu = arrays.net_nu(rxn_ind)
+            for isp in range(len(specs)):
+                assert nu.get(isp, 0) == utils.get_nu(isp, rxn)
+            # the first efficiency of a repeated species is used
+            eff = {}
+            for isp, alpha in rxn.thd_body_eff:
+                eff.setdefault(isp, alpha)
+            assert arrays.efficiencies(rxn_ind) == eff
+
+        last = len(specs) - 1
+        assert np.array_equal(arrays.changes_species(last),
+                              [utils.get_nu(last, rxn) != 0 for rxn in reacs])
+
+    def test_mechanism_index(self, tmpdir):
+        """Ensure lookup tables match searching the reaction lists.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(20, 60))
+        elems, specs, reacs = mech_interpret.read_mech(filename, None)
+        utils.reassign_species_lists(reacs, specs)
+        index = mech_arrays.MechanismIndex(specs, reacs)
+
+        rev_reacs = [i for i, rxn in enumerate(reacs) if rxn.rev]
+        pdep_reacs = [i for i, rxn in enumerate(reacs)
+                      if rxn.thd_body or rxn.pdep]
+        assert index.rev_reacs == rev_reacs
+        assert index.pdep_reacs == pdep_reacs
+        for rxn_ind, rxn in enumerate(reacs):
+            if rxn.rev:
+                assert index.rev_index[rxn_ind] == rev_reacs.index(rxn_ind)
+            if rxn.thd_body or rxn.pdep:
+                assert index.pdep_index[rxn_ind] == pdep_reacs.index(rxn_ind)
+            for sp in rxn.prod:
+                assert index.prod_nu[rxn_ind][sp] == \
+                    rxn.prod_nu[rxn.prod.index(sp)]
+
+        for isp in range(len(specs)):
+            spec_reacs = [i for i, rxn in enumerate(reacs)
+                          if utils.get_nu(isp, rxn) != 0]
+            assert index.spec_reacs[isp] == spec_reacs
+            for rxn_ind in range(len(reacs)):
+                count = 0
+                while (rxn_ind + 1 + count < len(reacs) and
+                       rxn_ind + 1 + count in spec_reacs):
+                    count += 1
+                assert index.num_following(isp, rxn_ind) == count
+
+    def test_pickle(self):
+        """Ensure slotted mechanism objects pickle and compare by value.
+        """
+        rxn = chem_utilities.ReacInfo(True, ['H', 'O2'], [1, 1], ['HO2'],
+                                      [1], 1.0e12, 0.5, 1000.0)
+        rxn.thd_body_eff = [('H2O', 2.0)]
+        copy = pickle.loads(pickle.dumps(rxn, pickle.HIGHEST_PROTOCOL))
+        assert copy == rxn and copy.thd_body_eff == [('H2O', 2.0)]
+        copy.A = 2.0e12
+        assert copy != rxn
+        assert not hasattr(rxn, '__dict__')
+
+
+class TestMechCache(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure mech_cache module imported.
+        """
+        assert 'pyjac.core.mech_cache' in sys.modules
+
+    def test_read_mech_file(self, tmpdir, monkeypatch):
+        """Ensure cached mechanisms match and are keyed by file contents.
+        """
+        monkeypatch.setenv(mech_cache.cache_dir_env, str(tmpdir.join('cache')))
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(20, 50))
+        key = mech_cache.get_cache_key(filename)
+
+        parsed = mech_cache.read_mech_file(filename)
+        assert os.path.isfile(os.path.join(mech_cache.get_cache_dir(),
+                                           key + '.pickle'))
+
+        def no_parse(*args):
+            raise AssertionError('mechanism re-parsed')
+        monkeypatch.setattr(mech_interpret, 'read_mech', no_parse)
+        cached = mech_cache.read_mech_file(filename)
+        assert cached[0] == parsed[0]
+        assert cached[1] == parsed[1]
+        assert cached[2] == parsed[2]
+
+        # changing the file must change the key
+        with open(filename, 'a') as file:
+            file.write('! modified\n')
+        assert mech_cache.get_cache_key(filename) != key
+
+
+def get_state(rxn):
+    """Get the state of a reaction, with its Chebyshev coefficients as lists.
+    """
+    return tuple(value.tolist() if isinstance(value, np.ndarray) else value
+                 for value in rxn.__getstate__())
+
+
+class TestMechInterpret(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure mech_interpret module imported.
+        """
+        assert 'pyjac.core.mech_interpret' in sys.modules
+
+    def test_read_mech_scaling(self, tmpdir):
+        """Ensure the work of the Chemkin parser grows linearly with the
+        size of the file.
+        """
+        def count_lines(filename):
+            # the Python lines executed, a measure of the work that does
+            # not depend on the machine
+            count = [0]
+
+            def trace(frame, event, arg):
+                if event == 'line':
+                    count[0] += 1
+                return trace
+            tracer = sys.gettrace()
+            sys.settrace(trace)
+            try:
+                parsed = mech_interpret.read_mech(filename, None)
+            finally:
+                sys.settrace(tracer)
+            return count[0], parsed
+
+        scale = 8
+        counts = []
+        for mult in (1, scale):
+            filename = os.path.join(str(tmpdir), 'mech{}.inp'.format(mult))
+            synthetic.write_chemkin(filename, *synthetic.generate_mechanism(
+                50 * mult, 250 * mult, connectivity=50))
+            count, (elems, specs, reacs) = count_lines(filename)
+            counts.append(count)
+            assert len(specs) == 50 * mult
+            assert len(reacs) == 250 * mult
+
+        # quadratic scaling would give a ratio of scale ** 2
+        assert counts[1] < 1.25 * scale * counts[0]
+
+    def test_read_mech_parallel(self, tmpdir):
+        """Ensure reactions interpreted in parallel match the serial result.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(50, 400))
+        elems, specs, reacs = mech_interpret.read_mech(filename, None)
+        par_elems, par_specs, par_reacs = mech_interpret.read_mech(
+            filename, None, num_procs=3)
+        assert par_elems == elems
+        assert par_specs == specs
+        assert len(par_reacs) == len(reacs)
+        for par_reac, reac in zip(par_reacs, reacs):
+            assert get_state(par_reac) == get_state(reac)
+
+    def test_read_mech_parallel_error(self, tmpdir):
+        """Ensure the workers are stopped when a reaction fails to parse.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(10, 40))
+        with open(filename) as file:
+            lines = file.read().split('\n')
+        last = [i for i, line in enumerate(lines) if '=' in line][-1]
+        lines[last] = lines[last].rsplit(' ', 2)[0] + ' x 0.0'
+        with open(filename, 'w') as file:
+            file.write('\n'.join(lines))
+
+        try:
+            mech_interpret.read_mech(filename, None, num_procs=2)
+            assert False
+        except ValueError:
+            assert multiprocessing.active_children() == []
+
+    def test_iter_mech(self, tmpdir, monkeypatch):
+        """Ensure reactions are streamed as they are read, in order.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(50, 400))
+        elems, specs, reacs = mech_interpret.read_mech(filename, None)
+
+        num_read = [0]
+        read_reaction = mech_interpret._read_reaction
+        def counting_read_reaction(*args):
+            num_read[0] += 1
+            return read_reaction(*args)
+        monkeypatch.setattr(mech_interpret, '_read_reaction',
+                            counting_read_reaction)
+
+        stream = mech_interpret.iter_mech(filename)
+        kinds = []
+        for kind, item in stream:
+            kinds.append(kind)
+            if kind == 'reaction':
+                break
+        # the first reaction is yielded once the second one's line is reached
+        assert num_read[0] == 1
+        assert kinds == ['element'] * len(elems) + \
+            ['species'] * len(specs) + ['reaction']
+        assert get_state(item) == get_state(reacs[0])
+
+        streamed = [item] + [item for kind, item in stream]
+        assert len(streamed) == len(reacs)
+        for streamed_reac, reac in zip(streamed, reacs):
+            assert get_state(streamed_reac) == get_state(reac)
+
+    def test_element_weights(self, tmpdir):
+        """Ensure atomic weights declared by a mechanism only apply to it.
+        """
+        filename = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(filename,
+                                *synthetic.generate_mechanism(10, 20))
+        elems, specs, reacs = mech_interpret.read_mech(filename, None)
+        with open(filename) as file:
+            text = file.read()
+        heavy = os.path.join(str(tmpdir), 'heavy.inp')
+        with open(heavy, 'w') as file:
+            file.write(text.replace('C H O', 'C /13.0/ H O', 1))
+
+        heavy_specs = mech_interpret.read_mech(heavy, None)[1]
+        assert heavy_specs[0].mw > specs[0].mw
+        assert mech_interpret.read_mech(filename, None)[1] == specs
+        assert [sp.mw for sp in mech_interpret.read_mech(filename, None)[1]] \
+            == [sp.mw for sp in specs]
+
+    def test_read_thermo_index(self, tmpdir, monkeypatch):
+        """Ensure indexed thermo database is persisted, reused and refreshed.
+        """
+        monkeypatch.setattr(mech_interpret, 'thermo_index_min_size', 0)
+        filename = os.path.join(str(tmpdir), 'therm.dat')
+        thermo = synthetic.generate_mechanism(1000, 1)[1]
+        for sp in thermo:
+            sp.Trange = [200.0, 1000.0, 3500.0]
+        # a second record of S10, of another composition
+        other = chem_utilities.SpecInfo('S10')
+        other.elem = thermo[11].elem
+        other.hi = other.lo = thermo[11].hi
+        with open(filename, 'w') as file:
+            file.write('\n'.join(['THERMO', '   300.000  1000.000  5000.000'] +
+                                 synthetic.get_thermo_lines(thermo + [other]) +
+                                 ['END']
+                                 ) + '\n')
+
+        def read(names):
+            specs = [chem_utilities.SpecInfo(name) for name in names]
+            mech_interpret.read_thermo(filename, [], specs)
+            return specs
+
+        specs = read(['S10', 'S997', 'Y0'])
+        assert os.path.isfile(filename + mech_interpret.thermo_index_ext)
+        # first record of a species wins, and unknown species are left alone
+        assert specs[0].elem == thermo[10].elem != other.elem
+        assert specs[1].Trange == [200.0, 1000.0, 3500.0]
+        assert np.allclose(specs[1].hi, thermo[997].hi)
+        assert np.allclose(specs[1].lo, thermo[997].lo)
+        assert specs[2].mw == 0.0
+
+        # the index is reused ...
+        def no_index(data):
+            raise AssertionError('database re-indexed')
+        with monkeypatch.context() as patch:
+            patch.setattr(mech_interpret, '_build_thermo_index', no_index)
+            assert np.array_equal(read(['S997'])[0].hi, specs[1].hi)
+
+        # ... unless the contents change, even keeping the size and time
+        stat = os.stat(filename)
+        with open(filename) as file:
+            text = file.read()
+        with open(filename, 'w') as file:
+            file.write(text.replace('S997 ', 'S998 '))
+        os.utime(filename, (stat.st_atime, stat.st_mtime))
+        specs = read(['S997', 'S998'])
+        assert specs[0].mw == 0.0 and specs[1].mw
+
+        # the index is data: anything else is rebuilt, not loaded
+        index_file = filename + mech_interpret.thermo_index_ext
+        with open(index_file, 'wb') as file:
+            file.write(pickle.dumps(no_index.__name__))
+        assert read(['S998'])[0].mw
+        with open(index_file) as file:
+            assert json.load(file)['offsets']['S998'] > 0
+
+        # mechanisms with a THERMO section are not indexed on disk
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+        specs = [chem_utilities.SpecInfo('S1')]
+        mech_interpret.read_thermo(mech_name, [], specs)
+        assert specs[0].mw
+        assert not os.path.exists(mech_name + mech_interpret.thermo_index_ext)
+
+        # a stale index must not be used once the database changes
+        with open(filename, 'w') as file:
+            file.write('\n'.join(['THERMO'] +
+                                 synthetic.get_thermo_lines([other]) +
+                                 ['END']
+                                 ) + '\n')
+        os.utime(filename, (0, 0))
+        specs = read(['S10', 'S997'])
+        assert specs[0].elem == other.elem
+        assert specs[1].mw == 0.0
+
+
+class TestPlanner(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure planner module imported.
+        """
+        assert 'pyjac.core.planner' in sys.modules
+
+    def test_plan(self, tmpdir):
+        """Ensure the plan predicts the files and nonzeros generated.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        # enough reactions to split the Jacobian into files
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(20, 100))
+        for lang in ['c', 'cuda']:
+            plan = planner.plan_generation(lang, mech_name,
+                                           parse_cache=False, processes=2)
+            tree = create_jacobian.create_source_tree(lang, mech_name,
+                                                      parse_cache=False)
+            header = tree['sparse_multiplier' + utils.header_ext[lang]]
+            assert '#define N_A {}\n'.format(plan['nonzeros']) in header
+            assert plan['memory']['dense'] == 8 * 20 * 20
+
+            jacobs = [name for name in tree if name.startswith('jacobs/jacob_')
+                      and name.endswith(utils.file_ext[lang])]
+            assert plan['jacobian_files'] == len(jacobs) > 1
+            assert sorted(name for name in plan['lines']) == sorted(
+                name for name in tree if name.endswith(utils.file_ext[lang]))
+            lines = sum(text.count('\n') for name, text in tree.items()
+                        if name in plan['lines'])
+            assert abs(plan['total_lines'] - lines) < 0.2 * lines
+            assert plan['compile_time']['cpu'] >= \
+                plan['compile_time']['wall'] > 0
+
+        plan = planner.plan_generation('c', mech_name, parse_cache=False,
+                                       skip_jac=True)
+        assert plan['nonzeros'] is None and plan['jacobian_files'] == 0
+        assert plan['tables'] is None
+
+        plan = planner.plan_generation('c', mech_name, parse_cache=False,
+                                       table_kernels=True)
+        tree = create_jacobian.create_source_tree('c', mech_name,
+                                                  parse_cache=False,
+                                                  table_kernels=True)
+        assert plan['table_kernels'] and plan['jacobian_files'] == 0
+        assert sorted(plan['lines']) == sorted(
+            name for name in tree if name.endswith('.c'))
+        # the tables are written exactly as planned
+        assert plan['lines']['rxn_tables.c'] == \
+            tree['rxn_tables.c'].count('\n')
+        assert plan['tables'] > 0
+        assert '#define N_A {}\n'.format(plan['nonzeros']) in \
+            tree['sparse_multiplier.h']
+        assert 'constant tables' in planner.summary(plan)
+
+class TestProfiler(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure profiler module imported.
+        """
+        assert 'pyjac.core.profiler' in sys.modules
+
+    def test_stages(self):
+        """Ensure nested stages are recorded, with their peak memory.
+        """
+        prof = profiler.Profiler()
+        try:
+            with prof.stage('outer'):
+                with prof.stage('inner'):
+                    data = bytearray(1 << 20)
+                del data
+        finally:
+            prof.close()
+        inner, outer = prof.stages
+        assert (inner['name'], inner['depth']) == ('inner', 1)
+        assert (outer['name'], outer['depth']) == ('outer', 0)
+        assert outer['wall_time'] >= inner['wall_time'] >= 0
+        if profiler.tracemalloc is not None:
+            assert outer['peak_memory'] >= inner['peak_memory'] >= 1 << 20
+
+        prof = profiler.Profiler(enabled=False)
+        with prof.stage('outer'):
+            pass
+        assert prof.stages == []
+
+    def test_report(self, tmpdir):
+        """Ensure the report of a generation lists its stages and files.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+        tree = create_jacobian.create_source_tree('c', mech_name,
+                                                  parse_cache=False,
+                                                  profile=True,
+                                                  trace_memory=False
+                                                  )
+        report = json.loads(tree[profiler.report_name])
+        names = [stage['name'] for stage in report['stages']]
+        for name in ['parse', 'write_rxn_rates', 'write_jacobian', 'total']:
+            assert name in names
+        assert report['files']['jacob.c']['lines'] == \
+            tree['jacob.c'].count('\n')
+        assert report['total']['bytes'] == sum(
+            len(text) for name, text in tree.items()
+            if name not in [profiler.report_name, file_writer.manifest_name])
+
 class TestRateSubs(object):
     """
     """
@@ -58,3 +980,138 @@ def test_imported(self):
         """Ensure shared_memory module imported.
         """
         assert 'pyjac.core.shared_memory' in sys.modules
+
+class TestSparsity(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure sparsity module imported.
+        """
+        assert 'pyjac.core.sparsity' in sys.modules
+
+    def test_sparse_multiplier(self, tmpdir):
+        """Ensure the sparse multiplier only multiplies the nonzero entries.
+        """
+        pattern = sparsity.SparsityPattern(3)
+        pattern.add(0, 0)
+        pattern.add_row(1, 1)
+        assert (1, 2) in pattern and (2, 1) not in pattern
+        assert pattern.nnz == 3
+        assert pattern.col_indices(1).tolist() == [1, 2]
+        assert pattern.row_indices(2).tolist() == [1]
+        assert pattern.flat_indices().tolist() == [0, 4, 7]
+        copy = pattern.copy()
+        copy.add(2, 2)
+        assert (2, 2) not in pattern
+
+        create_jacobian.write_sparse_multiplier(str(tmpdir), 'c', pattern)
+        with open(os.path.join(str(tmpdir), 'sparse_multiplier.h')) as file:
+            assert '#define N_A 3' in file.read()
+        with open(os.path.join(str(tmpdir), 'sparse_multiplier.c')) as file:
+            text = file.read()
+        assert 'w[0] =  A[0] * Vm[0];' in text
+        assert 'w[1] =  A[4] * Vm[1] +  A[7] * Vm[2];' in text
+        assert 'w[2] = 0;' in text
+
+
+table_driver = """\
+#include <stdio.h>
+#include "header.h"
+#include "dydt.h"
+#include "jacob.h"
+
+int main (void) {
+  double y[NSP];
+  double dy[NSP];
+  static double jac[NSP * NSP];
+  for (int p = 0; p < 2; ++p) {
+    y[0] = 800.0 + 700.0 * p;
+    for (int i = 1; i < NSP; ++i)
+      y[i] = (1.0 + (i + p) % 3) / (2.0 * NSP);
+    dydt(0.0, 101325.0 * (1 + p), y, dy);
+    eval_jacob(0.0, 101325.0 * (1 + p), y, jac);
+    for (int i = 0; i < NSP; ++i)
+      printf("%.17e\\n", dy[i]);
+    for (int i = 0; i < NSP * NSP; ++i)
+      printf("%.17e\\n", jac[i]);
+  }
+  return 0;
+}
+"""
+"""str: C program printing the derivatives and Jacobian at two states"""
+
+
+class TestTableKernels(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure table_kernels module imported.
+        """
+        assert 'pyjac.core.table_kernels' in sys.modules
+
+    def test_table_kernels(self, tmpdir):
+        """Ensure the table-driven kernels have the sparsity of the unrolled
+        code, and (if compiled) the same derivatives and Jacobian.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(15, 60, seed=2))
+        disabled = [4]
+        manifests = {}
+        for tables in [False, True]:
+            build_path = os.path.join(str(tmpdir), str(tables))
+            create_jacobian.create_jacobian('c', mech_name,
+                                            build_path=build_path,
+                                            parse_cache=False,
+                                            disabled_reactions=disabled,
+                                            table_kernels=tables)
+            manifests[tables] = file_writer.read_manifest(build_path)
+        assert manifests[True]['kernels'] == 'tables'
+        assert manifests[False]['kernels'] == 'unrolled'
+        assert manifests[True]['sparsity'] == manifests[False]['sparsity']
+        assert 'rxn_tables' in manifests[True]['sources']
+        assert not any(name.startswith('jacobs/')
+                       for name in manifests[True]['sources'])
+        assert manifests[True]['files']['dydt.c'] == \
+            manifests[False]['files']['dydt.c']
+        num_reac = manifests[True]['counts']['reactions']
+        with open(os.path.join(str(tmpdir), 'True', 'rxn_tables.c')) as file:
+            assert 'const int tbl_kf_kind[{}]'.format(num_reac) in \
+                file.read()
+
+        elems, specs, reacs = mech_interpret.read_mech(mech_name, None)
+        utils.reassign_species_lists(reacs, specs)
+        index = mech_arrays.MechanismIndex(specs, reacs)
+        tables = table_kernels.get_tables(specs, reacs, index, set(disabled))
+        assert tables['tbl_kf_kind'][1][4] == \
+            table_kernels.kf_kinds['KF_OFF']
+        assert len(tables['tbl_reac_ptr'][1]) == len(reacs) + 1
+        assert len(tables['tbl_pm_kind'][1]) == len(index.pdep_reacs)
+        assert len(tables['tbl_kc_fac'][1]) == len(index.rev_reacs)
+        try:
+            create_jacobian.create_source_tree('cuda', mech_name,
+                                               parse_cache=False,
+                                               table_kernels=True)
+            assert False
+        except SystemExit:
+            pass
+
+        if libgen.which('gcc') is None:
+            return
+        values = {}
+        for tables in [False, True]:
+            build_path = os.path.join(str(tmpdir), str(tables))
+            with open(os.path.join(build_path, 'driver.c'), 'w') as file:
+                file.write(table_driver)
+            sources = [os.path.join(build_path, name + '.c') for name in
+                       manifests[tables]['sources'] + ['driver']]
+            exe = os.path.join(build_path, 'driver')
+            subprocess.check_call(['gcc', '-std=c99', '-O0',
+                                   '-I' + build_path,
+                                   '-I' + os.path.join(build_path, 'jacobs'),
+                                   '-o', exe] + sources + ['-lm'])
+            values[tables] = np.array([float(line) for line in
+                                       subprocess.check_output([exe]).split()])
+        assert np.allclose(values[True], values[False], rtol=1e-7,
+                           atol=1e-12 * np.abs(values[False]).max())
+
@@ -0,0 +1,89 @@
+"""
+Test of the modules imported by the pyJac entry points
+"""
+# Python 2 compatibility
+from __future__ import print_function
+from __future__ import division
+
+import sys
+import subprocess
+
+light_modules = ['pyjac', 'pyjac.utils', 'pyjac.server', 'pyjac.server.client',
+                 'pyjac.batch', 'pyjac.benchmark', 'pyjac.libgen',
+                 'pyjac.pywrap'
+                 ]
+"""list of str: Modules imported without the generator or NumPy"""
+
+entry_points = ['pyjac', 'pyjac.batch', 'pyjac.server', 'pyjac.libgen',
+                'pyjac.pywrap', 'pyjac.functional_tester',
+                'pyjac.performance_tester'
+                ]
+"""list of str: Modules run by ``python -m`` whose ``--help`` imports
+neither the generator nor NumPy (nor Cantera)"""
+
+heavy_modules = ['numpy', 'cantera', 'pyjac.core.create_jacobian']
+"""list of str: Modules only imported once needed"""
+
+
+def imported_modules(args):
+    """Run Python with ``-X importtime``, returning the names of the modules
+    imported.
+    """
+    process = subprocess.Popen([sys.executable, '-X', 'importtime'] + args,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    modules = set()
+    for line in stderr.decode('utf-8').splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        name = line[len('import time:'):].split('|')[2]
+        modules.add(name.strip())
+    return modules
+
+
+class TestImports(object):
+    """
+    """
+    def test_modules(self):
+        """Ensure the modules not generating code import none of the heavy
+        modules.
+        """
+        if sys.version_info < (3, 7):
+            # no -X importtime, and the attributes are not imported lazily
+            return
+        for module in light_modules:
+            modules = imported_modules(['-c', 'import ' + module])
+            assert module in modules
+            assert not any(name in modules for name in heavy_modules), module
+
+    def test_help(self):
+        """Ensure ``--help`` of the entry points imports none of the heavy
+        modules.
+        """
+        if sys.version_info < (3, 7):
+            return
+        for module in entry_points:
+            modules = imported_modules(['-m', module, '--help'])
+            assert not any(name in modules for name in heavy_modules), module
+
+    def test_lazy_attributes(self):
+        """Ensure the attributes of the packages are those of their
+        submodules.
+        """
+        import pyjac
+        from .. import server
+        from .. import batch
+        from ..core import create_jacobian
+        from ..server import server as server_module
+        from ..batch import batch as batch_module
+        assert pyjac.create_jacobian is create_jacobian.create_jacobian
+        assert pyjac.create_source_tree is create_jacobian.create_source_tree
+        assert server.GeneratorServer is server_module.GeneratorServer
+        assert batch.run_batch is batch_module.run_batch
+        try:
+            pyjac.no_such_attribute
+            assert False
+        except AttributeError:
+            pass
@@ -2,9 +2,11 @@
 from __future__ import print_function
 from __future__ import division
 
+import os
 import sys
 
 from ..libgen import libgen
+from ..core import file_writer
 
 class TestLibgen(object):
     """
@@ -13,3 +15,57 @@ def test_imported(self):
         """Ensure libgen module imported.
         """
         assert 'pyjac.libgen.libgen' in sys.modules
+
+    def test_up_to_date(self, tmpdir):
+        """Ensure only changed sources are recompiled.
+        """
+        source = os.path.join(str(tmpdir), 'dydt.c')
+        obj = os.path.join(str(tmpdir), 'dydt.o')
+        for name in (source, obj):
+            with open(name, 'w') as file:
+                file.write('')
+        command = 'gcc -c {} -o {}'.format(source, obj)
+        # never compiled by libgen
+        assert not libgen.up_to_date(obj, source, command)
+
+        with open(obj + '.cmd', 'w') as file:
+            file.write(command)
+        os.utime(source, (0, 0))
+        assert libgen.up_to_date(obj, source, command)
+        assert not libgen.up_to_date(obj, source, command + ' -DFINITE_DIFF')
+        assert not libgen.up_to_date(obj, source, command,
+                                     os.path.getmtime(obj) + 1
+                                     )
+        os.utime(obj, (0, 0))
+        os.utime(source, None)
+        assert not libgen.up_to_date(obj, source, command)
+
+    def test_file_list(self, tmpdir):
+        """Ensure the subfiles are listed from the manifest if present.
+        """
+        source_dir = str(tmpdir)
+        os.mkdir(os.path.join(source_dir, 'jacobs'))
+        with open(os.path.join(source_dir, 'jacobs', 'jac_list_c'), 'w') as file:
+            file.write('jacob_0.c jacob_1.c')
+        i_dirs, files = libgen.get_file_list(source_dir, False, 'c')
+        assert files[-2:] == [os.path.join('jacobs', 'jacob_0'),
+                              os.path.join('jacobs', 'jacob_1')]
+
+        manifest = {'sources': ['dydt', 'jacob', 'jacobs/jacob_0',
+                                'jacobs/jacob_1', 'jacobs/jacob_2',
+                                'sparse_multiplier']}
+        i_dirs, files = libgen.get_file_list(source_dir, True, 'c',
+                                             manifest=manifest)
+        assert i_dirs == [source_dir, os.path.join(source_dir, 'jacobs')]
+        assert 'rxn_rates_pres_mod' in files
+        assert files[-3:] == ['jacobs/jacob_0', 'jacobs/jacob_1',
+                              'jacobs/jacob_2']
+        assert 'sparse_multiplier' not in files
+        assert 'rxn_tables' not in files
+        manifest = {'sources': ['dydt', 'jacob', 'rxn_tables'],
+                    'kernels': 'tables'}
+        i_dirs, files = libgen.get_file_list(source_dir, False, 'c',
+                                             manifest=manifest)
+        assert 'rxn_tables' in files and 'jacob' in files
+        assert i_dirs == [source_dir]
+        assert file_writer.read_manifest(source_dir) is None
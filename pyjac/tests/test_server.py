@@ -0,0 +1,171 @@
+# Python 2 compatibility
+from __future__ import print_function
+from __future__ import division
+
+import os
+import sys
+import json
+import socket
+import threading
+
+from ..server import server
+from ..server import client
+from ..core import file_writer
+from ..core import create_jacobian
+from ..benchmark import synthetic
+
+class TestServer(object):
+    """
+    """
+    def test_imported(self):
+        """Ensure server module imported.
+        """
+        assert 'pyjac.server.server' in sys.modules
+
+    def test_generate(self, tmpdir):
+        """Ensure the server generates code for loaded mechanisms, or a
+        subset of their reactions, and answers errors.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+        address = os.path.join(str(tmpdir), 'pyjac.sock')
+        if not hasattr(server, '_UnixServer'):
+            address = 'localhost:0'
+        generator = server.GeneratorServer(parse_cache=False)
+        srv = server.make_server(address, generator)
+        if not hasattr(server, '_UnixServer'):
+            address = 'localhost:{}'.format(srv.server_address[1])
+        thread = threading.Thread(target=srv.serve_forever)
+        thread.start()
+        try:
+            info = client.call(address, 'load', {'mech_name': mech_name})
+            assert info['species'] == 10
+            assert client.call(address, 'mechanisms') == [info]
+
+            build_path = os.path.join(str(tmpdir), 'out')
+            manifest = client.call(address, 'generate',
+                                   {'lang': 'c', 'build_path': build_path,
+                                    'mechanism': info['id'],
+                                    'reactions': [0, 2, 4],
+                                    'options': {'skip_jac': True}})
+            assert manifest['counts']['reactions'] == 3
+            assert manifest == file_writer.read_manifest(build_path)
+            assert os.path.isfile(os.path.join(build_path, 'rxn_rates.c'))
+
+            # the whole mechanism, as generated directly
+            manifest = client.call(address, 'generate',
+                                   {'lang': 'c', 'build_path': build_path,
+                                    'mech_name': mech_name})
+            assert manifest['counts']['reactions'] == info['reactions']
+            tree = create_jacobian.create_source_tree('c', mech_name,
+                                                      parse_cache=False)
+            for name, text in tree.items():
+                if name != file_writer.manifest_name:
+                    with open(os.path.join(build_path, name)) as file:
+                        assert file.read() == text
+
+            for method, params, code in [
+                    ('nope', {}, client.METHOD_NOT_FOUND),
+                    ('generate', {'lang': 'c', 'build_path': build_path,
+                                  'mech_name': mech_name,
+                                  'options': {'bogus': True}},
+                     client.INVALID_PARAMS),
+                    ('generate', {'lang': 'c', 'build_path': build_path,
+                                  'mechanism': 'missing'},
+                     client.INVALID_PARAMS),
+                    ('generate', {'lang': 'c', 'build_path': build_path,
+                                  'mechanism': info['id'], 'reactions': [99]},
+                     client.INVALID_PARAMS),
+                    ('generate', {'lang': 'java', 'build_path': build_path,
+                                  'mechanism': info['id']},
+                     client.GENERATION_ERROR)]:
+                try:
+                    client.call(address, method, params)
+                    assert False, method
+                except client.ServerError as e:
+                    assert e.code == code
+
+            assert client.call(address, 'unload', {'id': info['id']})
+            assert client.call(address, 'mechanisms') == []
+            assert client.call(address, 'shutdown')
+            thread.join(10)
+            assert not thread.is_alive()
+        finally:
+            if thread.is_alive():
+                srv.shutdown()
+                thread.join()
+            srv.server_close()
+
+    def test_invalid_params(self, tmpdir, monkeypatch):
+        """Ensure only parameters a method cannot be called with are answered
+        as invalid, and errors raised by the generation as such.
+        """
+        mech_name = os.path.join(str(tmpdir), 'mech.inp')
+        synthetic.write_chemkin(mech_name,
+                                *synthetic.generate_mechanism(10, 20))
+        generator = server.GeneratorServer(parse_cache=False)
+
+        def request(method, params):
+            return generator.handle(json.dumps({'jsonrpc': '2.0', 'id': 1,
+                                                'method': method,
+                                                'params': params}))
+
+        info = request('load', {'mech_name': mech_name})['result']
+        for params in [{'mech_name': mech_name, 'bogus': True}, {},
+                       [mech_name, None, None], mech_name]:
+            response = request('load', params)
+            assert response['error']['code'] == client.INVALID_PARAMS
+
+        def broken_generator(*args, **kwargs):
+            raise TypeError('a bug of the generator')
+        monkeypatch.setattr(server, 'create_jacobian', broken_generator)
+        response = request('generate', {'lang': 'c',
+                                         'build_path': str(tmpdir),
+                                         'mechanism': info['id']})
+        assert response['error']['code'] == client.GENERATION_ERROR
+        assert 'a bug of the generator' in response['error']['message']
+
+    def test_address(self, tmpdir):
+        """Ensure the server only replaces stale sockets, and only listens
+        on other hosts than loopback addresses if allowed to.
+        """
+        for host in ['0.0.0.0', 'localhost']:
+            try:
+                srv = server.make_server(host + ':0')
+                assert host == 'localhost'
+                srv.server_close()
+            except SystemExit:
+                assert host != 'localhost'
+        srv = server.make_server('0.0.0.0:0', allow_remote=True)
+        srv.server_close()
+
+        if not hasattr(server, '_UnixServer'):
+            return
+        address = os.path.join(str(tmpdir), 'pyjac.sock')
+        with open(address, 'w') as file:
+            file.write('data')
+        try:
+            server.make_server(address)
+            assert False
+        except SystemExit:
+            pass
+        with open(address) as file:
+            assert file.read() == 'data'
+        os.remove(address)
+
+        # left by a server that did not exit cleanly
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(address)
+        sock.close()
+        srv = server.make_server(address)
+        try:
+            # still listening
+            try:
+                server.make_server(address)
+                assert False
+            except SystemExit:
+                pass
+        finally:
+            srv.server_close()
+
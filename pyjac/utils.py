@@ -4,15 +4,17 @@
 
 # Standard libraries
 import os
+import sys
 import errno
+import importlib
 from math import log10, floor
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 
 __all__ = ['line_start', 'comment', 'langs', 'file_ext', 'restrict',
            'header_ext', 'line_end', 'exp_10_fun', 'array_chars',
            'get_species_mappings', 'get_nu', 'read_str_num', 'split_str',
            'create_dir', 'get_array', 'get_index', 'reassign_species_lists',
-           'is_integer', 'get_parser'
+           'is_integer', 'lazy_imports', 'read_index_ranges', 'get_parser'
            ]
 
 line_start = '  '
@@ -303,6 +305,63 @@ def is_integer(val):
             return False
 
 
+def lazy_imports(package, names):
+    """Returns a module ``__getattr__`` (Python 3.7+) importing the
+    attributes of a package from its submodules on first use.
+
+    Parameters
+    ----------
+    package : str
+        Name of the package, i.e., its ``__name__``.
+    names : dict
+        The submodule of each attribute, relative to the package (e.g.,
+        ``'.server'``).
+
+    Returns
+    -------
+    function
+        The ``__getattr__`` of the package.
+
+    """
+    def __getattr__(name):
+        if name not in names:
+            raise AttributeError("module '{}' has no attribute '{}'".format(
+                package, name))
+        value = getattr(importlib.import_module(names[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+    return __getattr__
+
+
+def read_index_ranges(string):
+    """Returns the indices of a list of indices and ranges.
+
+    Parameters
+    ----------
+    string : str
+        Comma-separated indices and inclusive ranges, e.g. ``1,5,10-20``.
+
+    Returns
+    -------
+    list of int
+        The indices, in order.
+
+    """
+    indices = []
+    for item in string.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        start, _, stop = item.partition('-')
+        try:
+            start = int(start)
+            stop = int(stop) if stop else start
+        except ValueError:
+            raise ArgumentTypeError('invalid index range: ' + item)
+        indices.extend(range(start, stop + 1))
+    return sorted(set(indices))
+
+
 def get_parser():
     """
 
@@ -430,6 +489,101 @@ def get_parser():
                         action='store_true',
                         help='If specified, this option turns off Jacobian generation '
                              '(only rate subs are generated)')
+    parser.add_argument('-npc', '--no_parse_cache',
+                        dest='parse_cache',
+                        required=False,
+                        default=True,
+                        action='store_false',
+                        help='If specified, always interpret the mechanism '
+                             'instead of reusing a cached result for '
+                             'unchanged files (cached in $PYJAC_CACHE_DIR, '
+                             'default ~/.cache/pyjac).')
+    parser.add_argument('-pp', '--parse_processes',
+                        type=int,
+                        dest='parse_procs',
+                        default=1,
+                        required=False,
+                        help='The number of processes used to interpret the '
+                             'reactions of a Chemkin-format mechanism '
+                             '(useful for very large mechanisms).')
+    parser.add_argument('-cse', '--cse',
+                        required=False,
+                        default=False,
+                        action='store_true',
+                        help='If specified, evaluate the subexpressions '
+                             'repeated in the Jacobian only once (common '
+                             'subexpression elimination), and report the '
+                             'number of operations removed.')
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        default=1,
+                        required=False,
+                        help='The number of processes generating code in '
+                             'parallel (the output is the same).')
+    parser.add_argument('-prof', '--profile',
+                        nargs='?',
+                        const='memory',
+                        default=None,
+                        choices=['memory', 'time'],
+                        required=False,
+                        help='If specified, report the wall time, CPU time '
+                             'and peak memory of each stage of the '
+                             'generation, and the size of each file, in '
+                             'profile.json in the build directory. Tracing '
+                             'memory slows the generation down (by over an '
+                             'order of magnitude on some Python versions); '
+                             '"--profile time" only times the stages.')
+    parser.add_argument('-plan', '--plan',
+                        nargs='?',
+                        const='text',
+                        default=None,
+                        choices=['text', 'json'],
+                        required=False,
+                        help='If specified, do not generate any code; '
+                             'instead predict the number of rate and '
+                             'Jacobian subfiles, their approximate lines, '
+                             'the Jacobian nonzeros, the Jacobian memory per '
+                             'state (dense and sparse) and the compile time '
+                             '(and, with --table_kernels, the size of the '
+                             'constant tables), as a table or '
+                             '("--plan json") as JSON.')
+    parser.add_argument('-srv', '--server',
+                        type=str,
+                        default=None,
+                        required=False,
+                        help='If specified, the address of a running pyJac '
+                             'server (host:port, or the path of a Unix '
+                             'domain socket; see "python -m pyjac.server") '
+                             'that generates the code, reusing the '
+                             'mechanisms it has already interpreted.')
+    parser.add_argument('-dr', '--disable_reactions',
+                        type=read_index_ranges,
+                        default=None,
+                        required=False,
+                        help='Indices of reactions (from zero, in the order '
+                             'of the mechanism) to leave out, e.g. '
+                             '"1,5,10-20". They keep their place in the '
+                             'generated code, with zero rates.')
+    parser.add_argument('-delta', '--delta',
+                        required=False,
+                        default=False,
+                        action='store_true',
+                        help='If specified, keep the Jacobian subfiles of '
+                             'the previous generation in the build '
+                             'directory that are unchanged, e.g. when only '
+                             'the reactions left out changed, so that only '
+                             'the files of the changed reactions are '
+                             'rewritten and recompiled.')
+    parser.add_argument('-tk', '--table_kernels',
+                        required=False,
+                        default=False,
+                        action='store_true',
+                        help='If specified, write the reaction and species '
+                             'rates and the Jacobian as compact loops over '
+                             'constant tables of the mechanism instead of '
+                             'unrolled code, which compiles much faster '
+                             'into a smaller library for large mechanisms '
+                             '(C only).')
 
     args = parser.parse_args()
     return args
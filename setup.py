@@ -78,8 +78,10 @@
     ],
     keywords='chemical_kinetics analytical_Jacobian',
 
-    packages=['pyjac', 'pyjac.core', 'pyjac.functional_tester', 'pyjac.libgen',
-              'pyjac.performance_tester', 'pyjac.pywrap', 'pyjac.tests',
+    packages=['pyjac', 'pyjac.batch', 'pyjac.benchmark', 'pyjac.core',
+              'pyjac.functional_tester', 'pyjac.libgen',
+              'pyjac.performance_tester', 'pyjac.pywrap', 'pyjac.server',
+              'pyjac.tests',
               ],
     package_dir={'pyjac': 'pyjac'},
     install_requires=install_requires,